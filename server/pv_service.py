@@ -6,25 +6,36 @@ This module provides a FastAPI server that integrates both the PV simulation
 and technical report generation services into a single interface.
 """
 
+import hmac
 import logging
 import sys
 import os
+from functools import partial
 from pathlib import Path
-from fastapi import FastAPI, HTTPException
+from typing import Literal, Optional
+from fastapi import FastAPI, Header, HTTPException, Query, Request
+from fastapi.responses import FileResponse, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
 # Add pvlib_api and tech_study to Python path
-sys.path.append(str(Path(__file__).parent / 'pvlib_api'))
-sys.path.append(str(Path(__file__).parent / 'tech_study'))
+SERVER_DIR = Path(__file__).parent
+if str(SERVER_DIR) not in sys.path:
+    sys.path.append(str(SERVER_DIR))
+sys.path.append(str(SERVER_DIR / 'pvlib_api'))
+sys.path.append(str(SERVER_DIR / 'tech_study'))
 
 # Import PV simulation components
-from SPVSimAPI import SPVSim
+from SPVSimAPI import RESULT_FIELDS, SPVSim, parse_result_fields
 from APIModels import SimulationRequest, SimulationResponse
+from instrumentation import STAGE_HISTOGRAMS, Trace, span, stage_metrics, tracing
+from metrics import REGISTRY, cache_families, gauge_family, install_metrics
+from wire_format import accepted_media_type, wire_response
 
-# Import report generation components
-from run_report import main as generate_report
-from models import ReportRequest, ReportResponse
+# Import report request models; the report stack itself loads on first use
+# (package-qualified: a bare "models" resolves to pvlib_api/models.py)
+from tech_study.models import ReportRequest, ReportResponse
 
 # Configure logging
 logging.basicConfig(
@@ -52,23 +63,128 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+def generate_report(**kwargs):
+    """Generate a report, importing the report stack (jinja2, yaml, templates) on first use"""
+    from run_report import main
+    return main(**kwargs)
+
+def _report_metrics():
+    """Report section cache and export queue, read at scrape time once reports are in use"""
+    if 'run_report' not in sys.modules:
+        return []
+
+    from scripts.export_document import get_exporter
+    from scripts.template_engine import TEMPLATES_DIR, get_engine
+
+    exporter = get_exporter()
+    return cache_families({'report_sections': [get_engine(TEMPLATES_DIR)]}) + [
+        gauge_family('pv_report_export_queue_depth', 'PDF exports waiting for or running in the worker pool',
+                     exporter.pending),
+        gauge_family('pv_report_export_workers', 'PDF conversion worker processes', exporter.max_workers),
+    ]
+
+# Prometheus metrics at GET /metrics
+REGISTRY.register_collector(stage_metrics)
+REGISTRY.register_collector(_report_metrics)
+install_metrics(app, 'pv_service')
+
+# Return the Server-Timing header for every simulation when set
+TIMINGS_ENV = 'PV_TIMINGS'
+# Log a warning with the request's inputs when a traced simulation takes longer (ms)
+SLOW_SIMULATION_ENV = 'PV_SLOW_SIMULATION_MS'
+# Record peak memory per stage for every simulation when set to 1 (debugging only)
+TRACE_MEMORY_ENV = 'PV_TRACE_MEMORY'
+# Accepted ?timings= values; 'memory' also records peak memory per stage
+TIMINGS_VALUES = ('false', '0', 'true', '1', 'memory')
+
+def _simulate(request: SimulationRequest, fields=None):
+    sim = SPVSim()
+    sim.configure_from_request(request)
+    return sim, sim.execute_simulation(fields)
+
+def _run_simulation(request: SimulationRequest, trace: Trace = None, fields=None):
+    """Create, configure and run a simulation (blocking), recording stage spans into trace
+    and computing only the selected result fields (all by default); returns the simulator
+    and its results"""
+    if trace is None:
+        return _simulate(request, fields)
+
+    with tracing(trace):
+        return _simulate(request, fields)
+
+def _execute_simulation(request: SimulationRequest, trace: Trace = None, fields=None):
+    """Run a simulation as _run_simulation does, returning its results"""
+    return _run_simulation(request, trace, fields)[1]
+
+def _log_timings(request: SimulationRequest, trace: Trace):
+    """Log the stage breakdown, warning with the inputs when the simulation was slow"""
+    total_ms = trace.elapsed_ms()
+    threshold_ms = float(os.environ.get(SLOW_SIMULATION_ENV) or 0)
+    if threshold_ms and total_ms > threshold_ms:
+        logging.warning(
+            f"Slow simulation ({total_ms:.0f} ms) for lat={request.site.lat}, lon={request.site.lon}, "
+            f"tz={request.site.tz}, arrays={2 if request.secondary_array else 1}, "
+            f"bank_capacity={request.bank.bnk_cap}: {trace.server_timing()}"
+        )
+    else:
+        logging.info(f"Simulation timings: {trace.server_timing()}")
+
 @app.post("/simulate", response_model=SimulationResponse)
-async def run_simulation(request: SimulationRequest) -> SimulationResponse:
+async def run_simulation(
+    request: SimulationRequest,
+    http_request: Request,
+    timings: str = Query('false', description="true for the per-stage timing breakdown; memory to add peak memory per stage"),
+    fields: Optional[str] = Query(None, description=f"Comma separated result fields to compute: {', '.join(RESULT_FIELDS)}")
+) -> SimulationResponse:
     """
     Run a PV system simulation based on the provided parameters.
+
+    ?fields= limits the response to the listed sections (success and message are
+    always included), skipping the work for the others; ?fields=summary is the
+    cheap option for polling headline numbers.
+
+    With ?timings=true (or PV_TIMINGS=1) the per-stage breakdown is returned in
+    the Server-Timing header; ?timings=true also adds it, up to serialization, as a
+    timings field. ?timings=memory (or PV_TRACE_MEMORY=1) also records each
+    stage's peak_memory_kb. That runs tracemalloc, which slows the simulation and
+    is process-wide: simulations traced concurrently share one peak counter, so
+    their memory figures include each other's allocations.
+
+    The response format follows the Accept header: JSON by default, or MessagePack,
+    Arrow IPC or raw float32 with the monthly and daily tables as numeric arrays
+    (see wire_format).
     """
+    try:
+        selected = parse_result_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    timings = timings.lower()
+    if timings not in TIMINGS_VALUES:
+        raise HTTPException(status_code=400, detail=f"timings must be one of: {', '.join(TIMINGS_VALUES)}")
+    memory = timings == 'memory' or os.environ.get(TRACE_MEMORY_ENV) == '1'
+    timings = timings in ('true', '1', 'memory')
+    accepted_media_type(http_request)
+
     try:
         logging.info("Starting PV simulation")
         
-        # Create and configure simulation
-        sim = SPVSim()
-        sim.configure_from_request(request)
-        
-        # Run simulation
-        results = sim.execute_simulation()
+        # Stages are always traced to feed the duration histograms
+        trace = Trace(memory=memory)
+
+        # Run in the worker threadpool so simulations don't block the event loop
+        sim, results = await run_in_threadpool(_run_simulation, request, trace, selected)
         logging.info("Simulation completed successfully")
         
-        return results
+        with tracing(trace), span('serialization'):
+            # The breakdown has to be in the body before it is encoded, so the
+            # timings field stops short of serialization (Server-Timing includes it)
+            results['timings'] = trace.to_dict() if timings else None
+            response = wire_response(http_request, results, sim.result_arrays())
+        _log_timings(request, trace)
+
+        if timings or os.environ.get(TIMINGS_ENV) == '1':
+            response.headers['Server-Timing'] = trace.server_timing()
+        return response
         
     except Exception as e:
         logging.error(f"Simulation error: {str(e)}")
@@ -77,6 +193,53 @@ async def run_simulation(request: SimulationRequest) -> SimulationResponse:
             detail=f"Simulation error: {str(e)}"
         )
 
+# Admin profiling endpoint, only registered when set to 1
+PROFILING_ENV = 'PV_PROFILING'
+# When set, profiling requests must send it in the X-Profiling-Token header
+PROFILING_TOKEN_ENV = 'PV_PROFILING_TOKEN'
+
+if os.environ.get(PROFILING_ENV) == '1':
+    @app.post("/admin/profile")
+    async def profile_simulation(
+        request: SimulationRequest,
+        mode: Literal['sampling', 'cprofile'] = 'sampling',
+        output_format: Literal['speedscope', 'collapsed'] = Query('speedscope', alias='format'),
+        interval_ms: float = Query(5.0, gt=0, le=1000),
+        memory: bool = True,
+        x_profiling_token: Optional[str] = Header(None)
+    ):
+        """
+        Run a simulation under a profiler and return flamegraph stacks, the
+        hottest functions and allocation statistics.
+        """
+        token = os.environ.get(PROFILING_TOKEN_ENV)
+        if token and not hmac.compare_digest(x_profiling_token or '', token):
+            raise HTTPException(status_code=403, detail="Invalid profiling token")
+
+        from profiling import ProfilerBusy, profile_call
+
+        logging.info(f"Profiling simulation ({mode}) for lat={request.site.lat}, lon={request.site.lon}")
+        try:
+            report = await run_in_threadpool(
+                profile_call,
+                partial(_execute_simulation, request),
+                mode=mode,
+                output_format=output_format,
+                interval_ms=interval_ms,
+                memory=memory,
+                name=f"simulation {request.site.lat},{request.site.lon}"
+            )
+        except ProfilerBusy as e:
+            raise HTTPException(status_code=409, detail=str(e))
+
+        results = report.pop('result')
+        report['simulation'] = {
+            'success': bool(results and results.get('success')),
+            'service_percentage': results.get('service_percentage') if results else None
+        }
+        logging.info(f"Profiled simulation in {report['elapsed_ms']:.0f} ms")
+        return report
+
 @app.post("/generate-report", response_model=ReportResponse)
 async def generate_technical_report(request: ReportRequest) -> ReportResponse:
     """
@@ -85,30 +248,25 @@ async def generate_technical_report(request: ReportRequest) -> ReportResponse:
     try:
         logging.info(f"Starting report generation for project: {request.project_name}")
         
-        # Generate report
-        success = generate_report(
+        # Generate report in memory on the worker threadpool; requests share no files
+        result = await run_in_threadpool(
+            generate_report,
             project_name=request.project_name,
             project_specs=request.project_specs,
             components=request.components,
             calculation_results=request.calculation_results,
-            templates=request.templates
+            templates=request.templates,
+            write_files=request.write_files,
+            output_format=request.output_format
         )
         
-        # Read generated report
-        try:
-            report_path = Path(__file__).parent / "tech_study/output/report.md"
-            with open(report_path, "r") as f:
-                report_content = f.read()
-        except FileNotFoundError:
-            raise HTTPException(
-                status_code=500,
-                detail="Report file not found after generation"
-            )
-            
         return ReportResponse(
-            success=True,
-            message="Report generated successfully",
-            report_content=report_content
+            success=result["success"],
+            message=result["message"],
+            report_content=result.get("report_content"),
+            report_path=result.get("report_path"),
+            export_path=result.get("export_path"),
+            error=result.get("error")
         )
         
     except Exception as e:
@@ -119,6 +277,38 @@ async def generate_technical_report(request: ReportRequest) -> ReportResponse:
             error=str(e)
         )
 
+@app.post("/export-report")
+async def export_technical_report(request: ReportRequest):
+    """
+    Generate a technical report and return the document itself (Markdown, HTML or PDF).
+    """
+    logging.info(f"Starting report export ({request.output_format}) for project: {request.project_name}")
+
+    result = await run_in_threadpool(
+        generate_report,
+        project_name=request.project_name,
+        project_specs=request.project_specs,
+        components=request.components,
+        calculation_results=request.calculation_results,
+        templates=request.templates,
+        output_format=request.output_format
+    )
+
+    if not result["success"]:
+        raise HTTPException(
+            status_code=500,
+            detail=f"{result['message']}: {result.get('error', '')}"
+        )
+
+    if request.output_format == "md":
+        return Response(content=result["report_content"], media_type="text/markdown")
+
+    return FileResponse(
+        result["export_path"],
+        media_type=result["export_media_type"],
+        filename=f"{request.project_name}.{request.output_format}"
+    )
+
 @app.post("/simulate-and-report")
 async def simulate_and_generate_report(
     sim_request: SimulationRequest,
@@ -129,10 +319,10 @@ async def simulate_and_generate_report(
     """
     try:
         # Run simulation first
-        sim_results = await run_simulation(sim_request)
+        sim_results = await run_in_threadpool(_execute_simulation, sim_request)
         
         # Add simulation results to report request
-        report_request.calculation_results = sim_results.dict()
+        report_request.calculation_results = sim_results
         
         # Generate report
         report_response = await generate_technical_report(report_request)
@@ -146,14 +336,22 @@ async def simulate_and_generate_report(
             error=str(e)
         )
 
+@app.get("/timings")
+async def stage_timings():
+    """Histograms of simulation stage durations across traced requests"""
+    return {"stages": STAGE_HISTOGRAMS.snapshot()}
+
 @app.get("/")
 async def root():
     """Root endpoint to verify API is running"""
     return {
         "message": "Solar PV Service API is running",
         "endpoints": {
-            "simulate": "POST /simulate - Run PV system simulation",
+            "simulate": "POST /simulate - Run PV system simulation (?fields=summary,... to select result sections, ?timings=true for a stage breakdown)",
+            "timings": "GET /timings - Simulation stage duration histograms",
+            "metrics": "GET /metrics - Prometheus metrics",
             "generate-report": "POST /generate-report - Generate technical report",
+            "export-report": "POST /export-report - Download technical report as Markdown, HTML or PDF",
             "simulate-and-report": "POST /simulate-and-report - Run simulation and generate report"
         }
     }
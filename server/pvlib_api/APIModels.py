@@ -116,3 +116,5 @@ class SimulationResponse(BaseModel):
     monthly_performance: Dict[str, Any] = None
     power_flow: Dict[str, Any] = None
     service_percentage: float = None
+    summary: Optional[Dict[str, Any]] = None
+    timings: Optional[Dict[str, Any]] = None
@@ -4,6 +4,7 @@ from pvlib.temperature import TEMPERATURE_MODEL_PARAMETERS
 from pvlib.atmosphere import tdew_from_rh  # Correct function to use
 import pandas as pd
 import numpy as np
+from instrumentation import span
 
 class PVArray():
     """ Methods associated with the definition, display, and operation of a Solar Panel Array """
@@ -179,8 +180,6 @@ class PVArray():
         temp_parms = TEMPERATURE_MODEL_PARAMETERS[temp_model][temp_type]
         
         # Get site data
-        print("get_location")
-
         loc = cur_site.get_location()
         
         # Try to get site weather data first
@@ -189,10 +188,10 @@ class PVArray():
         #     wind_speed = cur_site.get_wind_spd(times)['Wind_Spd']
         # except (AttributeError, KeyError):
         # If not available, use our atmospheric data function
-        atmos_data = self.get_atmospheric_data(times, loc)
+        with span('weather'):
+            atmos_data = self.get_atmospheric_data(times, loc)
         air_temp = atmos_data['air_temp']
         wind_speed = atmos_data['wind_speed']
-        print("PVSystem")
 
         # Create PVSystem object
         pvsys = PVSystem(
@@ -209,60 +208,65 @@ class PVArray():
         )
         
         # Solar position calculations
-        solpos = loc.get_solarposition(times, pressure=None, temperature=air_temp)
-        
-        # Air mass calculations
-        airmass = loc.get_airmass(times, solar_position=solpos, model='kastenyoung1989')
-        
+        with span('solar_position'):
+            solpos = loc.get_solarposition(times, pressure=None, temperature=air_temp)
+
+            # Air mass calculations
+            airmass = loc.get_airmass(times, solar_position=solpos, model='kastenyoung1989')
+
         # Clear sky irradiance
-        clearsky = loc.get_clearsky(times, model='ineichen')
-        
-        # Angle of incidence
-        aoi = pvsys.get_aoi(solpos['zenith'], solpos['azimuth'])
-        
-        # Plane of array irradiance
-        total_irrad = pvsys.get_irradiance(
-            solpos['zenith'], 
-            solpos['azimuth'],
-            clearsky['dni'], 
-            clearsky['ghi'], 
-            clearsky['dhi'],
-            dni_extra=None, 
-            airmass=airmass,
-            model='haydavies'
-        )
-        
+        with span('clearsky'):
+            clearsky = loc.get_clearsky(times, model='ineichen')
+
+        with span('transposition'):
+            # Angle of incidence
+            aoi = pvsys.get_aoi(solpos['zenith'], solpos['azimuth'])
+
+            # Plane of array irradiance
+            total_irrad = pvsys.get_irradiance(
+                solpos['zenith'],
+                solpos['azimuth'],
+                clearsky['dni'],
+                clearsky['ghi'],
+                clearsky['dhi'],
+                dni_extra=None,
+                airmass=airmass,
+                model='haydavies'
+            )
+
         # Cell temperature
-        cell_temps = pvsys.get_cell_temperature(
-            total_irrad['poa_global'], 
-            air_temp, 
-            wind_speed, 
-            model='sapm'
-        )
+        with span('cell_temperature'):
+            cell_temps = pvsys.get_cell_temperature(
+                total_irrad['poa_global'],
+                air_temp,
+                wind_speed,
+                model='sapm'
+            )
         
         # Get technology-specific parameters
         # vars_dict = panel_types[cur_pnl.Technology].copy()
         # egrf = vars_dict.pop('EgRef', 1.121)
         # dgdt = vars_dict.pop('dEgdT', -0.0002677)
         
-        # Calculate module parameters using cell temperature
-        photocurrent, saturation_current, resistance_series, resistance_shunt, nNsVth = (
-            pvsys.calcparams_desoto(
-                total_irrad['poa_global'],
-                cell_temps
+        with span('single_diode'):
+            # Calculate module parameters using cell temperature
+            photocurrent, saturation_current, resistance_series, resistance_shunt, nNsVth = (
+                pvsys.calcparams_desoto(
+                    total_irrad['poa_global'],
+                    cell_temps
+                )
             )
-        )
-        
-        # Calculate array output
-        array_out = pvsys.scale_voltage_current_power(
-            pvsys.singlediode(
-                photocurrent,
-                saturation_current,
-                resistance_series,
-                resistance_shunt, 
-                nNsVth
+
+            # Calculate array output
+            array_out = pvsys.scale_voltage_current_power(
+                pvsys.singlediode(
+                    photocurrent,
+                    saturation_current,
+                    resistance_series,
+                    resistance_shunt,
+                    nNsVth
+                )
             )
-        )
         
         # Add temperature data to output
         array_out['cell_temperature'] = cell_temps
@@ -2,11 +2,11 @@ import numpy as np
 import math
 import pandas as pd
 import os.path
-import requests
 import csv
-from urllib.request import urlopen
 from datetime import date
-import matplotlib.pyplot as plt
+
+# urllib.request and matplotlib are imported where used: the simulation
+# services never fetch resources or plot, and both add to their startup time
 
 def dfcell_is_empty(cell_value):
     """ Return True if Dataframe cell contains NaN """
@@ -145,37 +145,84 @@ def read_resource(filename, dirptr):
 def read_web_resource(url, dirptr, filename):
     """  Method to retrieve data from web url and create a file
          with filename within the designated dirptr  """
+    from urllib.error import URLError
+    from urllib.request import urlopen
+
     fp = os.path.join(dirptr, filename)
     try:
         response = urlopen(url)
         cr = csv.reader(response.read().decode('utf-8'))
         return True
-    except requests.exceptions.ConnectionError:
+    except URLError:
         return False
 
+MONTH_NAMES = np.array(['Jan', 'Feb', 'Mar', 'Apr',
+                        'May', 'Jun', 'Jul', 'Aug',
+                        'Sep', 'Oct', 'Nov', 'Dec'])
+
+def daily_totals(df, select_values):
+    """ Sums each select_value column per DayofYear in a single pass
+        returns 3 part tuple containing:
+            array of the days of year present (sorted),
+            array of the month of each of those days,
+            array of daily totals, one row per day and one column per select_value
+    """
+    days, first_hour, day_index = np.unique(df['DayofYear'].to_numpy(),
+                                            return_index=True, return_inverse=True)
+    day_months = df['Month'].to_numpy()[first_hour].astype(int)
+    # Missing values count as zero, as in a groupby sum
+    values = np.nan_to_num(df[list(select_values)].to_numpy(dtype=float))
+    totals = np.column_stack([np.bincount(day_index, weights=values[:, col], minlength=len(days))
+                              for col in range(values.shape[1])])
+    return days, day_months, totals
+
+def build_monthly_summaries(df, select_values):
+    """ Summarizes df contents for several select_value parameters
+        over an entire year from one set of daily totals
+        returns dict of select_value -> 3 part list containing:
+            monthly summary dataframe,
+            best day designator,
+            worst day designator
+    """
+    days, day_months, totals = daily_totals(df, select_values)
+    if len(days) == 0:
+        raise IndexError('No daily values to summarize')
+    month_index = day_months - 1
+    days_in_month = np.bincount(month_index, minlength=12)
+    hours_in_month = np.bincount(df['Month'].to_numpy().astype(int) - 1, minlength=12)
+
+    rslt = dict()
+    for col, select_value in enumerate(select_values):
+        day_vals = totals[:, col]
+        monthly_total = np.bincount(month_index, weights=day_vals, minlength=12)
+        best = np.full(12, -np.inf)
+        worst = np.full(12, np.inf)
+        np.maximum.at(best, month_index, day_vals)
+        np.minimum.at(worst, month_index, day_vals)
+
+        # Months without data have no average, best or worst day
+        empty = days_in_month == 0
+        with np.errstate(invalid='ignore', divide='ignore'):
+            avg = monthly_total / days_in_month
+        best[empty] = np.nan
+        worst[empty] = np.nan
+
+        summary = pd.DataFrame({'Total {0}'.format(select_value): monthly_total,
+                                'Avg {0}'.format(select_value): avg,
+                                'Best {0}'.format(select_value): best,
+                                'Worst {0}'.format(select_value): worst,
+                                'Days': hours_in_month/24},
+                               index=MONTH_NAMES)
+        summary.index.name = 'Months'
+        rslt[select_value] = [summary,
+                              int(days[np.argmax(day_vals)]),
+                              int(days[np.argmin(day_vals)])]
+    return rslt
+
 def build_monthly_summary(df, select_value):
     """ Summarizes df contents for select_value parameter
         over an entire year """    
-    month_list = np.array(['Jan', 'Feb', 'Mar', 'Apr',
-                           'May', 'Jun', 'Jul', 'Aug',
-                           'Sep', 'Oct', 'Nov', 'Dec'])
-    dat_list = np.zeros([12,5])
-    for indx in range(12):
-        smpl_df = df.loc[df['Month'] == indx+1]
-        vals = smpl_df[select_value].groupby(smpl_df['DayofMonth']).sum()
-        dat_list[indx][0] = vals.sum()
-        dat_list[indx][1] = vals.mean()
-        dat_list[indx][2] = vals.max()
-        dat_list[indx][3] = vals.min()
-        dat_list[indx][4] = len(smpl_df)/24
-    rslt = pd.DataFrame(dat_list, month_list, 
-                        columns=['Total {0}'.format(select_value), 
-                                 'Avg {0}'.format(select_value), 
-                                 'Best {0}'.format(select_value), 
-                                 'Worst {0}'.format(select_value),
-                                 'Days' ])
-    rslt.index.name= 'Months'
-    return rslt
+    return build_monthly_summaries(df, [select_value])[select_value][0]
 
 
 def build_monthly_performance(df, param):
@@ -186,30 +233,39 @@ def build_monthly_performance(df, param):
             best day designator,
             worst day designator
     """
-    rslt = []    
-    rslt.append( build_monthly_summary(df, param))
-    rslt.append( find_best_doy(df, param))
-    rslt.append( find_worst_doy(df, param))
-    return rslt
+    return build_monthly_summaries(df, [param])[param]
 
 def find_worst_doy(df, select_value):
     """ returns a day_of_year where select_value is a minimum """
-    rslt_df = df[select_value].groupby(df['DayofYear']).sum()
-    mn = rslt_df.min()
-    for indx in range(len(rslt_df)):
-        if rslt_df.iloc[indx] == mn:
-            return indx + 1
-    raise IndexError('No worst day value found')
+    days, _, totals = daily_totals(df, [select_value])
+    if len(days) == 0:
+        raise IndexError('No worst day value found')
+    return int(days[np.argmin(totals[:, 0])])
     
 def find_best_doy(df, select_value):
     """ returns a day_of_year where select_value is a maximum """
-    rslt_df = df[select_value].groupby(df['DayofYear']).sum()
-    mx = rslt_df.max()
-    for indx in range(len(rslt_df)):
-        if rslt_df.iloc[indx] == mx:
-            return indx + 1
-    raise IndexError('No best day value found')
-   
+    days, _, totals = daily_totals(df, [select_value])
+    if len(days) == 0:
+        raise IndexError('No best day value found')
+    return int(days[np.argmax(totals[:, 0])])
+
+def daily_means(df):
+    """ Averages every column of df per calendar day of its DatetimeIndex
+        in a single pass, as df.resample('D').mean() does for a frame
+        with no missing days """
+    day_index, days = pd.factorize(df.index.normalize(), sort=True)
+    values = df.to_numpy(dtype=float)
+    present = ~np.isnan(values)
+    values = np.where(present, values, 0.0)
+    sums = np.column_stack([np.bincount(day_index, weights=values[:, col], minlength=len(days))
+                            for col in range(values.shape[1])])
+    counts = np.column_stack([np.bincount(day_index, weights=present[:, col], minlength=len(days))
+                              for col in range(values.shape[1])])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = sums / counts
+    days.name = df.index.name
+    return pd.DataFrame(means, index=days, columns=df.columns)
+
 def computOutputResults(attrb_dict,  ArP, ArV, ArI, acLd, dcLd, wkDict):
     """Computes the controlled Voltage & current output used to either power
        the load or charge/discharge a battery bank. Updates the
@@ -463,6 +519,10 @@ def import_new_resource(file_type ):
 
 
 def plot_graphic(title, xlabel, ylabel, xdata, plotslist, figsize=(6, 4)):
+    import matplotlib.pyplot as plt
+    from pandas.plotting import register_matplotlib_converters
+
+    register_matplotlib_converters()
     fig, ax = plt.subplots(figsize=figsize)
     for plot in plotslist:
         if plot['type'] == 'Bar':
@@ -6,7 +6,6 @@ import os.path
 import pickle
 import numpy as np
 import pandas as pd
-from pandas.plotting import register_matplotlib_converters
 
 from PVSite import PVSite
 from PVBattery import PVBattery
@@ -24,7 +23,6 @@ from PVUtilities import (read_resource, hourly_load, create_time_indices,
 
 class SPVSim:
     def __init__(self):
-        register_matplotlib_converters()
         self.debug = False
         self.errflg = False
         self.wdir = os.getcwd()
@@ -2,12 +2,13 @@
 # -*- coding: utf-8 -*-
 
 from datetime import datetime
+import logging
 import os.path
 import pickle
 import json
+from typing import Optional
 import numpy as np
 import pandas as pd
-from pandas.plotting import register_matplotlib_converters
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 # from typing import Dict, List, Optional, Any, Union
@@ -21,12 +22,36 @@ from PVArray import PVArray
 from PVInverter import PVInverter
 from PVChgControl import PVChgControl
 from SiteLoad import SiteLoad
+from instrumentation import span
+from wire_format import NumpyEncoder, accepted_media_type, frame_arrays, frame_records, wire_response
 from PVUtilities import (read_resource, hourly_load, create_time_indices,
-                         build_monthly_performance, build_overview_report,
+                         build_monthly_performance, build_overview_report, daily_means, MONTH_NAMES,
                          computOutputResults, show_pwr_performance, show_pwr_best_day,
                          show_pwr_worst_day, show_array_performance,show_array_best_day,
                          show_array_worst_day, output_report, debug_next )
 
+logger = logging.getLogger(__name__)
+
+# Sections of the simulation results, computed and returned only when selected;
+# success and message are always returned
+RESULT_FIELDS = ('service_percentage', 'summary', 'overview', 'monthly_performance', 'power_flow')
+
+
+def parse_result_fields(fields=None):
+    """ Returns the set of result sections selected by fields: a comma
+        separated string or an iterable of RESULT_FIELDS names, None for all
+        Raises ValueError for unknown names """
+    if fields is None:
+        return set(RESULT_FIELDS)
+    if isinstance(fields, str):
+        fields = fields.split(',')
+    selected = {field.strip() for field in fields if field.strip()}
+    unknown = selected.difference(RESULT_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown result fields: {', '.join(sorted(unknown))} "
+                         f"(expected any of {', '.join(RESULT_FIELDS)})")
+    return selected
+
 
 # Create FastAPI app
 app = FastAPI(title="PV Simulation API",
@@ -44,7 +69,6 @@ app.add_middleware(
 
 class SPVSim:
     def __init__(self):
-        register_matplotlib_converters()
         self.debug = False
         self.errflg = False
         # self.wdir = os.getcwd()
@@ -87,9 +111,7 @@ class SPVSim:
         self.site.lat = request_data.site.lat
         self.site.lon = request_data.site.lon
         self.site.elev = request_data.site.elev
-        print(f"Configured site: cntry={self.site.cntry}, lat={self.site.lat}, lon={self.site.lon}, elev={self.site.elev}")
-        print(f"Request data site: {request_data.site}")
-        print(f"Site object after configuration: {self.site.__dict__}")
+        logger.debug(f"Configured site: cntry={self.site.cntry}, lat={self.site.lat}, lon={self.site.lon}, elev={self.site.elev}")
         
         # Handle timezone conversion safely
         tz_input = request_data.site.tz
@@ -212,8 +234,7 @@ class SPVSim:
             request_data.load_profile.Mode
         ]
         self.load.add_new_row(load_values)
-        elp = self.load.get_load_profile()
-        print(elp)
+        logger.debug(f"Load profile:\n{self.load.get_load_profile()}")
 
     def combine_arrays(self):
         """ Combine primary & secondary array outputs to from a unified output
@@ -232,12 +253,8 @@ class SPVSim:
             if len(self.array_list) > 0:
                 if not isinstance(self.array_list[0], PVArray):
                     raise ValueError("First array is not a valid PVArray object")
-                print("define_array_performance",len(self.array_list)  )
-
                 frst_array = self.array_list[0].define_array_performance(self.times.index,
                                                 self.site, self.inv, self.pnl)
-                
-                print("after: define_array_performance")
 
                 rslt = pd.DataFrame({'ArrayVolts':frst_array['v_mp'],
                                    'ArrayCurrent':frst_array['i_mp'],
@@ -248,11 +265,8 @@ class SPVSim:
                     sarf = self.array_list[ar]
                     if sarf and isinstance(sarf, PVArray):
                         try:
-                            print("define_array_performance 2:", ar, self.inv, self.pnl)
-
                             sec_array = self.array_list[ar].define_array_performance(
                                 self.times.index, self.site, self.inv, self.pnl)
-                            print("after define_array_performance 2")
 
                             for rw in range(len(rslt)):
                                 if rslt['ArrayPower'].iloc[rw] > 0 and sec_array['p_mp'].iloc[rw] > 0:
@@ -363,16 +377,24 @@ class SPVSim:
                                 self.load.get_load_profile()))
         return rslt
 
-    def execute_simulation(self):
-        """ Perform System Analysis and return results as JSON-serializable dict """
+    def execute_simulation(self, fields=None):
+        """ Perform System Analysis and return results as JSON-serializable dict
+            fields selects the result sections to compute (see RESULT_FIELDS),
+            all of them by default """
+        selected = parse_result_fields(fields)
         results = {
             "success": False,
-            "message": "Simulation failed",
+            "message": "Simulation failed"
+        }
+        defaults = {
+            "service_percentage": 0.0,
+            "summary": {},
             "overview": {"text": ""},
             "monthly_performance": {"monthly_averages": [], "best_day": [], "worst_day": []},
-            "power_flow": {"data": []},
-            "service_percentage": 0.0
+            "power_flow": {"data": []}
         }
+        results.update((field, defaults[field]) for field in RESULT_FIELDS if field in selected)
+        self.daily_power_flow = None
 
         if self.perform_base_error_check():
             self.errflg = False
@@ -385,30 +407,29 @@ class SPVSim:
                 self.loc = self.site.get_location()
             else:
                 raise ValueError("Site object does not have a get_location method")
-            self.times = create_time_indices(self.site.tz)
+            with span('time_index'):
+                self.times = create_time_indices(self.site.tz)
             # self.site.get_atmospherics(self.times.index)
             if bnkflg:
                 self.bnk.initialize_bank()
-            print("combine arrays 1:")
-
-            self.array_out = self.combine_arrays()
-            print("build_monthly_performance")
 
-            self.mnthly_array_perfm = build_monthly_performance(self.array_out,'ArrayPower')
-            print("get_daily_load")
+            with span('combine'):
+                self.array_out = self.combine_arrays()
 
-            dl = np.array([self.load.get_daily_load()]*12)
-            dlf = pd.DataFrame({'Daily Load':dl}, index=self.mnthly_array_perfm[0].index.values)
-            self.mnthly_array_perfm[0] = self.mnthly_array_perfm[0].join(dlf)
-            print("combine arrays")
-            self.array_out = self.combine_arrays()
-            print("compute_powerFlows")
+            with span('power_flow'):
+                self.power_flow = self.compute_powerFlows()
 
-            self.power_flow = self.compute_powerFlows()
-            print("build_monthly_performance")
-
-            self.mnthly_pwr_perfm = build_monthly_performance(self.power_flow, 'PowerOut')
-            self.mnthly_pwr_perfm[0] = self.mnthly_pwr_perfm[0].join(dlf)
+            if 'monthly_performance' in selected:
+                with span('summaries'):
+                    dl = np.array([self.load.get_daily_load()]*12)
+                    dlf = pd.DataFrame({'Daily Load':dl}, index=MONTH_NAMES)
+                    self.mnthly_array_perfm = build_monthly_performance(self.array_out,'ArrayPower')
+                    self.mnthly_array_perfm[0] = self.mnthly_array_perfm[0].join(dlf)
+                    self.mnthly_pwr_perfm = build_monthly_performance(self.power_flow, 'PowerOut')
+                    self.mnthly_pwr_perfm[0] = self.mnthly_pwr_perfm[0].join(dlf)
+            else:
+                self.mnthly_array_perfm = None
+                self.mnthly_pwr_perfm = None
 
             if self.errflg == False:
                 srvchrs = self.power_flow['Service'].sum()
@@ -428,22 +449,29 @@ class SPVSim:
                     # Prepare properly formatted results
                     results["success"] = True
                     results["message"] = ms
-                    results["service_percentage"] = service_percentage
+                    if 'service_percentage' in selected:
+                        results["service_percentage"] = float(service_percentage)
                     
                     try:
-                        # Format overview report
-                        overview_text = build_overview_report(self)
-                        results["overview"]["text"] = overview_text
-                        
-                        # Format monthly performance data
-                        monthly_data = self.format_monthly_performance()
-                        if monthly_data:
-                            results["monthly_performance"].update(monthly_data)
-                        
-                        # Format power flow data
-                        power_flow_data = self.format_power_flow_data()
-                        if power_flow_data:
-                            results["power_flow"]["data"] = power_flow_data
+                        with span('summaries'):
+                            if 'summary' in selected:
+                                results["summary"] = self.format_summary(srvchrs, dmndhrs)
+
+                            # Format overview report
+                            if 'overview' in selected:
+                                results["overview"]["text"] = build_overview_report(self)
+
+                            # Format monthly performance data
+                            if 'monthly_performance' in selected:
+                                monthly_data = self.format_monthly_performance()
+                                if monthly_data:
+                                    results["monthly_performance"].update(monthly_data)
+
+                            # Format power flow data
+                            if 'power_flow' in selected:
+                                power_flow_data = self.format_power_flow_data()
+                                if power_flow_data:
+                                    results["power_flow"]["data"] = power_flow_data
                     except Exception as e:
                         results["message"] = f"Error formatting results: {str(e)}"
                         results["success"] = False
@@ -462,6 +490,20 @@ class SPVSim:
             results["message"] = "Base error check failed"
             return results
 
+    def format_summary(self, service_hours, demand_hours):
+        """Annual totals (kWh) and service figures, straight from the hourly arrays"""
+        summary = {
+            "annual_array_energy_kwh": float(np.nansum(self.array_out['ArrayPower'].to_numpy())) / 1000,
+            "annual_energy_delivered_kwh": float(np.nansum(self.power_flow['PowerOut'].to_numpy())) / 1000,
+            "annual_load_kwh": float(np.nansum(self.power_flow['Total_Load'].to_numpy())) / 1000,
+            "service_hours": float(service_hours),
+            "demand_hours": float(demand_hours),
+            "service_percentage": float(service_hours / demand_hours * 100)
+        }
+        if self.bnk:
+            summary["battery_cycles"] = float(self.bnk.tot_cycles)
+        return summary
+
     def format_monthly_performance(self):
         """Format monthly performance data for JSON serialization"""
         if not hasattr(self, 'mnthly_pwr_perfm') or self.mnthly_pwr_perfm is None:
@@ -477,27 +519,18 @@ class SPVSim:
         try:
             # Format the first DataFrame in the tuple (monthly averages)
             if isinstance(self.mnthly_pwr_perfm[0], pd.DataFrame):
-                monthly_df = self.mnthly_pwr_perfm[0]
-                result["monthly_averages"] = json.loads(
-                    monthly_df.reset_index().to_json(orient='records', date_format='iso')
-                )
+                result["monthly_averages"] = frame_records(self.mnthly_pwr_perfm[0])
             
             # Format the second DataFrame in the tuple (best day)
             if len(self.mnthly_pwr_perfm) > 1 and isinstance(self.mnthly_pwr_perfm[1], pd.DataFrame):
-                best_day_df = self.mnthly_pwr_perfm[1]
-                result["best_day"] = json.loads(
-                    best_day_df.reset_index().to_json(orient='records', date_format='iso')
-                )
+                result["best_day"] = frame_records(self.mnthly_pwr_perfm[1])
             
             # Format the third DataFrame in the tuple (worst day)
             if len(self.mnthly_pwr_perfm) > 2 and isinstance(self.mnthly_pwr_perfm[2], pd.DataFrame):
-                worst_day_df = self.mnthly_pwr_perfm[2]
-                result["worst_day"] = json.loads(
-                    worst_day_df.reset_index().to_json(orient='records', date_format='iso')
-                )
+                result["worst_day"] = frame_records(self.mnthly_pwr_perfm[2])
                 
         except Exception as e:
-            print(f"Error formatting monthly performance: {str(e)}")
+            logger.error(f"Error formatting monthly performance: {str(e)}")
             # Return empty results structure on error
             return {
                 "monthly_averages": [],
@@ -514,10 +547,19 @@ class SPVSim:
             
         # Sample the data (e.g., daily average) to reduce size
         # This is important for API responses to avoid overwhelming bandwidth
-        daily_power = self.power_flow.resample('D').mean()
-        
-        # Convert to JSON-compatible format
-        return json.loads(daily_power.reset_index().to_json(orient='records', date_format='iso'))
+        self.daily_power_flow = daily_means(self.power_flow)
+        return frame_records(self.daily_power_flow)
+
+    def result_arrays(self):
+        """Numeric columns of the returned tables as NumPy arrays, for binary
+        response formats: monthly_performance.<column> (Jan to Dec) and
+        power_flow.<column> (daily averages from Jan 1)"""
+        arrays = {}
+        if getattr(self, 'mnthly_pwr_perfm', None) is not None:
+            arrays.update(frame_arrays(self.mnthly_pwr_perfm[0], 'monthly_performance'))
+        if getattr(self, 'daily_power_flow', None) is not None:
+            arrays.update(frame_arrays(self.daily_power_flow, 'power_flow'))
+        return arrays
 
     def get_results_json(self):
         """Return simulation results as JSON string"""
@@ -533,9 +575,7 @@ class SPVSim:
         invflg = False
 
         if not hasattr(self.site, 'lat') or not self.site.lat:
-            print(f"Base error check failed: site.lat is {self.site.lat}")
-            print(f"Site object during base error check: {self.site.__dict__}")
-            print(f"Site object attributes: {self.site.__dict__.keys()}")
+            logger.warning(f"Base error check failed: site.lat is {self.site.lat}")
             return False
 
         # #Tests for panel & Array definition
@@ -557,7 +597,7 @@ class SPVSim:
         # if bflg and not invflg and not self.chgc.check_definition():
         #     return False
 
-        print("Base error check passed")
+        logger.debug("Base error check passed")
         return True
 
     # def load_project_file(self, fn):
@@ -637,25 +677,28 @@ class SPVSim:
 
 # Create API routes
 @app.post("/simulate", response_model=SimulationResponse)
-async def run_simulation(request: Request, request_data: SimulationRequest):
+async def run_simulation(request: Request, request_data: SimulationRequest, fields: Optional[str] = None):
+    try:
+        selected = parse_result_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    accepted_media_type(request)
+
     try:
-        print("Incoming request data:", request_data)
+        logger.debug(f"Incoming request data: {request_data}")
 
         # Create a new simulation instance
         sim = SPVSim()
 
-        print("Created SSPVSim:")
-
         # Configure the simulation from the request data
         sim.configure_from_request(request_data)
 
-        print("Configue SSPVSim:")
         # overview_text = build_overview_report(sim)
         # print(overview_text)
         # Run the simulation
-        results = sim.execute_simulation()
+        results = sim.execute_simulation(selected)
 
-        return results
+        return wire_response(request, results, sim.result_arrays())
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Simulation error: {str(e)}")
 
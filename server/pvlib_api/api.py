@@ -4,9 +4,12 @@ from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 from SPVSim import SPVSim
 from datetime import datetime
+import numpy as np
 import pandas as pd
 from typing import Dict, Any, Optional
 from pydantic import BaseModel
+from metrics import install_metrics
+from wire_format import accepted_media_type, wire_response
 
 app = FastAPI()
 
@@ -19,6 +22,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Prometheus metrics at GET /metrics
+install_metrics(app, 'pv_api')
+
 # Add exception handler for validation errors
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -51,12 +57,14 @@ async def health_check():
     return {"status": "healthy"}
 
 @app.post("/simulate")
-async def simulate(input_data: SimulationInput):
+async def simulate(input_data: SimulationInput, request: Request):
     print(f"Received simulation request: {input_data}")
+    accepted_media_type(request)
     api_instance = SolarPVAPI()
     try:
         results = api_instance.run_simulation(input_data.dict())
-        return results
+        # Binary formats carry the hourly output as an array (see wire_format)
+        return wire_response(request, results, {"powerOutput": np.asarray(results["powerOutput"], dtype=float)})
     except Exception as e:
         print(f"Error during simulation: {str(e)}")
         import traceback
@@ -0,0 +1,8 @@
+"""
+Simulation Engine Benchmarks
+
+Seeded, repeatable timings of the simulation hot paths, written to JSON and
+compared against a stored baseline. Run from the pvlib_api directory:
+
+    python -m benchmarks.runner
+"""
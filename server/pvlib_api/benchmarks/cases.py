@@ -0,0 +1,211 @@
+"""
+Benchmark Cases
+
+Each case has a setup step (untimed) returning the state the timed run step
+receives, and a check value summarizing the run's output so behavior
+changes show up next to timing changes. Random weather is seeded before
+both steps, so every round simulates the same year.
+"""
+
+import copy
+import io
+import subprocess
+import sys
+import tempfile
+import warnings
+from contextlib import redirect_stdout
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from aggregation import aggregate_energy
+from APIModels import SimulationRequest
+from PVUtilities import build_monthly_performance, computOutputResults, create_time_indices
+from SPVSimAPI import SPVSim
+from simplified_simulator import SimplePVSimulator, create_default_config
+
+SEED = 42
+HOURS_PER_YEAR = 8760
+
+PVLIB_API_DIR = Path(__file__).resolve().parent.parent
+SERVER_DIR = PVLIB_API_DIR.parent
+
+# Modules the services load on first use only; importing a service must not pull them in
+LAZY_MODULES = ('matplotlib', 'jinja2', 'yaml', 'run_report', 'weasyprint', 'profiling')
+
+# Off-grid system: 4 x 230 W panels charging a 24 V, 400 Ah bank
+OFF_GRID_REQUEST: Dict[str, Any] = {
+    'site': {'cntry': 'Tunisia', 'lat': 36.8, 'lon': 10.18, 'elev': 10, 'tz': 'UTC'},
+    'battery': {'b_typ': 'FLA', 'b_nomv': 12, 'b_rcap': 200, 'b_rhrs': 20, 'b_ir': 0.01,
+                'b_stdTemp': 25, 'b_tmpc': -0.5, 'b_mxDschg': 1200, 'b_mxDoD': 50},
+    'panel': {'Technology': 'Mono-c-Si', 'T_NOCT': 45, 'V_mp_ref': 30.5, 'I_mp_ref': 8.2,
+              'V_oc_ref': 37.8, 'I_sc_ref': 8.8, 'PTC': 230, 'A_c': 1.63, 'N_s': 60,
+              'R_s': 0.3, 'R_sh_ref': 300, 'BIPV': 0, 'alpha_sc': 0.004, 'beta_oc': -0.12,
+              'a_ref': 1.6, 'I_L_ref': 8.85, 'I_o_ref': 1e-10, 'Adjust': 8, 'gamma_r': -0.45},
+    'array': {'tilt': 30, 'azimuth': 180, 'mtg_cnfg': 'open_rack_cell_glassback', 'mtg_spc': 10,
+              'mtg_hgt': 1, 'gnd_cnd': 'Grass', 'albedo': 0.25, 'uis': 2, 'sip': 2,
+              'ary_Vmp': 61, 'ary_Imp': 16.4, 'ary_tpnl': 4},
+    'bank': {'doa': 2, 'doc': 50, 'bnk_uis': 2, 'bnk_sip': 2, 'bnk_tbats': 4,
+             'bnk_cap': 400, 'bnk_vo': 24},
+    'inverter': {'Vac': 230, 'Paco': 1000, 'Pdco': 1050, 'Vdco': 48, 'Pnt': 1, 'Vdcmax': 150,
+                 'Idcmax': 30, 'Mppt_low': 40, 'Mppt_high': 120},
+    'charge_controller': {'c_type': 'MPPT', 'c_pvmxv': 150, 'c_pvmxi': 30, 'c_bvnom': 24,
+                          'c_mvchg': 28.8, 'c_michg': 30, 'c_midschg': 30, 'c_tmpc': -0.03,
+                          'c_tmpr': 25, 'c_cnsmpt': 1, 'c_eff': 95},
+    'load_profile': {'Type': 'AC', 'Qty': 1, 'Use_Factor': 1, 'Hours': 6, 'Start_Hour': 18,
+                     'Watts': 100, 'Mode': 'AC'},
+}
+
+
+def grid_tied_request() -> Dict[str, Any]:
+    """Same system without battery storage"""
+    request = copy.deepcopy(OFF_GRID_REQUEST)
+    request['bank'].update(bnk_cap=0, bnk_tbats=0)
+    return request
+
+
+def multi_array_request() -> Dict[str, Any]:
+    """Off-grid system with a second, west-facing array"""
+    request = copy.deepcopy(OFF_GRID_REQUEST)
+    request['secondary_array'] = dict(request['array'], azimuth=270)
+    return request
+
+
+@dataclass
+class Benchmark:
+    """A timed code path"""
+    name: str
+    run: Callable[[Any], Any]
+    setup: Optional[Callable[[], Any]] = None
+    check: Optional[Callable[[Any], float]] = None
+    rounds: int = 5
+
+
+def quiet(func: Callable, *args) -> Any:
+    """Call func without the engines' progress prints and pandas warnings"""
+    with redirect_stdout(io.StringIO()), warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return func(*args)
+
+
+def configured_spvsim(request: Dict[str, Any]) -> SPVSim:
+    """SPVSim configured from a request dict"""
+    sim = SPVSim()
+    quiet(sim.configure_from_request, SimulationRequest(**request))
+    return sim
+
+
+def configured_simulator() -> SimplePVSimulator:
+    """SimplePVSimulator with the default configuration"""
+    simulator = SimplePVSimulator()
+    simulator.setup_system(*create_default_config())
+    return simulator
+
+
+def synthetic_array_output() -> Dict[str, np.ndarray]:
+    """Seeded hourly array power, volts, current and loads for a year"""
+    rng = np.random.default_rng(SEED)
+    hours = np.arange(HOURS_PER_YEAR) % 24
+    daylight = np.clip(np.sin(np.pi * (hours - 6) / 12), 0, None)
+    volts = np.where(daylight > 0, 55 + 6 * rng.random(HOURS_PER_YEAR), 0.0)
+    current = 16.4 * daylight * (0.6 + 0.4 * rng.random(HOURS_PER_YEAR))
+    ac_load = np.where((hours >= 18) & (hours < 24), 100.0, 0.0)
+    return {'ArP': volts * current, 'ArV': volts, 'ArI': current,
+            'acLd': ac_load, 'dcLd': np.zeros(HOURS_PER_YEAR)}
+
+
+def power_flow_state():
+    """Configured off-grid components with an initialized bank plus a year of inputs"""
+    sim = configured_spvsim(OFF_GRID_REQUEST)
+    sim.bnk.initialize_bank()
+    return sim, synthetic_array_output()
+
+
+def run_power_flows(state) -> float:
+    """computOutputResults for every hour of the year, returning delivered energy (Wh)"""
+    sim, series = state
+    sysAttribs = {'Inv': sim.inv, 'Chg': sim.chgc, 'Bnk': sim.bnk}
+    delivered = 0.0
+    for ArP, ArV, ArI, acLd, dcLd in zip(series['ArP'], series['ArV'], series['ArI'],
+                                          series['acLd'], series['dcLd']):
+        wkDict = dict()
+        computOutputResults(sysAttribs, ArP, ArV, ArI, acLd, dcLd, wkDict)
+        delivered += wkDict.get('PO', 0.0)
+    return delivered
+
+
+def summary_frame():
+    """Hourly time indices with a year of seeded array power"""
+    df = create_time_indices(0)
+    df['ArrayPower'] = synthetic_array_output()['ArP']
+    return df
+
+
+def bank_state():
+    """Initialized off-grid bank plus a year of charge/discharge currents"""
+    sim = configured_spvsim(OFF_GRID_REQUEST)
+    sim.bnk.initialize_bank()
+    series = synthetic_array_output()
+    currents = series['ArI'] - series['acLd'] / 24.0
+    return sim.bnk, currents
+
+
+def run_bank_updates(state) -> float:
+    """PVBatBank.update_soc for every hour of the year, returning the final SOC"""
+    bank, currents = state
+    for i_in in currents:
+        bank.update_soc(i_in, dict())
+    return bank.soc
+
+
+def cold_import(module: str, path: Path = PVLIB_API_DIR) -> List[str]:
+    """Import a module in a fresh interpreter, returning the LAZY_MODULES it loaded"""
+    code = (f"import sys; sys.path.insert(0, {str(path)!r}); import {module}; "
+            f"print(','.join(name for name in {LAZY_MODULES!r} if name in sys.modules))")
+    # Services may create log files in the working directory
+    with tempfile.TemporaryDirectory() as cwd:
+        completed = subprocess.run([sys.executable, '-c', code], cwd=cwd, capture_output=True,
+                                   text=True, check=True)
+    return [name for name in completed.stdout.strip().split(',') if name]
+
+
+def run_spvsim(sim: SPVSim) -> Dict[str, Any]:
+    return quiet(sim.execute_simulation)
+
+
+def spvsim_check(results: Dict[str, Any]) -> float:
+    return round(results['service_percentage'], 4)
+
+
+BENCHMARKS = [
+    Benchmark('spvsim_grid_tied', run_spvsim, lambda: configured_spvsim(grid_tied_request()),
+              spvsim_check, rounds=3),
+    Benchmark('spvsim_off_grid_battery', run_spvsim, lambda: configured_spvsim(OFF_GRID_REQUEST),
+              spvsim_check, rounds=3),
+    # Summary-only projection, as polled by the dashboard
+    Benchmark('spvsim_off_grid_summary', lambda sim: quiet(sim.execute_simulation, 'summary'),
+              lambda: configured_spvsim(OFF_GRID_REQUEST),
+              lambda results: round(results['summary']['service_percentage'], 4), rounds=3),
+    Benchmark('spvsim_multi_array', run_spvsim, lambda: configured_spvsim(multi_array_request()),
+              spvsim_check, rounds=3),
+    Benchmark('simple_simulate_year', lambda sim: sim.simulate_year(2023), configured_simulator,
+              lambda result: round(result.annual_energy, 3)),
+    Benchmark('simple_simulate_day', lambda sim: sim.simulate_day('2023-06-21'), configured_simulator,
+              lambda result: round(sum(result['power_output']), 3), rounds=20),
+    Benchmark('compute_output_results_year', run_power_flows, power_flow_state,
+              lambda delivered: round(delivered, 3)),
+    Benchmark('bank_update_soc_year', run_bank_updates, bank_state,
+              lambda soc: round(soc, 6), rounds=10),
+    Benchmark('build_monthly_performance', lambda df: build_monthly_performance(df, 'ArrayPower'),
+              summary_frame, lambda result: round(float(result[0].iloc[:, 0].sum()), 3), rounds=20),
+    Benchmark('aggregate_energy_year', lambda df: aggregate_energy(df['ArrayPower'].to_numpy(), df.index),
+              summary_frame, lambda result: round(result.annual_energy, 3), rounds=20),
+    Benchmark('create_time_indices', lambda tz: create_time_indices(tz), lambda: 0,
+              lambda times: len(times), rounds=10),
+    # Worker cold start: interpreter startup plus service imports
+    Benchmark('cold_import_spvsim_api', lambda _: cold_import('SPVSimAPI'), check=len, rounds=3),
+    Benchmark('cold_import_simple_api', lambda _: cold_import('simple_api'), check=len, rounds=3),
+    Benchmark('cold_import_pv_service', lambda _: cold_import('pv_service', SERVER_DIR), check=len, rounds=3),
+]
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Benchmark Runner
+
+Times each benchmark case over several seeded rounds, writes the results to
+JSON and compares median times against a stored baseline. Exits with status
+1 when any case is slower than the baseline by more than the threshold.
+
+Usage:
+    python -m benchmarks.runner                       # run and compare
+    python -m benchmarks.runner --filter spvsim       # subset of cases
+    python -m benchmarks.runner --save-baseline       # record a new baseline
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+PVLIB_API_DIR = Path(__file__).resolve().parent.parent
+if str(PVLIB_API_DIR) not in sys.path:
+    sys.path.insert(0, str(PVLIB_API_DIR))
+
+from benchmarks.cases import BENCHMARKS, SEED, Benchmark
+
+BENCHMARKS_DIR = Path(__file__).resolve().parent
+DEFAULT_BASELINE = BENCHMARKS_DIR / 'baseline.json'
+DEFAULT_OUTPUT = BENCHMARKS_DIR / 'results' / 'latest.json'
+DEFAULT_THRESHOLD = 0.20  # 20% slower than baseline median is a regression
+
+
+def environment_info() -> Dict[str, str]:
+    """Versions and machine details recorded with each run"""
+    import pandas
+    import pvlib
+
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pandas.__version__,
+        'pvlib': pvlib.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor() or platform.machine(),
+        'system': platform.system()
+    }
+
+
+def run_benchmark(benchmark: Benchmark, rounds: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Time a benchmark case
+
+    Args:
+        benchmark: Case to run
+        rounds: Number of timed rounds (defaults to the case's own)
+
+    Returns:
+        Dictionary of timing statistics in seconds plus the check value
+    """
+    rounds = rounds or benchmark.rounds
+    timings = []
+    check = None
+
+    for _ in range(rounds):
+        np.random.seed(SEED)
+        state = benchmark.setup() if benchmark.setup else None
+
+        np.random.seed(SEED)
+        start = time.perf_counter()
+        result = benchmark.run(state)
+        timings.append(time.perf_counter() - start)
+
+        if benchmark.check:
+            check = benchmark.check(result)
+
+    return {
+        'rounds': rounds,
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'mean': statistics.mean(timings),
+        'max': max(timings),
+        'stdev': statistics.stdev(timings) if len(timings) > 1 else 0.0,
+        'check': check
+    }
+
+
+def run_benchmarks(name_filter: Optional[str] = None, rounds: Optional[int] = None) -> Dict[str, Any]:
+    """Run all (or the matching) benchmark cases"""
+    results = {}
+    for benchmark in BENCHMARKS:
+        if name_filter and name_filter not in benchmark.name:
+            continue
+        print(f"Running {benchmark.name}...", flush=True)
+        results[benchmark.name] = run_benchmark(benchmark, rounds)
+        print(f"  median {results[benchmark.name]['median'] * 1000:.2f} ms "
+              f"over {results[benchmark.name]['rounds']} rounds")
+
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'seed': SEED,
+        'environment': environment_info(),
+        'benchmarks': results
+    }
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any],
+                    threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+    """
+    Compare benchmark medians against a baseline
+
+    Args:
+        current: Results from run_benchmarks
+        baseline: Previously saved results
+        threshold: Allowed relative slowdown before flagging a regression
+
+    Returns:
+        One row per current case with its status: regression, improvement, ok or new.
+        output_changed is set when the check value differs from the baseline.
+    """
+    rows = []
+    baseline_cases = baseline.get('benchmarks', {})
+
+    for name, result in current['benchmarks'].items():
+        reference = baseline_cases.get(name)
+        if reference is None:
+            rows.append({'name': name, 'status': 'new', 'current': result['median'],
+                         'baseline': None, 'ratio': None, 'output_changed': False})
+            continue
+
+        ratio = result['median'] / reference['median'] if reference['median'] else float('inf')
+        if ratio > 1 + threshold:
+            status = 'regression'
+        elif ratio < 1 / (1 + threshold):
+            status = 'improvement'
+        else:
+            status = 'ok'
+
+        rows.append({
+            'name': name,
+            'status': status,
+            'current': result['median'],
+            'baseline': reference['median'],
+            'ratio': ratio,
+            'output_changed': reference.get('check') != result.get('check')
+        })
+
+    return rows
+
+
+def print_comparison(rows: List[Dict[str, Any]]) -> None:
+    """Print the comparison table"""
+    print(f"\n{'Benchmark':<32} {'Baseline ms':>12} {'Current ms':>12} {'Ratio':>7}  Status")
+    print('-' * 76)
+    for row in rows:
+        baseline = f"{row['baseline'] * 1000:.2f}" if row['baseline'] is not None else '-'
+        ratio = f"{row['ratio']:.2f}" if row['ratio'] is not None else '-'
+        status = row['status'] + (' (output changed)' if row['output_changed'] else '')
+        print(f"{row['name']:<32} {baseline:>12} {row['current'] * 1000:>12.2f} {ratio:>7}  {status}")
+
+
+def save_json(data: Dict[str, Any], path: Path) -> None:
+    """Write results as JSON"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+        f.write('\n')
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the PV simulation engines')
+    parser.add_argument('--filter', help='Only run cases whose name contains this text')
+    parser.add_argument('--rounds', type=int, help='Override the number of rounds for every case')
+    parser.add_argument('--output', type=Path, default=DEFAULT_OUTPUT, help='Results JSON file')
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE, help='Baseline JSON file')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Relative slowdown flagged as a regression (default: 0.20)')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='Store these results as the new baseline instead of comparing')
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.filter, args.rounds)
+    save_json(results, args.output)
+    print(f"\nResults written to {args.output}")
+
+    if args.save_baseline:
+        save_json(results, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+
+    rows = compare_results(results, baseline, args.threshold)
+    print_comparison(rows)
+
+    regressions = [row['name'] for row in rows if row['status'] == 'regression']
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -43,6 +43,43 @@ def main():
         help='Manufacturer name (for single file mode)'
     )
 
+    parser.add_argument(
+        '--manifest',
+        type=str,
+        help='Ingestion manifest path (default: <output>/ingestion_manifest.sqlite)'
+    )
+
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Reprocess all PDFs, ignoring the ingestion manifest'
+    )
+
+    parser.add_argument(
+        '--targeted',
+        action='store_true',
+        help='Only run Camelot on electrical-spec pages'
+    )
+
+    parser.add_argument(
+        '--extraction-cache',
+        type=str,
+        help='Directory for cached Camelot tables/text, reused on later runs'
+    )
+
+    parser.add_argument(
+        '--cache-only',
+        action='store_true',
+        help='Re-run the parser from the extraction cache only, without running Camelot '
+             '(the PDFs must still exist: cache keys are their content hashes)'
+    )
+
+    parser.add_argument(
+        '--all-flavors',
+        action='store_true',
+        help='Run Camelot stream extraction on every page, not only pages lattice missed'
+    )
+
     parser.add_argument(
         'mode',
         choices=['file', 'batch'],
@@ -67,7 +104,13 @@ def main():
         pdf_files=[],
         output_dir=output_dir,
         skip_validation=True,
-        export_format='both'
+        export_format='both',
+        manifest_path=Path(args.manifest) if args.manifest else None,
+        force_reprocess=args.force,
+        targeted_extraction=args.targeted,
+        extraction_cache_dir=Path(args.extraction_cache) if args.extraction_cache else None,
+        cache_only=args.cache_only,
+        adaptive_flavors=not args.all_flavors
     )
 
     # Setup PDF files based on mode
@@ -79,7 +122,7 @@ def main():
 
         config.pdf_files = [{
             'file_path': str(pdf_path),
-            'manufacturer': args.manufacturer or 'Unknown'
+            'manufacturer': args.manufacturer
         }]
     else:  # batch mode
         config_path = Path(args.path)
@@ -106,6 +149,9 @@ def main():
     # Save results
     saved_files = processor.save_results(output_dir)
 
+    # Results are saved, record them so unchanged files are skipped next run
+    processor.mark_processed()
+
     # Print summary
     print("\n" + "="*80)
     print("CAMELOT EXTRACTION SUMMARY")
@@ -113,6 +159,7 @@ def main():
     print(f"Total files: {summary['total_files']}")
     print(f"Successful: {summary['successful_extractions']}")
     print(f"Failed: {summary['failed_extractions']}")
+    print(f"Skipped (unchanged): {summary['skipped_unchanged']}")
     print(f"Success rate: {summary['success_rate']}%")
     print(f"Average processing time: {summary['average_processing_time_ms']:.2f}ms")
     print(f"\nResults saved to: {output_dir}")
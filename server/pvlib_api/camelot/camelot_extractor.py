@@ -8,18 +8,109 @@ Much simpler and more reliable than regex-based text parsing.
 import camelot
 import logging
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
+
+from pdf_extractor import find_spec_fields, REQUIRED_SPEC_FIELDS, MIN_SPEC_FIELDS_PER_PAGE
+from extraction_cache import ExtractionCache
+from utils import compute_file_hash
 
 logger = logging.getLogger(__name__)
 
+# Bump when extraction output changes so ingested datasheets are reprocessed
+EXTRACTOR_VERSION = "1.2"
+
+# Rows in the fingerprint that buckets candidate duplicate tables
+DEDUP_SAMPLE_ROWS = 3
+
+# Minimum lattice table size for a page to be considered covered
+MIN_USEFUL_ROWS = 2
+MIN_USEFUL_COLS = 2
+
+
+def _normalize_cell(value: Any) -> str:
+    """Normalize cell text for fingerprinting (collapse whitespace)"""
+    return ' '.join(str(value).split())
+
+
+def _normalized_rows(df, limit: Optional[int] = None) -> Tuple:
+    """Normalized cell text of a table's rows (the first limit rows, if given)"""
+    rows = df.values.tolist() if limit is None else df.head(limit).values.tolist()
+    return tuple(tuple(_normalize_cell(cell) for cell in row) for row in rows)
+
+
+def _parse_pages(pages: str, page_count: int) -> List[int]:
+    """Expand a Camelot pages string ('all', '1,3', '2-4') to page numbers"""
+    if pages == 'all':
+        return list(range(1, page_count + 1))
+
+    page_numbers = []
+    for part in pages.split(','):
+        if '-' in part:
+            start, end = part.split('-')
+            end = page_count if end == 'end' else int(end)
+            page_numbers.extend(range(int(start), end + 1))
+        elif part:
+            page_numbers.append(int(part))
+
+    return page_numbers
+
 
 class CamelotExtractor:
     """Extract tables from PDFs using Camelot"""
 
-    def __init__(self, pdf_path: Path):
+    def __init__(self, pdf_path: Path, targeted: bool = False,
+                 cache: Optional[ExtractionCache] = None, cache_only: bool = False,
+                 adaptive: bool = True, file_hash: Optional[str] = None):
         self.pdf_path = pdf_path
+        self.targeted = targeted
+        self.cache = cache
+        self.cache_only = cache_only
+        self.adaptive = adaptive
+        self.file_hash = file_hash
+
+    def cache_settings(self) -> Dict[str, Any]:
+        """Extractor settings that affect output, used in the cache key"""
+        return {
+            'extractor': 'camelot',
+            'version': EXTRACTOR_VERSION,
+            'targeted': self.targeted,
+            'adaptive': self.adaptive
+        }
 
     def extract_all(self) -> Dict[str, Any]:
+        """
+        Extract all tables from PDF, served from the artifact cache when available
+
+        Returns:
+            Dictionary with extraction results
+        """
+
+        if self.cache:
+            # Hash the PDF once for both the lookup and the store
+            if self.file_hash is None:
+                self.file_hash = compute_file_hash(self.pdf_path)
+            cached = self.cache.get(self.pdf_path, self.cache_settings(), self.file_hash)
+            if cached:
+                return {**cached, 'success': True, 'cache_hit': True}
+
+            if self.cache_only:
+                return {
+                    'success': False,
+                    'error': 'Not found in extraction cache',
+                    'tables': [],
+                    'text': '',
+                    'table_count': 0,
+                    'method': 'camelot'
+                }
+
+        result = self._extract_with_camelot()
+
+        if self.cache and result['success']:
+            self.cache.put(self.pdf_path, self.cache_settings(), result, self.file_hash)
+
+        return result
+
+    def _extract_with_camelot(self) -> Dict[str, Any]:
         """
         Extract all tables from PDF using Camelot
 
@@ -30,21 +121,33 @@ class CamelotExtractor:
         logger.info(f"Extracting tables from {self.pdf_path.name} using Camelot")
 
         try:
+            # Limit Camelot to electrical-spec pages when targeting
+            pages = 'all'
+            text_content = None
+            if self.targeted:
+                pages, text_content = self._scan_spec_pages()
+                logger.info(f"Targeted extraction on pages {pages}")
+
             # Try lattice extraction first (for tables with clear borders)
             tables_lattice = camelot.read_pdf(
                 str(self.pdf_path),
-                pages='all',
+                pages=pages,
                 flavor='lattice',
                 suppress_stdout=True
             )
 
-            # Try stream extraction as fallback (for tables without borders)
-            tables_stream = camelot.read_pdf(
-                str(self.pdf_path),
-                pages='all',
-                flavor='stream',
-                suppress_stdout=True
-            )
+            # Try stream extraction as fallback (for tables without borders),
+            # only on pages where lattice found nothing useful when adaptive
+            stream_pages = self._stream_pages(pages, tables_lattice) if self.adaptive else pages
+            tables_stream = []
+            if stream_pages:
+                logger.info(f"Stream extraction on pages {stream_pages}")
+                tables_stream = camelot.read_pdf(
+                    str(self.pdf_path),
+                    pages=stream_pages,
+                    flavor='stream',
+                    suppress_stdout=True
+                )
 
             # Combine and deduplicate tables
             all_tables = list(tables_lattice) + list(tables_stream)
@@ -69,14 +172,17 @@ class CamelotExtractor:
                 logger.info(f"Table {i+1} ({df.shape[0]}x{df.shape[1]}): {df.iloc[0].tolist()[:5]}")
 
             # Extract text content (using pdfplumber as fallback)
-            text_content = self._extract_text_fallback()
+            if text_content is None:
+                text_content = self._extract_text_fallback()
 
             result = {
                 'success': True,
                 'tables': extracted_tables,
                 'text': text_content,
                 'table_count': len(extracted_tables),
-                'method': 'camelot'
+                'method': 'camelot',
+                'pages': pages,
+                'stream_pages': stream_pages
             }
 
             logger.info(f"Extraction complete: {len(extracted_tables)} tables found")
@@ -93,40 +199,118 @@ class CamelotExtractor:
                 'method': 'camelot'
             }
 
+    def _stream_pages(self, pages: str, lattice_tables) -> str:
+        """
+        Select pages for stream extraction
+
+        Args:
+            pages: Camelot pages string used for lattice extraction
+            lattice_tables: Tables found by lattice
+
+        Returns:
+            Camelot pages string, or '' when lattice covered every page
+        """
+        covered = {
+            int(table.page) for table in lattice_tables
+            if table.df.shape[0] >= MIN_USEFUL_ROWS
+            and table.df.shape[1] >= MIN_USEFUL_COLS
+            and any(_normalize_cell(cell) for cell in table.df.values.flatten())
+        }
+
+        page_count = 0
+        if pages == 'all' or 'end' in pages:
+            import pdfplumber
+            with pdfplumber.open(self.pdf_path) as pdf:
+                page_count = len(pdf.pages)
+
+        remaining = [page for page in _parse_pages(pages, page_count) if page not in covered]
+        return ','.join(str(page) for page in remaining)
+
+    def _table_fingerprint(self, df) -> Tuple:
+        """Fingerprint of a table: shape plus normalized sample rows"""
+        return df.shape, _normalized_rows(df, DEDUP_SAMPLE_ROWS)
+
     def _deduplicate_tables(self, tables: List) -> List:
-        """Remove duplicate tables based on content similarity"""
+        """
+        Remove duplicate tables by fingerprint
+
+        Tables are bucketed by a hash of their shape and normalized sample
+        rows. A table is only dropped when its full normalized contents
+        match a table already kept in its bucket, so full comparisons are
+        limited to tables that share a fingerprint.
+        """
 
         if not tables:
             return []
 
-        unique = [tables[0]]
+        unique = []
+        # Fingerprint -> full normalized rows of the tables kept with it
+        buckets: Dict[Tuple, List[Tuple]] = {}
 
-        for table in tables[1:]:
-            is_duplicate = False
+        for table in tables:
             table_df = table.df
 
-            for unique_table in unique:
-                unique_df = unique_table.df
-
-                # Check if tables have similar dimensions and content
-                if (table_df.shape == unique_df.shape and
-                    len(table_df) > 0 and len(unique_df) > 0):
-                    # Compare first few rows
-                    sample_size = min(3, len(table_df))
-                    similarity = sum(
-                        1 for i in range(sample_size)
-                        if table_df.iloc[i].tolist() == unique_df.iloc[i].tolist()
-                    )
-                    if similarity >= sample_size:
-                        is_duplicate = True
-                        break
-
-            if not is_duplicate:
+            # Empty tables have nothing to compare, keep them as before
+            if len(table_df) == 0:
                 unique.append(table)
+                continue
+
+            bucket = buckets.setdefault(self._table_fingerprint(table_df), [])
+            rows = _normalized_rows(table_df)
+            if rows in bucket:
+                continue
+
+            bucket.append(rows)
+            unique.append(table)
 
         logger.info(f"Deduplicated {len(tables)} tables to {len(unique)} unique tables")
         return unique
 
+    def _scan_spec_pages(self) -> Tuple[str, str]:
+        """
+        Pre-scan page text to find pages with electrical specifications
+
+        Text is read from every page, since the parser takes mechanical specs,
+        warranties and certifications from it; only the table pages stop
+        growing once Pmax, Voc, Isc, Vmp and Imp have all been seen.
+
+        Returns:
+            Tuple of (Camelot pages string, text of every page)
+        """
+        import pdfplumber
+
+        page_texts = []
+        spec_pages = []
+        fields_found = set()
+
+        with pdfplumber.open(self.pdf_path) as pdf:
+            for page_num, page in enumerate(pdf.pages, 1):
+                try:
+                    page_text = page.extract_text() or ''
+                except Exception as e:
+                    logger.warning(f"Text extraction failed on page {page_num}: {e}")
+                    page_text = ''
+                page_texts.append(page_text)
+
+                if REQUIRED_SPEC_FIELDS <= fields_found:
+                    continue
+                page_fields = find_spec_fields(page_text)
+                fields_found |= page_fields
+                if len(page_fields) >= MIN_SPEC_FIELDS_PER_PAGE:
+                    spec_pages.append(page_num)
+
+        text = ''.join(page_text + '\n\n' for page_text in page_texts if page_text)
+
+        # Labels may be drawn as graphics; fall back to every page
+        if spec_pages:
+            pages = ','.join(str(page_num) for page_num in spec_pages)
+        elif page_texts:
+            pages = f'1-{len(page_texts)}'
+        else:
+            pages = 'all'
+
+        return pages, text
+
     def _extract_text_fallback(self) -> str:
         """Fallback text extraction using pdfplumber"""
         try:
@@ -12,12 +12,18 @@ from datetime import datetime
 import logging
 from tqdm import tqdm
 
-from camelot_extractor import CamelotExtractor
-from simplified_parser import SimplifiedParser
+from camelot_extractor import CamelotExtractor, EXTRACTOR_VERSION
+from simplified_parser import SimplifiedParser, PARSER_VERSION
+from parser_registry import get_registry
 from models import PVPanelData, ExtractionResult, ProcessingConfig
+from ingestion_manifest import IngestionManifest, MANIFEST_FILENAME
+from extraction_cache import ExtractionCache
 
 logger = logging.getLogger(__name__)
 
+PIPELINE_NAME = 'camelot'
+PIPELINE_VERSION = f"{EXTRACTOR_VERSION}+{PARSER_VERSION}"
+
 
 class CamelotDatasheetProcessor:
     """Simplified datasheet processor using Camelot"""
@@ -26,18 +32,78 @@ class CamelotDatasheetProcessor:
         self.config = config
         self.results: List[ExtractionResult] = []
         self.errors: List[Dict[str, Any]] = []
+        self.skipped: List[str] = []
+        self.manifest: Optional[IngestionManifest] = None
+        self.extraction_cache: Optional[ExtractionCache] = None
+        if config.extraction_cache_dir:
+            self.extraction_cache = ExtractionCache(config.extraction_cache_dir)
+
+    def pipeline_version(self) -> str:
+        """Manifest version: extractor and parser versions, extraction and flavor modes and a digest of the manufacturer rules"""
+        mode = 'targeted' if self.config.targeted_extraction else 'full'
+        flavors = 'adaptive' if self.config.adaptive_flavors else 'all-flavors'
+        return f"{PIPELINE_VERSION}+{mode}+{flavors}+rules.{get_registry().rules_digest}"
+
+    def open_manifest(self) -> Optional[IngestionManifest]:
+        """Open the ingestion manifest used to skip unchanged datasheets"""
+        if self.manifest is None:
+            manifest_path = self.config.manifest_path or Path(self.config.output_dir) / MANIFEST_FILENAME
+            try:
+                self.manifest = IngestionManifest(manifest_path, PIPELINE_NAME, self.pipeline_version())
+            except Exception as e:
+                logger.warning(f"Ingestion manifest unavailable, processing all files: {e}")
+        return self.manifest
+
+    def mark_processed(self) -> int:
+        """
+        Record extracted results in the ingestion manifest
+
+        Call only once results have been saved, so files whose save
+        failed are picked up again on the next run.
+
+        Returns:
+            Number of files recorded
+        """
+        manifest = self.open_manifest()
+        if not manifest:
+            return 0
+
+        marked = 0
+        for result in self.results:
+            if result.source_file and Path(result.source_file).exists():
+                manifest.mark_processed(
+                    result.source_file,
+                    maker=result.panel_data.maker,
+                    model=result.panel_data.model
+                )
+                marked += 1
+
+        logger.info(f"Recorded {marked} files in ingestion manifest")
+        return marked
 
     def process_single_pdf(self, pdf_config: Dict[str, Any]) -> Optional[ExtractionResult]:
         """Process a single PDF file using Camelot"""
 
         pdf_path = Path(pdf_config['file_path'])
-        manufacturer = pdf_config.get('manufacturer', 'Unknown Manufacturer')
+        manufacturer = pdf_config.get('manufacturer')
 
         logger.info(f"Processing: {pdf_path.name}")
 
         try:
+            # Content hash for the extraction cache, reused from the manifest when it has one
+            file_hash = None
+            if self.extraction_cache and self.manifest:
+                file_hash = self.manifest.get_file_hash(pdf_path)
+
             # Extract tables using Camelot
-            extractor = CamelotExtractor(pdf_path)
+            extractor = CamelotExtractor(
+                pdf_path,
+                targeted=self.config.targeted_extraction,
+                cache=self.extraction_cache,
+                cache_only=self.config.cache_only,
+                adaptive=self.config.adaptive_flavors,
+                file_hash=file_hash
+            )
             extraction_data = extractor.extract_all()
 
             if not extraction_data['success']:
@@ -52,6 +118,10 @@ class CamelotDatasheetProcessor:
             tables = extraction_data['tables']
             text = extraction_data['text']
 
+            # Detect manufacturer from the rule registry keyword index if not provided
+            if not manufacturer:
+                manufacturer = get_registry().detect_manufacturer(text)
+
             logger.info(f"Found {len(tables)} tables using Camelot")
 
             # Parse using simplified parser
@@ -119,6 +189,10 @@ class CamelotDatasheetProcessor:
         successful_extractions = 0
         failed_extractions = 0
 
+        # Cache-only runs are for re-parsing the corpus, so never skip files
+        skip_unchanged = not (self.config.force_reprocess or self.config.cache_only)
+        manifest = self.open_manifest() if skip_unchanged else None
+
         # Create progress bar
         with tqdm(total=total_files, desc="Processing PDFs") as pbar:
             for pdf_config in self.config.pdf_files:
@@ -140,6 +214,18 @@ class CamelotDatasheetProcessor:
                     failed_extractions += 1
                     continue
 
+                # Skip datasheets already ingested with the current pipeline version
+                if manifest and manifest.is_processed(pdf_path):
+                    logger.info(f"Skipping unchanged: {pdf_path.name}")
+                    self.skipped.append(str(pdf_path))
+                    pbar.set_postfix({
+                        'Status': f'Unchanged: {pdf_path.name}',
+                        'Success': successful_extractions,
+                        'Failed': failed_extractions
+                    })
+                    pbar.update(1)
+                    continue
+
                 # Process PDF
                 result = self.process_single_pdf(pdf_config)
 
@@ -164,7 +250,10 @@ class CamelotDatasheetProcessor:
         # Generate summary
         summary = self.generate_summary(successful_extractions, failed_extractions)
 
-        logger.info(f"Batch processing complete: {successful_extractions} successful, {failed_extractions} failed")
+        logger.info(
+            f"Batch processing complete: {successful_extractions} successful, "
+            f"{failed_extractions} failed, {len(self.skipped)} skipped (unchanged)"
+        )
 
         return summary
 
@@ -191,6 +280,7 @@ class CamelotDatasheetProcessor:
             'total_files': total_processed,
             'successful_extractions': successful,
             'failed_extractions': failed,
+            'skipped_unchanged': len(self.skipped),
             'success_rate': round(success_rate, 2),
             'average_processing_time_ms': round(avg_processing_time, 2),
             'manufacturers_found': manufacturers,
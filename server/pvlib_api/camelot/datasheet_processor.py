@@ -12,13 +12,30 @@ from datetime import datetime
 import logging
 from tqdm import tqdm
 
-from pdf_extractor import PDFTextExtractor
-from panel_parser import ParserFactory
+from pdf_extractor import PDFTextExtractor, EXTRACTOR_VERSION
+from panel_parser import ParserFactory, PARSER_VERSION
+from parser_registry import get_registry
 from models import PVPanelData, ExtractionResult, ProcessingConfig
-from database import DatabaseManager, get_db_connection_string_from_env
+from panel_store import open_panel_writer
+from ingestion_manifest import IngestionManifest, MANIFEST_FILENAME
+from extraction_cache import ExtractionCache
+from utils import open_text_output
+from metrics import REGISTRY
 
 logger = logging.getLogger(__name__)
 
+PIPELINE_NAME = 'pdfplumber'
+PIPELINE_VERSION = f"{EXTRACTOR_VERSION}+{PARSER_VERSION}"
+
+DATASHEETS_PROCESSED = REGISTRY.counter(
+    'pv_datasheets_processed_total',
+    'Datasheets handled by batch processing, by outcome (success, failed, missing, unchanged)',
+    ('outcome',)
+)
+DATASHEET_DURATION = REGISTRY.histogram(
+    'pv_datasheet_processing_seconds', 'Time to extract and parse one datasheet'
+)
+
 
 class DatasheetProcessor:
     """Main datasheet processing orchestrator"""
@@ -28,6 +45,71 @@ class DatasheetProcessor:
         self.config = config
         self.results: List[ExtractionResult] = []
         self.errors: List[Dict[str, Any]] = []
+        self.skipped: List[str] = []
+        self.manifest: Optional[IngestionManifest] = None
+        self.db_writer = None
+        self.extraction_cache: Optional[ExtractionCache] = None
+        if config.extraction_cache_dir:
+            self.extraction_cache = ExtractionCache(config.extraction_cache_dir)
+
+    def pipeline_version(self) -> str:
+        """Manifest version: extractor and parser versions, extraction mode and a digest of the manufacturer rules"""
+        mode = 'targeted' if self.config.targeted_extraction else 'full'
+        return f"{PIPELINE_VERSION}+{mode}+rules.{get_registry().rules_digest}"
+
+    def open_manifest(self) -> Optional[IngestionManifest]:
+        """Open the ingestion manifest used to skip unchanged datasheets"""
+        if self.manifest is None:
+            manifest_path = self.config.manifest_path or Path(self.config.output_dir) / MANIFEST_FILENAME
+            try:
+                self.manifest = IngestionManifest(manifest_path, PIPELINE_NAME, self.pipeline_version())
+            except Exception as e:
+                logger.warning(f"Ingestion manifest unavailable, processing all files: {e}")
+        return self.manifest
+
+    def mark_processed(self, exclude_models: Optional[set] = None) -> int:
+        """
+        Record extracted results in the ingestion manifest
+
+        Call only once results have been persisted, so files whose save
+        failed are picked up again on the next run.
+
+        Args:
+            exclude_models: Models whose database write failed
+        """
+        manifest = self.open_manifest()
+        if not manifest:
+            return 0
+
+        exclude_models = exclude_models or set()
+        marked = 0
+        for result in self.results:
+            if result.panel_data.model in exclude_models:
+                continue
+            if result.source_file and Path(result.source_file).exists():
+                manifest.mark_processed(
+                    result.source_file,
+                    maker=result.panel_data.maker,
+                    model=result.panel_data.model
+                )
+                marked += 1
+
+        logger.info(f"Recorded {marked} files in ingestion manifest")
+        return marked
+
+    def database_configured(self) -> bool:
+        """Check if a real database connection string was provided"""
+        connection_string = self.config.db_connection_string
+        return bool(connection_string) and connection_string != "postgresql://..."
+
+    def open_db_writer(self):
+        """Create a chunked upsert writer for the configured store"""
+        return open_panel_writer(
+            self.config.db_connection_string,
+            chunk_size=self.config.db_chunk_size,
+            max_retries=self.config.db_max_retries,
+            use_copy=self.config.db_use_copy
+        )
 
     def process_single_pdf(self, pdf_config: Dict[str, Any]) -> Optional[ExtractionResult]:
         """Process a single PDF file"""
@@ -38,8 +120,19 @@ class DatasheetProcessor:
         logger.info(f"Processing: {pdf_path.name}")
 
         try:
+            # Content hash for the extraction cache, reused from the manifest when it has one
+            file_hash = None
+            if self.extraction_cache and self.manifest:
+                file_hash = self.manifest.get_file_hash(pdf_path)
+
             # Extract text and tables from PDF
-            extractor = PDFTextExtractor(pdf_path)
+            extractor = PDFTextExtractor(
+                pdf_path,
+                targeted=self.config.targeted_extraction,
+                cache=self.extraction_cache,
+                cache_only=self.config.cache_only,
+                file_hash=file_hash
+            )
             extraction_data = extractor.extract_all()
 
             if not extraction_data['success']:
@@ -54,24 +147,8 @@ class DatasheetProcessor:
             text = extraction_data['text']
             tables = extraction_data['tables']
 
-            # Detect or use provided manufacturer
-            manufacturer = manufacturer_hint
-            if not manufacturer:
-                # Try to detect from text
-                text_upper = text.upper()
-                if 'Q CELLS' in text_upper:
-                    manufacturer = 'Q CELLS'
-                elif 'JINKO' in text_upper:
-                    manufacturer = 'JinkoSolar'
-                elif 'CANADIAN SOLAR' in text_upper:
-                    manufacturer = 'Canadian Solar'
-                elif 'JA SOLAR' in text_upper:
-                    manufacturer = 'JA Solar'
-                else:
-                    manufacturer = 'Unknown Manufacturer'
-
-            # Create appropriate parser
-            parser = ParserFactory.create_parser(manufacturer, text)
+            # Create parser from the provided manufacturer, or detect it from text
+            parser = ParserFactory.create_parser(manufacturer_hint, text)
 
             # Parse panel data
             start_time = time.time()
@@ -146,6 +223,14 @@ class DatasheetProcessor:
         successful_extractions = 0
         failed_extractions = 0
 
+        # Cache-only runs are for re-parsing the corpus, so never skip files
+        skip_unchanged = not (self.config.force_reprocess or self.config.cache_only)
+        manifest = self.open_manifest() if skip_unchanged else None
+
+        # Stream upserts in chunks while extracting instead of one write at the end
+        if self.config.db_stream and self.database_configured():
+            self.db_writer = self.open_db_writer()
+
         # Create progress bar
         with tqdm(total=total_files, desc="Processing PDFs") as pbar:
             for pdf_config in self.config.pdf_files:
@@ -165,13 +250,32 @@ class DatasheetProcessor:
                     })
                     pbar.update(1)
                     failed_extractions += 1
+                    DATASHEETS_PROCESSED.inc(outcome='missing')
+                    continue
+
+                # Skip datasheets already ingested with the current pipeline version
+                if manifest and manifest.is_processed(pdf_path):
+                    logger.info(f"Skipping unchanged: {pdf_path.name}")
+                    self.skipped.append(str(pdf_path))
+                    pbar.set_postfix({
+                        'Status': f'Unchanged: {pdf_path.name}',
+                        'Success': successful_extractions,
+                        'Failed': failed_extractions
+                    })
+                    pbar.update(1)
+                    DATASHEETS_PROCESSED.inc(outcome='unchanged')
                     continue
 
                 # Process PDF
+                started = time.perf_counter()
                 result = self.process_single_pdf(pdf_config)
+                DATASHEET_DURATION.observe(time.perf_counter() - started)
+                DATASHEETS_PROCESSED.inc(outcome='success' if result else 'failed')
 
                 if result:
                     self.results.append(result)
+                    if self.db_writer:
+                        self.db_writer.add(result.panel_data)
                     successful_extractions += 1
                     pbar.set_postfix({
                         'Status': f'✓ {result.panel_data.model}',
@@ -191,7 +295,16 @@ class DatasheetProcessor:
         # Generate summary
         summary = self.generate_summary(successful_extractions, failed_extractions)
 
-        logger.info(f"Batch processing complete: {successful_extractions} successful, {failed_extractions} failed")
+        if self.db_writer:
+            summary['database_save'] = self.db_writer.close()
+            self.db_writer = None
+
+        REGISTRY.flush()
+
+        logger.info(
+            f"Batch processing complete: {successful_extractions} successful, "
+            f"{failed_extractions} failed, {len(self.skipped)} skipped (unchanged)"
+        )
 
         return summary
 
@@ -219,6 +332,7 @@ class DatasheetProcessor:
             'total_files': total_processed,
             'successful_extractions': successful,
             'failed_extractions': failed,
+            'skipped_unchanged': len(self.skipped),
             'success_rate': round(success_rate, 2),
             'average_processing_time_ms': round(avg_processing_time, 2),
             'manufacturers_found': manufacturers,
@@ -228,32 +342,43 @@ class DatasheetProcessor:
 
         return summary
 
+    def _result_dict(self, result: ExtractionResult) -> Dict[str, Any]:
+        """Serialize one extraction result for the JSON output"""
+        return {
+            'panel_data': result.panel_data.dict(),
+            'confidence_scores': result.confidence_scores,
+            'warnings': result.warnings,
+            'errors': result.errors,
+            'processing_time_ms': result.processing_time_ms,
+            'source_file': str(result.source_file) if result.source_file else None
+        }
+
     def save_results(self, output_dir: Path) -> Dict[str, Path]:
-        """Save extraction results to files"""
+        """
+        Save extraction results to files
+
+        Writes the results collected in self.results, which the summary,
+        manifest and database save also read, so memory still grows with
+        the batch. Only their serialized form is written record by record
+        instead of being built as one list first. With compress_output the
+        JSON and CSV files are gzip-compressed.
+        """
 
         output_dir = Path(output_dir)
         output_dir.mkdir(parents=True, exist_ok=True)
 
         timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+        suffix = '.gz' if self.config.compress_output else ''
         saved_files = {}
 
         # Save detailed results as JSON
-        json_file = output_dir / f'extracted_data_{timestamp}.json'
-        results_data = []
-
-        for result in self.results:
-            result_dict = {
-                'panel_data': result.panel_data.dict(),
-                'confidence_scores': result.confidence_scores,
-                'warnings': result.warnings,
-                'errors': result.errors,
-                'processing_time_ms': result.processing_time_ms,
-                'source_file': str(result.source_file) if result.source_file else None
-            }
-            results_data.append(result_dict)
-
-        with open(json_file, 'w') as f:
-            json.dump(results_data, f, indent=2, default=str)
+        json_file = output_dir / f'extracted_data_{timestamp}.json{suffix}'
+        with open_text_output(json_file) as f:
+            f.write('[')
+            for index, result in enumerate(self.results):
+                f.write(',\n' if index else '\n')
+                json.dump(self._result_dict(result), f, indent=2, default=str)
+            f.write('\n]\n' if self.results else ']\n')
         saved_files['json'] = json_file
 
         # Save summary
@@ -264,14 +389,12 @@ class DatasheetProcessor:
         saved_files['summary'] = summary_file
 
         # Save CSV (simplified)
-        csv_file = output_dir / f'extracted_data_{timestamp}.csv'
+        csv_file = output_dir / f'extracted_data_{timestamp}.csv{suffix}'
         import csv
 
-        with open(csv_file, 'w', newline='') as f:
+        with open_text_output(csv_file) as f:
             if self.results:
-                # Get all fields from first result
-                fieldnames = list(self.results[0].panel_data.dict().keys())
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
+                writer = csv.DictWriter(f, fieldnames=list(PVPanelData.model_fields.keys()))
 
                 writer.writeheader()
                 for result in self.results:
@@ -295,22 +418,19 @@ class DatasheetProcessor:
             return {"success": False, "message": "No results to save"}
 
         try:
-            # Get database connection
-            db_manager = DatabaseManager(self.config.db_connection_string)
+            # Upsert panels in chunks over a pooled connection
+            with self.open_db_writer() as writer:
+                writer.add_many(result.panel_data for result in self.results)
+            result = writer.summary()
 
-            with db_manager as db:
-                # Upsert panels
-                panels = [result.panel_data for result in self.results]
-                result = db.upsert_pv_panels(panels)
+            if result['success']:
+                logger.info(f"Successfully saved {result['inserted_count']} panels to database")
 
-                if result['success']:
-                    logger.info(f"Successfully saved {result['inserted_count']} panels to database")
+                # Save results to file as backup
+                saved_files = self.save_results(self.config.output_dir)
+                result['saved_files'] = {k: str(v) for k, v in saved_files.items()}
 
-                    # Save results to file as backup
-                    saved_files = self.save_results(self.config.output_dir)
-                    result['saved_files'] = {k: str(v) for k, v in saved_files.items()}
-
-                return result
+            return result
 
         except Exception as e:
             logger.error(f"Database save failed: {e}", exc_info=True)
@@ -344,19 +464,55 @@ def load_config(config_file: Path) -> ProcessingConfig:
         skip_validation=config_dict['processing'].get('skip_validation', False),
         export_format=config_dict['processing'].get('export_format', 'both'),
         output_dir=Path(config_dict['processing']['output_dir']),
-        enabled_manufacturers=config_dict.get('manufacturer_patterns', {}).get('enabled_patterns', [])
+        enabled_manufacturers=config_dict.get('manufacturer_patterns', {}).get('enabled_patterns', []),
+        manifest_path=config_dict['processing'].get('manifest_path'),
+        force_reprocess=config_dict['processing'].get('force_reprocess', False),
+        targeted_extraction=config_dict['processing'].get('targeted_extraction', False),
+        extraction_cache_dir=config_dict['processing'].get('extraction_cache_dir'),
+        cache_only=config_dict['processing'].get('cache_only', False),
+        db_stream=config_dict['database'].get('stream', False),
+        db_chunk_size=config_dict['database'].get('chunk_size', 500),
+        db_use_copy=config_dict['database'].get('use_copy', False),
+        db_max_retries=config_dict['database'].get('max_retries', 3),
+        compress_output=config_dict['processing'].get('compress_output', False)
     )
 
     return config
 
 
-def process_from_config(config_file: Path) -> Dict[str, Any]:
+def process_from_config(config_file: Path, force_reprocess: bool = False,
+                        manifest_path: Optional[Path] = None,
+                        targeted_extraction: bool = False,
+                        extraction_cache_dir: Optional[Path] = None,
+                        cache_only: bool = False,
+                        db_stream: bool = False,
+                        db_chunk_size: Optional[int] = None,
+                        db_use_copy: bool = False,
+                        compress_output: bool = False) -> Dict[str, Any]:
     """Process datasheets from configuration file"""
 
     logger.info(f"Loading configuration from {config_file}")
 
     # Load configuration
     config = load_config(config_file)
+    if force_reprocess:
+        config.force_reprocess = True
+    if manifest_path:
+        config.manifest_path = Path(manifest_path)
+    if targeted_extraction:
+        config.targeted_extraction = True
+    if extraction_cache_dir:
+        config.extraction_cache_dir = Path(extraction_cache_dir)
+    if cache_only:
+        config.cache_only = True
+    if db_stream:
+        config.db_stream = True
+    if db_chunk_size:
+        config.db_chunk_size = db_chunk_size
+    if db_use_copy:
+        config.db_use_copy = True
+    if compress_output:
+        config.compress_output = True
 
     # Create processor
     processor = DatasheetProcessor(config)
@@ -371,8 +527,8 @@ def process_from_config(config_file: Path) -> Dict[str, Any]:
         saved_files = processor.save_results(config.output_dir)
         summary['output_files'] = {k: str(v) for k, v in saved_files.items()}
 
-    # Try to save to database if connection string is provided
-    if config.db_connection_string and config.db_connection_string != "postgresql://...":
+    # Try to save to database if connection string is provided and results were not streamed
+    if 'database_save' not in summary and processor.database_configured():
         try:
             db_result = processor.save_to_database()
             summary['database_save'] = db_result
@@ -380,4 +536,11 @@ def process_from_config(config_file: Path) -> Dict[str, Any]:
             logger.warning(f"Database save failed: {e}")
             summary['database_save'] = {"success": False, "error": str(e)}
 
+    # Only record files in the manifest once their results are persisted
+    db_save = summary.get('database_save', {"success": True})
+    if db_save['success'] or db_save.get('failed_models'):
+        summary['manifest_recorded'] = processor.mark_processed(
+            exclude_models=set(db_save.get('failed_models', []))
+        )
+
     return summary
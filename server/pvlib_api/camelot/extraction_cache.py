@@ -0,0 +1,123 @@
+"""
+Extraction Artifact Cache
+
+Persists raw extractor output (page text, tables, metadata) as gzipped JSON
+keyed by PDF content hash and extractor settings, so parsers can be re-run
+across the whole corpus without invoking pdfplumber or Camelot again.
+"""
+
+import gzip
+import json
+import hashlib
+import logging
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+from utils import compute_file_hash
+
+logger = logging.getLogger(__name__)
+
+DATAFRAME_MARKER = '__dataframe__'
+
+
+def _encode_value(value: Any) -> Any:
+    """JSON fallback encoder for extractor artifacts"""
+    # Camelot tables are DataFrames; store rows, column labels and dtypes
+    if hasattr(value, 'values') and hasattr(value, 'shape') and hasattr(value, 'iloc'):
+        return {DATAFRAME_MARKER: {
+            'columns': value.columns.tolist(),
+            # Object rows keep each column's Python values (ints stay ints next to floats)
+            'data': value.astype(object).values.tolist(),
+            'dtypes': [str(dtype) for dtype in value.dtypes]
+        }}
+    return str(value)
+
+
+def _decode_object(obj: Dict[str, Any]) -> Any:
+    """JSON object hook restoring DataFrames"""
+    if DATAFRAME_MARKER in obj and len(obj) == 1:
+        from pandas import DataFrame
+        table = obj[DATAFRAME_MARKER]
+        # Artifacts written before dtypes were stored hold plain rows
+        if isinstance(table, list):
+            return DataFrame(table)
+        df = DataFrame(table['data'], columns=table['columns'])
+        return df.astype(dict(zip(df.columns, table['dtypes'])))
+    return obj
+
+
+class ExtractionCache:
+    """On-disk cache of raw PDF extraction output"""
+
+    def __init__(self, cache_dir: Path):
+        """
+        Initialize cache
+
+        Args:
+            cache_dir: Directory holding cached artifacts
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def make_key(self, pdf_path: Path, settings: Dict[str, Any], file_hash: Optional[str] = None) -> str:
+        """Build cache key from PDF content hash (computed unless given) and extractor settings"""
+        key_source = json.dumps({
+            'file_hash': file_hash or compute_file_hash(pdf_path),
+            'settings': settings
+        }, sort_keys=True)
+        return hashlib.sha256(key_source.encode('utf-8')).hexdigest()
+
+    def _artifact_path(self, key: str) -> Path:
+        """Get artifact file path for a cache key"""
+        return self.cache_dir / key[:2] / f'{key}.json.gz'
+
+    def get(self, pdf_path: Path, settings: Dict[str, Any],
+            file_hash: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Load cached extraction output
+
+        Args:
+            pdf_path: Source PDF
+            settings: Extractor settings
+            file_hash: Precomputed content hash of the PDF, to avoid reading it again
+
+        Returns:
+            Extraction dictionary, or None on cache miss
+        """
+        artifact_path = self._artifact_path(self.make_key(pdf_path, settings, file_hash))
+        if not artifact_path.exists():
+            return None
+
+        try:
+            with gzip.open(artifact_path, 'rt', encoding='utf-8') as f:
+                data = json.load(f, object_hook=_decode_object)
+            logger.info(f"Extraction cache hit for {Path(pdf_path).name}")
+            return data
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cache artifact {artifact_path}: {e}")
+            return None
+
+    def put(self, pdf_path: Path, settings: Dict[str, Any], data: Dict[str, Any],
+            file_hash: Optional[str] = None) -> Path:
+        """
+        Store extraction output
+
+        Args:
+            pdf_path: Source PDF
+            settings: Extractor settings
+            data: Extraction output
+            file_hash: Precomputed content hash of the PDF, to avoid reading it again
+
+        Returns:
+            Path of the written artifact
+        """
+        artifact_path = self._artifact_path(self.make_key(pdf_path, settings, file_hash))
+        artifact_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write to a temp file first so an interrupted run never leaves a truncated artifact
+        tmp_path = artifact_path.with_suffix('.tmp')
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(data, f, default=_encode_value, separators=(',', ':'))
+        tmp_path.replace(artifact_path)
+
+        return artifact_path
@@ -5,7 +5,7 @@ Pydantic models for validation and type checking of extracted PV panel data.
 """
 
 from pydantic import BaseModel, Field, validator
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime
 from pathlib import Path
 
@@ -151,6 +151,24 @@ class PVPanelData(BaseModel):
         return warnings
 
 
+# p_v_panel column order shared by the storage backends
+PANEL_COLUMNS = (
+    'maker', 'model', 'description', 'max_power',
+    'open_circuit_voltage', 'short_circuit_current',
+    'voltage_at_pmax', 'current_at_pmax', 'max_series_fuse_rating',
+    'temp_coeff_pmax', 'temp_coeff_isc', 'temp_coeff_voc',
+    'temp_coeff_ipmax', 'temp_coeff_vpmax', 'module_type',
+    'short_side', 'long_side', 'weight', 'efficiency',
+    'performance_warranty', 'product_warranty', 'certification'
+)
+
+
+def panel_to_row(panel: PVPanelData) -> Tuple[Any, ...]:
+    """Build a database row in PANEL_COLUMNS order"""
+    db_dict = panel.to_database_dict()
+    return tuple(db_dict.get(column) for column in PANEL_COLUMNS)
+
+
 class ExtractionResult(BaseModel):
     """Result of datasheet extraction"""
 
@@ -213,3 +231,30 @@ class ProcessingConfig(BaseModel):
     export_format: str = Field(default="both", pattern="^(json|csv|both)$")
     output_dir: Path
     enabled_manufacturers: List[str] = Field(default_factory=list)
+    manifest_path: Optional[Path] = None
+    force_reprocess: bool = False
+    targeted_extraction: bool = False
+    extraction_cache_dir: Optional[Path] = None
+    cache_only: bool = False
+    adaptive_flavors: bool = True
+    db_stream: bool = False
+    db_chunk_size: int = Field(default=500, ge=1)
+    db_use_copy: bool = False
+    db_max_retries: int = Field(default=3, ge=0)
+    compress_output: bool = False
+
+
+class ManufacturerRuleSet(BaseModel):
+    """Declarative parsing rules for one manufacturer"""
+
+    name: str
+    priority: int = 100
+    keywords: List[str] = Field(default_factory=list)
+    aliases: List[str] = Field(default_factory=list)
+    parser_class: Optional[str] = None
+    module_type: Optional[str] = None
+    patterns: Dict[str, List[str]] = Field(default_factory=dict)
+    case_sensitive_fields: List[str] = Field(default_factory=list)
+    table_aliases: Dict[str, List[str]] = Field(default_factory=dict)
+    units: Dict[str, str] = Field(default_factory=dict)
+    ranges: Dict[str, Tuple[float, float]] = Field(default_factory=dict)
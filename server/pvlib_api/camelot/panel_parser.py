@@ -9,10 +9,14 @@ import re
 from typing import Dict, List, Optional, Tuple
 from abc import ABC, abstractmethod
 from models import PVPanelData
+from pattern_engine import PatternSet, compile_pattern
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Bump when parsing rules change so ingested datasheets are reprocessed
+PARSER_VERSION = "1.1"
+
 
 class PanelParser(ABC):
     """Abstract base class for panel parsers"""
@@ -59,7 +63,7 @@ class PanelParser(ABC):
     def extract_from_text(self, text: str, patterns: List[str]) -> Optional[str]:
         """Extract value using list of regex patterns"""
         for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
+            match = compile_pattern(pattern).search(text)
             if match:
                 return match.group(1).strip()
         return None
@@ -73,11 +77,9 @@ class PanelParser(ABC):
 class QCellsParser(PanelParser):
     """Parser for Q CELLS datasheets"""
 
-    def __init__(self):
-        super().__init__("Q CELLS")
-
-        # Pattern definitions for Q CELLS
-        self.patterns = {
+    # Pattern definitions for Q CELLS, compiled once at import
+    PATTERNS = PatternSet(
+        {
             'model': [
                 r'Q\.PEAK\s+([A-Z0-9.-]+\s*\d+(?:\.\d+)?)',
                 r'Model\s*[=:]\s*([A-Z0-9.-]+\s*\d+(?:\.\d+)?)',
@@ -158,78 +160,89 @@ class QCellsParser(PanelParser):
                 r'(IEC\s+\d+/\s*IEC\s+\d+)',
                 r'(IEC\s+\d+)',
                 r'(UL\s+\d+)'
+            ],
+            'power_class': [
+                r'POWER\s+CLASS.*?(\d{3})\s+(\d{3})\s+(\d{3})\s+(\d{3})\s+(\d{3})\s+(\d{3})'
+            ],
+            'efficiency_table': [
+                r'Efficiency1\s+η\s*\[\%\]\s*(?:≥\s*)?(\d{2}\.?\d*)'
             ]
-        }
+        },
+        # Table layouts are matched case-sensitively
+        field_flags={'power_class': 0, 'efficiency_table': 0}
+    )
+
+    def __init__(self):
+        super().__init__("Q CELLS")
 
     def parse(self, text: str, tables: List[Dict]) -> PVPanelData:
         """Parse Q CELLS datasheet"""
 
+        # Scan all fields in one pass
+        scan = self.PATTERNS.scan(text)
+
         # Extract model
-        model = self.extract_from_text(text, self.patterns['model'])
+        model = scan.value('model')
         if not model:
             model = "Unknown Model"
 
         # Extract max power - try multiple patterns including table format
         max_power = None
         # First try the POWER CLASS table format
-        power_class_match = re.search(r'POWER\s+CLASS.*?(\d{3})\s+(\d{3})\s+(\d{3})\s+(\d{3})\s+(\d{3})\s+(\d{3})', text)
+        power_class_match = scan.best('power_class')
         if power_class_match:
             # Take the highest power value (last one in the series)
-            powers = [int(power_class_match.group(i)) for i in range(1, 7)]
+            powers = [int(power) for power in power_class_match.groups]
             max_power = max(powers)
         else:
             # Try other patterns
-            max_power = self.extract_number_from_text(text, self.patterns['max_power'])
+            max_power = self.parse_number(scan.value('max_power'))
 
         # Extract efficiency - handle table format
         efficiency = None
         # Try to extract from efficiency table
-        efficiency_match = re.search(r'Efficiency1\s+η\s*\[\%\]\s*(?:≥\s*)?(\d{2}\.?\d*)', text)
+        efficiency_match = scan.best('efficiency_table')
         if efficiency_match:
-            efficiency = float(efficiency_match.group(1))
+            efficiency = float(efficiency_match.value)
         else:
             # Try other patterns
-            efficiency = self.extract_number_from_text(text, self.patterns['efficiency'])
+            efficiency = self.parse_number(scan.value('efficiency'))
 
-        voc = self.extract_number_from_text(text, self.patterns['voc'])
-        isc = self.extract_number_from_text(text, self.patterns['isc'])
-        vmp = self.extract_number_from_text(text, self.patterns['vmp'])
-        imp = self.extract_number_from_text(text, self.patterns['imp'])
-        temp_coeff_pmax = self.extract_number_from_text(text, self.patterns['temp_coeff_pmax'])
-        temp_coeff_voc = self.extract_number_from_text(text, self.patterns['temp_coeff_voc'])
-        temp_coeff_isc = self.extract_number_from_text(text, self.patterns['temp_coeff_isc'])
+        voc = self.parse_number(scan.value('voc'))
+        isc = self.parse_number(scan.value('isc'))
+        vmp = self.parse_number(scan.value('vmp'))
+        imp = self.parse_number(scan.value('imp'))
+        temp_coeff_pmax = self.parse_number(scan.value('temp_coeff_pmax'))
+        temp_coeff_voc = self.parse_number(scan.value('temp_coeff_voc'))
+        temp_coeff_isc = self.parse_number(scan.value('temp_coeff_isc'))
 
         # Extract dimensions
         short_side = None
         long_side = None
-        dim_match = self.extract_from_text(text, self.patterns['dimensions'])
+        dim_match = scan.best('dimensions')
         if dim_match:
-            # Try to match the dimension pattern
-            dim_pattern = self.patterns['dimensions'][0]
-            match = re.search(dim_pattern, text)
-            if match:
-                long_side = self.parse_number(match.group(1))
-                short_side = self.parse_number(match.group(2))
-                # Convert mm to m
-                if long_side:
-                    long_side = long_side / 1000
-                if short_side:
-                    short_side = short_side / 1000
+            long_side = self.parse_number(dim_match.groups[0])
+            short_side = self.parse_number(dim_match.groups[1])
+            # Convert mm to m
+            if long_side:
+                long_side = long_side / 1000
+            if short_side:
+                short_side = short_side / 1000
 
         # Extract weight
-        weight = self.extract_number_from_text(text, self.patterns['weight'])
+        weight = self.parse_number(scan.value('weight'))
 
         # Extract warranties
-        product_warranty = self.extract_from_text(text, self.patterns['warranty_product'])
+        product_warranty = scan.value('warranty_product')
         if product_warranty:
             product_warranty = f"{product_warranty} years"
 
-        performance_warranty = self.extract_from_text(text, self.patterns['warranty_performance'])
+        performance_warranty = scan.value('warranty_performance')
         if performance_warranty:
             performance_warranty = f"{performance_warranty} years"
 
         # Extract certification
-        certification = self.extract_from_text(text, self.patterns['certification'])
+        certification = scan.value('certification')
 
         # Build panel data
         panel_data = PVPanelData(
@@ -260,36 +273,37 @@ class QCellsParser(PanelParser):
 class GenericParser(PanelParser):
     """Generic parser for unknown manufacturers"""
 
+    # Generic patterns that might work for multiple manufacturers
+    PATTERNS = PatternSet({
+        'max_power': [
+            r'(\d{3,4})\s*W\s*Pmax',
+            r'Power\s*[=:]\s*(\d{3,4})\s*W',
+            r'Pmax\s*[=:]\s*(\d{3,4})\s*W'
+        ],
+        'efficiency': [
+            r'Efficiency\s*[=:]\s*(\d{2}\.?\d*)\s*%',
+            r'η\s*[=:]\s*(\d{2}\.?\d*)\s*%'
+        ],
+        'voc': [
+            r'Voc\s*[=:]\s*(\d{2}\.?\d*)\s*V',
+            r'Open\s+Circuit\s+Voltage\s*[=:]\s*(\d{2}\.?\d*)\s*V'
+        ],
+        'isc': [
+            r'Isc\s*[=:]\s*(\d{2}\.?\d*)\s*A',
+            r'Short\s+Circuit\s+Current\s*[=:]\s*(\d{2}\.?\d*)\s*A'
+        ]
+    })
+
     def __init__(self):
         super().__init__("Unknown Manufacturer")
 
-        # Generic patterns that might work for multiple manufacturers
-        self.patterns = {
-            'max_power': [
-                r'(\d{3,4})\s*W\s*Pmax',
-                r'Power\s*[=:]\s*(\d{3,4})\s*W',
-                r'Pmax\s*[=:]\s*(\d{3,4})\s*W'
-            ],
-            'efficiency': [
-                r'Efficiency\s*[=:]\s*(\d{2}\.?\d*)\s*%',
-                r'η\s*[=:]\s*(\d{2}\.?\d*)\s*%'
-            ],
-            'voc': [
-                r'Voc\s*[=:]\s*(\d{2}\.?\d*)\s*V',
-                r'Open\s+Circuit\s+Voltage\s*[=:]\s*(\d{2}\.?\d*)\s*V'
-            ],
-            'isc': [
-                r'Isc\s*[=:]\s*(\d{2}\.?\d*)\s*A',
-                r'Short\s+Circuit\s+Current\s*[=:]\s*(\d{2}\.?\d*)\s*A'
-            ]
-        }
-
     def parse(self, text: str, tables: List[Dict]) -> PVPanelData:
         """Parse using generic patterns"""
-        max_power = self.extract_number_from_text(text, self.patterns['max_power'])
-        efficiency = self.extract_number_from_text(text, self.patterns['efficiency'])
-        voc = self.extract_number_from_text(text, self.patterns['voc'])
-        isc = self.extract_number_from_text(text, self.patterns['isc'])
+        scan = self.PATTERNS.scan(text)
+        max_power = self.parse_number(scan.value('max_power'))
+        efficiency = self.parse_number(scan.value('efficiency'))
+        voc = self.parse_number(scan.value('voc'))
+        isc = self.parse_number(scan.value('isc'))
 
         return PVPanelData(
             maker=self.maker,
@@ -306,59 +320,8 @@ class ParserFactory:
 
     @staticmethod
     def create_parser(manufacturer: Optional[str] = None, pdf_text: str = "") -> PanelParser:
-        """Create appropriate parser instance"""
-
-        # If manufacturer is specified, use it
-        if manufacturer:
-            manufacturer_upper = manufacturer.upper()
-
-            if 'Q' in manufacturer_upper or 'QCELLS' in manufacturer_upper:
-                return QCellsParser()
-            elif 'JINKO' in manufacturer_upper:
-                return JinkoSolarParser()
-            elif 'CANADIAN' in manufacturer_upper:
-                return CanadianSolarParser()
-            elif 'JA' in manufacturer_upper:
-                return JASolarParser()
-
-        # Try to detect from PDF text
-        pdf_text_upper = pdf_text.upper()
-
-        if 'Q CELLS' in pdf_text_upper or 'Q.PEAK' in pdf_text_upper:
-            return QCellsParser()
-        elif 'JINKO' in pdf_text_upper:
-            return JinkoSolarParser()
-        elif 'CANADIAN SOLAR' in pdf_text_upper:
-            return CanadianSolarParser()
-        elif 'JA SOLAR' in pdf_text_upper or 'JASOLAR' in pdf_text_upper:
-            return JASolarParser()
-
-        # Default to generic parser
-        return GenericParser()
-
-
-# Placeholder parsers for other manufacturers (can be expanded)
-class JinkoSolarParser(PanelParser):
-    def __init__(self):
-        super().__init__("JinkoSolar")
-
-    def parse(self, text: str, tables: List[Dict]) -> PVPanelData:
-        # Implementation similar to QCellsParser
-        # Would extract Jinko-specific patterns
-        return PVPanelData(maker=self.maker, model="Model TBD")
-
+        """Create appropriate parser instance from the manufacturer rule registry"""
+        # Imported here: the registry depends on the parser classes above
+        from parser_registry import get_registry
 
-class CanadianSolarParser(PanelParser):
-    def __init__(self):
-        super().__init__("Canadian Solar")
-
-    def parse(self, text: str, tables: List[Dict]) -> PVPanelData:
-        return PVPanelData(maker=self.maker, model="Model TBD")
-
-
-class JASolarParser(PanelParser):
-    def __init__(self):
-        super().__init__("JA Solar")
-
-    def parse(self, text: str, tables: List[Dict]) -> PVPanelData:
-        return PVPanelData(maker=self.maker, model="Model TBD")
+        return get_registry().create_parser(manufacturer, pdf_text)
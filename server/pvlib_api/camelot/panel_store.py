@@ -0,0 +1,63 @@
+"""
+Panel Storage Backends
+
+Select the panel store from a connection URL: sqlite:///path for the
+embedded SQLite store, anything else for PostgreSQL. psycopg2 is only
+imported when a PostgreSQL URL is used. Stores are opened behind a
+read-through PanelCache, so repeated panel lookups skip the database.
+"""
+
+from typing import Optional
+
+from panel_cache import DEFAULT_CACHE_SIZE, DEFAULT_MAX_AGE, PanelCache
+from sqlite_store import SQLitePanelStore, SQLitePanelWriter, is_sqlite_url, sqlite_path_from_url
+
+
+def open_panel_store(connection_string: str, cache: Optional[PanelCache] = None,
+                     cache_size: int = DEFAULT_CACHE_SIZE, cache_max_age: Optional[float] = DEFAULT_MAX_AGE):
+    """
+    Create the panel store for a connection URL
+
+    Args:
+        connection_string: sqlite:///path or PostgreSQL URL
+        cache: Existing read cache to invalidate on upsert; the store itself is returned
+        cache_size: Size of the read-through cache put in front of the store
+            when no cache is given (0 for none)
+        cache_max_age: Seconds before that cache reads a lookup again, so writes
+            from other processes show up (None: never)
+
+    Returns:
+        PanelCache over the store, or the SQLitePanelStore / DatabaseManager
+        itself when a cache is given or cache_size is 0 (not yet connected)
+    """
+    if is_sqlite_url(connection_string):
+        store = SQLitePanelStore(sqlite_path_from_url(connection_string), cache=cache)
+    else:
+        from database import DatabaseManager
+        store = DatabaseManager(connection_string, cache=cache)
+
+    if cache is not None or not cache_size:
+        return store
+
+    # The store invalidates its own cache on upsert
+    store.cache = PanelCache(store, cache_size, cache_max_age)
+    return store.cache
+
+
+def open_panel_writer(connection_string: str, chunk_size: int = 500, max_retries: int = 3,
+                      use_copy: bool = False, cache: Optional[PanelCache] = None):
+    """
+    Create a chunked upsert writer for a connection URL
+
+    Returns:
+        SQLitePanelWriter or PanelUpsertWriter
+    """
+    if is_sqlite_url(connection_string):
+        store = SQLitePanelStore(sqlite_path_from_url(connection_string), cache=cache)
+        if not store.connect():
+            raise RuntimeError(f"Could not open SQLite store: {connection_string}")
+        return SQLitePanelWriter(store, chunk_size=chunk_size, owns_store=True)
+
+    from database import PanelUpsertWriter
+    return PanelUpsertWriter(connection_string, chunk_size=chunk_size, max_retries=max_retries,
+                             use_copy=use_copy, cache=cache)
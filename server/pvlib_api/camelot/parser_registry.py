@@ -0,0 +1,327 @@
+"""
+Manufacturer Parser Registry
+
+Loads declarative manufacturer rule sets (JSON files in manufacturer_rules/),
+compiles their patterns once, and selects parsers through a keyword index
+instead of hard-coded if/elif chains. New manufacturers are onboarded by
+adding a rule file.
+"""
+
+import os
+import re
+import json
+import hashlib
+import logging
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Any
+
+from models import PVPanelData, ManufacturerRuleSet
+from pattern_engine import PatternSet
+from panel_parser import PanelParser, QCellsParser, GenericParser
+
+logger = logging.getLogger(__name__)
+
+RULES_DIR_ENV = 'PV_MANUFACTURER_RULES_DIR'
+RULES_DIR_NAME = 'manufacturer_rules'
+DEFAULTS_FILENAME = 'defaults.json'
+
+# Parsers with custom logic that rule files may bind to via "parser_class"
+CUSTOM_PARSERS = {
+    'QCellsParser': QCellsParser,
+    'GenericParser': GenericParser
+}
+
+# Conversion factors to the units stored in PVPanelData (m, kg)
+UNIT_FACTORS = {
+    'mm': 0.001,
+    'cm': 0.01,
+    'm': 1.0,
+    'kg': 1.0,
+    'g': 0.001,
+    'lbs': 0.45359237
+}
+
+# Numeric rule fields and the PVPanelData attributes they populate
+NUMERIC_FIELDS = {
+    'max_power': 'maxPower',
+    'efficiency': 'efficiency',
+    'voc': 'openCircuitVoltage',
+    'isc': 'shortCircuitCurrent',
+    'vmp': 'voltageAtPmax',
+    'imp': 'currentAtPmax',
+    'temp_coeff_pmax': 'tempCoeffPmax',
+    'temp_coeff_voc': 'tempCoeffVoc',
+    'temp_coeff_isc': 'tempCoeffIsc',
+    'max_series_fuse': 'maxSeriesFuseRating',
+    'weight': 'weight'
+}
+
+
+def find_rules_dir() -> Path:
+    """Locate the manufacturer rules directory"""
+    env_dir = os.environ.get(RULES_DIR_ENV)
+    if env_dir:
+        return Path(env_dir)
+
+    here = Path(__file__).resolve().parent
+    for base in (here, here.parent):
+        candidate = base / RULES_DIR_NAME
+        if candidate.is_dir():
+            return candidate
+
+    return here / RULES_DIR_NAME
+
+
+def load_rule_sets(rules_dir: Path) -> Tuple[Dict[str, Any], List[ManufacturerRuleSet]]:
+    """
+    Load defaults and manufacturer rule sets from a directory
+
+    Manufacturer ranges, table aliases and units are merged over the defaults.
+
+    Returns:
+        Tuple of (defaults, rule sets sorted by priority)
+    """
+    rules_dir = Path(rules_dir)
+    defaults: Dict[str, Any] = {}
+
+    defaults_file = rules_dir / DEFAULTS_FILENAME
+    if defaults_file.exists():
+        with open(defaults_file, 'r', encoding='utf-8') as f:
+            defaults = json.load(f)
+
+    rule_sets = []
+    for rule_file in sorted(rules_dir.glob('*.json')):
+        if rule_file.name == DEFAULTS_FILENAME:
+            continue
+
+        try:
+            with open(rule_file, 'r', encoding='utf-8') as f:
+                rule_dict = json.load(f)
+
+            for key in ('ranges', 'table_aliases', 'units'):
+                rule_dict[key] = {**defaults.get(key, {}), **rule_dict.get(key, {})}
+
+            rule_sets.append(ManufacturerRuleSet(**rule_dict))
+        except Exception as e:
+            logger.error(f"Invalid manufacturer rule file {rule_file.name}: {e}")
+
+    rule_sets.sort(key=lambda rules: rules.priority)
+    logger.info(f"Loaded {len(rule_sets)} manufacturer rule sets from {rules_dir}")
+
+    return defaults, rule_sets
+
+
+def rules_digest(rules_dir: Path) -> str:
+    """
+    Short digest of every rule file (defaults included) in a directory
+
+    Changes whenever a rule file is added, removed or edited, so results
+    parsed under other rules can be told apart.
+    """
+    digest = hashlib.sha256()
+    for rule_file in sorted(Path(rules_dir).glob('*.json')):
+        digest.update(rule_file.name.encode('utf-8') + b'\0')
+        digest.update(rule_file.read_bytes() + b'\0')
+    return digest.hexdigest()[:12]
+
+
+class RuleBasedParser(PanelParser):
+    """Parser driven entirely by a manufacturer rule set"""
+
+    def __init__(self, rules: ManufacturerRuleSet, patterns: PatternSet):
+        super().__init__(rules.name)
+        self.rules = rules
+        self.patterns = patterns
+
+    def in_range(self, field: str, value: Optional[float]) -> bool:
+        """Check value against the plausibility range for a field"""
+        if value is None:
+            return False
+        bounds = self.rules.ranges.get(field)
+        return bounds is None or bounds[0] <= value <= bounds[1]
+
+    def convert_unit(self, field: str, value: Optional[float]) -> Optional[float]:
+        """Convert value from the rule's source unit"""
+        if value is None:
+            return None
+        # Rounded so e.g. 1134 mm converts to 1.134 m without float noise
+        return round(value * UNIT_FACTORS.get(self.rules.units.get(field, ''), 1.0), 6)
+
+    def _number_from_scan(self, scan, field: str) -> Optional[float]:
+        """First in-range numeric candidate for a field"""
+        for candidate in scan.get(field):
+            value = self.parse_number(candidate.value)
+            if self.in_range(field, value):
+                return value
+        return None
+
+    def _number_from_tables(self, tables: List[Dict], field: str) -> Optional[float]:
+        """First in-range value from a table row whose label matches an alias"""
+        aliases = [alias.upper() for alias in self.rules.table_aliases.get(field, [])]
+        if not aliases:
+            return None
+
+        for table in tables:
+            rows = table.get('data')
+            if rows is None:
+                continue
+            # Camelot tables are DataFrames
+            if hasattr(rows, 'values'):
+                rows = rows.values.tolist()
+
+            for row in rows:
+                if not row or not row[0]:
+                    continue
+                label = str(row[0]).upper()
+                if not any(alias in label for alias in aliases):
+                    continue
+                for cell in row[1:]:
+                    value = self.parse_number(str(cell)) if cell else None
+                    if self.in_range(field, value):
+                        return value
+
+        return None
+
+    def parse(self, text: str, tables: List[Dict]) -> PVPanelData:
+        """Parse datasheet using rule patterns, falling back to table aliases"""
+        scan = self.patterns.scan(text)
+        values: Dict[str, Any] = {}
+
+        for field, attribute in NUMERIC_FIELDS.items():
+            value = self._number_from_scan(scan, field)
+            if value is None:
+                value = self._number_from_tables(tables, field)
+            values[attribute] = self.convert_unit(field, value)
+
+        # Dimensions: two captured sides, stored long/short in metres
+        dim_match = scan.best('dimensions')
+        if dim_match and len(dim_match.groups) >= 2:
+            sides = [self.convert_unit('dimensions', self.parse_number(side)) for side in dim_match.groups[:2]]
+            if all(sides):
+                values['longSide'] = max(sides)
+                values['shortSide'] = min(sides)
+
+        for field, attribute in (('warranty_product', 'productWarranty'),
+                                 ('warranty_performance', 'performanceWarranty')):
+            years = scan.value(field)
+            if years:
+                values[attribute] = f"{years} years"
+
+        model = scan.value('model') or "Unknown Model"
+
+        return PVPanelData(
+            maker=self.maker,
+            model=model,
+            description=f"{self.maker} {model} Solar Panel",
+            moduleType=self.rules.module_type,
+            certification=scan.value('certification'),
+            **values
+        )
+
+
+class ParserRegistry:
+    """Registry of manufacturer rule sets with keyword-indexed detection"""
+
+    def __init__(self, rules_dir: Optional[Path] = None):
+        """Load and compile all rule sets"""
+        self.rules_dir = Path(rules_dir) if rules_dir else find_rules_dir()
+        self.defaults, self.rule_sets = load_rule_sets(self.rules_dir)
+        self.rules_digest = rules_digest(self.rules_dir)
+        self.by_name = {rules.name: rules for rules in self.rule_sets}
+
+        # Compile every rule set's patterns once
+        self.pattern_sets = {
+            rules.name: PatternSet(
+                rules.patterns,
+                field_flags={field: 0 for field in rules.case_sensitive_fields}
+            )
+            for rules in self.rule_sets if rules.patterns
+        }
+
+        # Keyword index: detection keyword -> rule set name
+        self.keyword_index: Dict[str, str] = {}
+        for rules in self.rule_sets:
+            for keyword in rules.keywords:
+                self.keyword_index.setdefault(keyword.lower(), rules.name)
+
+        self._detector = None
+        if self.keyword_index:
+            ordered = sorted(self.keyword_index, key=len, reverse=True)
+            self._detector = re.compile(
+                '(?=(' + '|'.join(re.escape(keyword) for keyword in ordered) + '))',
+                re.IGNORECASE
+            )
+
+    def detect(self, text: str) -> Optional[ManufacturerRuleSet]:
+        """Detect manufacturer from datasheet text in a single scan"""
+        if not self._detector or not text:
+            return None
+
+        found = {
+            self.keyword_index[match.group(1).lower()]
+            for match in self._detector.finditer(text)
+        }
+        for rules in self.rule_sets:
+            if rules.name in found:
+                return rules
+
+        return None
+
+    def detect_manufacturer(self, text: str) -> str:
+        """Detect manufacturer name, or 'Unknown Manufacturer'"""
+        rules = self.detect(text)
+        return rules.name if rules else "Unknown Manufacturer"
+
+    def find(self, manufacturer: Optional[str]) -> Optional[ManufacturerRuleSet]:
+        """Find rule set from a manufacturer hint by name or alias"""
+        if not manufacturer:
+            return None
+
+        if manufacturer in self.by_name:
+            return self.by_name[manufacturer]
+
+        manufacturer_upper = manufacturer.upper()
+        for rules in self.rule_sets:
+            if any(alias.upper() in manufacturer_upper for alias in rules.aliases):
+                return rules
+
+        return None
+
+    def build_parser(self, rules: ManufacturerRuleSet) -> PanelParser:
+        """Instantiate the parser for a rule set"""
+        if rules.parser_class:
+            parser_class = CUSTOM_PARSERS.get(rules.parser_class)
+            if parser_class:
+                return parser_class()
+            logger.warning(f"Unknown parser class {rules.parser_class} for {rules.name}, using rules")
+
+        return RuleBasedParser(rules, self.pattern_sets.get(rules.name) or PatternSet({}))
+
+    def create_parser(self, manufacturer: Optional[str] = None, pdf_text: str = "") -> PanelParser:
+        """Create parser from a manufacturer hint, else from detection in text"""
+        rules = self.find(manufacturer) or self.detect(pdf_text)
+        if rules:
+            return self.build_parser(rules)
+
+        return GenericParser()
+
+    def ranges_for(self, manufacturer: Optional[str]) -> Dict[str, Tuple[float, float]]:
+        """Plausibility ranges for a manufacturer, or the defaults"""
+        rules = self.find(manufacturer)
+        if rules:
+            return rules.ranges
+        return {field: tuple(bounds) for field, bounds in self.defaults.get('ranges', {}).items()}
+
+    def table_aliases_for(self, manufacturer: Optional[str]) -> Dict[str, List[str]]:
+        """Table header aliases for a manufacturer, or the defaults"""
+        rules = self.find(manufacturer)
+        if rules:
+            return rules.table_aliases
+        return self.defaults.get('table_aliases', {})
+
+
+@lru_cache(maxsize=None)
+def get_registry() -> ParserRegistry:
+    """Get the process-wide parser registry, loading rules on first use"""
+    return ParserRegistry()
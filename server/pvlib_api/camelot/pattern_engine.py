@@ -0,0 +1,230 @@
+"""
+Pattern Engine for Datasheet Parsing
+
+Compiles field regex patterns once and scans datasheet text with a single
+keyword prefilter pass, so only patterns whose literal anchors occur in the
+text are evaluated. Returns every field candidate with position and confidence.
+"""
+
+import re
+import logging
+from functools import lru_cache
+from typing import Dict, List, Optional, NamedTuple, Set, Tuple
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLAGS = re.IGNORECASE | re.MULTILINE
+
+# Confidence assigned to the first pattern of a field, decreasing with pattern order
+BASE_CONFIDENCE = 0.95
+CONFIDENCE_STEP = 0.05
+MIN_CONFIDENCE = 0.5
+
+
+class FieldMatch(NamedTuple):
+    """Single field candidate found in text"""
+    field: str
+    value: str
+    groups: Tuple[Optional[str], ...]
+    start: int
+    end: int
+    pattern_index: int
+    confidence: float
+
+
+@lru_cache(maxsize=1024)
+def compile_pattern(pattern: str, flags: int = DEFAULT_FLAGS) -> re.Pattern:
+    """Compile regex pattern, caching the result"""
+    return re.compile(pattern, flags)
+
+
+def _literal_runs(parsed) -> List[str]:
+    """Collect runs of literal characters that every match must contain"""
+    runs = []
+    current = []
+
+    for op, av in parsed:
+        if op == sre_parse.LITERAL:
+            current.append(chr(av))
+            continue
+
+        if current:
+            runs.append(''.join(current))
+            current = []
+
+        # Capturing/non-capturing groups are mandatory, so their literals are too
+        if op == sre_parse.SUBPATTERN:
+            runs.extend(_literal_runs(av[-1]))
+
+    if current:
+        runs.append(''.join(current))
+
+    return runs
+
+
+def literal_anchor(pattern: str) -> Optional[str]:
+    """
+    Derive the longest literal substring required by a pattern
+
+    Returns:
+        Anchor string, or None when the pattern has no mandatory literal
+    """
+    try:
+        parsed = sre_parse.parse(pattern)
+    except re.error:
+        return None
+
+    runs = [run.strip() for run in _literal_runs(parsed)]
+    runs = [run for run in runs if run]
+    if not runs:
+        return None
+
+    return max(runs, key=len)
+
+
+class ScanResult:
+    """Field candidates found in one scan of a text"""
+
+    def __init__(self, candidates: Dict[str, List[FieldMatch]]):
+        self.candidates = candidates
+
+    def best(self, field: str) -> Optional[FieldMatch]:
+        """Get highest-confidence candidate for a field"""
+        matches = self.candidates.get(field)
+        return matches[0] if matches else None
+
+    def value(self, field: str) -> Optional[str]:
+        """Get value of the best candidate for a field"""
+        match = self.best(field)
+        return match.value if match else None
+
+    def get(self, field: str) -> List[FieldMatch]:
+        """Get all candidates for a field, best first"""
+        return self.candidates.get(field, [])
+
+    def fields(self) -> List[str]:
+        """Get fields with at least one candidate"""
+        return [field for field, matches in self.candidates.items() if matches]
+
+
+class PatternSet:
+    """Precompiled field patterns with a keyword prefilter"""
+
+    def __init__(self, patterns: Dict[str, List[str]], flags: int = DEFAULT_FLAGS,
+                 field_flags: Optional[Dict[str, int]] = None):
+        """
+        Compile field patterns
+
+        Args:
+            patterns: Field name -> regex patterns in priority order
+            flags: Default regex flags
+            field_flags: Per-field flag overrides (e.g. 0 for case-sensitive fields)
+        """
+        field_flags = field_flags or {}
+
+        self.patterns = patterns
+        self.compiled: Dict[str, List[re.Pattern]] = {}
+        self._anchored: Dict[str, List[Tuple[int, str]]] = {}
+        self._unanchored: Dict[str, List[int]] = {}
+        keywords: Set[str] = set()
+
+        for field, field_patterns in patterns.items():
+            field_flag = field_flags.get(field, flags)
+            self.compiled[field] = [compile_pattern(p, field_flag) for p in field_patterns]
+            self._anchored[field] = []
+            self._unanchored[field] = []
+
+            for index, pattern in enumerate(field_patterns):
+                anchor = literal_anchor(pattern)
+                if anchor:
+                    keyword = anchor.lower()
+                    keywords.add(keyword)
+                    self._anchored[field].append((index, keyword))
+                else:
+                    self._unanchored[field].append(index)
+
+        self.keywords = keywords
+        self._prefilter = None
+        self._contained: Dict[str, Set[str]] = {}
+
+        if keywords:
+            # Longest first so the alternation prefers full keywords at each position
+            ordered = sorted(keywords, key=len, reverse=True)
+            self._prefilter = re.compile(
+                '(?=(' + '|'.join(re.escape(k) for k in ordered) + '))',
+                re.IGNORECASE
+            )
+            # A keyword hit also implies every shorter keyword it contains
+            self._contained = {
+                k: {other for other in keywords if other in k}
+                for k in keywords
+            }
+
+    def present_keywords(self, text: str) -> Set[str]:
+        """Find which anchor keywords occur in text in a single pass"""
+        if not self._prefilter or not text:
+            return set()
+
+        found: Set[str] = set()
+        for match in self._prefilter.finditer(text):
+            keyword = match.group(1).lower()
+            if keyword not in found:
+                found |= self._contained.get(keyword, {keyword})
+
+        return found
+
+    @staticmethod
+    def confidence_for(pattern_index: int) -> float:
+        """Confidence of a match from its pattern position"""
+        return max(MIN_CONFIDENCE, BASE_CONFIDENCE - CONFIDENCE_STEP * pattern_index)
+
+    def scan(self, text: str, fields: Optional[List[str]] = None) -> ScanResult:
+        """
+        Scan text for all fields
+
+        Only patterns whose anchors were seen by the prefilter are evaluated.
+
+        Args:
+            text: Text to scan
+            fields: Restrict scan to these fields (default: all)
+
+        Returns:
+            ScanResult with candidates per field, best first
+        """
+        present = self.present_keywords(text)
+        candidates: Dict[str, List[FieldMatch]] = {}
+
+        for field in fields or self.compiled:
+            indexes = [index for index, keyword in self._anchored[field] if keyword in present]
+            indexes.extend(self._unanchored[field])
+
+            matches = []
+            for index in sorted(indexes):
+                match = self.compiled[field][index].search(text)
+                if not match:
+                    continue
+
+                groups = match.groups()
+                value = groups[0] if groups else match.group(0)
+                matches.append(FieldMatch(
+                    field=field,
+                    value=value.strip() if value else value,
+                    groups=groups,
+                    start=match.start(),
+                    end=match.end(),
+                    pattern_index=index,
+                    confidence=self.confidence_for(index)
+                ))
+
+            candidates[field] = matches
+
+        return ScanResult(candidates)
+
+    def first(self, text: str, field: str) -> Optional[str]:
+        """Get value of the first matching pattern for a single field"""
+        return self.scan(text, [field]).value(field)
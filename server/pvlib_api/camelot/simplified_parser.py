@@ -10,9 +10,13 @@ from typing import Dict, List, Optional, Any
 from pandas import DataFrame
 
 from models import PVPanelData
+from parser_registry import get_registry
 
 logger = logging.getLogger(__name__)
 
+# Bump when parsing rules change so ingested datasheets are reprocessed
+PARSER_VERSION = "1.1"
+
 
 class SimplifiedParser:
     """Parse PV panel data from Camelot-extracted tables"""
@@ -20,6 +24,18 @@ class SimplifiedParser:
     def __init__(self, manufacturer: str):
         self.manufacturer = manufacturer
 
+        # Plausibility ranges and header aliases come from the manufacturer rules
+        registry = get_registry()
+        self.ranges = registry.ranges_for(manufacturer)
+        self.table_aliases = registry.table_aliases_for(manufacturer)
+
+    def _in_range(self, field: str, value: Optional[float]) -> bool:
+        """Check value against the plausibility range for a field"""
+        if not value:
+            return False
+        bounds = self.ranges.get(field)
+        return bounds is None or bounds[0] <= value <= bounds[1]
+
     def parse(self, tables: List[Dict[str, Any]], text: str) -> PVPanelData:
         """
         Parse panel data from extracted tables
@@ -137,56 +153,56 @@ class SimplifiedParser:
         df_str = df.astype(str)
 
         # Find POWER CLASS row
-        power_values = self._find_column_values(df, ['POWER CLASS', 'Power at MPP'])
+        power_values = self._find_column_values(df, self.table_aliases.get('max_power', []))
         if power_values:
             # Extract numeric values and take the maximum
             numeric_powers = [self._extract_number(v) for v in power_values]
-            numeric_powers = [p for p in numeric_powers if p and 300 <= p <= 500]
+            numeric_powers = [p for p in numeric_powers if self._in_range('max_power', p)]
             if numeric_powers:
                 specs['max_power'] = max(numeric_powers)
                 logger.info(f"Found power values: {numeric_powers}")
 
         # Find efficiency
-        efficiency_values = self._find_column_values(df, ['Efficiency', 'η [%]'])
+        efficiency_values = self._find_column_values(df, self.table_aliases.get('efficiency', []))
         if efficiency_values:
             numeric_eff = [self._extract_number(v) for v in efficiency_values]
-            numeric_eff = [e for e in numeric_eff if e and 15 <= e <= 25]
+            numeric_eff = [e for e in numeric_eff if self._in_range('efficiency', e)]
             if numeric_eff:
                 specs['efficiency'] = numeric_eff[0]
                 logger.info(f"Found efficiency: {specs['efficiency']}")
 
         # Find Voc (Open Circuit Voltage)
-        voc_values = self._find_column_values(df, ['Voc', 'Open Circuit Voltage', 'V [V]'])
+        voc_values = self._find_column_values(df, self.table_aliases.get('voc', []))
         if voc_values:
             numeric_voc = [self._extract_number(v) for v in voc_values]
-            numeric_voc = [v for v in numeric_voc if v and 30 <= v <= 60]
+            numeric_voc = [v for v in numeric_voc if self._in_range('voc', v)]
             if numeric_voc:
                 specs['voc'] = numeric_voc[0]
                 logger.info(f"Found Voc: {specs['voc']}")
 
         # Find Isc (Short Circuit Current)
-        isc_values = self._find_column_values(df, ['Isc', 'Short Circuit Current', 'A [A]'])
+        isc_values = self._find_column_values(df, self.table_aliases.get('isc', []))
         if isc_values:
             numeric_isc = [self._extract_number(v) for v in isc_values]
-            numeric_isc = [i for i in numeric_isc if i and 5 <= i <= 15]
+            numeric_isc = [i for i in numeric_isc if self._in_range('isc', i)]
             if numeric_isc:
                 specs['isc'] = numeric_isc[0]
                 logger.info(f"Found Isc: {specs['isc']}")
 
         # Find Vmp (Voltage at MPP)
-        vmp_values = self._find_column_values(df, ['Vmp', 'Voltage at MPP', 'MPP'])
+        vmp_values = self._find_column_values(df, self.table_aliases.get('vmp', []))
         if vmp_values:
             numeric_vmp = [self._extract_number(v) for v in vmp_values]
-            numeric_vmp = [v for v in numeric_vmp if v and 20 <= v <= 50]
+            numeric_vmp = [v for v in numeric_vmp if self._in_range('vmp', v)]
             if numeric_vmp:
                 specs['vmp'] = numeric_vmp[0]
                 logger.info(f"Found Vmp: {specs['vmp']}")
 
         # Find Imp (Current at MPP)
-        imp_values = self._find_column_values(df, ['Imp', 'Current at MPP'])
+        imp_values = self._find_column_values(df, self.table_aliases.get('imp', []))
         if imp_values:
             numeric_imp = [self._extract_number(v) for v in imp_values]
-            numeric_imp = [i for i in numeric_imp if i and 5 <= i <= 15]
+            numeric_imp = [i for i in numeric_imp if self._in_range('imp', i)]
             if numeric_imp:
                 specs['imp'] = numeric_imp[0]
                 logger.info(f"Found Imp: {specs['imp']}")
@@ -235,7 +251,7 @@ class SimplifiedParser:
             row_powers = []
             for val in row_values:
                 power = self._extract_number(str(val))
-                if power and 300 <= power <= 500:
+                if self._in_range('max_power', power):
                     row_powers.append(power)
 
             # If we found multiple power values in this row, it's likely the power class row
@@ -294,37 +310,37 @@ class SimplifiedParser:
 
             # Check for POWER
             if any(keyword in combined_text for keyword in ['MAXIMUM POWER', 'POWER AT MPP', 'PMPP', 'PMAX']):
-                if 300 <= value_at_max_power <= 500:
+                if self._in_range('max_power', value_at_max_power):
                     # Use the power class value, not the extracted value (they should match)
                     logger.info(f"Found Power: {max_power}W from power class row")
 
             # Check for ISC (Short Circuit Current)
             elif any(keyword in combined_text for keyword in ['SHORT CIRCUIT CURRENT', 'ISC']):
-                if 5 <= value_at_max_power <= 15:
+                if self._in_range('isc', value_at_max_power):
                     specs['isc'] = value_at_max_power
                     logger.info(f"Found Isc: {value_at_max_power}A from transposed table")
 
             # Check for VOC (Open Circuit Voltage)
             elif any(keyword in combined_text for keyword in ['OPEN CIRCUIT VOLTAGE', 'VOC']):
-                if 30 <= value_at_max_power <= 60:
+                if self._in_range('voc', value_at_max_power):
                     specs['voc'] = value_at_max_power
                     logger.info(f"Found Voc: {value_at_max_power}V from transposed table")
 
             # Check for IMP (Current at MPP)
             elif any(keyword in combined_text for keyword in ['CURRENT AT MPP', 'IMPP', 'OPTIMUM OPERATING CURRENT']):
-                if 5 <= value_at_max_power <= 15:
+                if self._in_range('imp', value_at_max_power):
                     specs['imp'] = value_at_max_power
                     logger.info(f"Found Imp: {value_at_max_power}A from transposed table")
 
             # Check for VMP (Voltage at MPP)
             elif any(keyword in combined_text for keyword in ['VOLTAGE AT MPP', 'VMPP', 'OPTIMUM OPERATING VOLTAGE']):
-                if 20 <= value_at_max_power <= 50:
+                if self._in_range('vmp', value_at_max_power):
                     specs['vmp'] = value_at_max_power
                     logger.info(f"Found Vmp: {value_at_max_power}V from transposed table")
 
             # Check for Efficiency
             elif any(keyword in combined_text for keyword in ['EFFICIENCY', 'Η', 'η']) and '%' in combined_text:
-                if 15 <= value_at_max_power <= 25:
+                if self._in_range('efficiency', value_at_max_power):
                     specs['efficiency'] = value_at_max_power
                     logger.info(f"Found Efficiency: {value_at_max_power}% from transposed table")
 
@@ -344,7 +360,7 @@ class SimplifiedParser:
                 if max_power_col_idx < len(df.columns):
                     cell_value = df.iloc[row_idx, max_power_col_idx]
                     value = self._extract_number(str(cell_value))
-                    if value and 5 <= value <= 15:
+                    if self._in_range('isc', value):
                         specs['isc'] = value
                         logger.info(f"Found Isc: {value}A from transposed table")
 
@@ -353,7 +369,7 @@ class SimplifiedParser:
                 if max_power_col_idx < len(df.columns):
                     cell_value = df.iloc[row_idx, max_power_col_idx]
                     value = self._extract_number(str(cell_value))
-                    if value and 30 <= value <= 60:
+                    if self._in_range('voc', value):
                         specs['voc'] = value
                         logger.info(f"Found Voc: {value}V from transposed table")
 
@@ -362,7 +378,7 @@ class SimplifiedParser:
                 if max_power_col_idx < len(df.columns):
                     cell_value = df.iloc[row_idx, max_power_col_idx]
                     value = self._extract_number(str(cell_value))
-                    if value and 5 <= value <= 15:
+                    if self._in_range('imp', value):
                         specs['imp'] = value
                         logger.info(f"Found Imp: {value}A from transposed table")
 
@@ -371,7 +387,7 @@ class SimplifiedParser:
                 if max_power_col_idx < len(df.columns):
                     cell_value = df.iloc[row_idx, max_power_col_idx]
                     value = self._extract_number(str(cell_value))
-                    if value and 20 <= value <= 50:
+                    if self._in_range('vmp', value):
                         specs['vmp'] = value
                         logger.info(f"Found Vmp: {value}V from transposed table")
 
@@ -380,7 +396,7 @@ class SimplifiedParser:
                 if max_power_col_idx < len(df.columns):
                     cell_value = df.iloc[row_idx, max_power_col_idx]
                     value = self._extract_number(str(cell_value))
-                    if value and 15 <= value <= 25:
+                    if self._in_range('efficiency', value):
                         specs['efficiency'] = value
                         logger.info(f"Found Efficiency: {value}% from transposed table")
 
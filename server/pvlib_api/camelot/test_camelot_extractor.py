@@ -0,0 +1,131 @@
+"""
+Tests for the Camelot extractor's targeted page scan, flavor selection and deduplication
+"""
+
+import pytest
+
+pytest.importorskip('camelot')
+
+import pandas as pd
+import camelot
+import pdfplumber
+from types import SimpleNamespace
+
+from camelot_extractor import CamelotExtractor
+
+SPEC_PAGE = "Maximum Power Pmax 400 W\nVoc 45.2 V\nIsc 11.1 A\nVmpp 37.5 V\nImpp 10.7 A"
+MECHANICAL_PAGE = "Dimensions 1722 x 1134 x 30 mm\nWeight 21.5 kg\nIEC 61215"
+
+
+class FakePage:
+    def __init__(self, page_number, text):
+        self.page_number = page_number
+        self.text = text
+
+    def extract_text(self):
+        return self.text
+
+
+class FakePDF:
+    def __init__(self, texts):
+        self.pages = [FakePage(number, text) for number, text in enumerate(texts, 1)]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def table(rows, page=1):
+    """Camelot-like table"""
+    return SimpleNamespace(df=pd.DataFrame(rows), page=str(page))
+
+
+SPEC_ROWS = [['Pmax', '400 W'], ['Voc', '45.2 V'], ['Isc', '11.1 A'], ['Vmpp', '37.5 V']]
+
+
+@pytest.fixture
+def fake_pdf(monkeypatch):
+    """Three-page datasheet: cover, electrical specs, then mechanical specs"""
+    texts = ["Q.PEAK DUO 400 solar module", SPEC_PAGE, MECHANICAL_PAGE]
+    monkeypatch.setattr(pdfplumber, 'open', lambda path: FakePDF(texts))
+    return texts
+
+
+class TestTargetedScan:
+    """Test that targeting limits table pages but keeps all page text"""
+
+    def test_text_after_spec_page_kept(self, fake_pdf, tmp_path):
+        pages, text = CamelotExtractor(tmp_path / 'sheet.pdf', targeted=True)._scan_spec_pages()
+
+        assert pages == '2'
+        assert 'Weight 21.5 kg' in text
+        assert all(page_text in text for page_text in fake_pdf)
+
+    def test_tables_read_from_spec_pages_only(self, fake_pdf, tmp_path, monkeypatch):
+        calls = []
+
+        def read_pdf(path, pages, flavor, suppress_stdout):
+            calls.append((flavor, pages))
+            return []
+
+        monkeypatch.setattr(camelot, 'read_pdf', read_pdf)
+        result = CamelotExtractor(tmp_path / 'sheet.pdf', targeted=True).extract_all()
+
+        assert result['success']
+        assert calls == [('lattice', '2'), ('stream', '2')]
+        assert 'IEC 61215' in result['text']
+
+
+class TestFlavorSelection:
+    """Test which pages stream extraction runs on"""
+
+    @pytest.fixture
+    def calls(self, fake_pdf, monkeypatch):
+        calls = []
+
+        def read_pdf(path, pages, flavor, suppress_stdout):
+            calls.append((flavor, pages))
+            # Lattice finds a bordered spec table on page 2 only
+            return [table(SPEC_ROWS, page=2)] if flavor == 'lattice' else []
+
+        monkeypatch.setattr(camelot, 'read_pdf', read_pdf)
+        return calls
+
+    def test_adaptive_streams_uncovered_pages(self, calls, tmp_path):
+        result = CamelotExtractor(tmp_path / 'sheet.pdf').extract_all()
+
+        assert calls == [('lattice', 'all'), ('stream', '1,3')]
+        assert result['stream_pages'] == '1,3'
+        assert result['table_count'] == 1
+
+    def test_fixed_streams_every_page(self, calls, tmp_path):
+        CamelotExtractor(tmp_path / 'sheet.pdf', adaptive=False).extract_all()
+
+        assert calls == [('lattice', 'all'), ('stream', 'all')]
+
+
+class TestDeduplication:
+    """Test removal of tables found by both flavors"""
+
+    def test_identical_tables_across_flavors_dropped(self, tmp_path):
+        lattice = table(SPEC_ROWS, page=2)
+        stream = table([[f' {cell}  ' for cell in row] for row in SPEC_ROWS], page=2)
+
+        unique = CamelotExtractor(tmp_path / 'sheet.pdf')._deduplicate_tables([lattice, stream])
+
+        assert unique == [lattice]
+
+    def test_same_fingerprint_different_contents_kept(self, tmp_path):
+        first = table(SPEC_ROWS)
+        second = table(SPEC_ROWS[:3] + [['Vmpp', '38.0 V']])
+        extractor = CamelotExtractor(tmp_path / 'sheet.pdf')
+
+        assert extractor._table_fingerprint(first.df) == extractor._table_fingerprint(second.df)
+        assert extractor._deduplicate_tables([first, second]) == [first, second]
+
+    def test_empty_tables_kept(self, tmp_path):
+        empty = [table([]), table([])]
+
+        assert CamelotExtractor(tmp_path / 'sheet.pdf')._deduplicate_tables(empty) == empty
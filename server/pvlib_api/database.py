@@ -4,29 +4,150 @@ Database Integration Module
 PostgreSQL database connection and operations for PV panel data.
 """
 
+import io
+import time
+import threading
 import psycopg2
+from psycopg2 import pool as pg_pool
 from psycopg2.extras import execute_values, RealDictCursor
-from typing import List, Optional, Dict, Any
-from models import PVPanelData, ExtractionResult
+from typing import List, Optional, Dict, Any, Iterable, Tuple
+from models import PVPanelData, ExtractionResult, PANEL_COLUMNS, panel_to_row
+from panel_cache import PanelCache, summarize_statistics
+from utils import open_text_output
 import logging
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+_COLUMN_LIST = ', '.join(PANEL_COLUMNS)
+_UPDATE_SET = ', '.join(f"{column} = EXCLUDED.{column}" for column in PANEL_COLUMNS if column != 'model')
+
+# UPSERT query using ON CONFLICT
+UPSERT_QUERY = f"""
+    INSERT INTO p_v_panel ({_COLUMN_LIST}) VALUES %s
+    ON CONFLICT (model) DO UPDATE SET {_UPDATE_SET}
+    RETURNING id, model, (xmax = 0) AS inserted
+"""
+
+# COPY path: bulk load into a session temp table, then merge in one statement
+STAGING_TABLE = 'p_v_panel_staging'
+CREATE_STAGING_QUERY = f"""
+    CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE}
+    ON COMMIT DELETE ROWS
+    AS SELECT {_COLUMN_LIST} FROM p_v_panel WITH NO DATA
+"""
+COPY_STAGING_QUERY = f"COPY {STAGING_TABLE} ({_COLUMN_LIST}) FROM STDIN WITH (FORMAT csv)"
+MERGE_STAGING_QUERY = f"""
+    INSERT INTO p_v_panel ({_COLUMN_LIST})
+    SELECT {_COLUMN_LIST} FROM {STAGING_TABLE}
+    ON CONFLICT (model) DO UPDATE SET {_UPDATE_SET}
+    RETURNING id, model, (xmax = 0) AS inserted
+"""
+
+DEFAULT_CHUNK_SIZE = 500
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_RETRY_DELAY = 0.5
+
+# Errors worth retrying: dropped connections, serialization failures, deadlocks
+RETRYABLE_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError,
+                    psycopg2.extensions.TransactionRollbackError)
+
+_pools: Dict[Tuple[str, int, int], pg_pool.ThreadedConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_connection_pool(connection_string: str, minconn: int = 1,
+                        maxconn: int = 5) -> pg_pool.ThreadedConnectionPool:
+    """Get the process-wide connection pool for a connection string"""
+    key = (connection_string, minconn, maxconn)
+    with _pools_lock:
+        connection_pool = _pools.get(key)
+        if connection_pool is None or connection_pool.closed:
+            connection_pool = pg_pool.ThreadedConnectionPool(minconn, maxconn, connection_string)
+            _pools[key] = connection_pool
+            logger.info(f"Database connection pool created ({minconn}-{maxconn} connections)")
+        return connection_pool
+
+
+def close_connection_pools() -> None:
+    """Close all connection pools"""
+    with _pools_lock:
+        for connection_pool in _pools.values():
+            if not connection_pool.closed:
+                connection_pool.closeall()
+        _pools.clear()
+
+
+# Server-side prepared lookups: name -> (parameter types, statement)
+PREPARED_STATEMENTS = {
+    'pv_panel_exists': ('(text)', """
+        SELECT id, maker, model, max_power, efficiency
+        FROM p_v_panel
+        WHERE model = $1
+    """),
+    'pv_panel_by_model': ('(text)', """
+        SELECT *
+        FROM p_v_panel
+        WHERE model = $1
+    """),
+    'pv_panels_by_maker': ('(text, integer)', """
+        SELECT id, maker, model, max_power, efficiency, certification
+        FROM p_v_panel
+        WHERE maker ILIKE $1
+        ORDER BY model
+        LIMIT $2
+    """)
+}
+
+
+EXPORT_QUERY = "SELECT * FROM p_v_panel ORDER BY maker, model"
+EXPORT_BATCH_SIZE = 10000
+
+# PostgreSQL type OIDs -> Arrow types for Parquet export (anything else is exported as text)
+ARROW_TYPES = {
+    16: 'bool_',
+    20: 'int64', 21: 'int32', 23: 'int32',
+    700: 'float32', 701: 'float64', 1700: 'float64'
+}
+
+
+def _copy_field(value: Any) -> str:
+    """Format a value for COPY CSV input: NULL unquoted, text always quoted"""
+    if value is None:
+        return ''
+    if isinstance(value, str):
+        return '"' + value.replace('"', '""') + '"'
+    return str(value)
+
 
 class DatabaseManager:
     """Manage PostgreSQL database operations"""
 
-    def __init__(self, connection_string: str):
-        """Initialize with database connection string"""
+    def __init__(self, connection_string: str, use_pool: bool = False,
+                 cache: Optional[PanelCache] = None):
+        """
+        Initialize with database connection string
+
+        Args:
+            connection_string: PostgreSQL connection URL
+            use_pool: Borrow the connection from the shared pool instead of opening one
+            cache: Read cache to invalidate on upsert
+        """
         self.connection_string = connection_string
+        self.use_pool = use_pool
+        self.cache = cache
         self.connection = None
+        self._prepared = set()
 
     def connect(self):
         """Establish database connection"""
         try:
-            self.connection = psycopg2.connect(self.connection_string)
+            if self.use_pool:
+                self.connection = get_connection_pool(self.connection_string).getconn()
+            else:
+                self.connection = psycopg2.connect(self.connection_string)
             self.connection.autocommit = False
+            self._prepared = set()
             logger.info("Database connection established")
             return True
         except Exception as e:
@@ -34,9 +155,12 @@ class DatabaseManager:
             return False
 
     def disconnect(self):
-        """Close database connection"""
+        """Close database connection, or return it to the pool"""
         if self.connection:
-            self.connection.close()
+            if self.use_pool:
+                get_connection_pool(self.connection_string).putconn(self.connection)
+            else:
+                self.connection.close()
             self.connection = None
             logger.info("Database connection closed")
 
@@ -69,243 +193,391 @@ class DatabaseManager:
             logger.error(f"Database connection check failed: {e}")
             return False
 
-    def upsert_pv_panels(self, panels: List[PVPanelData]) -> Dict[str, Any]:
-        """Insert or update PV panel records"""
+    def upsert_pv_panels(self, panels: List[PVPanelData],
+                         chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, Any]:
+        """Insert or update PV panel records in chunks"""
 
         if not panels:
             return {"success": False, "message": "No panels to insert"}
 
-        # Prepare data for insertion
-        insert_data = []
-        for panel in panels:
-            db_dict = panel.to_database_dict()
-
-            # Build tuple in correct order
-            tuple_data = (
-                db_dict['maker'],
-                db_dict['model'],
-                db_dict.get('description'),
-                db_dict.get('max_power'),
-                db_dict.get('open_circuit_voltage'),
-                db_dict.get('short_circuit_current'),
-                db_dict.get('voltage_at_pmax'),
-                db_dict.get('current_at_pmax'),
-                db_dict.get('max_series_fuse_rating'),
-                db_dict.get('temp_coeff_pmax'),
-                db_dict.get('temp_coeff_isc'),
-                db_dict.get('temp_coeff_voc'),
-                db_dict.get('temp_coeff_ipmax'),
-                db_dict.get('temp_coeff_vpmax'),
-                db_dict.get('module_type'),
-                db_dict.get('short_side'),
-                db_dict.get('long_side'),
-                db_dict.get('weight'),
-                db_dict.get('efficiency'),
-                db_dict.get('performance_warranty'),
-                db_dict.get('product_warranty'),
-                db_dict.get('certification')
-            )
-            insert_data.append(tuple_data)
-
+        writer = PanelUpsertWriter(connection=self.connection, chunk_size=chunk_size,
+                                   max_retries=0, cache=self.cache)
+        writer.add_many(panels)
+        return writer.close()
+
+    def _execute_prepared(self, cursor, name: str, params: Tuple[Any, ...]) -> None:
+        """Execute a prepared lookup, preparing it once per connection"""
+        if name not in self._prepared:
+            # Pooled connections may already hold the statement from an earlier manager
+            cursor.execute("SELECT 1 FROM pg_prepared_statements WHERE name = %s", (name,))
+            if cursor.fetchone() is None:
+                param_types, statement = PREPARED_STATEMENTS[name]
+                cursor.execute(f"PREPARE {name} {param_types} AS {statement}")
+            self._prepared.add(name)
+
+        placeholders = ', '.join(['%s'] * len(params))
+        cursor.execute(f"EXECUTE {name} ({placeholders})", params)
+
+    def _lookup(self, name: str, params: Tuple[Any, ...], fetch_all: bool = False):
+        """Run a prepared lookup returning dict rows"""
+        cursor = self.connection.cursor(cursor_factory=RealDictCursor)
         try:
-            cursor = self.connection.cursor()
-
-            # UPSERT query using ON CONFLICT
-            query = """
-                INSERT INTO p_v_panel (
-                    maker, model, description, max_power,
-                    open_circuit_voltage, short_circuit_current,
-                    voltage_at_pmax, current_at_pmax, max_series_fuse_rating,
-                    temp_coeff_pmax, temp_coeff_isc, temp_coeff_voc,
-                    temp_coeff_ipmax, temp_coeff_vpmax, module_type,
-                    short_side, long_side, weight, efficiency,
-                    performance_warranty, product_warranty, certification
-                ) VALUES %s
-                ON CONFLICT (model) DO UPDATE SET
-                    maker = EXCLUDED.maker,
-                    description = EXCLUDED.description,
-                    max_power = EXCLUDED.max_power,
-                    open_circuit_voltage = EXCLUDED.open_circuit_voltage,
-                    short_circuit_current = EXCLUDED.short_circuit_current,
-                    voltage_at_pmax = EXCLUDED.voltage_at_pmax,
-                    current_at_pmax = EXCLUDED.current_at_pmax,
-                    max_series_fuse_rating = EXCLUDED.max_series_fuse_rating,
-                    temp_coeff_pmax = EXCLUDED.temp_coeff_pmax,
-                    temp_coeff_isc = EXCLUDED.temp_coeff_isc,
-                    temp_coeff_voc = EXCLUDED.temp_coeff_voc,
-                    temp_coeff_ipmax = EXCLUDED.temp_coeff_ipmax,
-                    temp_coeff_vpmax = EXCLUDED.temp_coeff_vpmax,
-                    module_type = EXCLUDED.module_type,
-                    short_side = EXCLUDED.short_side,
-                    long_side = EXCLUDED.long_side,
-                    weight = EXCLUDED.weight,
-                    efficiency = EXCLUDED.efficiency,
-                    performance_warranty = EXCLUDED.performance_warranty,
-                    product_warranty = EXCLUDED.product_warranty,
-                    certification = EXCLUDED.certification
-                RETURNING id, model
-            """
-
-            # Execute bulk insert
-            execute_values(cursor, query, insert_data, template=None, page_size=100)
-
-            # Get results
-            results = cursor.fetchall()
-
-            self.connection.commit()
-            cursor.close()
-
-            logger.info(f"Successfully upserted {len(results)} PV panels")
-
-            return {
-                "success": True,
-                "inserted_count": len(results),
-                "results": [{"id": r[0], "model": r[1]} for r in results]
-            }
-
-        except Exception as e:
+            self._execute_prepared(cursor, name, params)
+            if fetch_all:
+                return [dict(row) for row in cursor.fetchall()]
+            row = cursor.fetchone()
+            return dict(row) if row else None
+        except Exception:
+            # A failed transaction may have discarded statements prepared in it
             self.connection.rollback()
-            logger.error(f"Database upsert failed: {e}")
-            return {
-                "success": False,
-                "error": str(e),
-                "inserted_count": 0
-            }
+            self._prepared = set()
+            raise
+        finally:
+            cursor.close()
 
     def check_panel_exists(self, model: str) -> Optional[Dict[str, Any]]:
         """Check if a panel with given model exists"""
 
         try:
-            cursor = self.connection.cursor(cursor_factory=RealDictCursor)
-            query = """
-                SELECT id, maker, model, max_power, efficiency
-                FROM p_v_panel
-                WHERE model = %s
-            """
-            cursor.execute(query, (model,))
-            result = cursor.fetchone()
-            cursor.close()
-
-            return dict(result) if result else None
-
+            return self._lookup('pv_panel_exists', (model,))
         except Exception as e:
             logger.error(f"Failed to check panel existence: {e}")
             return None
 
     def get_panel_by_model(self, model: str) -> Optional[Dict[str, Any]]:
-        """Retrieve panel data by model"""
+        """
+        Retrieve panel data by model
 
-        try:
-            cursor = self.connection.cursor(cursor_factory=RealDictCursor)
-            query = """
-                SELECT *
-                FROM p_v_panel
-                WHERE model = %s
-            """
-            cursor.execute(query, (model,))
-            result = cursor.fetchone()
-            cursor.close()
+        Raises:
+            psycopg2.Error: The lookup failed (so a read cache never stores a failure as a miss)
+        """
+        return self._lookup('pv_panel_by_model', (model,))
 
-            return dict(result) if result else None
+    def get_panels_by_maker(self, maker: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Retrieve panels by manufacturer
 
-        except Exception as e:
-            logger.error(f"Failed to retrieve panel: {e}")
-            return None
+        Raises:
+            psycopg2.Error: The lookup failed
+        """
+        return self._lookup('pv_panels_by_maker', (f"%{maker}%", limit), fetch_all=True)
 
-    def get_panels_by_maker(self, maker: str, limit: int = 100) -> List[Dict[str, Any]]:
-        """Retrieve panels by manufacturer"""
+    def export_to_csv(self, output_file: Path) -> bool:
+        """
+        Export all panels to CSV file
+
+        Rows are streamed with COPY ... TO STDOUT straight into the file, so
+        memory does not grow with table size. A .gz suffix writes gzip.
+        """
 
         try:
-            cursor = self.connection.cursor(cursor_factory=RealDictCursor)
-            query = """
-                SELECT id, maker, model, max_power, efficiency, certification
-                FROM p_v_panel
-                WHERE maker ILIKE %s
-                ORDER BY model
-                LIMIT %s
-            """
-            cursor.execute(query, (f"%{maker}%", limit))
-            results = cursor.fetchall()
+            cursor = self.connection.cursor()
+            with open_text_output(output_file) as csvfile:
+                cursor.copy_expert(f"COPY ({EXPORT_QUERY}) TO STDOUT WITH (FORMAT csv, HEADER)", csvfile)
+            row_count = cursor.rowcount
             cursor.close()
 
-            return [dict(row) for row in results]
+            logger.info(f"Exported {row_count} panels to {output_file}")
+            return True
 
         except Exception as e:
-            logger.error(f"Failed to retrieve panels: {e}")
-            return []
+            logger.error(f"CSV export failed: {e}")
+            return False
 
-    def export_to_csv(self, output_file: Path) -> bool:
-        """Export all panels to CSV file"""
+    def export_to_parquet(self, output_file: Path, batch_size: int = EXPORT_BATCH_SIZE) -> bool:
+        """
+        Export all panels to Parquet file (requires pyarrow)
 
-        import csv
+        Rows are read through a named server-side cursor and written one
+        row group per batch.
+        """
 
         try:
-            cursor = self.connection.cursor(cursor_factory=RealDictCursor)
-            query = """
-                SELECT *
-                FROM p_v_panel
-                ORDER BY maker, model
-            """
-            cursor.execute(query)
-            results = cursor.fetchall()
-            cursor.close()
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            logger.error("Parquet export requires pyarrow (pip install pyarrow)")
+            return False
 
-            with open(output_file, 'w', newline='') as csvfile:
-                if results:
-                    fieldnames = results[0].keys()
-                    writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                    writer.writeheader()
-                    for row in results:
-                        writer.writerow(row)
+        writer = None
+        try:
+            # Named cursors stay on the server and are fetched itersize rows at a time
+            cursor = self.connection.cursor(name='pv_panel_export')
+            cursor.itersize = batch_size
+            cursor.execute(EXPORT_QUERY)
+
+            row_count = 0
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if writer is None:
+                    schema = pa.schema([
+                        (column.name, getattr(pa, ARROW_TYPES.get(column.type_code, 'string'))())
+                        for column in cursor.description
+                    ])
+                    writer = pq.ParquetWriter(str(output_file), schema)
+                    converters = [
+                        str if field.type == pa.string() else float if pa.types.is_floating(field.type) else None
+                        for field in schema
+                    ]
+                if not rows:
+                    break
+
+                arrays = [
+                    pa.array([value if convert is None or value is None else convert(value)
+                              for value in values], type=field.type)
+                    for field, convert, values in zip(schema, converters, zip(*rows))
+                ]
+                writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+                row_count += len(rows)
+
+            cursor.close()
+            self.connection.commit()
 
-            logger.info(f"Exported {len(results)} panels to {output_file}")
+            logger.info(f"Exported {row_count} panels to {output_file}")
             return True
 
         except Exception as e:
-            logger.error(f"CSV export failed: {e}")
+            self.connection.rollback()
+            logger.error(f"Parquet export failed: {e}")
             return False
 
+        finally:
+            if writer is not None:
+                writer.close()
+
+    def export(self, output_file: Path) -> bool:
+        """Export all panels, choosing the format from the file name (.csv, .csv.gz, .parquet)"""
+        if Path(output_file).suffix == '.parquet':
+            return self.export_to_parquet(output_file)
+        return self.export_to_csv(output_file)
+
+    def get_maker_statistics(self) -> List[Dict[str, Any]]:
+        """Get per-maker panel counts and power sums in one aggregate query"""
+
+        cursor = self.connection.cursor(cursor_factory=RealDictCursor)
+        cursor.execute("""
+            SELECT maker, COUNT(*) AS count,
+                   SUM(max_power) AS power_sum, COUNT(max_power) AS power_count
+            FROM p_v_panel
+            GROUP BY maker
+        """)
+        results = cursor.fetchall()
+        cursor.close()
+
+        return [dict(row) for row in results]
+
     def get_statistics(self) -> Dict[str, Any]:
         """Get database statistics"""
 
         try:
-            cursor = self.connection.cursor()
+            return summarize_statistics(self.get_maker_statistics())
+        except Exception as e:
+            logger.error(f"Failed to get statistics: {e}")
+            return {}
 
-            # Get total count
-            cursor.execute("SELECT COUNT(*) FROM p_v_panel")
-            total_count = cursor.fetchone()[0]
-
-            # Get maker counts
-            cursor.execute("""
-                SELECT maker, COUNT(*) as count
-                FROM p_v_panel
-                GROUP BY maker
-                ORDER BY count DESC
-                LIMIT 10
-            """)
-            maker_counts = cursor.fetchall()
-
-            # Get average power
-            cursor.execute("""
-                SELECT AVG(max_power) as avg_power
-                FROM p_v_panel
-                WHERE max_power IS NOT NULL
-            """)
-            avg_power_result = cursor.fetchone()
-            avg_power = avg_power_result[0] if avg_power_result and avg_power_result[0] else 0
+class PanelUpsertWriter:
+    """
+    Stream PV panel upserts to PostgreSQL in fixed-size chunks
+
+    Panels are buffered as they are produced and written one chunk per
+    transaction, so a failing chunk is retried (or skipped) on its own
+    without losing the rest of the batch.
+    """
+
+    def __init__(self, connection_string: Optional[str] = None,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 max_retries: int = DEFAULT_MAX_RETRIES,
+                 retry_delay: float = DEFAULT_RETRY_DELAY,
+                 use_copy: bool = False,
+                 connection=None,
+                 cache: Optional[PanelCache] = None):
+        """
+        Initialize writer
+
+        Args:
+            connection_string: PostgreSQL URL; a connection is borrowed from the shared pool
+            chunk_size: Panels per transaction
+            max_retries: Retries per chunk on connection/serialization errors
+            retry_delay: Initial retry delay in seconds, doubled on each attempt
+            use_copy: Load chunks with COPY into a temp table and merge, instead of VALUES lists
+            connection: Existing connection to use instead of the pool
+            cache: Read cache to invalidate as chunks are committed
+        """
+        if connection is None and not connection_string:
+            raise ValueError("connection_string or connection is required")
 
+        self.connection_string = connection_string
+        self.chunk_size = max(1, chunk_size)
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.use_copy = use_copy
+        self.cache = cache
+
+        self._pooled = connection is None
+        self.connection = connection
+        self._staging_ready = False
+
+        # Rows keyed by model: ON CONFLICT cannot touch the same row twice in one statement
+        self._buffer: Dict[str, Tuple[Any, ...]] = {}
+
+        self.inserted_count = 0
+        self.chunks_written = 0
+        self.results: List[Dict[str, Any]] = []
+        self.failed_models: List[str] = []
+        self.errors: List[str] = []
+
+    def _get_connection(self):
+        """Get the writer connection, borrowing from the pool on first use"""
+        if self.connection is None:
+            self.connection = get_connection_pool(self.connection_string).getconn()
+            self.connection.autocommit = False
+            self._staging_ready = False
+        return self.connection
+
+    def _release_connection(self, broken: bool = False) -> None:
+        """Return a pooled connection (discarding it if broken)"""
+        if self._pooled and self.connection is not None:
+            get_connection_pool(self.connection_string).putconn(self.connection, close=broken)
+            self.connection = None
+
+    def add(self, panel: PVPanelData) -> None:
+        """Queue a panel, writing a chunk once the buffer is full"""
+        row = panel_to_row(panel)
+        model = row[PANEL_COLUMNS.index('model')]
+
+        # Later results for the same model win
+        self._buffer.pop(model, None)
+        self._buffer[model] = row
+
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    def add_many(self, panels: Iterable[PVPanelData]) -> None:
+        """Queue several panels"""
+        for panel in panels:
+            self.add(panel)
+
+    def _write_values(self, cursor, rows: List[Tuple[Any, ...]]) -> List[Tuple[Any, ...]]:
+        """Upsert rows with a multi-row VALUES statement"""
+        return execute_values(cursor, UPSERT_QUERY, rows, page_size=len(rows), fetch=True)
+
+    def _write_copy(self, cursor, rows: List[Tuple[Any, ...]]) -> List[Tuple[Any, ...]]:
+        """Upsert rows by COPY into the staging table and a single merge"""
+        if not self._staging_ready:
+            cursor.execute(CREATE_STAGING_QUERY)
+            self._staging_ready = True
+
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write(','.join(_copy_field(value) for value in row))
+            buffer.write('\n')
+        buffer.seek(0)
+
+        cursor.copy_expert(COPY_STAGING_QUERY, buffer)
+        cursor.execute(MERGE_STAGING_QUERY)
+        return cursor.fetchall()
+
+    def _write_chunk(self, rows: List[Tuple[Any, ...]]) -> List[Tuple[Any, ...]]:
+        """Write one chunk in its own transaction"""
+        connection = self._get_connection()
+        try:
+            cursor = connection.cursor()
+            if self.use_copy:
+                results = self._write_copy(cursor, rows)
+            else:
+                results = self._write_values(cursor, rows)
+            connection.commit()
             cursor.close()
+            return results
+        except Exception:
+            connection.rollback()
+            # A staging table created in this transaction is gone with it
+            self._staging_ready = False
+            raise
+
+    def flush(self) -> bool:
+        """
+        Write buffered panels as one chunk, retrying transient failures
+
+        Returns:
+            True if the chunk was written
+        """
+        if not self._buffer:
+            return True
 
-            return {
-                "total_panels": total_count,
-                "unique_makers": len(maker_counts),
-                "top_makers": [{"maker": m[0], "count": m[1]} for m in maker_counts],
-                "average_power": round(avg_power, 2) if avg_power else 0
-            }
+        rows = list(self._buffer.values())
+        models = list(self._buffer.keys())
+        self._buffer = {}
+
+        attempt = 0
+        while True:
+            try:
+                results = self._write_chunk(rows)
+                break
+            except RETRYABLE_ERRORS as e:
+                # The connection may be dead; get a fresh one from the pool
+                broken = self.connection is None or bool(self.connection.closed)
+                if broken:
+                    self._release_connection(broken=True)
+                    self._staging_ready = False
+                if attempt >= self.max_retries or (broken and not self._pooled):
+                    return self._chunk_failed(models, e)
+                delay = self.retry_delay * (2 ** attempt)
+                attempt += 1
+                logger.warning(f"Chunk of {len(rows)} panels failed ({e}), retry {attempt} in {delay:.1f}s")
+                time.sleep(delay)
+            except Exception as e:
+                return self._chunk_failed(models, e)
+
+        self.chunks_written += 1
+        self.inserted_count += len(results)
+        self.results.extend({"id": r[0], "model": r[1]} for r in results)
+
+        if self.cache:
+            inserted = {r[1]: r[2] for r in results}
+            maker_index = PANEL_COLUMNS.index('maker')
+            power_index = PANEL_COLUMNS.index('max_power')
+            self.cache.record_upsert(
+                {'model': model, 'maker': row[maker_index], 'max_power': row[power_index],
+                 'inserted': inserted.get(model, False)}
+                for model, row in zip(models, rows)
+            )
+        logger.info(f"Upserted chunk of {len(results)} PV panels ({self.inserted_count} total)")
+        return True
+
+    def _chunk_failed(self, models: List[str], error: Exception) -> bool:
+        """Record a chunk that could not be written"""
+        logger.error(f"Database upsert failed for chunk of {len(models)} panels: {error}")
+        self.failed_models.extend(models)
+        self.errors.append(str(error))
+        return False
+
+    def summary(self) -> Dict[str, Any]:
+        """Get write totals in the upsert_pv_panels result format"""
+        result = {
+            "success": not self.failed_models,
+            "inserted_count": self.inserted_count,
+            "chunks_written": self.chunks_written,
+            "results": self.results
+        }
+        if self.failed_models:
+            result["error"] = self.errors[-1]
+            result["failed_models"] = self.failed_models
+        return result
+
+    def close(self) -> Dict[str, Any]:
+        """Flush remaining panels and release the connection"""
+        try:
+            self.flush()
+        finally:
+            self._release_connection()
+        return self.summary()
 
-        except Exception as e:
-            logger.error(f"Failed to get statistics: {e}")
-            return {}
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
 
 
 def get_db_connection_string_from_env() -> str:
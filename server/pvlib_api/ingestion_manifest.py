@@ -0,0 +1,141 @@
+"""
+Ingestion Manifest for Datasheet Processing
+
+SQLite-backed record of datasheets that have already been extracted and
+persisted. Entries are keyed by file content hash and pipeline version so
+re-runs only reprocess new or modified PDFs, or all PDFs after a parser bump.
+"""
+
+import sqlite3
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+from utils import compute_file_hash
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = 'ingestion_manifest.sqlite'
+
+
+class IngestionManifest:
+    """Track processed datasheets by content hash and pipeline version"""
+
+    def __init__(self, manifest_path: Path, pipeline: str, pipeline_version: str):
+        """
+        Open (or create) the manifest database
+
+        Args:
+            manifest_path: Path to the SQLite manifest file
+            pipeline: Pipeline name (e.g. 'pdfplumber', 'camelot')
+            pipeline_version: Combined extractor/parser version string
+        """
+        self.manifest_path = Path(manifest_path)
+        self.pipeline = pipeline
+        self.pipeline_version = pipeline_version
+
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(str(self.manifest_path))
+        self._create_tables()
+
+    def _create_tables(self) -> None:
+        """Create manifest tables if they do not exist"""
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS file_hashes (
+                file_path TEXT PRIMARY KEY,
+                file_size INTEGER NOT NULL,
+                file_mtime_ns INTEGER NOT NULL,
+                file_hash TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS ingested_files (
+                file_hash TEXT NOT NULL,
+                pipeline TEXT NOT NULL,
+                pipeline_version TEXT NOT NULL,
+                file_path TEXT NOT NULL,
+                maker TEXT,
+                model TEXT,
+                processed_at TEXT NOT NULL,
+                PRIMARY KEY (file_hash, pipeline)
+            );
+        """)
+        self.connection.commit()
+
+    def get_file_hash(self, file_path: Path) -> str:
+        """
+        Get content hash for a file
+
+        The digest is reused when size and mtime match the last recorded
+        values, so unchanged files are not re-read.
+        """
+        file_path = Path(file_path).resolve()
+        stat = file_path.stat()
+
+        row = self.connection.execute(
+            "SELECT file_size, file_mtime_ns, file_hash FROM file_hashes WHERE file_path = ?",
+            (str(file_path),)
+        ).fetchone()
+
+        if row and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+            return row[2]
+
+        file_hash = compute_file_hash(file_path)
+        self.connection.execute(
+            "INSERT OR REPLACE INTO file_hashes (file_path, file_size, file_mtime_ns, file_hash) "
+            "VALUES (?, ?, ?, ?)",
+            (str(file_path), stat.st_size, stat.st_mtime_ns, file_hash)
+        )
+        self.connection.commit()
+        return file_hash
+
+    def is_processed(self, file_path: Path) -> bool:
+        """Check if file content was already ingested with the current pipeline version"""
+        file_hash = self.get_file_hash(file_path)
+
+        row = self.connection.execute(
+            "SELECT pipeline_version FROM ingested_files WHERE file_hash = ? AND pipeline = ?",
+            (file_hash, self.pipeline)
+        ).fetchone()
+
+        return row is not None and row[0] == self.pipeline_version
+
+    def mark_processed(self, file_path: Path, maker: Optional[str] = None,
+                       model: Optional[str] = None) -> None:
+        """Record a file as ingested with the current pipeline version"""
+        file_hash = self.get_file_hash(file_path)
+
+        self.connection.execute(
+            "INSERT OR REPLACE INTO ingested_files "
+            "(file_hash, pipeline, pipeline_version, file_path, maker, model, processed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (file_hash, self.pipeline, self.pipeline_version,
+             str(Path(file_path).resolve()), maker, model, datetime.now().isoformat())
+        )
+        self.connection.commit()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get manifest statistics for the current pipeline"""
+        total, current = self.connection.execute(
+            "SELECT COUNT(*), SUM(CASE WHEN pipeline_version = ? THEN 1 ELSE 0 END) "
+            "FROM ingested_files WHERE pipeline = ?",
+            (self.pipeline_version, self.pipeline)
+        ).fetchone()
+
+        return {
+            'pipeline': self.pipeline,
+            'pipeline_version': self.pipeline_version,
+            'total_entries': total,
+            'current_version_entries': current or 0
+        }
+
+    def close(self) -> None:
+        """Close manifest database"""
+        if self.connection:
+            self.connection.close()
+            self.connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
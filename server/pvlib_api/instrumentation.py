@@ -0,0 +1,282 @@
+"""
+Pipeline Instrumentation
+
+Lightweight spans for timing simulation stages. Spans are only recorded
+while a trace is active in the current context, so instrumented code costs
+a single context-variable lookup when tracing is off.
+
+    with tracing() as trace:
+        with span('solar_position'):
+            ...
+    trace.breakdown()      # per-stage wall/CPU time and peak memory
+    trace.server_timing()  # value for a Server-Timing response header
+
+Finished spans are also aggregated into STAGE_HISTOGRAMS across requests.
+"""
+
+import contextvars
+import functools
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Histogram bucket upper bounds in milliseconds
+DEFAULT_BUCKETS_MS: Tuple[float, ...] = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+_current_trace: contextvars.ContextVar = contextvars.ContextVar('pv_trace', default=None)
+
+# tracemalloc is process-wide; it runs while any memory-tracing trace is active
+_memory_lock = threading.Lock()
+_memory_traces = 0
+_owns_tracemalloc = False
+
+
+@dataclass
+class SpanRecord:
+    """A finished span"""
+    name: str
+    depth: int
+    wall_ms: float
+    cpu_ms: float
+    peak_memory_kb: Optional[float] = None
+
+
+class StageHistograms:
+    """Thread-safe cumulative histograms of stage wall time"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS_MS):
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._stages: Dict[str, Dict[str, Any]] = {}
+
+    def observe(self, name: str, value_ms: float) -> None:
+        """Record one stage duration"""
+        with self._lock:
+            stage = self._stages.get(name)
+            if stage is None:
+                stage = self._stages[name] = {'counts': [0] * (len(self.buckets) + 1), 'count': 0, 'sum_ms': 0.0}
+            index = next((i for i, bound in enumerate(self.buckets) if value_ms <= bound), len(self.buckets))
+            stage['counts'][index] += 1
+            stage['count'] += 1
+            stage['sum_ms'] += value_ms
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Current histograms
+
+        Returns:
+            Dictionary of stage -> {buckets: {upper bound: cumulative count}, count, sum_ms}
+        """
+        with self._lock:
+            result = {}
+            for name, stage in self._stages.items():
+                cumulative = 0
+                buckets = {}
+                for bound, count in zip(self.buckets + (float('inf'),), stage['counts']):
+                    cumulative += count
+                    buckets['+Inf' if bound == float('inf') else f'{bound:g}'] = cumulative
+                result[name] = {'buckets': buckets, 'count': stage['count'], 'sum_ms': round(stage['sum_ms'], 3)}
+            return result
+
+    def metrics_family(self, name: str, documentation: str) -> Dict[str, Any]:
+        """Histograms as a metrics family in seconds, labelled by stage (see metrics.py)"""
+        with self._lock:
+            samples = [[[stage_name], list(stage['counts']), stage['sum_ms'] / 1000]
+                       for stage_name, stage in self._stages.items()]
+        return {'name': name, 'type': 'histogram', 'help': documentation, 'labelnames': ['stage'],
+                'buckets': [bound / 1000 for bound in self.buckets], 'samples': samples}
+
+    def reset(self) -> None:
+        """Clear all histograms"""
+        with self._lock:
+            self._stages.clear()
+
+
+STAGE_HISTOGRAMS = StageHistograms()
+
+
+def stage_metrics() -> List[Dict[str, Any]]:
+    """Metrics collector exporting STAGE_HISTOGRAMS as pv_simulation_stage_duration_seconds"""
+    return [STAGE_HISTOGRAMS.metrics_family('pv_simulation_stage_duration_seconds',
+                                            'Durations of traced simulation stages')]
+
+
+class Trace:
+    """Spans recorded for one request"""
+
+    def __init__(self, memory: bool = False, histograms: Optional[StageHistograms] = STAGE_HISTOGRAMS):
+        """
+        Initialize trace
+
+        Args:
+            memory: Also record peak traced memory per span (starts tracemalloc,
+                which slows the traced code noticeably; use for debugging only).
+                tracemalloc is process-wide, so memory traces running at the
+                same time see each other's allocations and peak resets
+            histograms: Aggregate histograms to feed, or None
+        """
+        self.memory = memory
+        self.histograms = histograms
+        self.spans: List[SpanRecord] = []
+        self._open: List['_Span'] = []
+        self._start = time.perf_counter()
+
+    def breakdown(self) -> Dict[str, Dict[str, float]]:
+        """Per-stage totals in first-seen order: calls, wall_ms, cpu_ms and peak_memory_kb"""
+        stages: Dict[str, Dict[str, float]] = {}
+        for record in self.spans:
+            stage = stages.setdefault(record.name, {'calls': 0, 'wall_ms': 0.0, 'cpu_ms': 0.0})
+            stage['calls'] += 1
+            stage['wall_ms'] += record.wall_ms
+            stage['cpu_ms'] += record.cpu_ms
+            if record.peak_memory_kb is not None:
+                stage['peak_memory_kb'] = max(stage.get('peak_memory_kb', 0.0), record.peak_memory_kb)
+
+        for stage in stages.values():
+            stage['wall_ms'] = round(stage['wall_ms'], 3)
+            stage['cpu_ms'] = round(stage['cpu_ms'], 3)
+        return stages
+
+    def elapsed_ms(self) -> float:
+        """Wall time since the trace started"""
+        return (time.perf_counter() - self._start) * 1000
+
+    def server_timing(self) -> str:
+        """Breakdown formatted as a Server-Timing header value"""
+        entries = [f'{name};dur={stage["wall_ms"]:.1f}' for name, stage in self.breakdown().items()]
+        entries.append(f'total;dur={self.elapsed_ms():.1f}')
+        return ', '.join(entries)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable breakdown plus the individual spans"""
+        return {
+            'total_ms': round(self.elapsed_ms(), 3),
+            'stages': self.breakdown(),
+            'spans': [asdict(record) for record in self.spans]
+        }
+
+
+class _Span:
+    """Active span recording into a trace"""
+
+    __slots__ = ('name', 'trace', 'depth', 'wall_start', 'cpu_start', 'memory_start', 'memory_peak')
+
+    def __init__(self, name: str, trace: Trace):
+        self.name = name
+        self.trace = trace
+
+    def __enter__(self) -> '_Span':
+        trace = self.trace
+        self.depth = len(trace._open)
+
+        if trace.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            # Hand the peak seen so far to the enclosing span before resetting it
+            if trace._open:
+                parent = trace._open[-1]
+                parent.memory_peak = max(parent.memory_peak, peak)
+            tracemalloc.reset_peak()
+            self.memory_start = current
+            self.memory_peak = current
+
+        trace._open.append(self)
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.thread_time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        wall_ms = (time.perf_counter() - self.wall_start) * 1000
+        cpu_ms = (time.thread_time() - self.cpu_start) * 1000
+        trace = self.trace
+        trace._open.pop()
+
+        peak_memory_kb = None
+        if trace.memory:
+            self.memory_peak = max(self.memory_peak, tracemalloc.get_traced_memory()[1])
+            peak_memory_kb = round((self.memory_peak - self.memory_start) / 1024, 1)
+            if trace._open:
+                parent = trace._open[-1]
+                parent.memory_peak = max(parent.memory_peak, self.memory_peak)
+
+        trace.spans.append(SpanRecord(self.name, self.depth, round(wall_ms, 3), round(cpu_ms, 3), peak_memory_kb))
+        if trace.histograms is not None:
+            trace.histograms.observe(self.name, wall_ms)
+
+
+class _NullSpan:
+    """Shared no-op span used when tracing is off"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> '_NullSpan':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+
+NULL_SPAN = _NullSpan()
+
+
+def span(name: str):
+    """Context manager timing a stage in the active trace (no-op without one)"""
+    trace = _current_trace.get()
+    if trace is None:
+        return NULL_SPAN
+    return _Span(name, trace)
+
+
+def instrument(name: Optional[str] = None) -> Callable:
+    """Decorator timing every call of a function as a stage (defaults to the function name)"""
+    def decorator(func: Callable) -> Callable:
+        stage = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            trace = _current_trace.get()
+            if trace is None:
+                return func(*args, **kwargs)
+            with _Span(stage, trace):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def current_trace() -> Optional[Trace]:
+    """Trace active in the current context, if any"""
+    return _current_trace.get()
+
+
+@contextmanager
+def tracing(trace: Optional[Trace] = None, memory: bool = False) -> Iterator[Trace]:
+    """
+    Activate a trace for the enclosed code
+
+    Args:
+        trace: Trace to record into (a new one by default)
+        memory: Record peak memory per span when creating a new trace
+    """
+    global _memory_traces, _owns_tracemalloc
+
+    trace = trace or Trace(memory=memory)
+    if trace.memory:
+        with _memory_lock:
+            _memory_traces += 1
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _owns_tracemalloc = True
+
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+        if trace.memory:
+            with _memory_lock:
+                _memory_traces -= 1
+                if _memory_traces == 0 and _owns_tracemalloc:
+                    tracemalloc.stop()
+                    _owns_tracemalloc = False
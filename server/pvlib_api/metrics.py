@@ -0,0 +1,546 @@
+"""
+Service Metrics
+
+In-process Prometheus-style counters, gauges and histograms, rendered in the
+text exposition format for a /metrics endpoint.
+
+    REQUESTS = REGISTRY.counter('pv_requests_total', 'Requests', ('endpoint',))
+    REQUESTS.inc(endpoint='/simulate')
+    REGISTRY.render()
+
+Values kept elsewhere (cache hit counters, stage histograms, queue sizes)
+are read by collectors at scrape time, so they cost nothing per call.
+
+With several worker processes, set PV_METRICS_DIR to a directory shared by
+them: each process writes its samples there (at most every few seconds and
+at exit) and render() merges the files of all processes. Files are keyed on
+pid and process start time, so a reused pid never overwrites an exited
+process's samples. Counters and histograms of exited processes are kept,
+compacted into a single file; their gauges are dropped.
+"""
+
+import asyncio
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: exited processes' files are kept as they are
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+METRICS_DIR_ENV = 'PV_METRICS_DIR'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Histogram bucket upper bounds in seconds
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Minimum seconds between snapshot writes in multi-process mode
+FLUSH_INTERVAL = 5.0
+
+# Counters and histograms of exited processes, merged into one snapshot
+EXITED_FILENAME = 'metrics-exited.json'
+# Held while reading or compacting the shared directory
+LOCK_FILENAME = 'metrics.lock'
+
+
+class _Metric:
+    """Labelled metric values guarded by a lock"""
+
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], Any] = {}
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self) -> List[list]:
+        return [[list(key), value] for key, value in self._values.items()]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Metric family dictionary as written to snapshot files"""
+        with self._lock:
+            samples = self._samples()
+        return {'name': self.name, 'type': self.kind, 'help': self.documentation,
+                'labelnames': list(self.labelnames), 'samples': samples}
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    kind = 'counter'
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+
+    kind = 'gauge'
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed buckets"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def _samples(self) -> List[list]:
+        return [[list(key), list(counts), total] for key, (counts, total) in self._values.items()]
+
+    def snapshot(self) -> Dict[str, Any]:
+        family = super().snapshot()
+        family['buckets'] = list(self.buckets)
+        return family
+
+
+def gauge_family(name: str, documentation: str, value: float) -> Dict[str, Any]:
+    """Unlabelled gauge family for collectors"""
+    return {'name': name, 'type': 'gauge', 'help': documentation, 'labelnames': [],
+            'samples': [[[], float(value)]]}
+
+
+def merge_families(families: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Sum families with the same name sample by sample"""
+    merged: Dict[str, Dict[str, Any]] = {}
+    values: Dict[str, Dict[Tuple[str, ...], Any]] = {}
+
+    for family in families:
+        name = family['name']
+        target = merged.get(name)
+        if target is None:
+            target = merged[name] = {key: value for key, value in family.items() if key != 'samples'}
+            values[name] = {}
+        elif target['type'] != family['type'] or target.get('buckets') != family.get('buckets'):
+            logger.warning(f"Skipping metric {name} with a mismatched type or bucket layout")
+            continue
+
+        samples = values[name]
+        for sample in family['samples']:
+            key = tuple(sample[0])
+            if family['type'] == 'histogram':
+                counts, total = samples.get(key, ([0] * len(sample[1]), 0.0))
+                samples[key] = ([a + b for a, b in zip(counts, sample[1])], total + sample[2])
+            else:
+                samples[key] = samples.get(key, 0.0) + sample[1]
+
+    for name, family in merged.items():
+        family['samples'] = [
+            [list(key), *value] if family['type'] == 'histogram' else [list(key), value]
+            for key, value in values[name].items()
+        ]
+    return [merged[name] for name in sorted(merged)]
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if value == float('-inf'):
+        return '-Inf'
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(pairs: List[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def render_text(families: Iterable[Dict[str, Any]]) -> str:
+    """Render metric families in the Prometheus text exposition format"""
+    lines = []
+    for family in families:
+        name = family['name']
+        lines.append(f'# HELP {name} {_escape(family["help"])}')
+        lines.append(f'# TYPE {name} {family["type"]}')
+
+        for sample in family['samples']:
+            pairs = list(zip(family['labelnames'], sample[0]))
+            if family['type'] == 'histogram':
+                counts, total = sample[1], sample[2]
+                cumulative = 0
+                for bound, count in zip(family['buckets'] + [float('inf')], counts):
+                    cumulative += count
+                    le = _format_labels(pairs + [('le', _format_value(bound))])
+                    lines.append(f'{name}_bucket{le} {cumulative}')
+                lines.append(f'{name}_sum{_format_labels(pairs)} {_format_value(total)}')
+                lines.append(f'{name}_count{_format_labels(pairs)} {cumulative}')
+            else:
+                lines.append(f'{name}{_format_labels(pairs)} {_format_value(sample[1])}')
+
+    return '\n'.join(lines) + '\n'
+
+
+def _process_start(pid: int) -> Optional[int]:
+    """Start time of a process in clock ticks since boot, or None where /proc is unavailable"""
+    try:
+        with open(f'/proc/{pid}/stat', 'rb') as f:
+            stat = f.read()
+        # Fields after the parenthesized command name start at field 3; starttime is field 22
+        return int(stat[stat.rindex(b')') + 2:].split()[19])
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _process_alive(pid: int, start: Optional[int] = None) -> bool:
+    """Whether pid is running and, when start is known, is still the same process"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    if start is not None:
+        current = _process_start(pid)
+        return current is None or current == start
+    return True
+
+
+class MetricsRegistry:
+    """Metrics and collectors of one process, optionally shared through a directory"""
+
+    def __init__(self, metrics_dir: Optional[str] = None):
+        """
+        Initialize registry
+
+        Args:
+            metrics_dir: Directory where every worker process writes its samples
+                (None for single-process use)
+        """
+        self.metrics_dir = Path(metrics_dir) if metrics_dir else None
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[Dict[str, Any]]]] = []
+        self._lock = threading.Lock()
+        self._last_flush = 0.0
+        # (pid, start) of the process owning the snapshot file, refreshed after a fork
+        self._process: Optional[Tuple[int, Optional[int]]] = None
+        self._created = time.time_ns()
+
+    def _register(self, cls, name: str, documentation: str, labelnames: Sequence[str], **kwargs) -> _Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif type(metric) is not cls or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} is already registered with a different type or labels")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Get or create a counter"""
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        """Get or create a gauge"""
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """Get or create a histogram"""
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def register_collector(self, collector: Callable[[], Iterable[Dict[str, Any]]]) -> None:
+        """Add a function returning metric families, called on every scrape"""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def collect(self) -> List[Dict[str, Any]]:
+        """Families of this process"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+
+        families = [metric.snapshot() for metric in metrics]
+        for collector in collectors:
+            try:
+                families.extend(collector())
+            except Exception as e:
+                logger.warning(f"Metrics collector {getattr(collector, '__name__', collector)} failed: {e}")
+        return merge_families(families)
+
+    def _current_process(self) -> Tuple[int, Optional[int]]:
+        pid = os.getpid()
+        if self._process is None or self._process[0] != pid:
+            self._process = (pid, _process_start(pid))
+        return self._process
+
+    def snapshot_path(self) -> Optional[Path]:
+        """File this process writes its samples to (None without a directory)"""
+        if self.metrics_dir is None:
+            return None
+        pid, start = self._current_process()
+        # Without a known start time, this registry's creation stands in for it
+        token = start if start is not None else f'r{self._created}'
+        return self.metrics_dir / f'metrics-{pid}-{token}.json'
+
+    def flush(self) -> None:
+        """Write this process's samples to the shared directory"""
+        if self.metrics_dir is None:
+            return
+        self._last_flush = time.monotonic()
+        try:
+            self.metrics_dir.mkdir(parents=True, exist_ok=True)
+            pid, start = self._current_process()
+            path = self.snapshot_path()
+            temp_path = path.with_suffix(f'.{threading.get_ident()}.tmp')
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'pid': pid, 'start': start, 'families': self.collect()}, f)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write metrics snapshot to {self.metrics_dir}: {e}")
+
+    def flush_due(self) -> bool:
+        """Whether the last snapshot is older than FLUSH_INTERVAL (always False without a directory)"""
+        return self.metrics_dir is not None and time.monotonic() - self._last_flush >= FLUSH_INTERVAL
+
+    def gather(self) -> List[Dict[str, Any]]:
+        """Families of this process, merged with every other process sharing the directory"""
+        if self.metrics_dir is None:
+            return self.collect()
+
+        self.flush()
+        with self._directory_lock() as exclusive:
+            families = []
+            # Snapshots of processes that have exited, with the families already compacted
+            exited_paths = []
+            exited_families = []
+            for path in sorted(self.metrics_dir.glob('metrics-*.json')):
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        snapshot = json.load(f)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Skipping unreadable metrics snapshot {path.name}: {e}")
+                    continue
+
+                if path.name == EXITED_FILENAME:
+                    exited_families.extend(snapshot['families'])
+                elif _process_alive(snapshot['pid'], snapshot.get('start')):
+                    families.extend(snapshot['families'])
+                else:
+                    exited_paths.append(path)
+                    exited_families.extend(family for family in snapshot['families'] if family['type'] != 'gauge')
+
+            families.extend(exited_families)
+            if exclusive and exited_paths:
+                self._compact(exited_paths, exited_families)
+        return merge_families(families)
+
+    @contextmanager
+    def _directory_lock(self) -> Iterator[bool]:
+        """Hold the directory lock; yields whether it was taken (False where flock is unavailable)"""
+        if fcntl is None:
+            yield False
+            return
+        try:
+            lock_file = open(self.metrics_dir / LOCK_FILENAME, 'a')
+        except OSError:
+            yield False
+            return
+        with lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield True
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _compact(self, exited_paths: List[Path], exited_families: List[Dict[str, Any]]) -> None:
+        """Replace exited processes' snapshots with EXITED_FILENAME holding all their families (under the directory lock)"""
+        exited_path = self.metrics_dir / EXITED_FILENAME
+        try:
+            temp_path = exited_path.with_suffix(f'.{threading.get_ident()}.tmp')
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'pid': None, 'families': merge_families(exited_families)}, f)
+            os.replace(temp_path, exited_path)
+            for path in exited_paths:
+                path.unlink()
+        except OSError as e:
+            logger.warning(f"Could not compact exited processes' metrics in {self.metrics_dir}: {e}")
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        return render_text(self.gather())
+
+
+REGISTRY = MetricsRegistry(os.environ.get(METRICS_DIR_ENV) or None)
+atexit.register(REGISTRY.flush)
+
+
+# Objects with hits and misses attributes, reported per cache name
+_watched_caches: Dict[str, 'weakref.WeakSet'] = {}
+_watched_lock = threading.Lock()
+
+
+def watch_cache(name: str, cache: Any) -> None:
+    """Report a cache's hits and misses counters under the given name"""
+    with _watched_lock:
+        _watched_caches.setdefault(name, weakref.WeakSet()).add(cache)
+
+
+def cache_families(caches: Dict[str, Iterable[Any]]) -> List[Dict[str, Any]]:
+    """Hit and miss counter families for objects with hits and misses attributes, by cache name"""
+    totals = {name: [0, 0] for name in caches}
+    for name, instances in caches.items():
+        for cache in instances:
+            totals[name][0] += cache.hits
+            totals[name][1] += cache.misses
+
+    return [
+        {'name': 'pv_cache_hits_total', 'type': 'counter', 'help': 'Cache lookups served from cache',
+         'labelnames': ['cache'], 'samples': [[[name], float(hits)] for name, (hits, _) in totals.items()]},
+        {'name': 'pv_cache_misses_total', 'type': 'counter', 'help': 'Cache lookups that went to the source',
+         'labelnames': ['cache'], 'samples': [[[name], float(misses)] for name, (_, misses) in totals.items()]},
+    ]
+
+
+def _watched_cache_families() -> List[Dict[str, Any]]:
+    with _watched_lock:
+        caches = {name: list(instances) for name, instances in _watched_caches.items()}
+    return cache_families(caches)
+
+
+REGISTRY.register_collector(_watched_cache_families)
+
+
+def record_worker_threads(service: str, registry: MetricsRegistry = REGISTRY) -> None:
+    """Set worker thread pool utilization gauges (call from the event loop)"""
+    from anyio import to_thread
+
+    limiter = to_thread.current_default_thread_limiter()
+    registry.gauge('pv_worker_threads_busy', 'Worker threads running blocking calls',
+                   ('service',)).set(limiter.borrowed_tokens, service=service)
+    registry.gauge('pv_worker_threads_limit', 'Worker thread pool size',
+                   ('service',)).set(limiter.total_tokens, service=service)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request count, latency, errors and in-flight requests"""
+
+    def __init__(self, app, service: str, registry: MetricsRegistry = REGISTRY):
+        self.app = app
+        self.service = service
+        self.registry = registry
+        self.requests = registry.counter(
+            'pv_http_requests_total', 'HTTP requests by endpoint and status',
+            ('service', 'method', 'endpoint', 'status'))
+        self.latency = registry.histogram(
+            'pv_http_request_duration_seconds', 'HTTP request latency by endpoint',
+            ('service', 'method', 'endpoint'))
+        self.errors = registry.counter(
+            'pv_http_request_errors_total', 'HTTP requests that failed with a server error or exception',
+            ('service', 'endpoint'))
+        self.in_progress = registry.gauge(
+            'pv_http_requests_in_progress', 'HTTP requests being handled or waiting for a worker',
+            ('service',))
+        self._flushing = False
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+
+        async def send_with_status(message):
+            if message['type'] == 'http.response.start':
+                status[0] = message['status']
+            await send(message)
+
+        start = time.perf_counter()
+        self.in_progress.inc(service=self.service)
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.in_progress.dec(service=self.service)
+
+            # Label by route template so path parameters don't create new series
+            route = scope.get('route')
+            endpoint = getattr(route, 'path', 'unmatched')
+            method = scope['method']
+
+            self.requests.inc(service=self.service, method=method, endpoint=endpoint, status=status[0])
+            self.latency.observe(elapsed, service=self.service, method=method, endpoint=endpoint)
+            if status[0] >= 500:
+                self.errors.inc(service=self.service, endpoint=endpoint)
+            # Collectors and the file write run off the event loop, one flush at a time
+            if self.registry.flush_due() and not self._flushing:
+                self._flushing = True
+                try:
+                    record_worker_threads(self.service, self.registry)
+                    await asyncio.get_running_loop().run_in_executor(None, self.registry.flush)
+                finally:
+                    self._flushing = False
+
+
+def install_metrics(app, service: str, registry: MetricsRegistry = REGISTRY) -> None:
+    """
+    Add request metrics middleware and a GET /metrics endpoint to a FastAPI app
+
+    Args:
+        app: FastAPI application
+        service: Value of the service label on request metrics
+        registry: Registry to record into and render
+    """
+    from fastapi import Response
+    from fastapi.concurrency import run_in_threadpool
+
+    app.add_middleware(MetricsMiddleware, service=service, registry=registry)
+
+    async def metrics():
+        """Prometheus metrics"""
+        record_worker_threads(service, registry)
+        # Collectors and snapshot file reads run off the event loop
+        content = await run_in_threadpool(registry.render)
+        return Response(content=content, media_type=CONTENT_TYPE)
+
+    app.add_api_route('/metrics', metrics, methods=['GET'], include_in_schema=False)
@@ -0,0 +1,273 @@
+"""
+Panel Read Cache
+
+Read-through LRU cache in front of a panel store (DatabaseManager or any
+object with the same lookup methods). Lookups by model and maker are served
+from memory after the first query, upserts invalidate affected entries, and
+the statistics snapshot is updated incrementally for inserted panels. Other
+store methods pass through, so a cache can stand in for its store.
+
+Entries expire after max_age seconds, bounding how long writes made by
+other processes (e.g. the datasheet CLI) stay invisible. Failed lookups are
+logged and never cached.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, List, Optional
+
+from metrics import watch_cache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_SIZE = 1024
+# Seconds a cached lookup or statistics snapshot is served before it is read again
+DEFAULT_MAX_AGE = 60.0
+TOP_MAKERS_LIMIT = 10
+
+# Cached marker for models known not to exist, distinct from "not cached"
+_MISSING = object()
+
+
+def summarize_statistics(maker_rows: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Build the statistics summary from per-maker aggregates
+
+    Args:
+        maker_rows: Dicts with maker, count, power_sum and power_count
+
+    Returns:
+        Dictionary with total_panels, unique_makers, top_makers and average_power
+    """
+    maker_rows = list(maker_rows)
+    total_count = sum(row['count'] for row in maker_rows)
+    power_sum = sum(row['power_sum'] or 0 for row in maker_rows)
+    power_count = sum(row['power_count'] for row in maker_rows)
+
+    top_makers = sorted(maker_rows, key=lambda row: row['count'], reverse=True)[:TOP_MAKERS_LIMIT]
+    avg_power = power_sum / power_count if power_count else 0
+
+    return {
+        "total_panels": total_count,
+        "unique_makers": len(maker_rows),
+        "top_makers": [{"maker": row['maker'], "count": row['count']} for row in top_makers],
+        "average_power": round(float(avg_power), 2) if avg_power else 0
+    }
+
+
+class LRUCache:
+    """Thread-safe bounded mapping evicting the least recently used entry"""
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE, max_age: Optional[float] = None):
+        """
+        Initialize cache
+
+        Args:
+            maxsize: Maximum number of entries
+            max_age: Seconds after which an entry is dropped instead of returned (None: never)
+        """
+        self.maxsize = max(1, maxsize)
+        self.max_age = max_age
+        self._data: OrderedDict = OrderedDict()
+        self._stored: Dict[Hashable, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get value and mark it most recently used"""
+        with self._lock:
+            if key not in self._data:
+                return default
+            if self.max_age is not None and time.monotonic() - self._stored[key] > self.max_age:
+                del self._data[key]
+                del self._stored[key]
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store value, evicting the oldest entry when full"""
+        with self._lock:
+            self._data[key] = value
+            self._stored[key] = time.monotonic()
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                oldest, _ = self._data.popitem(last=False)
+                del self._stored[oldest]
+
+    def pop(self, key: Hashable) -> None:
+        """Remove an entry if present"""
+        with self._lock:
+            self._data.pop(key, None)
+            self._stored.pop(key, None)
+
+    def keys(self) -> List[Hashable]:
+        """Snapshot of cached keys"""
+        with self._lock:
+            return list(self._data.keys())
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        with self._lock:
+            self._data.clear()
+            self._stored.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class PanelCache:
+    """Read-through cache for panel lookups and statistics"""
+
+    def __init__(self, source, maxsize: int = DEFAULT_CACHE_SIZE,
+                 max_age: Optional[float] = DEFAULT_MAX_AGE):
+        """
+        Initialize cache
+
+        Args:
+            source: Panel store providing get_panel_by_model, get_panels_by_maker
+                and get_maker_statistics (raising on failed lookups)
+            maxsize: Maximum cached model and maker lookups (each)
+            max_age: Seconds before cached lookups and statistics are read again (None: never)
+        """
+        self.source = source
+        self.max_age = max_age
+        self.models = LRUCache(maxsize, max_age)
+        self.makers = LRUCache(maxsize, max_age)
+
+        # maker -> [count, power_sum, power_count]; None until first loaded
+        self._maker_stats: Optional[Dict[str, List[float]]] = None
+        self._stats_loaded = 0.0
+        self._stats_lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        watch_cache('panel', self)
+
+    def get_panel_by_model(self, model: str) -> Optional[Dict[str, Any]]:
+        """Retrieve panel data by model"""
+        cached = self.models.get(model)
+        if cached is not None:
+            self.hits += 1
+            return None if cached is _MISSING else dict(cached)
+
+        self.misses += 1
+        try:
+            panel = self.source.get_panel_by_model(model)
+        except Exception as e:
+            logger.error(f"Failed to retrieve panel: {e}")
+            return None
+        self.models.put(model, panel if panel is not None else _MISSING)
+        return dict(panel) if panel is not None else None
+
+    def check_panel_exists(self, model: str) -> Optional[Dict[str, Any]]:
+        """Check if a panel with given model exists"""
+        panel = self.get_panel_by_model(model)
+        if panel is None:
+            return None
+        return {key: panel.get(key) for key in ('id', 'maker', 'model', 'max_power', 'efficiency')}
+
+    def get_panels_by_maker(self, maker: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """Retrieve panels by manufacturer"""
+        key = (maker.lower(), limit)
+        cached = self.makers.get(key)
+        if cached is not None:
+            self.hits += 1
+            return [dict(row) for row in cached]
+
+        self.misses += 1
+        try:
+            panels = self.source.get_panels_by_maker(maker, limit)
+        except Exception as e:
+            logger.error(f"Failed to retrieve panels: {e}")
+            return []
+        self.makers.put(key, [dict(row) for row in panels])
+        return panels
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get statistics from the snapshot, loading it on first use and after max_age"""
+        with self._stats_lock:
+            expired = self.max_age is not None and time.monotonic() - self._stats_loaded > self.max_age
+            if self._maker_stats is None or expired:
+                self._maker_stats = {
+                    row['maker']: [row['count'], row['power_sum'] or 0, row['power_count']]
+                    for row in self.source.get_maker_statistics()
+                }
+                self._stats_loaded = time.monotonic()
+            maker_rows = [
+                {'maker': maker, 'count': count, 'power_sum': power_sum, 'power_count': power_count}
+                for maker, (count, power_sum, power_count) in self._maker_stats.items()
+            ]
+
+        return summarize_statistics(maker_rows)
+
+    def invalidate(self, models: Iterable[str] = (), makers: Iterable[str] = ()) -> None:
+        """Drop cached lookups for changed models and makers"""
+        for model in models:
+            self.models.pop(model)
+
+        # Maker lookups match by substring, so drop every query the maker could satisfy
+        changed = [maker.lower() for maker in makers if maker]
+        for key in self.makers.keys():
+            if any(key[0] in maker for maker in changed):
+                self.makers.pop(key)
+
+    def record_upsert(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """
+        Apply upserted panels to the cache
+
+        Args:
+            rows: Dicts with model, maker, max_power and inserted (False for updates)
+        """
+        rows = list(rows)
+        makers = [row.get('maker') for row in rows]
+
+        # An update may move a model to another maker, whose lists then hold a stale row
+        for row in rows:
+            if row.get('inserted', True):
+                continue
+            previous = self.models.get(row['model'])
+            if previous is None:
+                # Previous maker unknown: any maker list could hold the row
+                self.makers.clear()
+            elif previous is not _MISSING:
+                makers.append(previous.get('maker'))
+
+        self.invalidate(models=[row['model'] for row in rows], makers=makers)
+
+        with self._stats_lock:
+            if self._maker_stats is None:
+                return
+
+            # An update's previous values are unknown, so reload the snapshot lazily
+            if any(not row.get('inserted', True) for row in rows):
+                self._maker_stats = None
+                return
+
+            for row in rows:
+                stats = self._maker_stats.setdefault(row['maker'], [0, 0, 0])
+                stats[0] += 1
+                if row.get('max_power') is not None:
+                    stats[1] += row['max_power']
+                    stats[2] += 1
+
+    def clear(self) -> None:
+        """Drop all cached lookups and the statistics snapshot"""
+        self.models.clear()
+        self.makers.clear()
+        with self._stats_lock:
+            self._maker_stats = None
+
+    def __getattr__(self, name: str) -> Any:
+        # Everything but the cached lookups (connect, upsert, export...) goes to the store
+        if name == 'source':
+            raise AttributeError(name)
+        return getattr(self.source, name)
+
+    def __enter__(self):
+        self.source.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return self.source.__exit__(exc_type, exc_val, exc_tb)
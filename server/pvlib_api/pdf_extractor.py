@@ -4,55 +4,121 @@ PDF Text Extraction Module for Solar Panel Datasheets
 This module uses pdfplumber to extract text and table data from PDF datasheets.
 """
 
+import re
 import pdfplumber
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Set, Tuple
 from pathlib import Path
 
+from extraction_cache import ExtractionCache
+from utils import compute_file_hash
+
 logger = logging.getLogger(__name__)
 
+# Bump when extraction output changes so ingested datasheets are reprocessed
+EXTRACTOR_VERSION = "1.1"
+
+# Keyword groups used to locate electrical-spec pages before table extraction
+SPEC_FIELD_PATTERNS = {
+    'max_power': re.compile(r'\bP\s*(?:MPP|MAX)\b|MAXIMUM\s*POWER|NOMINAL\s*(?:MAX\.?\s*)?POWER|RATED\s*POWER', re.IGNORECASE),
+    'voc': re.compile(r'\bV\s*OC\b|OPEN\s*-?\s*CIRCUIT\s*VOLTAGE', re.IGNORECASE),
+    'isc': re.compile(r'\bI\s*SC\b|SHORT\s*-?\s*CIRCUIT\s*CURRENT', re.IGNORECASE),
+    'vmp': re.compile(r'\bV\s*MPP?\b|VOLTAGE\s*AT\s*(?:MPP|PMAX|MAXIMUM\s*POWER)|OPERATING\s*VOLTAGE', re.IGNORECASE),
+    'imp': re.compile(r'\bI\s*MPP?\b|CURRENT\s*AT\s*(?:MPP|PMAX|MAXIMUM\s*POWER)|OPERATING\s*CURRENT', re.IGNORECASE),
+}
+REQUIRED_SPEC_FIELDS = frozenset(SPEC_FIELD_PATTERNS)
+MIN_SPEC_FIELDS_PER_PAGE = 2
+
+
+def find_spec_fields(text: Optional[str]) -> Set[str]:
+    """Return the electrical-spec field groups mentioned in text"""
+    if not text:
+        return set()
+    return {field for field, pattern in SPEC_FIELD_PATTERNS.items() if pattern.search(text)}
+
 
 class PDFTextExtractor:
     """Extract text and tables from PDF datasheets using pdfplumber"""
 
-    def __init__(self, pdf_path: Path):
-        """Initialize extractor with PDF file path"""
+    def __init__(self, pdf_path: Path, targeted: bool = False,
+                 cache: Optional[ExtractionCache] = None, cache_only: bool = False,
+                 file_hash: Optional[str] = None):
+        """Initialize extractor with PDF file path, optional artifact cache and known content hash"""
         self.pdf_path = pdf_path
+        self.targeted = targeted
+        self.cache = cache
+        self.cache_only = cache_only
+        self.file_hash = file_hash
         self.text_content = ""
         self.tables = []
         self.metadata = {}
 
+    def cache_settings(self) -> Dict[str, Any]:
+        """Extractor settings that affect output, used in the cache key"""
+        return {
+            'extractor': 'pdfplumber',
+            'version': EXTRACTOR_VERSION,
+            'targeted': self.targeted
+        }
+
     def extract_all(self) -> Dict[str, Any]:
-        """Extract both text and tables from PDF"""
-        logger.info(f"Extracting content from {self.pdf_path.name}")
+        """Extract text and tables, served from the artifact cache when available"""
+        if self.cache:
+            # Hash the PDF once for both the lookup and the store
+            if self.file_hash is None:
+                self.file_hash = compute_file_hash(self.pdf_path)
+            cached = self.cache.get(self.pdf_path, self.cache_settings(), self.file_hash)
+            if cached:
+                self.text_content = cached['text']
+                self.tables = cached['tables']
+                self.metadata = cached['metadata']
+                return {**cached, 'success': True, 'cache_hit': True}
 
-        try:
-            # Handle pdfplumber compatibility issues with certain PDFs
-            pdf = None
-            try:
-                pdf = pdfplumber.open(self.pdf_path)
-            except AttributeError as e:
-                if 'LTCurve' in str(e) and 'original_path' in str(e):
-                    logger.warning(f"PDF compatibility issue with pdfplumber for {self.pdf_path.name}. Retrying...")
-                    # Retry once - sometimes this is a transient issue
-                    import time
-                    time.sleep(0.1)
-                    pdf = pdfplumber.open(self.pdf_path)
-                else:
-                    raise
-            except Exception as e:
-                logger.error(f"Failed to open PDF {self.pdf_path.name}: {e}")
+            if self.cache_only:
                 return {
                     'text': "",
                     'tables': [],
                     'metadata': {},
                     'success': False,
-                    'error': str(e)
+                    'error': "Not found in extraction cache"
                 }
 
-            if not pdf:
-                raise Exception("Failed to open PDF")
+        result = self._extract_from_pdf()
+
+        if self.cache and result['success']:
+            self.cache.put(self.pdf_path, self.cache_settings(), {
+                'text': result['text'],
+                'tables': result['tables'],
+                'metadata': result['metadata']
+            }, self.file_hash)
+
+        return result
+
+    def _extract_from_pdf(self) -> Dict[str, Any]:
+        """
+        Extract both text and tables from PDF in a single pass over the pages
+
+        In targeted mode, tables are only extracted from pages that mention
+        electrical-spec fields, and no longer once all required fields have
+        been seen. Text is still extracted from every page, so mechanical and
+        packaging specs on later pages reach the parser; only tables on those
+        pages (e.g. a dimensions or packaging table) are left out.
+        """
+        logger.info(f"Extracting content from {self.pdf_path.name}")
+
+        try:
+            pdf = pdfplumber.open(self.pdf_path)
+        except Exception as e:
+            logger.error(f"Failed to open PDF {self.pdf_path.name}: {e}")
+            return {
+                'text': "",
+                'tables': [],
+                'metadata': {},
+                'success': False,
+                'error': str(e)
+            }
 
+        try:
             with pdf:
                 self.metadata = {
                     'page_count': len(pdf.pages),
@@ -60,30 +126,57 @@ class PDFTextExtractor:
                     'pdf_info': pdf.metadata
                 }
 
-                # Extract text from all pages
                 all_text = []
+                self.tables = []
+                fields_found = set()
+                table_pages = []
+                skipped_pages = []
+                page_errors = []
+                tables_done_at = None  # page after which targeted mode stops extracting tables
+
                 for page_num, page in enumerate(pdf.pages, 1):
-                    page_text = page.extract_text()
+                    try:
+                        page_text = page.extract_text()
+                    except Exception as e:
+                        # Some PDFs break pdfminer layout on a single page; keep the rest
+                        logger.warning(f"Text extraction failed on page {page_num} of {self.pdf_path.name}: {e}")
+                        page_errors.append({'page': page_num, 'error': str(e)})
+                        page_text = None
+
                     if page_text:
                         all_text.append(f"--- PAGE {page_num} ---\n{page_text}")
 
-                self.text_content = "\n\n".join(all_text)
+                    page_fields = find_spec_fields(page_text)
+                    fields_found |= page_fields
 
-                # Extract tables from all pages
-                self.tables = []
-                for page_num, page in enumerate(pdf.pages, 1):
-                    page_tables = page.extract_tables()
-                    for table_num, table in enumerate(page_tables, 1):
-                        if table:
-                            self.tables.append({
-                                'page': page_num,
-                                'table_number': table_num,
-                                'data': table
-                            })
+                    if tables_done_at:
+                        continue
+                    if self.targeted and len(page_fields) < MIN_SPEC_FIELDS_PER_PAGE:
+                        skipped_pages.append(page)
+                    else:
+                        self._extract_page_tables(page, page_num, page_errors)
+                        table_pages.append(page_num)
+
+                    if self.targeted and REQUIRED_SPEC_FIELDS <= fields_found:
+                        tables_done_at = page_num
+
+                # Labels may be drawn as graphics; fall back to the skipped pages
+                if self.targeted and not self.tables:
+                    for page in skipped_pages:
+                        self._extract_page_tables(page, page.page_number, page_errors)
+                        table_pages.append(page.page_number)
+
+                self.text_content = "\n\n".join(all_text)
+                self.metadata.update({
+                    'table_pages': sorted(table_pages),
+                    'tables_stopped_early': tables_done_at is not None and tables_done_at < len(pdf.pages),
+                    'spec_fields_found': sorted(fields_found),
+                    'page_errors': page_errors
+                })
 
                 logger.info(
                     f"Extraction complete: {len(pdf.pages)} pages, "
-                    f"{len(self.tables)} tables, "
+                    f"{len(self.tables)} tables from {len(table_pages)} pages, "
                     f"{len(self.text_content)} characters of text"
                 )
 
@@ -104,6 +197,23 @@ class PDFTextExtractor:
                 'error': str(e)
             }
 
+    def _extract_page_tables(self, page, page_num: int, page_errors: List[Dict[str, Any]]) -> None:
+        """Extract tables from a single page, recording failures instead of raising"""
+        try:
+            page_tables = page.extract_tables()
+        except Exception as e:
+            logger.warning(f"Table extraction failed on page {page_num} of {self.pdf_path.name}: {e}")
+            page_errors.append({'page': page_num, 'error': str(e)})
+            return
+
+        for table_num, table in enumerate(page_tables, 1):
+            if table:
+                self.tables.append({
+                    'page': page_num,
+                    'table_number': table_num,
+                    'data': table
+                })
+
     def get_text(self) -> str:
         """Get extracted text content"""
         if not self.text_content:
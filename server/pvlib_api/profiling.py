@@ -0,0 +1,327 @@
+"""
+Simulation Profiling
+
+On-demand profiling of a single call, for diagnosing requests that are
+unexpectedly slow. The call runs under cProfile or a sampling profiler and
+the result comes back as flamegraph-ready stacks (collapsed format for
+flamegraph.pl / speedscope, or speedscope JSON), the hottest functions
+and, optionally, tracemalloc allocation statistics.
+
+Nothing here runs, or needs to be imported, until a profile is requested.
+"""
+
+import cProfile
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+PROFILE_MODES = ('sampling', 'cprofile')
+PROFILE_FORMATS = ('speedscope', 'collapsed')
+DEFAULT_INTERVAL_MS = 5.0
+DEFAULT_TOP = 25
+
+# Rebuilding stacks from cProfile data: caller paths carrying less than this
+# share of a function's own time are dropped, and paths are cut at this depth
+MIN_PATH_FRACTION = 0.01
+MAX_STACK_DEPTH = 64
+
+# Stacks below this share of the total are left out of the returned profile
+MIN_STACK_FRACTION = 0.0005
+
+SPEEDSCOPE_SCHEMA = 'https://www.speedscope.app/file-format-schema.json'
+
+# Function name, file name, first line
+Frame = Tuple[str, str, int]
+
+# cProfile and tracemalloc are process-wide, so only one profile runs at a time
+_profile_lock = threading.Lock()
+
+
+class ProfilerBusy(RuntimeError):
+    """Another profile is already running"""
+
+
+def _run_target(func: Callable[[], Any]) -> Any:
+    # Stack root for profiled calls; frames above it belong to the profiler
+    return func()
+
+
+def _code_frame(code) -> Frame:
+    return (code.co_name, Path(code.co_filename).name, code.co_firstlineno)
+
+
+def _label(frame: Frame) -> str:
+    name, filename, line = frame
+    label = f'{name} ({filename}:{line})' if filename else name
+    return label.replace(';', ':')
+
+
+class SamplingProfiler:
+    """Periodically records the stack of one thread from a background thread"""
+
+    def __init__(self, thread_id: int, interval: float, root_code=_run_target.__code__):
+        """
+        Initialize profiler
+
+        Args:
+            thread_id: Thread to sample
+            interval: Seconds between samples
+            root_code: Code object where stacks start (excluded)
+        """
+        self.thread_id = thread_id
+        self.interval = interval
+        self.root_code = root_code
+        self.samples: Dict[Tuple[Frame, ...], float] = defaultdict(float)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='pv-sampling-profiler', daemon=True)
+
+    def _run(self) -> None:
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            # Weight by the time actually elapsed, since waking up needs the GIL
+            now = time.perf_counter()
+            elapsed, last = now - last, now
+
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None and frame.f_code is not self.root_code:
+                stack.append(_code_frame(frame.f_code))
+                frame = frame.f_back
+            # Skip samples taken outside the profiled call
+            if frame is not None and stack:
+                self.samples[tuple(reversed(stack))] += elapsed
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def stacks(self) -> Dict[Tuple[Frame, ...], float]:
+        """Sampled stacks weighted in milliseconds"""
+        return {stack: seconds * 1000 for stack, seconds in self.samples.items()}
+
+
+def cprofile_stacks(profiler: cProfile.Profile) -> Dict[Tuple[Frame, ...], float]:
+    """
+    Rebuild weighted stacks (milliseconds) from cProfile data
+
+    cProfile only records caller -> callee edges, so each function's own time
+    is split across its callers in proportion to the time spent under each.
+    Self times are exact; the stacks are an approximation (use sampling for
+    exact stacks).
+    """
+    raw = pstats.Stats(profiler).stats
+    root = (_run_target.__code__.co_filename, _run_target.__code__.co_firstlineno, _run_target.__name__)
+    memo: Dict[Any, List[Tuple[tuple, float]]] = {}
+
+    def paths(func, active) -> List[Tuple[tuple, float]]:
+        if func in memo:
+            return memo[func]
+
+        callers = {caller: timing for caller, timing in raw[func][4].items()
+                   if caller in raw and caller not in active and caller != root}
+        result = []
+        if callers and len(active) < MAX_STACK_DEPTH:
+            total = sum(timing[3] for timing in callers.values())
+            for caller, timing in callers.items():
+                share = timing[3] / total if total else 1 / len(callers)
+                if share < MIN_PATH_FRACTION:
+                    continue
+                for stack, fraction in paths(caller, active | {func}):
+                    if fraction * share >= MIN_PATH_FRACTION:
+                        result.append((stack + (func,), fraction * share))
+
+        if result:
+            kept = sum(fraction for _, fraction in result)
+            result = [(stack, fraction / kept) for stack, fraction in result]
+        else:
+            result = [((func,), 1.0)]
+        memo[func] = result
+        return result
+
+    stacks: Dict[Tuple[Frame, ...], float] = defaultdict(float)
+    for func, (_, _, own_time, _, _) in raw.items():
+        # Skip the profiler's own frames
+        if own_time <= 0 or func == root or '_lsprof.Profiler' in func[2]:
+            continue
+        for stack, fraction in paths(func, frozenset()):
+            frames = tuple((name, Path(filename).name if filename != '~' else '', line)
+                           for filename, line, name in stack)
+            stacks[frames] += own_time * 1000 * fraction
+    return dict(stacks)
+
+
+def prune_stacks(stacks: Dict[Tuple[Frame, ...], float],
+                 min_fraction: float = MIN_STACK_FRACTION) -> Dict[Tuple[Frame, ...], float]:
+    """Drop stacks carrying less than min_fraction of the total weight"""
+    threshold = sum(stacks.values()) * min_fraction
+    return {stack: weight for stack, weight in stacks.items() if weight >= threshold}
+
+
+def collapsed_stacks(stacks: Dict[Tuple[Frame, ...], float]) -> str:
+    """Stacks in the collapsed format (one "root;...;leaf weight" line each, weights in microseconds)"""
+    lines = [f"{';'.join(_label(frame) for frame in stack)} {round(weight * 1000)}"
+             for stack, weight in sorted(stacks.items())]
+    return '\n'.join(lines) + '\n' if lines else ''
+
+
+def speedscope_profile(stacks: Dict[Tuple[Frame, ...], float], name: str = 'profile') -> Dict[str, Any]:
+    """Stacks as a speedscope sampled profile (weights in milliseconds)"""
+    frames = []
+    frame_index: Dict[Frame, int] = {}
+    samples = []
+    weights = []
+
+    for stack, weight in sorted(stacks.items()):
+        sample = []
+        for frame in stack:
+            if frame not in frame_index:
+                frame_index[frame] = len(frames)
+                frames.append({'name': frame[0], 'file': frame[1], 'line': frame[2]})
+            sample.append(frame_index[frame])
+        samples.append(sample)
+        weights.append(round(weight, 3))
+
+    return {
+        '$schema': SPEEDSCOPE_SCHEMA,
+        'name': name,
+        'exporter': 'pvlib_api.profiling',
+        'activeProfileIndex': 0,
+        'shared': {'frames': frames},
+        'profiles': [{
+            'type': 'sampled',
+            'name': name,
+            'unit': 'milliseconds',
+            'startValue': 0,
+            'endValue': round(sum(weights), 3),
+            'samples': samples,
+            'weights': weights
+        }]
+    }
+
+
+def top_functions(stacks: Dict[Tuple[Frame, ...], float], top: int = DEFAULT_TOP) -> List[Dict[str, Any]]:
+    """Functions with the most own time, with the total time of stacks they appear in"""
+    own: Dict[Frame, float] = defaultdict(float)
+    total: Dict[Frame, float] = defaultdict(float)
+    for stack, weight in stacks.items():
+        own[stack[-1]] += weight
+        for frame in set(stack):
+            total[frame] += weight
+
+    hottest = sorted(own, key=own.get, reverse=True)[:top]
+    return [{'function': _label(frame), 'self_ms': round(own[frame], 3), 'total_ms': round(total[frame], 3)}
+            for frame in hottest]
+
+
+def allocation_stats(before: tracemalloc.Snapshot, after: tracemalloc.Snapshot, peak: int,
+                     top: int = DEFAULT_TOP) -> Dict[str, Any]:
+    """Peak traced memory plus the source lines whose allocations grew the most"""
+    ignore = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__))
+    diffs = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), 'lineno')
+    return {
+        'peak_kb': round(peak / 1024, 1),
+        'top': [
+            {
+                'location': f'{Path(stat.traceback[0].filename).name}:{stat.traceback[0].lineno}',
+                'size_kb': round(stat.size_diff / 1024, 1),
+                'count': stat.count_diff
+            }
+            for stat in diffs[:top] if stat.size_diff > 0
+        ]
+    }
+
+
+def profile_call(func: Callable[[], Any], mode: str = 'sampling', output_format: str = 'speedscope',
+                 interval_ms: float = DEFAULT_INTERVAL_MS, memory: bool = True, top: int = DEFAULT_TOP,
+                 name: str = 'profile') -> Dict[str, Any]:
+    """
+    Run a call under a profiler
+
+    Args:
+        func: Call to profile (no arguments)
+        mode: 'sampling' (exact stacks, low overhead) or 'cprofile' (exact call counts
+            and own times, approximate stacks)
+        output_format: 'speedscope' JSON or 'collapsed' stacks
+        interval_ms: Sampling interval
+        memory: Also trace allocations with tracemalloc (slows the call)
+        top: Number of hottest functions and allocation sites to report
+        name: Profile name shown by speedscope
+
+    Returns:
+        Dictionary with mode, format, elapsed_ms, profile, top_functions,
+        allocations, error (the call's exception message, if any) and result
+
+    Raises:
+        ValueError: Unknown mode or output format
+        ProfilerBusy: Another profile is running
+    """
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profiling mode: {mode}")
+    if output_format not in PROFILE_FORMATS:
+        raise ValueError(f"Unknown profile format: {output_format}")
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusy("Another profile is already running")
+
+    started_tracemalloc = False
+    try:
+        if memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracemalloc = True
+            tracemalloc.reset_peak()
+            before = tracemalloc.take_snapshot()
+
+        result = None
+        error = None
+        start = time.perf_counter()
+
+        if mode == 'cprofile':
+            profiler = cProfile.Profile()
+            profiler.enable()
+        else:
+            sampler = SamplingProfiler(threading.get_ident(), interval_ms / 1000)
+            sampler.start()
+
+        try:
+            result = _run_target(func)
+        except Exception as e:
+            error = str(e)
+        finally:
+            if mode == 'cprofile':
+                profiler.disable()
+            else:
+                sampler.stop()
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        allocations = None
+        if memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            allocations = allocation_stats(before, tracemalloc.take_snapshot(), peak, top)
+    finally:
+        if started_tracemalloc:
+            tracemalloc.stop()
+        _profile_lock.release()
+
+    stacks = cprofile_stacks(profiler) if mode == 'cprofile' else sampler.stacks()
+    kept = prune_stacks(stacks)
+    profile = collapsed_stacks(kept) if output_format == 'collapsed' else speedscope_profile(kept, name)
+
+    return {
+        'mode': mode,
+        'format': output_format,
+        'elapsed_ms': round(elapsed_ms, 3),
+        'profile': profile,
+        'top_functions': top_functions(stacks, top),
+        'allocations': allocations,
+        'error': error,
+        'result': result
+    }
@@ -3,12 +3,13 @@ Simplified PV Simulation API
 Clean FastAPI interface for the simplified simulator
 """
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 from typing import Dict, Any, Optional, List
 from datetime import datetime, date
 import json
+import numpy as np
 
 from simplified_simulator import (
     SimplePVSimulator,
@@ -18,6 +19,9 @@ from simplified_simulator import (
     InverterConfig,
     create_default_config
 )
+from instrumentation import stage_metrics, tracing
+from metrics import REGISTRY, install_metrics
+from wire_format import accepted_media_type, wire_response
 
 app = FastAPI(
     title="Simple PV Simulation API",
@@ -34,6 +38,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Prometheus metrics at GET /metrics
+REGISTRY.register_collector(stage_metrics)
+install_metrics(app, 'simple_api')
+
+# Simulations that fail are reported with success=False rather than an error status
+SIMULATION_ERRORS = REGISTRY.counter(
+    'pv_simulation_errors_total', 'Simulations that returned an error response', ('service', 'endpoint')
+)
+
 
 # Pydantic models for API validation
 class SiteConfigModel(BaseModel):
@@ -95,6 +108,9 @@ class SimulationResponse(BaseModel):
     performance_ratio: Optional[float] = None
     monthly_energy: Optional[Dict[str, float]] = None
     daily_energy: Optional[Dict[str, float]] = None
+    daily_energy_percentiles: Optional[Dict[str, float]] = None
+    hour_month_profile: Optional[List[List[float]]] = None
+    hourly_power_output: Optional[List[float]] = None
     error_message: Optional[str] = None
 
 
@@ -106,7 +122,7 @@ class DaySimulationResponse(BaseModel):
     error_message: Optional[str] = None
 
 
-# Global simulator instance
+# Global simulator instance; its site geometry cache is shared by all requests
 simulator = SimplePVSimulator()
 
 
@@ -120,7 +136,8 @@ async def root():
             "health": "/health",
             "simulate_year": "/simulate/year",
             "simulate_day": "/simulate/day",
-            "default_config": "/config/default"
+            "default_config": "/config/default",
+            "metrics": "/metrics"
         }
     }
 
@@ -147,12 +164,21 @@ async def get_default_config():
 
 
 @app.post("/simulate/year", response_model=SimulationResponse)
-async def simulate_year(request: SimulationRequest):
+async def simulate_year(
+    request: SimulationRequest,
+    http_request: Request,
+    include_hourly: bool = Query(False, description="Add the 8760 hourly AC power values (W)"),
+    include_profile: bool = Query(False, description="Add the mean power (W) by month and hour of day")
+):
     """
     Run a full year simulation
 
-    Returns annual energy production, capacity factor, and performance metrics
+    Returns annual energy production, capacity factor, performance metrics
+    and daily energy percentiles. Binary response formats (see wire_format)
+    carry daily_energy and monthly_energy as arrays ordered by day of year and
+    month, and hour_month_profile as 288 values (January hours 0-23 first).
     """
+    accepted_media_type(http_request)
     try:
         # Convert Pydantic models to internal config objects
         site = SiteConfig(**request.site.model_dump())
@@ -165,26 +191,41 @@ async def simulate_year(request: SimulationRequest):
             raise HTTPException(status_code=400, detail="Failed to setup PV system")
 
         # Run simulation
-        results = simulator.simulate_year(request.year)
+        with tracing():
+            results = simulator.simulate_year(request.year)
 
         if not results:
             raise HTTPException(status_code=500, detail="Simulation failed to produce results")
 
         # Format response
-        return SimulationResponse(
-            success=True,
-            timestamp=datetime.now().isoformat(),
-            annual_energy=round(results.annual_energy, 2),
-            capacity_factor=round(results.capacity_factor, 4),
-            peak_power=round(results.peak_power, 2),
-            performance_ratio=round(results.performance_ratio, 4),
-            monthly_energy={str(k): round(v, 2) for k, v in results.monthly_energy.items()},
-            daily_energy={str(k): round(v, 2) for k, v in results.daily_energy.items()}
-        )
+        aggregates = results.aggregates
+        content = {
+            "success": True,
+            "timestamp": datetime.now().isoformat(),
+            "annual_energy": round(results.annual_energy, 2),
+            "capacity_factor": round(results.capacity_factor, 4),
+            "peak_power": round(results.peak_power, 2),
+            "performance_ratio": round(results.performance_ratio, 4),
+            "monthly_energy": dict(zip(map(str, range(1, 13)), np.round(aggregates.monthly_energy, 2).tolist())),
+            "daily_energy": dict(zip(map(str, aggregates.days.tolist()), np.round(aggregates.daily_energy, 2).tolist())),
+            "daily_energy_percentiles": {k: round(v, 2) for k, v in aggregates.daily_percentiles.items()},
+            "error_message": None
+        }
+        arrays = {
+            "daily_energy": aggregates.daily_energy,
+            "monthly_energy": aggregates.monthly_energy
+        }
+        if include_hourly:
+            content["hourly_power_output"] = arrays["hourly_power_output"] = results.hourly_power_output
+        if include_profile:
+            content["hour_month_profile"] = aggregates.hour_month_profile
+            arrays["hour_month_profile"] = aggregates.hour_month_profile.ravel()
+        return wire_response(http_request, content, arrays)
 
     except HTTPException:
         raise
     except Exception as e:
+        SIMULATION_ERRORS.inc(service='simple_api', endpoint='/simulate/year')
         return SimulationResponse(
             success=False,
             timestamp=datetime.now().isoformat(),
@@ -193,12 +234,15 @@ async def simulate_year(request: SimulationRequest):
 
 
 @app.post("/simulate/day", response_model=DaySimulationResponse)
-async def simulate_day(request: DaySimulationRequest):
+async def simulate_day(request: DaySimulationRequest, http_request: Request):
     """
     Simulate a single day in detail
 
-    Returns hourly power output, irradiance, and temperature data
+    Returns hourly power output, irradiance, and temperature data. Binary
+    response formats (see wire_format) carry hourly_data as one array per
+    quantity (hourly_data.power_output, ...), starting at midnight.
     """
+    accepted_media_type(http_request)
     try:
         # Validate date format
         try:
@@ -217,7 +261,8 @@ async def simulate_day(request: DaySimulationRequest):
             raise HTTPException(status_code=400, detail="Failed to setup PV system")
 
         # Run day simulation
-        results = simulator.simulate_day(request.simulation_date)
+        with tracing():
+            results = simulator.simulate_day(request.simulation_date)
 
         if not results:
             raise HTTPException(status_code=500, detail="Day simulation failed")
@@ -235,16 +280,21 @@ async def simulate_day(request: DaySimulationRequest):
 
         daily_total = sum(results['power_output']) / 1000  # Convert to kWh
 
-        return DaySimulationResponse(
-            success=True,
-            timestamp=datetime.now().isoformat(),
-            hourly_data=hourly_data,
-            daily_total=round(daily_total, 2)
-        )
+        content = {
+            "success": True,
+            "timestamp": datetime.now().isoformat(),
+            "hourly_data": hourly_data,
+            "daily_total": round(daily_total, 2),
+            "error_message": None
+        }
+        arrays = {f"hourly_data.{quantity}": np.asarray(results[quantity])
+                  for quantity in ('power_output', 'irradiance', 'cell_temperature', 'ambient_temperature')}
+        return wire_response(http_request, content, arrays)
 
     except HTTPException:
         raise
     except Exception as e:
+        SIMULATION_ERRORS.inc(service='simple_api', endpoint='/simulate/day')
         return DaySimulationResponse(
             success=False,
             timestamp=datetime.now().isoformat(),
@@ -254,6 +304,7 @@ async def simulate_day(request: DaySimulationRequest):
 
 @app.get("/simulate/quick")
 async def quick_simulation(
+    http_request: Request,
     latitude: float = Query(..., ge=-90, le=90, description="Latitude in decimal degrees"),
     longitude: float = Query(..., ge=-180, le=180, description="Longitude in decimal degrees"),
     system_size_kw: float = Query(10, gt=0, le=1000, description="System size in kilowatts")
@@ -263,6 +314,7 @@ async def quick_simulation(
 
     Uses default equipment configuration with specified location and system size
     """
+    accepted_media_type(http_request)
     try:
         # Get default config and modify
         site, panel, array, inverter = create_default_config()
@@ -284,12 +336,13 @@ async def quick_simulation(
         if not simulator.setup_system(site, panel, array, inverter):
             raise HTTPException(status_code=400, detail="Failed to setup PV system")
 
-        results = simulator.simulate_year()
+        with tracing():
+            results = simulator.simulate_year()
 
         if not results:
             raise HTTPException(status_code=500, detail="Simulation failed")
 
-        return {
+        return wire_response(http_request, {
             "success": True,
             "timestamp": datetime.now().isoformat(),
             "system_size_kw": system_size_kw,
@@ -304,11 +357,12 @@ async def quick_simulation(
                 "tilt_angle": array.tilt_angle,
                 "azimuth_angle": array.azimuth_angle
             }
-        }
+        })
 
     except HTTPException:
         raise
     except Exception as e:
+        SIMULATION_ERRORS.inc(service='simple_api', endpoint='/simulate/quick')
         return {
             "success": False,
             "timestamp": datetime.now().isoformat(),
@@ -13,6 +13,13 @@ import pvlib
 from pvlib.location import Location
 from pvlib.pvsystem import PVSystem
 from pvlib.temperature import TEMPERATURE_MODEL_PARAMETERS
+from instrumentation import span
+from aggregation import EnergyAggregates, aggregate_energy
+from metrics import watch_cache
+from panel_cache import LRUCache
+
+# Site geometries kept per simulator (a year and a few single days for several sites)
+GEOMETRY_CACHE_SIZE = 32
 
 
 @dataclass
@@ -60,14 +67,79 @@ class InverterConfig:
 @dataclass
 class SimulationResult:
     """Simulation output data"""
-    hourly_power_output: List[float]
-    daily_energy: Dict[int, float]  # day_of_year -> kWh
-    monthly_energy: Dict[int, float]  # month -> kWh
-    annual_energy: float  # kWh
+    hourly_power_output: np.ndarray  # W
+    aggregates: EnergyAggregates
     capacity_factor: float
-    peak_power: float
     performance_ratio: float
 
+    @property
+    def annual_energy(self) -> float:
+        """kWh"""
+        return self.aggregates.annual_energy
+
+    @property
+    def peak_power(self) -> float:
+        """W"""
+        return self.aggregates.peak_power
+
+    @property
+    def daily_energy(self) -> Dict[int, float]:
+        """day_of_year -> kWh"""
+        return self.aggregates.daily_energy_by_day()
+
+    @property
+    def monthly_energy(self) -> Dict[int, float]:
+        """month -> kWh"""
+        return self.aggregates.monthly_energy_by_month()
+
+
+@dataclass
+class SiteGeometry:
+    """Solar geometry of a site over a time index, shared by the simulation steps"""
+    solar_position: pd.DataFrame
+    clearsky: pd.DataFrame  # ghi, dni, dhi (W/m2)
+    dni_extra: pd.Series  # extraterrestrial DNI (W/m2)
+
+
+def compute_site_geometry(location: Location, times: pd.DatetimeIndex) -> SiteGeometry:
+    """Solar position, extraterrestrial irradiance and clear-sky irradiance, each computed once"""
+    with span('solar_position'):
+        solar_position = location.get_solarposition(times)
+    dni_extra = pvlib.irradiance.get_extra_radiation(times)
+    with span('clearsky'):
+        clearsky = location.get_clearsky(times, solar_position=solar_position, dni_extra=dni_extra)
+    return SiteGeometry(solar_position=solar_position, clearsky=clearsky, dni_extra=dni_extra)
+
+
+class SiteGeometryCache:
+    """LRU cache of SiteGeometry by site coordinates and time index"""
+
+    def __init__(self, maxsize: int = GEOMETRY_CACHE_SIZE):
+        self.entries = LRUCache(maxsize)
+        self.hits = 0
+        self.misses = 0
+        watch_cache('site_geometry', self)
+
+    @staticmethod
+    def key(location: Location, times: pd.DatetimeIndex) -> tuple:
+        site = (location.latitude, location.longitude, location.altitude, str(location.tz))
+        if times.freq is not None and len(times):
+            return site + (times[0], len(times), times.freqstr)
+        return site + (str(times.tz), times.asi8.tobytes())
+
+    def get(self, location: Location, times: pd.DatetimeIndex) -> SiteGeometry:
+        """Cached geometry, computed on first use (treat as read-only)"""
+        key = self.key(location, times)
+        geometry = self.entries.get(key)
+        if geometry is not None:
+            self.hits += 1
+            return geometry
+
+        self.misses += 1
+        geometry = compute_site_geometry(location, times)
+        self.entries.put(key, geometry)
+        return geometry
+
 
 class SimplePVSimulator:
     """
@@ -75,6 +147,7 @@ class SimplePVSimulator:
     """
 
     def __init__(self):
+        self.geometry_cache = SiteGeometryCache()
         self.location: Optional[Location] = None
         self.pv_system: Optional[PVSystem] = None
         self.timezone: str = "UTC"
@@ -148,12 +221,19 @@ class SimplePVSimulator:
             print(f"Error setting up system: {e}")
             return False
 
-    def generate_weather_data(self, times: pd.DatetimeIndex) -> pd.DataFrame:
+    def site_geometry(self, times: pd.DatetimeIndex) -> SiteGeometry:
+        """
+        Solar geometry of the configured site over times, shared across calls
+        """
+        return self.geometry_cache.get(self.location, times)
+
+    def generate_weather_data(self, times: pd.DatetimeIndex,
+                              geometry: Optional[SiteGeometry] = None) -> pd.DataFrame:
         """
         Generate synthetic weather data when real data isn't available
         """
-        # Get solar position for temperature modeling
-        solar_position = self.location.get_solarposition(times)
+        if geometry is None:
+            geometry = self.site_geometry(times)
 
         # Simple temperature model based on time of day and season
         day_of_year = times.dayofyear
@@ -171,8 +251,7 @@ class SimplePVSimulator:
         wind_speed = 3 + 2 * np.random.random(len(times))
 
         # Clear sky GHI
-        clearsky = self.location.get_clearsky(times)
-        ghi = clearsky['ghi']
+        ghi = geometry.clearsky['ghi']
 
         # Add some cloud cover variation
         cloud_factor = 0.7 + 0.3 * np.random.random(len(times))
@@ -201,86 +280,77 @@ class SimplePVSimulator:
                 tz=self.timezone
             )
 
-            # Generate or get weather data
-            weather = self.generate_weather_data(times)
+            # Solar position and clear sky, shared with earlier runs for this site
+            geometry = self.site_geometry(times)
+            solar_position = geometry.solar_position
 
-            # Calculate solar position
-            solar_position = self.location.get_solarposition(times)
+            # Generate or get weather data
+            with span('weather'):
+                weather = self.generate_weather_data(times, geometry)
 
             # Calculate plane-of-array irradiance using stored array config
-            poa_irradiance = pvlib.irradiance.get_total_irradiance(
-                surface_tilt=self.array_config.tilt_angle,
-                surface_azimuth=self.array_config.azimuth_angle,
-                solar_zenith=solar_position['apparent_zenith'],
-                solar_azimuth=solar_position['azimuth'],
-                dni=weather['ghi'],  # Simplified - using GHI for DNI
-                ghi=weather['ghi'],
-                dhi=weather['ghi'] * 0.2,  # Simplified DHI
-                albedo=0.25
-            )
+            with span('transposition'):
+                poa_irradiance = pvlib.irradiance.get_total_irradiance(
+                    surface_tilt=self.array_config.tilt_angle,
+                    surface_azimuth=self.array_config.azimuth_angle,
+                    solar_zenith=solar_position['apparent_zenith'],
+                    solar_azimuth=solar_position['azimuth'],
+                    dni=weather['ghi'],  # Simplified - using GHI for DNI
+                    ghi=weather['ghi'],
+                    dhi=weather['ghi'] * 0.2,  # Simplified DHI
+                    dni_extra=geometry.dni_extra,
+                    albedo=0.25
+                )
 
             # Calculate cell temperature
-            temperature_model = TEMPERATURE_MODEL_PARAMETERS['sapm']['open_rack_glass_glass']
-            cell_temp = pvlib.temperature.sapm_cell(
-                poa_irradiance['poa_global'],
-                weather['temp_air'],
-                weather['wind_speed'],
-                **temperature_model
-            )
+            with span('cell_temperature'):
+                temperature_model = TEMPERATURE_MODEL_PARAMETERS['sapm']['open_rack_glass_glass']
+                cell_temp = pvlib.temperature.sapm_cell(
+                    poa_irradiance['poa_global'],
+                    weather['temp_air'],
+                    weather['wind_speed'],
+                    **temperature_model
+                )
 
             # Calculate DC power using pvwatts with stored parameters
-            dc_power = pvlib.pvsystem.pvwatts_dc(
-                poa_irradiance['poa_global'],
-                cell_temp,
-                pdc0=self.module_params['pdc0'],
-                gamma_pdc=self.module_params['gamma_pdc'],
-                temp_ref=25.0
-            )
-
-            # Calculate AC power using inverter with stored parameters
-            ac_power = pvlib.inverter.pvwatts(
-                dc_power,
-                pdc0=self.inverter_params['pdc0'],
-                eta_inv_nom=self.inverter_params['eta_inv_nom'],
-                eta_inv_ref=self.inverter_params['eta_inv_ref']
-            )
-
-            # Ensure no negative power
-            ac_power = ac_power.clip(lower=0)
+            with span('power'):
+                dc_power = pvlib.pvsystem.pvwatts_dc(
+                    poa_irradiance['poa_global'],
+                    cell_temp,
+                    pdc0=self.module_params['pdc0'],
+                    gamma_pdc=self.module_params['gamma_pdc'],
+                    temp_ref=25.0
+                )
+
+                # Calculate AC power using inverter with stored parameters
+                ac_power = pvlib.inverter.pvwatts(
+                    dc_power,
+                    pdc0=self.inverter_params['pdc0'],
+                    eta_inv_nom=self.inverter_params['eta_inv_nom'],
+                    eta_inv_ref=self.inverter_params['eta_inv_ref']
+                )
+
+                # Ensure no negative power
+                ac_power = ac_power.clip(lower=0)
 
             # Calculate results
-            hourly_power = ac_power.tolist()
-            daily_energy = {}
-            monthly_energy = {}
-
-            # Daily energy aggregation
-            for day in range(1, 367):
-                day_mask = times.dayofyear == day
-                if day_mask.any():
-                    daily_energy[day] = ac_power[day_mask].sum() / 1000  # kWh
-
-            # Monthly energy aggregation
-            for month in range(1, 13):
-                month_mask = times.month == month
-                monthly_energy[month] = ac_power[month_mask].sum() / 1000  # kWh
+            with span('summaries'):
+                hourly_power = ac_power.to_numpy()
+                aggregates = aggregate_energy(hourly_power, times)
 
-            annual_energy = ac_power.sum() / 1000  # kWh
-            peak_power = ac_power.max()
-            system_capacity = self.module_params['pdc0']  # Already scaled for total system
+                annual_energy = aggregates.annual_energy  # kWh
+                system_capacity = self.module_params['pdc0']  # Already scaled for total system
 
-            capacity_factor = annual_energy / (system_capacity * 8760) if system_capacity > 0 else 0
+                capacity_factor = annual_energy / (system_capacity * 8760) if system_capacity > 0 else 0
 
-            # Simple performance ratio calculation
-            theoretical_energy = weather['ghi'].sum() / 1000  # kWh
-            performance_ratio = annual_energy / theoretical_energy if theoretical_energy > 0 else 0
+                # Simple performance ratio calculation
+                theoretical_energy = weather['ghi'].sum() / 1000  # kWh
+                performance_ratio = annual_energy / theoretical_energy if theoretical_energy > 0 else 0
 
             return SimulationResult(
                 hourly_power_output=hourly_power,
-                daily_energy=daily_energy,
-                monthly_energy=monthly_energy,
-                annual_energy=annual_energy,
+                aggregates=aggregates,
                 capacity_factor=capacity_factor,
-                peak_power=peak_power,
                 performance_ratio=performance_ratio
             )
 
@@ -304,46 +374,53 @@ class SimplePVSimulator:
                 tz=self.timezone
             )
 
-            weather = self.generate_weather_data(times)
-            solar_position = self.location.get_solarposition(times)
+            geometry = self.site_geometry(times)
+            solar_position = geometry.solar_position
 
-            # Calculate plane-of-array irradiance using stored array config
-            poa_irradiance = pvlib.irradiance.get_total_irradiance(
-                surface_tilt=self.array_config.tilt_angle,
-                surface_azimuth=self.array_config.azimuth_angle,
-                solar_zenith=solar_position['apparent_zenith'],
-                solar_azimuth=solar_position['azimuth'],
-                dni=weather['ghi'],
-                ghi=weather['ghi'],
-                dhi=weather['ghi'] * 0.2,
-                albedo=0.25
-            )
+            with span('weather'):
+                weather = self.generate_weather_data(times, geometry)
 
-            temperature_model = TEMPERATURE_MODEL_PARAMETERS['sapm']['open_rack_glass_glass']
-            cell_temp = pvlib.temperature.sapm_cell(
-                poa_irradiance['poa_global'],
-                weather['temp_air'],
-                weather['wind_speed'],
-                **temperature_model
-            )
+            # Calculate plane-of-array irradiance using stored array config
+            with span('transposition'):
+                poa_irradiance = pvlib.irradiance.get_total_irradiance(
+                    surface_tilt=self.array_config.tilt_angle,
+                    surface_azimuth=self.array_config.azimuth_angle,
+                    solar_zenith=solar_position['apparent_zenith'],
+                    solar_azimuth=solar_position['azimuth'],
+                    dni=weather['ghi'],
+                    ghi=weather['ghi'],
+                    dhi=weather['ghi'] * 0.2,
+                    dni_extra=geometry.dni_extra,
+                    albedo=0.25
+                )
+
+            with span('cell_temperature'):
+                temperature_model = TEMPERATURE_MODEL_PARAMETERS['sapm']['open_rack_glass_glass']
+                cell_temp = pvlib.temperature.sapm_cell(
+                    poa_irradiance['poa_global'],
+                    weather['temp_air'],
+                    weather['wind_speed'],
+                    **temperature_model
+                )
 
             # Calculate DC power using pvwatts with stored parameters
-            dc_power = pvlib.pvsystem.pvwatts_dc(
-                poa_irradiance['poa_global'],
-                cell_temp,
-                pdc0=self.module_params['pdc0'],
-                gamma_pdc=self.module_params['gamma_pdc'],
-                temp_ref=25.0
-            )
-
-            # Calculate AC power using inverter with stored parameters
-            ac_power = pvlib.inverter.pvwatts(
-                dc_power,
-                pdc0=self.inverter_params['pdc0'],
-                eta_inv_nom=self.inverter_params['eta_inv_nom'],
-                eta_inv_ref=self.inverter_params['eta_inv_ref']
-            )
-            ac_power = ac_power.clip(lower=0)
+            with span('power'):
+                dc_power = pvlib.pvsystem.pvwatts_dc(
+                    poa_irradiance['poa_global'],
+                    cell_temp,
+                    pdc0=self.module_params['pdc0'],
+                    gamma_pdc=self.module_params['gamma_pdc'],
+                    temp_ref=25.0
+                )
+
+                # Calculate AC power using inverter with stored parameters
+                ac_power = pvlib.inverter.pvwatts(
+                    dc_power,
+                    pdc0=self.inverter_params['pdc0'],
+                    eta_inv_nom=self.inverter_params['eta_inv_nom'],
+                    eta_inv_ref=self.inverter_params['eta_inv_ref']
+                )
+                ac_power = ac_power.clip(lower=0)
 
             return {
                 'times': times.tolist(),
@@ -0,0 +1,378 @@
+"""
+Embedded SQLite Panel Store
+
+SQLite implementation of the DatabaseManager operations (upsert, lookups,
+statistics, export) so datasheet runs and tests can persist panels locally
+without a PostgreSQL server. Selected with a sqlite:///path URL.
+"""
+
+import csv
+import sqlite3
+import logging
+from pathlib import Path
+from typing import List, Optional, Dict, Any, Iterable, Tuple
+
+from models import PVPanelData, PANEL_COLUMNS, panel_to_row
+from panel_cache import PanelCache, summarize_statistics
+from utils import open_text_output
+
+logger = logging.getLogger(__name__)
+
+SQLITE_URL_PREFIX = 'sqlite:///'
+
+DEFAULT_CHUNK_SIZE = 500
+EXPORT_BATCH_SIZE = 10000
+
+# Column types mirroring the Prisma PVPanel model
+TEXT_COLUMNS = {
+    'maker', 'model', 'description', 'module_type',
+    'performance_warranty', 'product_warranty', 'certification'
+}
+
+_COLUMN_LIST = ', '.join(PANEL_COLUMNS)
+_COLUMN_DEFINITIONS = ',\n'.join(
+    f"    {column} {'TEXT' if column in TEXT_COLUMNS else 'REAL'}"
+    f"{' NOT NULL' if column in ('maker', 'model') else ''}"
+    for column in PANEL_COLUMNS
+)
+
+CREATE_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS p_v_panel (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+{_COLUMN_DEFINITIONS}
+);
+CREATE UNIQUE INDEX IF NOT EXISTS p_v_panel_model_key ON p_v_panel (model);
+CREATE INDEX IF NOT EXISTS p_v_panel_maker_model_idx ON p_v_panel (maker COLLATE NOCASE, model);
+"""
+
+UPSERT_QUERY = f"""
+    INSERT INTO p_v_panel ({_COLUMN_LIST}) VALUES ({', '.join('?' * len(PANEL_COLUMNS))})
+    ON CONFLICT (model) DO UPDATE SET
+    {', '.join(f"{column} = excluded.{column}" for column in PANEL_COLUMNS if column != 'model')}
+"""
+
+EXPORT_QUERY = "SELECT * FROM p_v_panel ORDER BY maker, model"
+
+# Models of the chunk being upserted; joined against instead of binding one
+# IN parameter per panel, which older SQLite builds cap at 999 per statement
+CREATE_BATCH_TABLE = "CREATE TEMP TABLE IF NOT EXISTS p_v_panel_batch (model TEXT PRIMARY KEY)"
+BATCH_PANELS_QUERY = """
+    SELECT p.model, p.id FROM p_v_panel p JOIN temp.p_v_panel_batch b ON b.model = p.model
+"""
+
+
+def is_sqlite_url(connection_string: Optional[str]) -> bool:
+    """Check if a connection string selects the SQLite store"""
+    return bool(connection_string) and connection_string.startswith(SQLITE_URL_PREFIX)
+
+
+def sqlite_path_from_url(connection_string: str) -> Path:
+    """Get the database file path from a sqlite:///path URL"""
+    return Path(connection_string[len(SQLITE_URL_PREFIX):])
+
+
+class SQLitePanelStore:
+    """Manage PV panel data in an embedded SQLite database"""
+
+    def __init__(self, database_path: Path, cache: Optional[PanelCache] = None):
+        """
+        Initialize store
+
+        Args:
+            database_path: SQLite file path (':memory:' for a temporary store)
+            cache: Read cache to invalidate on upsert
+        """
+        self.database_path = database_path
+        self.cache = cache
+        self.connection: Optional[sqlite3.Connection] = None
+
+    def connect(self) -> bool:
+        """Open the database and create the schema if needed"""
+        try:
+            if str(self.database_path) != ':memory:':
+                Path(self.database_path).parent.mkdir(parents=True, exist_ok=True)
+
+            self.connection = sqlite3.connect(str(self.database_path), check_same_thread=False)
+            self.connection.row_factory = sqlite3.Row
+            # WAL + NORMAL sync: durable enough for batch ingestion, far fewer fsyncs
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.executescript(CREATE_SCHEMA)
+            logger.info(f"SQLite panel store opened: {self.database_path}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to open SQLite store: {e}")
+            return False
+
+    def disconnect(self):
+        """Close database connection"""
+        if self.connection:
+            self.connection.close()
+            self.connection = None
+            logger.info("SQLite panel store closed")
+
+    def __enter__(self):
+        """Context manager entry"""
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Context manager exit"""
+        if self.connection:
+            if exc_type:
+                self.connection.rollback()
+                logger.error(f"Database operation failed: {exc_val}")
+            else:
+                self.connection.commit()
+        self.disconnect()
+
+    def check_connection(self) -> bool:
+        """Verify database connection"""
+        try:
+            return bool(self.connection) and self.connection.execute("SELECT 1").fetchone() is not None
+        except Exception as e:
+            logger.error(f"Database connection check failed: {e}")
+            return False
+
+    def upsert_rows(self, rows: List[Tuple[Any, ...]]) -> List[Dict[str, Any]]:
+        """
+        Insert or update rows in PANEL_COLUMNS order in one transaction
+
+        Returns:
+            List of {id, model, inserted} per row
+        """
+        models = [row[PANEL_COLUMNS.index('model')] for row in rows]
+
+        with self.connection:
+            self.connection.execute(CREATE_BATCH_TABLE)
+            self.connection.execute("DELETE FROM temp.p_v_panel_batch")
+            self.connection.executemany("INSERT OR IGNORE INTO temp.p_v_panel_batch (model) VALUES (?)",
+                                        [(model,) for model in models])
+            existing = {r[0] for r in self.connection.execute(BATCH_PANELS_QUERY)}
+            self.connection.executemany(UPSERT_QUERY, rows)
+            ids = dict(self.connection.execute(BATCH_PANELS_QUERY).fetchall())
+
+        return [{'id': ids.get(model), 'model': model, 'inserted': model not in existing}
+                for model in models]
+
+    def upsert_pv_panels(self, panels: List[PVPanelData],
+                         chunk_size: int = DEFAULT_CHUNK_SIZE) -> Dict[str, Any]:
+        """Insert or update PV panel records in chunks"""
+
+        if not panels:
+            return {"success": False, "message": "No panels to insert"}
+
+        with SQLitePanelWriter(self, chunk_size=chunk_size) as writer:
+            writer.add_many(panels)
+        return writer.summary()
+
+    def check_panel_exists(self, model: str) -> Optional[Dict[str, Any]]:
+        """Check if a panel with given model exists"""
+        row = self.connection.execute(
+            "SELECT id, maker, model, max_power, efficiency FROM p_v_panel WHERE model = ?",
+            (model,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def get_panel_by_model(self, model: str) -> Optional[Dict[str, Any]]:
+        """Retrieve panel data by model"""
+        row = self.connection.execute("SELECT * FROM p_v_panel WHERE model = ?", (model,)).fetchone()
+        return dict(row) if row else None
+
+    def get_panels_by_maker(self, maker: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """Retrieve panels by manufacturer (case-insensitive substring, like ILIKE)"""
+        rows = self.connection.execute(
+            "SELECT id, maker, model, max_power, efficiency, certification "
+            "FROM p_v_panel WHERE maker LIKE ? ORDER BY model LIMIT ?",
+            (f"%{maker}%", limit)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_maker_statistics(self) -> List[Dict[str, Any]]:
+        """Get per-maker panel counts and power sums in one aggregate query"""
+        rows = self.connection.execute("""
+            SELECT maker, COUNT(*) AS count,
+                   SUM(max_power) AS power_sum, COUNT(max_power) AS power_count
+            FROM p_v_panel
+            GROUP BY maker
+        """).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get database statistics"""
+        try:
+            return summarize_statistics(self.get_maker_statistics())
+        except Exception as e:
+            logger.error(f"Failed to get statistics: {e}")
+            return {}
+
+    def export_to_csv(self, output_file: Path) -> bool:
+        """Export all panels to CSV file, streaming rows from the cursor"""
+        try:
+            cursor = self.connection.execute(EXPORT_QUERY)
+            row_count = 0
+
+            with open_text_output(output_file) as csvfile:
+                writer = csv.writer(csvfile)
+                writer.writerow([column[0] for column in cursor.description])
+                for row in cursor:
+                    writer.writerow(row)
+                    row_count += 1
+
+            logger.info(f"Exported {row_count} panels to {output_file}")
+            return True
+
+        except Exception as e:
+            logger.error(f"CSV export failed: {e}")
+            return False
+
+    def export_to_parquet(self, output_file: Path, batch_size: int = EXPORT_BATCH_SIZE) -> bool:
+        """Export all panels to Parquet file (requires pyarrow)"""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            logger.error("Parquet export requires pyarrow (pip install pyarrow)")
+            return False
+
+        schema = pa.schema(
+            [('id', pa.int64())] +
+            [(column, pa.string() if column in TEXT_COLUMNS else pa.float64()) for column in PANEL_COLUMNS]
+        )
+
+        try:
+            cursor = self.connection.execute(f"SELECT id, {_COLUMN_LIST} FROM p_v_panel ORDER BY maker, model")
+            row_count = 0
+
+            with pq.ParquetWriter(str(output_file), schema) as writer:
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    arrays = [pa.array(values, type=field.type) for field, values in zip(schema, zip(*rows))]
+                    writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+                    row_count += len(rows)
+
+            logger.info(f"Exported {row_count} panels to {output_file}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Parquet export failed: {e}")
+            return False
+
+    def export(self, output_file: Path) -> bool:
+        """Export all panels, choosing the format from the file name (.csv, .csv.gz, .parquet)"""
+        if Path(output_file).suffix == '.parquet':
+            return self.export_to_parquet(output_file)
+        return self.export_to_csv(output_file)
+
+
+class SQLitePanelWriter:
+    """
+    Chunked panel upserts into a SQLite store
+
+    Same interface and summary format as database.PanelUpsertWriter.
+    """
+
+    def __init__(self, store: SQLitePanelStore, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 owns_store: bool = False):
+        """
+        Initialize writer
+
+        Args:
+            store: Connected SQLite store
+            chunk_size: Panels per transaction
+            owns_store: Disconnect the store when the writer is closed
+        """
+        self.store = store
+        self.chunk_size = max(1, chunk_size)
+        self.owns_store = owns_store
+
+        # Rows keyed by model, later results for the same model win
+        self._buffer: Dict[str, Tuple[Any, ...]] = {}
+
+        self.inserted_count = 0
+        self.chunks_written = 0
+        self.results: List[Dict[str, Any]] = []
+        self.failed_models: List[str] = []
+        self.errors: List[str] = []
+
+    def add(self, panel: PVPanelData) -> None:
+        """Queue a panel, writing a chunk once the buffer is full"""
+        row = panel_to_row(panel)
+        model = row[PANEL_COLUMNS.index('model')]
+        self._buffer.pop(model, None)
+        self._buffer[model] = row
+
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    def add_many(self, panels: Iterable[PVPanelData]) -> None:
+        """Queue several panels"""
+        for panel in panels:
+            self.add(panel)
+
+    def flush(self) -> bool:
+        """
+        Write buffered panels as one transaction
+
+        Returns:
+            True if the chunk was written
+        """
+        if not self._buffer:
+            return True
+
+        rows = list(self._buffer.values())
+        self._buffer = {}
+
+        try:
+            results = self.store.upsert_rows(rows)
+        except Exception as e:
+            models = [row[PANEL_COLUMNS.index('model')] for row in rows]
+            logger.error(f"SQLite upsert failed for chunk of {len(rows)} panels: {e}")
+            self.failed_models.extend(models)
+            self.errors.append(str(e))
+            return False
+
+        self.chunks_written += 1
+        self.inserted_count += len(results)
+        self.results.extend({"id": r['id'], "model": r['model']} for r in results)
+
+        if self.store.cache:
+            maker_index = PANEL_COLUMNS.index('maker')
+            power_index = PANEL_COLUMNS.index('max_power')
+            self.store.cache.record_upsert(
+                {**result, 'maker': row[maker_index], 'max_power': row[power_index]}
+                for result, row in zip(results, rows)
+            )
+
+        logger.info(f"Upserted chunk of {len(results)} PV panels ({self.inserted_count} total)")
+        return True
+
+    def summary(self) -> Dict[str, Any]:
+        """Get write totals in the upsert_pv_panels result format"""
+        result = {
+            "success": not self.failed_models,
+            "inserted_count": self.inserted_count,
+            "chunks_written": self.chunks_written,
+            "results": self.results
+        }
+        if self.failed_models:
+            result["error"] = self.errors[-1]
+            result["failed_models"] = self.failed_models
+        return result
+
+    def close(self) -> Dict[str, Any]:
+        """Flush remaining panels"""
+        try:
+            self.flush()
+        finally:
+            if self.owns_store:
+                self.store.disconnect()
+        return self.summary()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
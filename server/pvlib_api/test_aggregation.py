@@ -0,0 +1,59 @@
+"""
+Tests for energy aggregation
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregation import aggregate_energy
+
+
+@pytest.fixture(scope='module')
+def year_power():
+    rng = np.random.default_rng(3)
+    times = pd.date_range('2024-01-01', '2024-12-31 23:00', freq='h', tz='America/New_York')
+    hours = times.hour.to_numpy()
+    power = np.clip(np.sin(np.pi * (hours - 6) / 12), 0, None) * 5000 * rng.random(len(times))
+    return pd.Series(power, index=times)
+
+
+class TestAggregateEnergy:
+    """Test the single-pass aggregates against masked per-day and per-month sums"""
+
+    def test_daily_and_monthly(self, year_power):
+        times = year_power.index
+        aggregates = aggregate_energy(year_power.to_numpy(), times)
+
+        daily = {day: year_power[times.dayofyear == day].sum() / 1000
+                 for day in range(1, 367) if (times.dayofyear == day).any()}
+        assert aggregates.daily_energy_by_day() == pytest.approx(daily)
+        assert len(aggregates.days) == 366
+
+        monthly = [year_power[times.month == month].sum() / 1000 for month in range(1, 13)]
+        np.testing.assert_allclose(aggregates.monthly_energy, monthly)
+        assert aggregates.annual_energy == pytest.approx(year_power.sum() / 1000)
+        assert aggregates.peak_power == year_power.max()
+
+    def test_hour_month_profile(self, year_power):
+        times = year_power.index
+        aggregates = aggregate_energy(year_power.to_numpy(), times)
+
+        expected = year_power.groupby([times.month, times.hour]).mean().unstack().to_numpy()
+        assert aggregates.hour_month_profile.shape == (12, 24)
+        np.testing.assert_allclose(aggregates.hour_month_profile, expected)
+
+    def test_percentiles(self, year_power):
+        aggregates = aggregate_energy(year_power.to_numpy(), year_power.index, percentiles=(10, 99.5))
+        assert list(aggregates.daily_percentiles) == ['p10', 'p99.5']
+        assert aggregates.daily_percentiles['p10'] == pytest.approx(np.percentile(aggregates.daily_energy, 10))
+
+    def test_partial_year_and_missing_values(self, year_power):
+        june = year_power[year_power.index.month == 6].copy()
+        june.iloc[12] = np.nan
+        aggregates = aggregate_energy(june.to_numpy(), june.index, step_hours=0.5)
+
+        assert aggregates.days[0] == june.index.dayofyear[0]
+        assert aggregates.monthly_energy[5] == pytest.approx(np.nansum(june) * 0.5 / 1000)
+        assert aggregates.monthly_energy[0] == 0
+        assert np.isnan(aggregates.hour_month_profile[0]).all()
@@ -0,0 +1,47 @@
+"""
+Tests for benchmark baseline comparison and service cold start
+"""
+
+import pytest
+
+from benchmarks.cases import SERVER_DIR, PVLIB_API_DIR, cold_import
+from benchmarks.runner import compare_results
+
+
+def make_results(**medians):
+    return {'benchmarks': {name: {'median': median, 'check': 1.0} for name, median in medians.items()}}
+
+
+class TestCompareResults:
+    """Test regression detection against a baseline"""
+
+    def test_statuses(self):
+        baseline = make_results(steady=1.0, slower=1.0, faster=1.0)
+        current = make_results(steady=1.1, slower=1.5, faster=0.5, added=0.2)
+        rows = {row['name']: row for row in compare_results(current, baseline, threshold=0.2)}
+
+        assert rows['steady']['status'] == 'ok'
+        assert rows['slower']['status'] == 'regression'
+        assert rows['faster']['status'] == 'improvement'
+        assert rows['added']['status'] == 'new'
+
+    def test_output_change_flagged(self):
+        baseline = make_results(case=1.0)
+        current = make_results(case=1.0)
+        current['benchmarks']['case']['check'] = 2.0
+
+        row = compare_results(current, baseline)[0]
+        assert row['status'] == 'ok'
+        assert row['output_changed']
+
+
+class TestColdStart:
+    """Test that services defer plotting, report and profiling imports to first use"""
+
+    @pytest.mark.parametrize('module, path', [
+        ('SPVSimAPI', PVLIB_API_DIR),
+        ('simple_api', PVLIB_API_DIR),
+        ('pv_service', SERVER_DIR),
+    ])
+    def test_no_lazy_modules_at_import(self, module, path):
+        assert cold_import(module, path) == []
@@ -0,0 +1,96 @@
+"""
+Tests for the chunked PostgreSQL panel writer
+"""
+
+import csv
+import psycopg2
+from database import PanelUpsertWriter, STAGING_TABLE
+from models import PANEL_COLUMNS, PVPanelData
+
+
+class FakeConnection:
+    """Connection whose temp tables, like PostgreSQL's, only survive a committed transaction"""
+
+    def __init__(self, failing_copies=0):
+        self.closed = 0
+        self.tables = set()
+        self.pending = set()
+        self.creates = 0
+        self.failing_copies = failing_copies
+        self.next_id = 1
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.tables |= self.pending
+        self.pending.clear()
+
+    def rollback(self):
+        self.pending.clear()
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.staged = []
+        self.rows = []
+
+    def _require_staging(self):
+        if STAGING_TABLE not in self.connection.tables | self.connection.pending:
+            raise psycopg2.ProgrammingError(f'relation "{STAGING_TABLE}" does not exist')
+
+    def execute(self, query):
+        if 'CREATE TEMP TABLE' in query:
+            self.connection.creates += 1
+            self.connection.pending.add(STAGING_TABLE)
+            return
+        self._require_staging()
+        self.rows = []
+        for model in self.staged:
+            self.rows.append((self.connection.next_id, model, True))
+            self.connection.next_id += 1
+
+    def copy_expert(self, query, buffer):
+        self._require_staging()
+        if self.connection.failing_copies:
+            self.connection.failing_copies -= 1
+            raise psycopg2.DataError('invalid input syntax')
+        model_index = PANEL_COLUMNS.index('model')
+        self.staged = [row[model_index] for row in csv.reader(buffer)]
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+
+def make_panel(model):
+    return PVPanelData(maker='Q CELLS', model=model, maxPower=400.0)
+
+
+class TestPanelUpsertWriter:
+    """Test chunked COPY upserts"""
+
+    def test_copy_chunk_after_failed_first_chunk(self):
+        connection = FakeConnection(failing_copies=1)
+        writer = PanelUpsertWriter(connection=connection, chunk_size=2, use_copy=True)
+
+        writer.add_many(make_panel(model) for model in ['A', 'B', 'C', 'D'])
+        writer.flush()
+
+        summary = writer.summary()
+        assert writer.failed_models == ['A', 'B']
+        assert writer.chunks_written == 1
+        assert [r['model'] for r in summary['results']] == ['C', 'D']
+
+    def test_staging_table_created_once(self):
+        connection = FakeConnection()
+        writer = PanelUpsertWriter(connection=connection, chunk_size=1, use_copy=True)
+
+        writer.add_many(make_panel(model) for model in ['A', 'B'])
+
+        assert writer.chunks_written == 2
+        assert not writer.failed_models
+        assert connection.creates == 1
@@ -0,0 +1,79 @@
+"""
+Tests for datasheet processor result files
+"""
+
+import csv
+import gzip
+import io
+import json
+
+import pytest
+
+from datasheet_processor import DatasheetProcessor
+from models import ExtractionResult, ProcessingConfig, PVPanelData
+
+
+def make_result(index):
+    panel = PVPanelData(maker='Q CELLS', model=f'Q.PEAK {400 + index}', maxPower=400.0 + index,
+                        efficiency=20.5, description=None if index % 2 else 'Mono, "half-cut"\nblack')
+    return ExtractionResult(panel_data=panel, confidence_scores={'maxPower': 0.9},
+                            warnings=['low confidence'] if index % 3 else [],
+                            processing_time_ms=12.5, source_file=f'/data/sheet-{index}.pdf')
+
+
+def buffered_outputs(results):
+    """JSON and CSV as save_results wrote them when it built the whole list first"""
+    results_data = [{
+        'panel_data': result.panel_data.dict(),
+        'confidence_scores': result.confidence_scores,
+        'warnings': result.warnings,
+        'errors': result.errors,
+        'processing_time_ms': result.processing_time_ms,
+        'source_file': str(result.source_file) if result.source_file else None
+    } for result in results]
+
+    csv_text = io.StringIO(newline='')
+    writer = csv.DictWriter(csv_text, fieldnames=list(results[0].panel_data.dict().keys()))
+    writer.writeheader()
+    for result in results:
+        writer.writerow(result.panel_data.dict())
+
+    return json.loads(json.dumps(results_data, indent=2, default=str)), csv_text.getvalue()
+
+
+@pytest.fixture
+def processor(tmp_path):
+    config = ProcessingConfig(db_connection_string='', pdf_files=[], output_dir=tmp_path)
+    processor = DatasheetProcessor(config)
+    processor.results = [make_result(index) for index in range(25)]
+    return processor
+
+
+class TestSaveResults:
+    """Test that record-by-record result files match the buffered output"""
+
+    def test_streamed_files_match_buffered(self, processor, tmp_path):
+        saved = processor.save_results(tmp_path / 'out')
+        expected_json, expected_csv = buffered_outputs(processor.results)
+
+        assert json.loads(saved['json'].read_text()) == expected_json
+        with open(saved['csv'], encoding='utf-8', newline='') as f:
+            assert f.read() == expected_csv
+
+    def test_compressed_files_match_buffered(self, processor, tmp_path):
+        processor.config.compress_output = True
+        saved = processor.save_results(tmp_path / 'out')
+        expected_json, expected_csv = buffered_outputs(processor.results)
+
+        assert saved['json'].name.endswith('.json.gz') and saved['csv'].name.endswith('.csv.gz')
+        with gzip.open(saved['json'], 'rt', encoding='utf-8') as f:
+            assert json.load(f) == expected_json
+        with gzip.open(saved['csv'], 'rt', encoding='utf-8', newline='') as f:
+            assert f.read() == expected_csv
+
+    def test_no_results(self, processor, tmp_path):
+        processor.results = []
+        saved = processor.save_results(tmp_path / 'out')
+
+        assert json.loads(saved['json'].read_text()) == []
+        assert saved['csv'].read_text() == ''
@@ -0,0 +1,132 @@
+"""
+Tests for the extraction artifact cache
+"""
+
+import pandas as pd
+import pdfplumber
+import pytest
+
+from extraction_cache import ExtractionCache
+from pdf_extractor import PDFTextExtractor
+
+SPEC_PAGE = "Maximum Power Pmax 400 W\nVoc 45.2 V\nIsc 11.1 A\nVmpp 37.5 V\nImpp 10.7 A"
+
+
+class FakePage:
+    def __init__(self, text):
+        self.text = text
+
+    def extract_text(self):
+        return self.text
+
+    def extract_tables(self):
+        return [[['Pmax', '400 W'], ['Voc', '45.2 V']]]
+
+
+class FakePDF:
+    def __init__(self, texts):
+        self.pages = [FakePage(text) for text in texts]
+        self.metadata = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+@pytest.fixture
+def datasheet(tmp_path):
+    path = tmp_path / 'sheet.pdf'
+    path.write_bytes(b'%PDF fake')
+    return path
+
+
+@pytest.fixture
+def opened(monkeypatch):
+    """Record every pdfplumber.open call"""
+    calls = []
+
+    def fake_open(path):
+        calls.append(path)
+        return FakePDF(["Q.PEAK DUO 400", SPEC_PAGE])
+
+    monkeypatch.setattr(pdfplumber, 'open', fake_open)
+    return calls
+
+
+class TestArtifactRoundTrip:
+    """Test that cached artifacts come back as they were stored"""
+
+    def test_camelot_tables_round_trip(self, tmp_path, datasheet):
+        cache = ExtractionCache(tmp_path / 'cache')
+        settings = {'extractor': 'camelot', 'version': '1.2'}
+        spec_table = pd.DataFrame([['Power Class', '400'], ['Voc', '45.2']])
+        numeric_table = pd.DataFrame({0: [1, 2], 1: [0.5, 1.5]})
+        data = {
+            'text': 'page one\n\n',
+            'tables': [
+                {'table_number': 1, 'data': spec_table, 'page': 2, 'accuracy': 99.5},
+                {'table_number': 2, 'data': numeric_table, 'page': 3, 'accuracy': 87.0},
+            ],
+            'pages': '2,3',
+        }
+
+        cache.put(datasheet, settings, data)
+        cached = cache.get(datasheet, settings)
+
+        assert cached['text'] == data['text'] and cached['pages'] == '2,3'
+        for stored, restored in zip(data['tables'], cached['tables']):
+            assert isinstance(restored['data'], pd.DataFrame)
+            pd.testing.assert_frame_equal(restored['data'], stored['data'])
+            assert restored['page'] == stored['page']
+            assert restored['accuracy'] == stored['accuracy']
+        assert list(cached['tables'][1]['data'].dtypes) == ['int64', 'float64']
+
+    def test_settings_and_content_change_key(self, tmp_path, datasheet):
+        cache = ExtractionCache(tmp_path / 'cache')
+        cache.put(datasheet, {'targeted': False}, {'text': 'full'})
+
+        assert cache.get(datasheet, {'targeted': True}) is None
+        datasheet.write_bytes(b'%PDF other revision')
+        assert cache.get(datasheet, {'targeted': False}) is None
+
+    def test_precomputed_hash_skips_reading_pdf(self, tmp_path, datasheet):
+        cache = ExtractionCache(tmp_path / 'cache')
+        cache.put(datasheet, {}, {'text': 'cached'}, file_hash='abc')
+        datasheet.unlink()
+
+        assert cache.get(datasheet, {}, file_hash='abc') == {'text': 'cached'}
+
+
+class TestCacheOnly:
+    """Test cache-only extraction, used to re-run parsers over the corpus"""
+
+    def test_served_from_cache_without_extraction(self, tmp_path, datasheet, opened):
+        cache = ExtractionCache(tmp_path / 'cache')
+        first = PDFTextExtractor(datasheet, cache=cache).extract_all()
+        assert first['success'] and len(opened) == 1
+
+        cached = PDFTextExtractor(datasheet, cache=cache, cache_only=True).extract_all()
+
+        assert cached['cache_hit']
+        assert len(opened) == 1
+        assert cached['text'] == first['text']
+        assert cached['tables'] == first['tables']
+
+    def test_miss_fails_without_extraction(self, tmp_path, datasheet, opened):
+        cache = ExtractionCache(tmp_path / 'cache')
+        result = PDFTextExtractor(datasheet, cache=cache, cache_only=True).extract_all()
+
+        assert not result['success']
+        assert result['error'] == "Not found in extraction cache"
+        assert opened == []
+
+    def test_missing_pdf_fails(self, tmp_path, datasheet, opened):
+        # Keys hash the PDF content, so cache-only runs still need the file
+        cache = ExtractionCache(tmp_path / 'cache')
+        PDFTextExtractor(datasheet, cache=cache).extract_all()
+        datasheet.unlink()
+
+        with pytest.raises(FileNotFoundError):
+            PDFTextExtractor(datasheet, cache=cache, cache_only=True).extract_all()
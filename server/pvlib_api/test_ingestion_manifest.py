@@ -0,0 +1,90 @@
+"""
+Tests for the ingestion manifest
+"""
+
+import os
+
+import pytest
+
+import ingestion_manifest
+from ingestion_manifest import IngestionManifest
+
+
+@pytest.fixture
+def datasheet(tmp_path):
+    path = tmp_path / 'sheet.pdf'
+    path.write_bytes(b'%PDF-1.4 first revision')
+    return path
+
+
+def open_manifest(tmp_path, version='1.0+1.0'):
+    return IngestionManifest(tmp_path / 'manifest' / 'ingestion.sqlite', 'pdfplumber', version)
+
+
+def rewrite(path, content):
+    """Replace file content, moving mtime forward so the change is always visible"""
+    mtime_ns = path.stat().st_mtime_ns
+    path.write_bytes(content)
+    os.utime(path, ns=(mtime_ns + 10**9, mtime_ns + 10**9))
+
+
+class TestIngestionManifest:
+    """Test skip and reprocess decisions"""
+
+    def test_unchanged_file_skipped(self, tmp_path, datasheet, monkeypatch):
+        with open_manifest(tmp_path) as manifest:
+            assert not manifest.is_processed(datasheet)
+            manifest.mark_processed(datasheet, 'Q CELLS', 'Q.PEAK 400')
+
+        # Reopened, as on the next run: size and mtime match, so the file is not hashed again
+        def fail(path):
+            raise AssertionError('unchanged file re-read')
+
+        monkeypatch.setattr(ingestion_manifest, 'compute_file_hash', fail)
+        with open_manifest(tmp_path) as manifest:
+            assert manifest.is_processed(datasheet)
+            assert manifest.get_statistics()['current_version_entries'] == 1
+
+    def test_changed_content_reprocessed(self, tmp_path, datasheet):
+        with open_manifest(tmp_path) as manifest:
+            manifest.mark_processed(datasheet)
+            first_hash = manifest.get_file_hash(datasheet)
+
+            rewrite(datasheet, b'%PDF-1.4 second revision')
+
+            assert manifest.get_file_hash(datasheet) != first_hash
+            assert not manifest.is_processed(datasheet)
+            manifest.mark_processed(datasheet)
+            assert manifest.is_processed(datasheet)
+
+    def test_same_content_elsewhere_skipped(self, tmp_path, datasheet):
+        copy = tmp_path / 'copy.pdf'
+        copy.write_bytes(datasheet.read_bytes())
+
+        with open_manifest(tmp_path) as manifest:
+            manifest.mark_processed(datasheet)
+            assert manifest.is_processed(copy)
+
+    def test_pipeline_version_bump_invalidates(self, tmp_path, datasheet):
+        with open_manifest(tmp_path) as manifest:
+            manifest.mark_processed(datasheet)
+
+        with open_manifest(tmp_path, version='1.0+1.1') as manifest:
+            assert not manifest.is_processed(datasheet)
+            assert manifest.get_statistics() == {
+                'pipeline': 'pdfplumber',
+                'pipeline_version': '1.0+1.1',
+                'total_entries': 1,
+                'current_version_entries': 0
+            }
+
+            manifest.mark_processed(datasheet)
+            assert manifest.is_processed(datasheet)
+            assert manifest.get_statistics()['total_entries'] == 1
+
+    def test_pipelines_tracked_separately(self, tmp_path, datasheet):
+        with open_manifest(tmp_path) as manifest:
+            manifest.mark_processed(datasheet)
+
+        with IngestionManifest(tmp_path / 'manifest' / 'ingestion.sqlite', 'camelot', '1.0+1.0') as manifest:
+            assert not manifest.is_processed(datasheet)
@@ -0,0 +1,89 @@
+"""
+Tests for pipeline instrumentation
+"""
+
+import tracemalloc
+
+from instrumentation import NULL_SPAN, StageHistograms, Trace, current_trace, instrument, span, tracing
+
+
+class TestSpans:
+    """Test span recording and trace breakdowns"""
+
+    def test_span_is_noop_without_trace(self):
+        assert current_trace() is None
+        assert span('stage') is NULL_SPAN
+        with span('stage'):
+            pass
+
+    def test_breakdown_and_nesting(self):
+        trace = Trace(histograms=None)
+        with tracing(trace):
+            with span('outer'):
+                with span('inner'):
+                    pass
+                with span('inner'):
+                    pass
+
+        assert current_trace() is None
+        assert [(record.name, record.depth) for record in trace.spans] == [('inner', 1), ('inner', 1), ('outer', 0)]
+
+        stages = trace.breakdown()
+        assert list(stages) == ['inner', 'outer']
+        assert stages['inner']['calls'] == 2
+        assert stages['outer']['wall_ms'] >= stages['inner']['wall_ms']
+
+    def test_instrument_decorator(self):
+        @instrument()
+        def compute(x):
+            return x * 2
+
+        assert compute(2) == 4
+        trace = Trace(histograms=None)
+        with tracing(trace):
+            assert compute(3) == 6
+        assert trace.breakdown()['compute']['calls'] == 1
+
+    def test_server_timing_header(self):
+        trace = Trace(histograms=None)
+        with tracing(trace), span('solar_position'):
+            pass
+
+        header = trace.server_timing()
+        entries = header.split(', ')
+        assert entries[0].startswith('solar_position;dur=')
+        assert entries[-1].startswith('total;dur=')
+
+    def test_memory_peak(self):
+        was_tracing = tracemalloc.is_tracing()
+        trace = Trace(memory=True, histograms=None)
+        with tracing(trace):
+            with span('allocate'):
+                data = bytearray(2 * 1024 * 1024)
+                del data
+
+        assert trace.breakdown()['allocate']['peak_memory_kb'] >= 2048
+        assert tracemalloc.is_tracing() == was_tracing
+
+
+class TestStageHistograms:
+    """Test aggregate stage histograms"""
+
+    def test_cumulative_buckets(self):
+        histograms = StageHistograms(buckets=(10, 100))
+        for value in (5, 50, 500):
+            histograms.observe('power_flow', value)
+
+        stage = histograms.snapshot()['power_flow']
+        assert stage['buckets'] == {'10': 1, '100': 2, '+Inf': 3}
+        assert stage['count'] == 3
+        assert stage['sum_ms'] == 555
+
+        histograms.reset()
+        assert histograms.snapshot() == {}
+
+    def test_trace_feeds_histograms(self):
+        histograms = StageHistograms()
+        with tracing(Trace(histograms=histograms)), span('weather'):
+            pass
+        assert histograms.snapshot()['weather']['count'] == 1
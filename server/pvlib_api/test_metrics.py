@@ -0,0 +1,171 @@
+"""
+Tests for service metrics
+"""
+
+import json
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from metrics import MetricsRegistry, cache_families, install_metrics, merge_families, render_text
+
+
+class FakeCache:
+    def __init__(self, hits, misses):
+        self.hits = hits
+        self.misses = misses
+
+
+class TestMetricsRegistry:
+    """Test metric recording and text rendering"""
+
+    def test_counter_and_gauge(self):
+        registry = MetricsRegistry()
+        requests = registry.counter('requests_total', 'Requests', ('endpoint',))
+        requests.inc(endpoint='/simulate')
+        requests.inc(2, endpoint='/simulate')
+        registry.gauge('queue_depth', 'Queued jobs').set(3)
+
+        text = registry.render()
+        assert '# TYPE requests_total counter' in text
+        assert 'requests_total{endpoint="/simulate"} 3.0' in text
+        assert 'queue_depth 3.0' in text
+
+    def test_histogram_buckets(self):
+        registry = MetricsRegistry()
+        latency = registry.histogram('latency_seconds', 'Latency', buckets=(0.1, 1))
+        for value in (0.05, 0.5, 5):
+            latency.observe(value)
+
+        text = registry.render()
+        assert 'latency_seconds_bucket{le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{le="1.0"} 2' in text
+        assert 'latency_seconds_bucket{le="+Inf"} 3' in text
+        assert 'latency_seconds_count 3' in text
+        assert 'latency_seconds_sum 5.55' in text
+
+    def test_conflicting_registration(self):
+        registry = MetricsRegistry()
+        registry.counter('jobs_total', 'Jobs', ('status',))
+        assert registry.counter('jobs_total', 'Jobs', ('status',)) is registry.counter('jobs_total', 'Jobs', ('status',))
+        with pytest.raises(ValueError):
+            registry.gauge('jobs_total', 'Jobs', ('status',))
+
+    def test_label_escaping(self):
+        registry = MetricsRegistry()
+        registry.counter('paths_total', 'Paths', ('path',)).inc(path='a"b\\c')
+        assert 'paths_total{path="a\\"b\\\\c"} 1.0' in registry.render()
+
+    def test_collectors_merge_with_metrics(self):
+        registry = MetricsRegistry()
+        registry.register_collector(lambda: cache_families({'panel': [FakeCache(3, 1), FakeCache(2, 0)]}))
+        registry.register_collector(lambda: cache_families({'report_sections': [FakeCache(1, 4)]}))
+
+        text = render_text(registry.collect())
+        assert 'pv_cache_hits_total{cache="panel"} 5.0' in text
+        assert 'pv_cache_misses_total{cache="report_sections"} 4.0' in text
+        assert text.count('# TYPE pv_cache_hits_total counter') == 1
+
+
+class TestMultiProcess:
+    """Test merging snapshots written by several processes"""
+
+    def test_merge_histograms(self):
+        family = {'name': 'latency_seconds', 'type': 'histogram', 'help': 'Latency',
+                  'labelnames': [], 'buckets': [1.0]}
+        merged = merge_families([
+            dict(family, samples=[[[], [1, 0], 0.5]]),
+            dict(family, samples=[[[], [2, 1], 3.0]]),
+        ])
+        assert merged[0]['samples'] == [[[], [3, 1], 3.5]]
+
+    def test_snapshots_shared_through_directory(self, tmp_path):
+        first = MetricsRegistry(tmp_path)
+        first.counter('jobs_total', 'Jobs').inc(2)
+        first.flush()
+
+        # Move the first snapshot aside so it stands in for another worker process
+        first.snapshot_path().rename(tmp_path / 'metrics-1.json')
+        second = MetricsRegistry(tmp_path)
+        second.counter('jobs_total', 'Jobs').inc(1)
+
+        assert 'jobs_total 3.0' in second.render()
+
+    def test_gauges_of_exited_processes_dropped(self, tmp_path):
+        registry = MetricsRegistry(tmp_path)
+        registry.gauge('in_progress', 'In progress').set(1)
+        registry.counter('done_total', 'Done').inc()
+        registry.flush()
+
+        dead_snapshot = registry.snapshot_path().read_text()
+        (tmp_path / 'metrics-999999999.json').write_text(dead_snapshot.replace(f'"pid": {os.getpid()}', '"pid": 999999999'))
+
+        text = registry.render()
+        assert 'in_progress 1.0' in text
+        assert 'done_total 2.0' in text
+
+    def test_exited_snapshots_compacted(self, tmp_path):
+        registry = MetricsRegistry(tmp_path)
+        registry.counter('done_total', 'Done').inc()
+        registry.flush()
+        snapshot = json.loads(registry.snapshot_path().read_text())
+        for pid in (999999998, 999999999):
+            (tmp_path / f'metrics-{pid}.json').write_text(json.dumps(dict(snapshot, pid=pid)))
+
+        assert 'done_total 3.0' in registry.render()
+        assert {path.name for path in tmp_path.glob('metrics-*.json')} == {
+            'metrics-exited.json', registry.snapshot_path().name}
+        assert 'done_total 3.0' in registry.render()
+
+    @pytest.mark.skipif(not os.path.exists(f'/proc/{os.getpid()}/stat'), reason='needs /proc')
+    def test_reused_pid_not_mistaken_for_exited_process(self, tmp_path):
+        registry = MetricsRegistry(tmp_path)
+        registry.gauge('in_progress', 'In progress').set(1)
+        registry.flush()
+        snapshot = json.loads(registry.snapshot_path().read_text())
+
+        # Same pid, earlier start: an exited process whose pid this one reused
+        (tmp_path / f'metrics-{os.getpid()}-1.json').write_text(json.dumps(dict(snapshot, start=snapshot['start'] - 1)))
+
+        assert registry.snapshot_path().name == f"metrics-{os.getpid()}-{snapshot['start']}.json"
+        assert 'in_progress 1.0' in registry.render()
+
+
+class TestMiddleware:
+    """Test request metrics recorded for a FastAPI app"""
+
+    def test_requests_recorded_by_route(self):
+        registry = MetricsRegistry()
+        app = FastAPI()
+
+        @app.get('/items/{item_id}')
+        async def get_item(item_id: int):
+            return {'id': item_id}
+
+        install_metrics(app, 'test', registry)
+        client = TestClient(app)
+        client.get('/items/1')
+        client.get('/items/2')
+
+        text = client.get('/metrics').text
+        assert ('pv_http_requests_total{service="test",method="GET",endpoint="/items/{item_id}",status="200"} 2.0'
+                in text)
+        assert 'pv_http_request_duration_seconds_count{service="test",method="GET",endpoint="/items/{item_id}"} 2' in text
+        assert 'pv_http_requests_in_progress{service="test"} 1.0' in text
+        assert 'pv_worker_threads_limit{service="test"}' in text
+
+    def test_snapshot_flushed_after_request(self, tmp_path):
+        registry = MetricsRegistry(tmp_path)
+        app = FastAPI()
+
+        @app.get('/ping')
+        async def ping():
+            return {}
+
+        install_metrics(app, 'test', registry)
+        TestClient(app).get('/ping')
+
+        snapshot = json.loads(registry.snapshot_path().read_text())
+        assert 'pv_http_requests_total' in {family['name'] for family in snapshot['families']}
@@ -0,0 +1,192 @@
+"""
+Tests for the panel read cache
+"""
+
+import pytest
+import panel_cache
+from panel_cache import LRUCache, PanelCache, summarize_statistics
+
+
+class FakePanelSource:
+    """In-memory panel store counting lookups"""
+
+    def __init__(self, panels):
+        self.panels = {panel['model']: dict(panel) for panel in panels}
+        self.calls = {'model': 0, 'maker': 0, 'stats': 0}
+        # Lookups left to fail, as when the database connection drops
+        self.failures = 0
+
+    def _maybe_fail(self):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError('connection lost')
+
+    def get_panel_by_model(self, model):
+        self.calls['model'] += 1
+        self._maybe_fail()
+        return self.panels.get(model)
+
+    def get_panels_by_maker(self, maker, limit=100):
+        self.calls['maker'] += 1
+        self._maybe_fail()
+        matches = [p for p in self.panels.values() if maker.lower() in p['maker'].lower()]
+        return sorted(matches, key=lambda p: p['model'])[:limit]
+
+    def get_maker_statistics(self):
+        self.calls['stats'] += 1
+        stats = {}
+        for panel in self.panels.values():
+            row = stats.setdefault(panel['maker'], {'maker': panel['maker'], 'count': 0,
+                                                    'power_sum': 0, 'power_count': 0})
+            row['count'] += 1
+            if panel.get('max_power') is not None:
+                row['power_sum'] += panel['max_power']
+                row['power_count'] += 1
+        return list(stats.values())
+
+    def upsert(self, panel):
+        inserted = panel['model'] not in self.panels
+        self.panels[panel['model']] = dict(panel)
+        return {**panel, 'inserted': inserted}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable monotonic clock for expiry tests"""
+    now = [1000.0]
+    monkeypatch.setattr(panel_cache.time, 'monotonic', lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def source():
+    return FakePanelSource([
+        {'id': 1, 'maker': 'Q CELLS', 'model': 'Q.PEAK 400', 'max_power': 400.0, 'efficiency': 20.1},
+        {'id': 2, 'maker': 'Q CELLS', 'model': 'Q.PEAK 405', 'max_power': 405.0, 'efficiency': 20.4},
+        {'id': 3, 'maker': 'JinkoSolar', 'model': 'JKM550', 'max_power': 550.0, 'efficiency': 21.3},
+    ])
+
+
+class TestLRUCache:
+    """Test bounded LRU mapping"""
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+        assert cache.get('a') == 1
+        assert cache.get('b') is None
+        assert len(cache) == 2
+
+    def test_entries_expire_after_max_age(self, clock):
+        cache = LRUCache(maxsize=2, max_age=10)
+        cache.put('a', 1)
+        clock[0] += 10
+        assert cache.get('a') == 1
+        clock[0] += 1
+        assert cache.get('a') is None
+        assert len(cache) == 0
+
+
+class TestPanelCache:
+    """Test read-through lookups, invalidation and statistics"""
+
+    def test_model_lookup_cached(self, source):
+        cache = PanelCache(source)
+        assert cache.get_panel_by_model('JKM550')['max_power'] == 550.0
+        assert cache.get_panel_by_model('JKM550')['max_power'] == 550.0
+        assert source.calls['model'] == 1
+        assert cache.hits == 1
+
+    def test_missing_model_cached(self, source):
+        cache = PanelCache(source)
+        assert cache.get_panel_by_model('NOPE') is None
+        assert cache.check_panel_exists('NOPE') is None
+        assert source.calls['model'] == 1
+
+    def test_returned_rows_are_copies(self, source):
+        cache = PanelCache(source)
+        cache.get_panel_by_model('JKM550')['max_power'] = 0
+        assert cache.get_panel_by_model('JKM550')['max_power'] == 550.0
+
+    def test_upsert_invalidates_model_and_maker(self, source):
+        cache = PanelCache(source)
+        assert cache.get_panel_by_model('NEW 1') is None
+        assert len(cache.get_panels_by_maker('cells')) == 2
+
+        row = source.upsert({'id': 4, 'maker': 'Q CELLS', 'model': 'NEW 1', 'max_power': 410.0})
+        cache.record_upsert([row])
+
+        assert cache.get_panel_by_model('NEW 1')['max_power'] == 410.0
+        assert len(cache.get_panels_by_maker('cells')) == 3
+        assert source.calls['model'] == 2
+        assert source.calls['maker'] == 2
+
+    def test_update_moving_maker_invalidates_old_maker(self, source):
+        cache = PanelCache(source)
+        cache.get_panel_by_model('Q.PEAK 405')
+        assert len(cache.get_panels_by_maker('cells')) == 2
+        assert len(cache.get_panels_by_maker('jinko')) == 1
+
+        row = source.upsert({'id': 2, 'maker': 'JinkoSolar', 'model': 'Q.PEAK 405', 'max_power': 405.0})
+        cache.record_upsert([row])
+
+        assert [p['model'] for p in cache.get_panels_by_maker('cells')] == ['Q.PEAK 400']
+        assert len(cache.get_panels_by_maker('jinko')) == 2
+
+    def test_update_of_uncached_model_drops_maker_lists(self, source):
+        cache = PanelCache(source)
+        assert len(cache.get_panels_by_maker('cells')) == 2
+
+        cache.record_upsert([source.upsert({'id': 2, 'maker': 'Trina', 'model': 'Q.PEAK 405', 'max_power': 405.0})])
+
+        assert len(cache.get_panels_by_maker('cells')) == 1
+
+    def test_statistics_updated_incrementally_on_insert(self, source):
+        cache = PanelCache(source)
+        assert cache.get_statistics()['total_panels'] == 3
+
+        cache.record_upsert([source.upsert({'id': 4, 'maker': 'Trina', 'model': 'TSM', 'max_power': 445.0})])
+        stats = cache.get_statistics()
+
+        assert source.calls['stats'] == 1
+        assert stats == summarize_statistics(source.get_maker_statistics())
+        assert stats['total_panels'] == 4
+        assert stats['unique_makers'] == 3
+
+    def test_statistics_reloaded_after_update(self, source):
+        cache = PanelCache(source)
+        cache.get_statistics()
+
+        cache.record_upsert([source.upsert({'id': 3, 'maker': 'JinkoSolar', 'model': 'JKM550', 'max_power': 555.0})])
+        stats = cache.get_statistics()
+
+        assert source.calls['stats'] == 2
+        assert stats['average_power'] == round((400 + 405 + 555) / 3, 2)
+
+    def test_failed_lookup_not_cached(self, source):
+        cache = PanelCache(source)
+        source.failures = 2
+
+        assert cache.get_panel_by_model('JKM550') is None
+        assert cache.get_panels_by_maker('cells') == []
+
+        assert cache.get_panel_by_model('JKM550')['max_power'] == 550.0
+        assert len(cache.get_panels_by_maker('cells')) == 2
+        assert source.calls == {'model': 2, 'maker': 2, 'stats': 0}
+
+    def test_lookups_reread_after_max_age(self, source, clock):
+        cache = PanelCache(source, max_age=30)
+        assert cache.get_panel_by_model('NEW 1') is None
+        cache.get_statistics()
+
+        # Written by another process, so record_upsert never ran here
+        source.upsert({'id': 4, 'maker': 'Trina', 'model': 'NEW 1', 'max_power': 410.0})
+        assert cache.get_panel_by_model('NEW 1') is None
+
+        clock[0] += 31
+        assert cache.get_panel_by_model('NEW 1')['max_power'] == 410.0
+        assert cache.get_statistics()['total_panels'] == 4
+        assert source.calls['stats'] == 2
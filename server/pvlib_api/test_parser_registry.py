@@ -0,0 +1,132 @@
+"""
+Tests for the declarative manufacturer parser registry
+"""
+
+import json
+import pytest
+from parser_registry import ParserRegistry, RuleBasedParser, get_registry
+from panel_parser import QCellsParser, GenericParser
+
+
+JINKO_TEXT = (
+    "JinkoSolar Tiger Neo N-type JKM575N-72HL4-V\n"
+    "Maximum Power (Pmax) 575Wp\n"
+    "Maximum Power Voltage (Vmp) 43.08V\n"
+    "Maximum Power Current (Imp) 13.35A\n"
+    "Open-circuit Voltage (Voc) 51.92V\n"
+    "Short-circuit Current (Isc) 14.14A\n"
+    "Module Efficiency STC (%) 22.26\n"
+    "Dimensions 2278×1134×30mm\n"
+    "Weight 32.0 kg\n"
+)
+
+
+@pytest.fixture
+def rules_dir(tmp_path):
+    """Rules directory with defaults and one data-only manufacturer"""
+    (tmp_path / 'defaults.json').write_text(json.dumps({
+        'ranges': {'max_power': [300, 500], 'voc': [30, 60]},
+        'units': {'dimensions': 'mm'}
+    }))
+    (tmp_path / 'acme.json').write_text(json.dumps({
+        'name': 'Acme Solar',
+        'priority': 5,
+        'keywords': ['ACME SOLAR'],
+        'aliases': ['ACME'],
+        'patterns': {
+            'model': [r'(AC-\d{3})'],
+            'max_power': [r'Pmax\s*(\d{3})\s*W'],
+            'voc': [r'Voc\s*(\d+\.?\d*)\s*V']
+        },
+        'ranges': {'max_power': [100, 800]}
+    }))
+    return tmp_path
+
+
+class TestRegistryLoading:
+    """Test rule loading and merging"""
+
+    def test_bundled_rules(self):
+        registry = get_registry()
+        assert 'Q CELLS' in registry.by_name
+        assert 'JinkoSolar' in registry.by_name
+        assert registry.rule_sets == sorted(registry.rule_sets, key=lambda r: r.priority)
+
+    def test_defaults_merged(self, rules_dir):
+        rules = ParserRegistry(rules_dir).by_name['Acme Solar']
+        assert rules.ranges['max_power'] == (100, 800)
+        assert rules.ranges['voc'] == (30, 60)
+        assert rules.units['dimensions'] == 'mm'
+
+    def test_invalid_rule_file_skipped(self, rules_dir):
+        (rules_dir / 'broken.json').write_text(json.dumps({'priority': 1}))
+        registry = ParserRegistry(rules_dir)
+        assert [r.name for r in registry.rule_sets] == ['Acme Solar']
+
+    def test_rules_digest_follows_rule_files(self, rules_dir):
+        original = ParserRegistry(rules_dir).rules_digest
+        assert ParserRegistry(rules_dir).rules_digest == original
+
+        (rules_dir / 'newco.json').write_text(json.dumps({'name': 'NewCo', 'keywords': ['NEWCO']}))
+        added = ParserRegistry(rules_dir).rules_digest
+        defaults = json.loads((rules_dir / 'defaults.json').read_text())
+        defaults['ranges']['voc'] = [20, 60]
+        (rules_dir / 'defaults.json').write_text(json.dumps(defaults))
+
+        assert len({original, added, ParserRegistry(rules_dir).rules_digest}) == 3
+
+
+class TestDetection:
+    """Test keyword-indexed parser selection"""
+
+    def test_detect_from_text(self, rules_dir):
+        registry = ParserRegistry(rules_dir)
+        assert registry.detect_manufacturer("Made by ACME Solar Inc.") == 'Acme Solar'
+        assert registry.detect_manufacturer("Nothing here") == 'Unknown Manufacturer'
+
+    def test_hint_by_alias(self, rules_dir):
+        parser = ParserRegistry(rules_dir).create_parser('acme', '')
+        assert isinstance(parser, RuleBasedParser)
+        assert parser.maker == 'Acme Solar'
+
+    def test_custom_parser_class(self):
+        assert isinstance(get_registry().create_parser('Q CELLS'), QCellsParser)
+
+    def test_unknown_falls_back_to_generic(self, rules_dir):
+        assert isinstance(ParserRegistry(rules_dir).create_parser(None, 'plain text'), GenericParser)
+
+
+class TestRuleBasedParser:
+    """Test parsing driven by rule files"""
+
+    def test_new_manufacturer_without_code(self, rules_dir):
+        parser = ParserRegistry(rules_dir).create_parser(None, 'ACME SOLAR')
+        panel = parser.parse("ACME SOLAR AC-650 Pmax 650 W Voc 49.1 V", [])
+        assert panel.model == 'AC-650'
+        assert panel.maxPower == 650
+        assert panel.openCircuitVoltage == 49.1
+
+    def test_out_of_range_rejected(self, rules_dir):
+        parser = ParserRegistry(rules_dir).create_parser('Acme', '')
+        panel = parser.parse("Voc 99.0 V", [])
+        assert panel.openCircuitVoltage is None
+
+    def test_table_alias_fallback(self, rules_dir):
+        registry = ParserRegistry(rules_dir)
+        rules = registry.by_name['Acme Solar']
+        rules.table_aliases['voc'] = ['Open Circuit Voltage']
+        parser = registry.build_parser(rules)
+        tables = [{'data': [['Open Circuit Voltage [V]', '48.2', '48.5']]}]
+        assert parser.parse("", tables).openCircuitVoltage == 48.2
+
+    def test_jinko_rules(self):
+        panel = get_registry().create_parser(None, JINKO_TEXT).parse(JINKO_TEXT, [])
+        assert panel.maker == 'JinkoSolar'
+        assert panel.model == 'JKM575N-72HL4-V'
+        assert panel.maxPower == 575
+        assert panel.openCircuitVoltage == 51.92
+        assert panel.shortCircuitCurrent == 14.14
+        assert panel.efficiency == 22.26
+        assert panel.longSide == 2.278
+        assert panel.shortSide == 1.134
+        assert panel.weight == 32.0
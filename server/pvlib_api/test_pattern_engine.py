@@ -0,0 +1,94 @@
+"""
+Tests for the datasheet pattern engine and manufacturer detection
+"""
+
+import pytest
+from pattern_engine import PatternSet, literal_anchor
+from panel_parser import ParserFactory, QCellsParser, GenericParser
+
+
+SAMPLE_TEXT = (
+    "Q.PEAK DUO L-G5.2 395\n"
+    "Voc = 48.74 V\n"
+    "Isc: 10.19 A\n"
+    "Module Efficiency: 19.6 %\n"
+    "Weight: 23.5 kg\n"
+)
+
+
+class TestLiteralAnchor:
+    """Test literal anchor derivation"""
+
+    def test_longest_literal_run(self):
+        assert literal_anchor(r'Open\s+Circuit\s+Voltage\s*[=:]\s*(\d+)') == 'Circuit'
+
+    def test_literal_inside_group(self):
+        assert literal_anchor(r'(Q\.PEAK\s+DUO)') == 'Q.PEAK'
+
+    def test_no_literal(self):
+        assert literal_anchor(r'(\d{3})\s+(\d{3})') is None
+
+
+class TestPatternSet:
+    """Test compiled pattern scanning"""
+
+    def test_first_pattern_wins(self):
+        patterns = PatternSet({'voc': [r'Voc\s*=\s*(\d+\.?\d*)', r'(\d+\.?\d*)\s*V']})
+        match = patterns.scan(SAMPLE_TEXT).best('voc')
+        assert match.value == '48.74'
+        assert match.pattern_index == 0
+        assert SAMPLE_TEXT[match.start:match.end].startswith('Voc')
+
+    def test_candidates_ordered_by_confidence(self):
+        patterns = PatternSet({'voc': [r'Uoc\s*=\s*(\d+)', r'Voc\s*=\s*(\d+\.?\d*)', r'(\d+\.\d+)\s*V']})
+        candidates = patterns.scan(SAMPLE_TEXT).get('voc')
+        assert [c.pattern_index for c in candidates] == [1, 2]
+        assert candidates[0].confidence > candidates[1].confidence
+
+    def test_prefilter_is_case_insensitive(self):
+        patterns = PatternSet({'isc': [r'Short\s+Circuit\s+Current\s*:\s*(\d+\.?\d*)']})
+        assert patterns.first("SHORT CIRCUIT CURRENT: 10.2 A", 'isc') == '10.2'
+
+    def test_overlapping_keywords_detected(self):
+        patterns = PatternSet({
+            'a': [r'Power\s*Voltage\s*(\d+)'],
+            'b': [r'Power\s*(\d+)'],
+            'c': [r'ower\s*Volt'],
+        })
+        present = patterns.present_keywords("Max PowerVoltage 40")
+        assert {'power', 'voltage', 'ower'} <= present
+
+    def test_field_flags_case_sensitive(self):
+        patterns = PatternSet({'power_class': [r'POWER\s+CLASS\s+(\d{3})']},
+                              field_flags={'power_class': 0})
+        assert patterns.first("power class 395", 'power_class') is None
+        assert patterns.first("POWER CLASS 395", 'power_class') == '395'
+
+    def test_missing_field(self):
+        patterns = PatternSet({'weight': [r'Weight\s*:\s*(\d+)\s*kg']})
+        result = patterns.scan("no data here")
+        assert result.best('weight') is None
+        assert result.fields() == []
+
+
+class TestParsers:
+    """Test parsers built on the pattern engine"""
+
+    def test_qcells_parse(self):
+        panel = QCellsParser().parse(SAMPLE_TEXT, [])
+        assert panel.openCircuitVoltage == 48.74
+        assert panel.shortCircuitCurrent == 10.19
+        assert panel.efficiency == 19.6
+        assert panel.weight == 23.5
+
+    @pytest.mark.parametrize("text,expected", [
+        ("Datasheet by Q CELLS", "Q CELLS"),
+        ("jinko solar tiger neo", "JinkoSolar"),
+        ("JINKO module, Q.PEAK compatible", "Q CELLS"),
+        ("Unbranded module", "Unknown Manufacturer"),
+    ])
+    def test_detection_from_text(self, text, expected):
+        assert ParserFactory.create_parser(None, text).maker == expected
+
+    def test_generic_fallback(self):
+        assert isinstance(ParserFactory.create_parser(None, "Unbranded module"), GenericParser)
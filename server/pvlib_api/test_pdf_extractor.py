@@ -0,0 +1,74 @@
+"""
+Tests for targeted PDF extraction
+"""
+
+import pdfplumber
+import pytest
+
+from pdf_extractor import PDFTextExtractor
+
+SPEC_PAGE = "Maximum Power Pmax 400 W\nVoc 45.2 V\nIsc 11.1 A\nVmpp 37.5 V\nImpp 10.7 A"
+MECHANICAL_PAGE = "Dimensions 1722 x 1134 x 30 mm\nWeight 21.5 kg"
+PACKAGING_PAGE = "Modules per pallet 32"
+
+
+class FakePage:
+    """Page whose text and single table are fixed"""
+
+    def __init__(self, page_number, text):
+        self.page_number = page_number
+        self.text = text
+        self.table_calls = 0
+
+    def extract_text(self):
+        return self.text
+
+    def extract_tables(self):
+        self.table_calls += 1
+        return [[['Page', str(self.page_number)]]]
+
+
+class FakePDF:
+    def __init__(self, texts):
+        self.pages = [FakePage(number, text) for number, text in enumerate(texts, 1)]
+        self.metadata = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+@pytest.fixture
+def pdf(monkeypatch, tmp_path):
+    """Datasheet with a cover, the electrical specs, then mechanical and packaging pages"""
+    fake = FakePDF(["Q.PEAK DUO 400", SPEC_PAGE, MECHANICAL_PAGE, PACKAGING_PAGE])
+    monkeypatch.setattr(pdfplumber, 'open', lambda path: fake)
+    path = tmp_path / 'sheet.pdf'
+    path.write_bytes(b'%PDF fake')
+    return path, fake
+
+
+class TestTargetedExtraction:
+    """Test that targeted mode stops table extraction but keeps all page text"""
+
+    def test_all_text_kept_tables_stop_after_spec_page(self, pdf):
+        path, fake = pdf
+        result = PDFTextExtractor(path, targeted=True).extract_all()
+
+        assert result['success']
+        for page_text in (SPEC_PAGE, MECHANICAL_PAGE, PACKAGING_PAGE):
+            assert page_text in result['text']
+        assert [page.table_calls for page in fake.pages] == [0, 1, 0, 0]
+        assert [table['page'] for table in result['tables']] == [2]
+        assert result['metadata']['table_pages'] == [2]
+        assert result['metadata']['tables_stopped_early']
+
+    def test_full_mode_reads_every_page(self, pdf):
+        path, fake = pdf
+        result = PDFTextExtractor(path).extract_all()
+
+        assert [page.table_calls for page in fake.pages] == [1, 1, 1, 1]
+        assert result['metadata']['table_pages'] == [1, 2, 3, 4]
+        assert not result['metadata']['tables_stopped_early']
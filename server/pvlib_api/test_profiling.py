@@ -0,0 +1,98 @@
+"""
+Tests for on-demand profiling
+"""
+
+import threading
+
+import pytest
+
+import profiling
+from profiling import ProfilerBusy, collapsed_stacks, profile_call, speedscope_profile, top_functions
+
+
+def busy_loop(duration=0.1):
+    total = 0
+    deadline = threading.Event()
+    timer = threading.Timer(duration, deadline.set)
+    timer.start()
+    while not deadline.is_set():
+        total += sum(range(200))
+    return total
+
+
+def allocate():
+    return [bytearray(1024) for _ in range(512)]
+
+
+class TestProfileCall:
+    """Test profiling modes and output formats"""
+
+    def test_sampling_speedscope(self):
+        report = profile_call(busy_loop, interval_ms=1, memory=False)
+
+        assert report['error'] is None
+        assert report['result'] > 0
+        profile = report['profile']
+        assert profile['$schema'] == profiling.SPEEDSCOPE_SCHEMA
+        names = {frame['name'] for frame in profile['shared']['frames']}
+        assert 'busy_loop' in names
+        assert '_run_target' not in names
+        sampled = profile['profiles'][0]
+        assert len(sampled['samples']) == len(sampled['weights']) > 0
+
+    def test_cprofile_collapsed(self):
+        report = profile_call(busy_loop, mode='cprofile', output_format='collapsed', memory=False)
+
+        lines = report['profile'].strip().split('\n')
+        assert all(line.rsplit(' ', 1)[1].isdigit() for line in lines)
+        assert any(line.startswith('busy_loop (test_profiling.py:') for line in lines)
+        assert not any('_lsprof' in line for line in lines)
+
+    def test_allocations(self):
+        report = profile_call(allocate, memory=True)
+        allocations = report['allocations']
+        assert allocations['peak_kb'] >= 512
+        assert any(site['location'].startswith('test_profiling.py:') for site in allocations['top'])
+
+    def test_errors_are_reported(self):
+        def fail():
+            raise RuntimeError('bad design')
+
+        report = profile_call(fail, mode='cprofile', memory=False)
+        assert report['error'] == 'bad design'
+        assert report['result'] is None
+
+    def test_invalid_mode_and_busy(self):
+        with pytest.raises(ValueError):
+            profile_call(busy_loop, mode='perf')
+
+        profiling._profile_lock.acquire()
+        try:
+            with pytest.raises(ProfilerBusy):
+                profile_call(busy_loop)
+        finally:
+            profiling._profile_lock.release()
+
+
+class TestStackFormats:
+    """Test rendering weighted stacks"""
+
+    STACKS = {
+        (('main', 'app.py', 1), ('solve', 'app.py', 10)): 3.0,
+        (('main', 'app.py', 1),): 1.0,
+    }
+
+    def test_collapsed(self):
+        assert collapsed_stacks(self.STACKS) == 'main (app.py:1) 1000\nmain (app.py:1);solve (app.py:10) 3000\n'
+
+    def test_speedscope_shares_frames(self):
+        profile = speedscope_profile(self.STACKS, 'demo')
+        assert len(profile['shared']['frames']) == 2
+        assert profile['profiles'][0]['samples'] == [[0], [0, 1]]
+        assert profile['profiles'][0]['endValue'] == 4.0
+
+    def test_top_functions(self):
+        rows = {row['function']: row for row in top_functions(self.STACKS)}
+        assert rows['solve (app.py:10)']['self_ms'] == 3.0
+        assert rows['main (app.py:1)']['self_ms'] == 1.0
+        assert rows['main (app.py:1)']['total_ms'] == 4.0
@@ -0,0 +1,85 @@
+"""
+Tests for PVUtilities monthly summaries
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from PVUtilities import (build_monthly_performance, build_monthly_summaries, build_monthly_summary,
+                         create_time_indices, daily_means, find_best_doy, find_worst_doy)
+
+
+def reference_summary(df, select_value):
+    """Per-month filter and groupby summary the vectorized version replaces"""
+    dat_list = np.zeros([12, 5])
+    for indx in range(12):
+        smpl_df = df.loc[df['Month'] == indx + 1]
+        vals = smpl_df[select_value].groupby(smpl_df['DayofMonth']).sum()
+        dat_list[indx] = [vals.sum(), vals.mean(), vals.max(), vals.min(), len(smpl_df) / 24]
+    return dat_list
+
+
+def reference_best_worst(df, select_value):
+    daily = df[select_value].groupby(df['DayofYear']).sum()
+    return int(daily.idxmax()), int(daily.idxmin())
+
+
+@pytest.fixture(scope='module')
+def year_frame():
+    rng = np.random.default_rng(7)
+    df = create_time_indices(0)
+    hours = df.index.hour.to_numpy()
+    daylight = np.clip(np.sin(np.pi * (hours - 6) / 12), 0, None)
+    df['ArrayPower'] = 400 * daylight * rng.random(len(df))
+    df['PowerOut'] = np.where(hours >= 18, 100.0, 0.0) * rng.random(len(df))
+    return df
+
+
+class TestMonthlySummaries:
+    """Test the single-pass summaries against the per-month implementation"""
+
+    def test_matches_reference(self, year_frame):
+        for param in ('ArrayPower', 'PowerOut'):
+            summary = build_monthly_summary(year_frame, param)
+            assert list(summary.columns) == [f'Total {param}', f'Avg {param}', f'Best {param}',
+                                             f'Worst {param}', 'Days']
+            assert summary.index.name == 'Months'
+            assert list(summary.index[:2]) == ['Jan', 'Feb']
+            np.testing.assert_allclose(summary.to_numpy(), reference_summary(year_frame, param))
+
+    def test_best_and_worst_days(self, year_frame):
+        best, worst = reference_best_worst(year_frame, 'ArrayPower')
+        assert find_best_doy(year_frame, 'ArrayPower') == best
+        assert find_worst_doy(year_frame, 'ArrayPower') == worst
+
+        performance = build_monthly_performance(year_frame, 'ArrayPower')
+        assert performance[1:] == [best, worst]
+
+    def test_several_metrics_at_once(self, year_frame):
+        summaries = build_monthly_summaries(year_frame, ['ArrayPower', 'PowerOut'])
+        for param, (summary, best, worst) in summaries.items():
+            pd.testing.assert_frame_equal(summary, build_monthly_summary(year_frame, param))
+            assert (best, worst) == reference_best_worst(year_frame, param)
+
+    def test_missing_values_and_months(self, year_frame):
+        df = year_frame.loc[year_frame['Month'] <= 6].copy()
+        df.iloc[5, df.columns.get_loc('ArrayPower')] = np.nan
+
+        summary = build_monthly_summary(df, 'ArrayPower')
+        np.testing.assert_allclose(summary.to_numpy(), reference_summary(df, 'ArrayPower'))
+        assert summary.loc['Dec', 'Days'] == 0
+        assert np.isnan(summary.loc['Dec', 'Avg ArrayPower'])
+
+    def test_empty_frame(self, year_frame):
+        with pytest.raises(IndexError):
+            find_best_doy(year_frame.iloc[:0], 'ArrayPower')
+
+
+class TestDailyMeans:
+    """Test the single-pass daily averages against resample"""
+
+    def test_matches_resample(self, year_frame):
+        frame = year_frame.tz_convert('Africa/Tunis')[['ArrayPower', 'PowerOut', 'Month']]
+        frame.iloc[3, 0] = np.nan
+        pd.testing.assert_frame_equal(daily_means(frame), frame.resample('D').mean(), check_freq=False)
@@ -262,6 +262,47 @@ class TestSimplePVSimulator:
         assert summer_avg > winter_avg
 
 
+class TestSiteGeometry:
+    """Test sharing solar geometry between runs"""
+
+    def setup_method(self):
+        self.simulator = SimplePVSimulator()
+        self.site, self.panel, self.array, self.inverter = create_default_config()
+        self.simulator.setup_system(self.site, self.panel, self.array, self.inverter)
+
+    def test_geometry_matches_pvlib(self):
+        times = pd.date_range('2023-06-21', periods=24, freq='h', tz=self.site.timezone)
+        geometry = self.simulator.site_geometry(times)
+
+        expected = self.simulator.location.get_clearsky(times)
+        pd.testing.assert_frame_equal(geometry.clearsky, expected)
+        assert geometry.solar_position['apparent_zenith'].equals(
+            self.simulator.location.get_solarposition(times)['apparent_zenith'])
+
+    def test_reused_across_runs_and_setups(self):
+        cache = self.simulator.geometry_cache
+        self.simulator.simulate_year(2023)
+        assert (cache.hits, cache.misses) == (0, 1)
+
+        # A new setup for the same site keeps the cached geometry
+        self.simulator.setup_system(self.site, self.panel, self.array, self.inverter)
+        np.random.seed(5)
+        first = self.simulator.simulate_year(2023)
+        np.random.seed(5)
+        second = self.simulator.simulate_year(2023)
+        assert (cache.hits, cache.misses) == (2, 1)
+        np.testing.assert_array_equal(first.hourly_power_output, second.hourly_power_output)
+
+    def test_other_site_or_period_computed(self):
+        cache = self.simulator.geometry_cache
+        self.simulator.simulate_day('2023-06-21')
+        self.simulator.simulate_day('2023-06-22')
+        moved = SiteConfig(latitude=-33.9, longitude=151.2, timezone='Australia/Sydney')
+        self.simulator.setup_system(moved, self.panel, self.array, self.inverter)
+        self.simulator.simulate_day('2023-06-21')
+        assert (cache.hits, cache.misses) == (0, 3)
+
+
 class TestDefaultConfig:
     """Test default configuration function"""
 
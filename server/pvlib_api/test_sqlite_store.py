@@ -0,0 +1,149 @@
+"""
+Tests for the embedded SQLite panel store
+"""
+
+import csv
+import gzip
+import io
+import pytest
+from models import PVPanelData, panel_to_row
+from panel_cache import PanelCache
+from panel_store import open_panel_store, open_panel_writer
+from sqlite_store import EXPORT_QUERY, SQLitePanelStore
+
+
+def make_panel(model, maker='Q CELLS', power=400.0):
+    return PVPanelData(maker=maker, model=model, maxPower=power, efficiency=20.5)
+
+
+@pytest.fixture
+def store():
+    with SQLitePanelStore(':memory:') as store:
+        yield store
+
+
+class TestSQLitePanelStore:
+    """Test upsert, lookups, statistics and export"""
+
+    def test_upsert_and_lookup(self, store):
+        result = store.upsert_pv_panels([make_panel('Q.PEAK 400'), make_panel('JKM550', 'JinkoSolar', 550.0)])
+        assert result['success']
+        assert result['inserted_count'] == 2
+
+        panel = store.get_panel_by_model('JKM550')
+        assert panel['maker'] == 'JinkoSolar'
+        assert panel['max_power'] == 550.0
+        assert store.check_panel_exists('NOPE') is None
+
+    def test_upsert_updates_existing_model(self, store):
+        store.upsert_pv_panels([make_panel('Q.PEAK 400', power=400.0)])
+        first_id = store.get_panel_by_model('Q.PEAK 400')['id']
+
+        store.upsert_pv_panels([make_panel('Q.PEAK 400', power=405.0)])
+        panel = store.get_panel_by_model('Q.PEAK 400')
+
+        assert panel['id'] == first_id
+        assert panel['max_power'] == 405.0
+        assert store.get_statistics()['total_panels'] == 1
+
+    def test_chunk_larger_than_sqlite_variable_limit(self, store):
+        rows = [panel_to_row(make_panel(f'M{i}')) for i in range(1500)]
+        store.upsert_rows(rows[:10])
+
+        results = store.upsert_rows(rows)
+
+        assert sum(row['inserted'] for row in results) == 1490
+        assert all(row['id'] is not None for row in results)
+        assert store.get_statistics()['total_panels'] == 1500
+
+    def test_duplicate_models_in_chunk_last_wins(self, store):
+        result = store.upsert_pv_panels([make_panel('A', power=1.0), make_panel('A', power=2.0)], chunk_size=10)
+        assert result['inserted_count'] == 1
+        assert store.get_panel_by_model('A')['max_power'] == 2.0
+
+    def test_maker_lookup_case_insensitive(self, store):
+        store.upsert_pv_panels([make_panel('B'), make_panel('A'), make_panel('J', 'JinkoSolar')])
+        assert [p['model'] for p in store.get_panels_by_maker('cells')] == ['A', 'B']
+
+    def test_statistics(self, store):
+        store.upsert_pv_panels([make_panel('A', power=400.0), make_panel('B', power=500.0),
+                                make_panel('J', 'JinkoSolar', 600.0)])
+        stats = store.get_statistics()
+        assert stats['total_panels'] == 3
+        assert stats['unique_makers'] == 2
+        assert stats['top_makers'][0] == {'maker': 'Q CELLS', 'count': 2}
+        assert stats['average_power'] == 500.0
+
+    def test_export_gzip_csv(self, store, tmp_path):
+        store.upsert_pv_panels([make_panel('A'), make_panel('B')])
+        output_file = tmp_path / 'panels.csv.gz'
+
+        assert store.export(output_file)
+        with gzip.open(output_file, 'rt') as f:
+            rows = list(csv.DictReader(f))
+        assert [row['model'] for row in rows] == ['A', 'B']
+
+    def test_streamed_csv_export_matches_buffered(self, store, tmp_path):
+        store.upsert_pv_panels([make_panel(f'M{index:04d}', maker=f'Maker {index % 7}', power=300.0 + index)
+                                for index in range(1200)], chunk_size=500)
+        output_file = tmp_path / 'panels.csv'
+
+        assert store.export(output_file)
+
+        # What the export wrote when it fetched every row first
+        cursor = store.connection.execute(EXPORT_QUERY)
+        buffered = io.StringIO(newline='')
+        writer = csv.DictWriter(buffered, fieldnames=[column[0] for column in cursor.description])
+        writer.writeheader()
+        for row in cursor.fetchall():
+            writer.writerow(dict(row))
+        with open(output_file, encoding='utf-8', newline='') as f:
+            assert f.read() == buffered.getvalue()
+
+    def test_parquet_export_spans_batches(self, store, tmp_path):
+        pq = pytest.importorskip('pyarrow.parquet')
+        store.upsert_pv_panels([make_panel(f'M{index:03d}', power=300.0 + index) for index in range(250)])
+        output_file = tmp_path / 'panels.parquet'
+
+        assert store.export_to_parquet(output_file, batch_size=100)
+
+        table = pq.read_table(output_file)
+        assert pq.ParquetFile(output_file).num_row_groups == 3
+        assert table.column('model').to_pylist() == [f'M{index:03d}' for index in range(250)]
+        assert table.column('max_power').to_pylist() == [300.0 + index for index in range(250)]
+
+
+class TestPanelStoreFactory:
+    """Test backend selection and streamed writes"""
+
+    def test_sqlite_url_selects_sqlite(self, tmp_path):
+        store = open_panel_store(f'sqlite:///{tmp_path}/panels.db')
+        assert isinstance(store, PanelCache)
+        assert isinstance(store.source, SQLitePanelStore)
+        assert isinstance(open_panel_store(f'sqlite:///{tmp_path}/panels.db', cache_size=0), SQLitePanelStore)
+
+    def test_lookups_read_through_cache(self, tmp_path):
+        with open_panel_store(f'sqlite:///{tmp_path}/panels.db') as store:
+            store.upsert_pv_panels([make_panel('A')])
+            assert store.get_panel_by_model('A')['max_power'] == 400.0
+            assert store.get_panel_by_model('A')['max_power'] == 400.0
+            assert (store.hits, store.misses) == (1, 1)
+
+            # Upserts through the store invalidate its cache
+            store.upsert_pv_panels([make_panel('A', power=405.0)])
+            assert store.get_panel_by_model('A')['max_power'] == 405.0
+
+    def test_streamed_writer_keeps_cache_coherent(self, tmp_path):
+        url = f'sqlite:///{tmp_path}/panels.db'
+        with open_panel_store(url) as store:
+            assert store.get_panel_by_model('A') is None
+            assert store.get_statistics()['total_panels'] == 0
+
+            writer = open_panel_writer(url, chunk_size=2, cache=store)
+            writer.add_many(make_panel(model) for model in 'ABC')
+            summary = writer.close()
+
+            assert summary['success']
+            assert summary['chunks_written'] == 2
+            assert store.get_panel_by_model('A')['model'] == 'A'
+            assert store.get_statistics()['total_panels'] == 3
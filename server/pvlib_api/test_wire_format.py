@@ -0,0 +1,165 @@
+"""
+Tests for result encoding and field selection
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+import wire_format
+from SPVSimAPI import RESULT_FIELDS, parse_result_fields
+from wire_format import (ARRAY_LAYOUT_HEADER, FLOAT32_MEDIA_TYPE, JSON_MEDIA_TYPE, RESULT_FIELDS_HEADER,
+                         NumpyEncoder, dumps_json, encode_result, frame_records, negotiate_encoding,
+                         negotiate_media_type, wire_response)
+
+CONTENT = {'success': True, 'annual_energy': 1500.5, 'daily_energy': {'1': 4.0, '2': 5.0}}
+ARRAYS = {'daily_energy': np.array([4.0, 5.0]), 'hourly_data.power_output': np.zeros(24)}
+
+
+def pandas_records(df):
+    """The pandas JSON round trip frame_records replaces"""
+    return json.loads(df.reset_index().to_json(orient='records', date_format='iso', double_precision=15))
+
+
+class TestFrameRecords:
+    """Test table rows against the pandas JSON output"""
+
+    def test_datetime_index(self):
+        index = pd.date_range('2023-01-01', periods=3, freq='D', tz='Africa/Tunis')
+        df = pd.DataFrame({'PowerOut': [1.5, np.nan, 2.25], 'Month': [1, 1, 1]}, index=index)
+        assert frame_records(df) == pandas_records(df)
+        assert frame_records(df)[0]['index'] == '2022-12-31T23:00:00.000Z'
+
+        naive = df.tz_localize(None)
+        assert frame_records(naive) == pandas_records(naive)
+
+    def test_named_index(self):
+        df = pd.DataFrame({'Total PowerOut': [10.0, 20.0], 'Days': [31.0, 28.0]},
+                          index=pd.Index(['Jan', 'Feb'], name='Months'))
+        assert frame_records(df) == pandas_records(df)
+        assert frame_records(df, 'month')[1] == {'month': 'Feb', 'Total PowerOut': 20.0, 'Days': 28.0}
+
+
+class TestDumpsJson:
+    """Test encoding NumPy values"""
+
+    def test_numpy_values(self):
+        content = {'hourly': np.array([0.5, 1.0]), 'total': np.float64(1.5), 'days': np.int64(365)}
+        assert json.loads(dumps_json(content)) == {'hourly': [0.5, 1.0], 'total': 1.5, 'days': 365}
+
+    def test_unsupported_type(self):
+        with pytest.raises(TypeError):
+            dumps_json({'value': object()})
+
+    def test_numpy_encoder(self):
+        text = json.dumps({'hourly': np.arange(3), 'peak': np.float32(2.5)}, cls=NumpyEncoder)
+        assert json.loads(text) == {'hourly': [0, 1, 2], 'peak': 2.5}
+
+
+class TestNegotiation:
+    """Test choosing formats and encodings from request headers"""
+
+    def test_json_by_default(self):
+        assert negotiate_media_type(None) == JSON_MEDIA_TYPE
+        assert negotiate_media_type('*/*') == JSON_MEDIA_TYPE
+        assert negotiate_media_type('text/html,application/xhtml+xml,*/*;q=0.8') == JSON_MEDIA_TYPE
+
+    def test_quality_weights(self):
+        assert negotiate_media_type('application/octet-stream, application/json;q=0.5') == FLOAT32_MEDIA_TYPE
+        assert negotiate_media_type('application/octet-stream;q=0, */*') == JSON_MEDIA_TYPE
+        assert negotiate_media_type('text/csv') is None
+
+    def test_formats_without_their_package(self, monkeypatch):
+        monkeypatch.setattr(wire_format, 'msgpack', None)
+        monkeypatch.setattr(wire_format, 'pa', None)
+        assert negotiate_media_type('application/x-msgpack') is None
+        assert negotiate_media_type('application/vnd.apache.arrow.stream, */*;q=0.1') == JSON_MEDIA_TYPE
+
+    def test_encodings(self, monkeypatch):
+        monkeypatch.setattr(wire_format, 'zstandard', None)
+        assert negotiate_encoding('gzip, deflate, br') == 'gzip'
+        assert negotiate_encoding('zstd') is None
+        assert negotiate_encoding('gzip;q=0, *') is None
+        assert negotiate_encoding(None) is None
+
+
+class TestEncodeResult:
+    """Test the binary formats"""
+
+    def test_json_keeps_content(self):
+        body, headers = encode_result(CONTENT, ARRAYS, JSON_MEDIA_TYPE)
+        assert json.loads(body) == CONTENT
+        assert headers == {}
+
+    def test_float32(self):
+        body, headers = encode_result(CONTENT, ARRAYS, FLOAT32_MEDIA_TYPE)
+        assert headers[ARRAY_LAYOUT_HEADER] == 'daily_energy=2,hourly_data.power_output=24'
+        assert json.loads(headers[RESULT_FIELDS_HEADER]) == {'success': True, 'annual_energy': 1500.5}
+        values = np.frombuffer(body, dtype='<f4')
+        assert len(values) == 26
+        assert values[:2].tolist() == [4.0, 5.0]
+
+    def test_msgpack(self):
+        msgpack = pytest.importorskip('msgpack')
+        body, _ = encode_result(CONTENT, ARRAYS, wire_format.MSGPACK_MEDIA_TYPE)
+        decoded = msgpack.unpackb(body)
+        assert decoded['daily_energy'] == [4.0, 5.0]
+        assert decoded['annual_energy'] == 1500.5
+        assert 'hourly_data' not in decoded
+
+    def test_arrow(self):
+        pa = pytest.importorskip('pyarrow')
+        body, _ = encode_result(CONTENT, ARRAYS, wire_format.ARROW_MEDIA_TYPE)
+        table = pa.ipc.open_stream(body).read_all()
+        assert table.column('daily_energy').to_pylist() == [[4.0, 5.0]]
+        assert json.loads(table.schema.metadata[b'fields']) == {'success': True, 'annual_energy': 1500.5}
+
+
+class TestWireResponse:
+    """Test responses built for a FastAPI endpoint"""
+
+    @pytest.fixture
+    def client(self):
+        app = FastAPI()
+
+        @app.get('/result')
+        async def result(request: Request):
+            return wire_response(request, {**CONTENT, 'hourly': np.arange(500.0)},
+                                 {'hourly': np.arange(500.0)})
+
+        return TestClient(app)
+
+    def test_compressed_json(self, client):
+        response = client.get('/result', headers={'Accept-Encoding': 'gzip'})
+        assert response.headers['content-type'] == JSON_MEDIA_TYPE
+        assert response.headers['content-encoding'] == 'gzip'
+        assert response.headers['vary'] == 'Accept, Accept-Encoding'
+        assert response.json()['hourly'][-1] == 499.0
+
+    def test_raw_float32(self, client):
+        response = client.get('/result', headers={'Accept': FLOAT32_MEDIA_TYPE, 'Accept-Encoding': 'identity'})
+        assert 'content-encoding' not in response.headers
+        assert np.frombuffer(response.content, dtype='<f4')[-1] == 499.0
+
+    def test_not_acceptable(self, client):
+        response = client.get('/result', headers={'Accept': 'text/csv'})
+        assert response.status_code == 406
+
+
+class TestResultFields:
+    """Test selecting simulation result sections"""
+
+    def test_all_by_default(self):
+        assert parse_result_fields() == set(RESULT_FIELDS)
+
+    def test_comma_separated(self):
+        assert parse_result_fields('summary, service_percentage,') == {'summary', 'service_percentage'}
+        assert parse_result_fields(['power_flow']) == {'power_flow'}
+
+    def test_unknown_field(self):
+        with pytest.raises(ValueError, match='hourly'):
+            parse_result_fields('summary,hourly')
@@ -5,6 +5,8 @@ Helper functions for common operations in datasheet processing.
 """
 
 import re
+import gzip
+import hashlib
 from typing import Optional, List, Dict, Any
 from pathlib import Path
 
@@ -55,6 +57,23 @@ def extract_model_from_filename(filename: str) -> Optional[str]:
     return name
 
 
+def compute_file_hash(file_path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """Compute SHA-256 hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def open_text_output(file_path: Path):
+    """Open a text file for writing, gzip-compressed when the name ends in .gz"""
+    file_path = Path(file_path)
+    if file_path.suffix == '.gz':
+        return gzip.open(file_path, 'wt', encoding='utf-8', newline='')
+    return open(file_path, 'w', encoding='utf-8', newline='')
+
+
 def format_file_size(size_bytes: int) -> str:
     """Format file size in human-readable format"""
     if size_bytes < 1024:
@@ -0,0 +1,326 @@
+"""
+Wire Format
+
+Encoding of simulation results for API responses. Tables are turned into
+JSON-ready rows straight from their NumPy values, without a pandas JSON
+round trip, and responses are encoded with orjson when it is installed
+(the standard json module otherwise).
+
+Simulation endpoints negotiate the response format from the Accept header.
+JSON is the default; MessagePack (msgpack), Arrow IPC streams (pyarrow) and
+raw little-endian float32 buffers carry numeric arrays without text float
+encoding. Bodies are compressed with zstd (zstandard) or gzip when the
+Accept-Encoding header allows it. Formats and encodings whose optional
+package is not installed are not offered.
+"""
+
+import gzip
+import json
+from datetime import date, datetime
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException, Request
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+JSON_MEDIA_TYPE = 'application/json'
+MSGPACK_MEDIA_TYPE = 'application/msgpack'
+ARROW_MEDIA_TYPE = 'application/vnd.apache.arrow.stream'
+FLOAT32_MEDIA_TYPE = 'application/octet-stream'
+
+# Other names clients use for the same formats
+MEDIA_TYPE_ALIASES = {
+    'application/x-msgpack': MSGPACK_MEDIA_TYPE,
+    'application/vnd.msgpack': MSGPACK_MEDIA_TYPE,
+}
+
+# Raw float32 responses describe their body in these headers
+ARRAY_LAYOUT_HEADER = 'X-Array-Layout'
+RESULT_FIELDS_HEADER = 'X-Result-Fields'
+
+# Bodies smaller than this are sent uncompressed
+MIN_COMPRESS_BYTES = 1024
+ZSTD_LEVEL = 3
+GZIP_LEVEL = 6
+
+
+def _json_default(value: Any) -> Any:
+    """Convert values the JSON encoders don't handle themselves"""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class NumpyEncoder(json.JSONEncoder):
+    """json.JSONEncoder for content holding NumPy arrays, scalars and timestamps"""
+
+    def default(self, o: Any) -> Any:
+        try:
+            return _json_default(o)
+        except TypeError:
+            return super().default(o)
+
+
+def dumps_json(content: Any) -> bytes:
+    """
+    Encode content as JSON
+
+    NumPy arrays and scalars are encoded directly; with orjson, NaN in
+    arrays becomes null.
+
+    Args:
+        content: JSON-compatible content, possibly holding NumPy values
+
+    Returns:
+        UTF-8 encoded JSON
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=_json_default,
+                            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, cls=NumpyEncoder, separators=(',', ':')).encode('utf-8')
+
+
+def _iso_labels(index: pd.DatetimeIndex) -> List[str]:
+    # Same form as DataFrame.to_json(date_format='iso'): UTC, milliseconds
+    if index.tz is None:
+        return np.datetime_as_string(index.values, unit='ms').tolist()
+    utc = index.tz_convert('UTC').tz_localize(None)
+    return [f'{label}Z' for label in np.datetime_as_string(utc.values, unit='ms')]
+
+
+def frame_records(df: pd.DataFrame, index_label: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Rows of a DataFrame, index first, as JSON-ready dictionaries
+
+    Matches json.loads(df.reset_index().to_json(orient='records', date_format='iso'))
+    at full float precision: missing values become None and timestamps ISO strings.
+
+    Args:
+        df: Table to convert
+        index_label: Key for the index values (defaults to the index name, or 'index')
+
+    Returns:
+        List of row dictionaries
+    """
+    label = index_label or df.index.name or 'index'
+    if isinstance(df.index, pd.DatetimeIndex):
+        index_values = _iso_labels(df.index)
+    else:
+        index_values = df.index.tolist()
+
+    values = df.to_numpy(dtype=object, copy=True)
+    values[pd.isna(values)] = None
+    columns = [label] + [str(column) for column in df.columns]
+    return [dict(zip(columns, [index_value] + row))
+            for index_value, row in zip(index_values, values.tolist())]
+
+
+def frame_arrays(df: pd.DataFrame, prefix: str) -> Dict[str, np.ndarray]:
+    """Numeric columns of a DataFrame as float arrays named '<prefix>.<column>'"""
+    return {f'{prefix}.{column}': df[column].to_numpy(dtype=float)
+            for column in df.columns if pd.api.types.is_numeric_dtype(df[column])}
+
+
+def _encode_msgpack(content: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> Tuple[bytes, Dict[str, str]]:
+    return msgpack.packb({**content, **arrays}, default=_json_default), {}
+
+
+def _encode_arrow(content: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> Tuple[bytes, Dict[str, str]]:
+    # One row holding each array as a list column; the other fields go in the schema metadata
+    table = pa.table({name: pa.array([values]) for name, values in arrays.items()})
+    table = table.replace_schema_metadata({'fields': dumps_json(content)})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes(), {}
+
+
+def _encode_float32(content: Dict[str, Any], arrays: Dict[str, np.ndarray]) -> Tuple[bytes, Dict[str, str]]:
+    # Arrays back to back; the layout and the scalar fields go in headers
+    layout = ','.join(f'{name}={len(values)}' for name, values in arrays.items())
+    scalars = {key: value for key, value in content.items()
+               if not isinstance(value, (dict, list, np.ndarray))}
+    body = b''.join(np.asarray(values, dtype='<f4').tobytes() for values in arrays.values())
+    headers = {ARRAY_LAYOUT_HEADER: layout,
+               RESULT_FIELDS_HEADER: json.dumps(scalars, cls=NumpyEncoder, separators=(',', ':'))}
+    return body, headers
+
+
+# Binary formats in order of preference: whether the optional package is installed, encoder
+_BINARY_FORMATS = {
+    MSGPACK_MEDIA_TYPE: (lambda: msgpack is not None, _encode_msgpack),
+    ARROW_MEDIA_TYPE: (lambda: pa is not None, _encode_arrow),
+    FLOAT32_MEDIA_TYPE: (lambda: True, _encode_float32),
+}
+
+
+def available_media_types() -> List[str]:
+    """Response formats that can be produced, JSON first"""
+    return [JSON_MEDIA_TYPE] + [media_type for media_type, (installed, _) in _BINARY_FORMATS.items()
+                                if installed()]
+
+
+def available_encodings() -> List[str]:
+    """Content encodings that can be produced, preferred first"""
+    return (['zstd'] if zstandard is not None else []) + ['gzip']
+
+
+def _parse_quality(header: Optional[str]) -> List[Tuple[str, float]]:
+    """Values of an Accept-style header with their q weights"""
+    parsed = []
+    for part in (header or '').split(','):
+        value, *params = [item.strip() for item in part.split(';')]
+        if not value:
+            continue
+        quality = 1.0
+        for param in params:
+            if param.startswith('q='):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        parsed.append((value.lower(), quality))
+    return parsed
+
+
+def negotiate_media_type(accept: Optional[str]) -> Optional[str]:
+    """
+    Choose the response format for an Accept header
+
+    The most specific matching range sets each format's weight; ties go to the
+    earlier format in available_media_types().
+
+    Args:
+        accept: Accept header value (JSON when missing)
+
+    Returns:
+        Media type, or None when none of the available formats is acceptable
+    """
+    ranges = [(MEDIA_TYPE_ALIASES.get(value, value), quality) for value, quality in _parse_quality(accept)]
+    if not ranges:
+        return JSON_MEDIA_TYPE
+
+    best, best_quality = None, 0.0
+    for media_type in available_media_types():
+        family = media_type.split('/')[0] + '/*'
+        for pattern in (media_type, family, '*/*'):
+            matches = [quality for value, quality in ranges if value == pattern]
+            if matches:
+                if max(matches) > best_quality:
+                    best, best_quality = media_type, max(matches)
+                break
+    return best
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Content encoding for an Accept-Encoding header, or None to send the body as is"""
+    weights = dict(_parse_quality(accept_encoding))
+    best, best_quality = None, 0.0
+    for encoding in available_encodings():
+        quality = weights.get(encoding, weights.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(body: bytes, encoding: Optional[str]) -> bytes:
+    """Compress a body with a negotiated content encoding"""
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+    if encoding == 'gzip':
+        return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+    return body
+
+
+def encode_result(content: Dict[str, Any], arrays: Optional[Mapping[str, np.ndarray]],
+                  media_type: str) -> Tuple[bytes, Dict[str, str]]:
+    """
+    Encode a result in one of the available formats
+
+    Binary formats carry the arrays in place of the content entries they
+    stand for: an array named 'hourly_data.power_output' replaces the
+    content's hourly_data entry. JSON encodes the content only.
+
+    Args:
+        content: JSON response body
+        arrays: 1-D numeric arrays for the binary formats
+        media_type: Format from negotiate_media_type
+
+    Returns:
+        Tuple of body and format specific headers
+    """
+    if media_type == JSON_MEDIA_TYPE:
+        return dumps_json(content), {}
+
+    arrays = dict(arrays or {})
+    replaced = {name.split('.')[0] for name in arrays}
+    kept = {key: value for key, value in content.items() if key not in replaced}
+    return _BINARY_FORMATS[media_type][1](kept, arrays)
+
+
+def accepted_media_type(request: Request) -> str:
+    """
+    Response format for a request's Accept header
+
+    Raises:
+        HTTPException: 406 when none of the available formats is acceptable
+    """
+    media_type = negotiate_media_type(request.headers.get('accept'))
+    if media_type is None:
+        raise HTTPException(status_code=406,
+                            detail=f"Acceptable formats: {', '.join(available_media_types())}")
+    return media_type
+
+
+def wire_response(request: Request, content: Dict[str, Any],
+                  arrays: Optional[Mapping[str, np.ndarray]] = None,
+                  headers: Optional[Dict[str, str]] = None) -> Response:
+    """
+    Build a simulation response in the format and encoding the client accepts
+
+    Endpoints call accepted_media_type first to reject unacceptable requests
+    before simulating.
+
+    Args:
+        request: Incoming request (Accept and Accept-Encoding headers)
+        content: JSON response body, possibly holding NumPy values
+        arrays: 1-D numeric arrays carried natively by the binary formats
+        headers: Extra response headers
+
+    Returns:
+        Response
+    """
+    media_type = accepted_media_type(request)
+    body, format_headers = encode_result(content, arrays, media_type)
+    response_headers = {'Vary': 'Accept, Accept-Encoding', **format_headers, **(headers or {})}
+    if len(body) >= MIN_COMPRESS_BYTES:
+        encoding = negotiate_encoding(request.headers.get('accept-encoding'))
+        if encoding:
+            body = compress(body, encoding)
+            response_headers['Content-Encoding'] = encoding
+    return Response(content=body, media_type=media_type, headers=response_headers)
@@ -7,11 +7,21 @@ making it accessible via HTTP endpoints.
 """
 
 import logging
+import sys
+from pathlib import Path
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import FileResponse, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
-from run_report import main as generate_report
+from run_report import main as generate_report, workspace_report
 from models import ReportRequest, ReportResponse
+from scripts.export_document import get_exporter
+from scripts.template_engine import TEMPLATES_DIR, get_engine
+
+# Service metrics are shared with the simulation APIs
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'pvlib_api'))
+from metrics import REGISTRY, cache_families, gauge_family, install_metrics
 
 # Configure logging
 logging.basicConfig(
@@ -39,6 +49,19 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+def _report_metrics():
+    """Report section cache and export queue, read at scrape time"""
+    exporter = get_exporter()
+    return cache_families({'report_sections': [get_engine(TEMPLATES_DIR)]}) + [
+        gauge_family('pv_report_export_queue_depth', 'PDF exports waiting for or running in the worker pool',
+                     exporter.pending),
+        gauge_family('pv_report_export_workers', 'PDF conversion worker processes', exporter.max_workers),
+    ]
+
+# Prometheus metrics at GET /metrics
+REGISTRY.register_collector(_report_metrics)
+install_metrics(app, 'report_api')
+
 @app.post("/generate", response_model=ReportResponse)
 async def generate_technical_report(request: ReportRequest) -> ReportResponse:
     """
@@ -47,29 +70,25 @@ async def generate_technical_report(request: ReportRequest) -> ReportResponse:
     try:
         logging.info(f"Received report generation request for project: {request.project_name}")
         
-        # Call the report generation function
-        success = generate_report(
+        # Call the report generation function on the worker threadpool
+        result = await run_in_threadpool(
+            generate_report,
             project_name=request.project_name,
             project_specs=request.project_specs,
             components=request.components,
             calculation_results=request.calculation_results,
-            templates=request.templates
+            templates=request.templates,
+            write_files=request.write_files,
+            output_format=request.output_format
         )
         
-        # Read the generated report
-        try:
-            with open("output/final_document.md", "r") as f:
-                report_content = f.read()
-        except FileNotFoundError:
-            raise HTTPException(
-                status_code=500,
-                detail="Report file not found after generation"
-            )
-            
         return ReportResponse(
-            success=True,
-            message="Report generated successfully",
-            report_content=report_content
+            success=result["success"],
+            message=result["message"],
+            report_content=result.get("report_content"),
+            report_url=f"/reports/{result['report_id']}" if result.get("report_id") else None,
+            export_url=f"/exports/{result['export_id']}" if result.get("export_id") else None,
+            error=result.get("error")
         )
         
     except Exception as e:
@@ -80,6 +99,59 @@ async def generate_technical_report(request: ReportRequest) -> ReportResponse:
             error=str(e)
         )
 
+@app.post("/export")
+async def export_technical_report(request: ReportRequest):
+    """
+    Generate a technical report and return the document itself (Markdown, HTML or PDF).
+    """
+    logging.info(f"Received report export request ({request.output_format}) for project: {request.project_name}")
+
+    result = await run_in_threadpool(
+        generate_report,
+        project_name=request.project_name,
+        project_specs=request.project_specs,
+        components=request.components,
+        calculation_results=request.calculation_results,
+        templates=request.templates,
+        output_format=request.output_format
+    )
+
+    if not result["success"]:
+        raise HTTPException(
+            status_code=500,
+            detail=f"{result['message']}: {result.get('error', '')}"
+        )
+
+    if request.output_format == "md":
+        return Response(content=result["report_content"], media_type="text/markdown")
+
+    return FileResponse(
+        result["export_path"],
+        media_type=result["export_media_type"],
+        filename=f"{request.project_name}.{request.output_format}"
+    )
+
+@app.get("/reports/{report_id}")
+async def download_report(report_id: str):
+    """
+    Download the report.md written by a /generate request with write_files set.
+    """
+    report_path = workspace_report(report_id)
+    if report_path is None:
+        raise HTTPException(status_code=404, detail="Report not found or expired")
+    return FileResponse(report_path, media_type="text/markdown", filename="report.md")
+
+@app.get("/exports/{export_id}")
+async def download_export(export_id: str):
+    """
+    Download an HTML/PDF document exported by /generate.
+    """
+    export = get_exporter().find(export_id)
+    if export is None:
+        raise HTTPException(status_code=404, detail="Export not found or expired")
+    path, media_type = export
+    return FileResponse(path, media_type=media_type, filename=f"report{path.suffix}")
+
 @app.get("/")
 async def root():
     """Root endpoint to verify API is running"""
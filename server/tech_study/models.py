@@ -1,4 +1,4 @@
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Literal
 from pydantic import BaseModel, Field
 
 class ReportRequest(BaseModel):
@@ -14,10 +14,14 @@ class ReportRequest(BaseModel):
         "calculations",
         "protection"
     ], description="List of template sections to include")
+    write_files: bool = Field(False, description="Also write inputs, calculations and report.md to a per-request workspace")
+    output_format: Literal["md", "html", "pdf"] = Field("md", description="Report format; html and pdf also export the report document")
 
 class ReportResponse(BaseModel):
     """Response model for report generation"""
     success: bool = Field(..., description="Whether the report generation was successful")
     message: str = Field(..., description="Status message")
     report_content: Optional[str] = Field(None, description="Generated report content in markdown format")
+    report_url: Optional[str] = Field(None, description="Download URL of the written report when write_files was requested")
+    export_url: Optional[str] = Field(None, description="Download URL of the exported HTML/PDF document")
     error: Optional[str] = Field(None, description="Error message if generation failed")
@@ -3,18 +3,23 @@
 Solar PV Technical Project Report Generator
 
 This script orchestrates the generation of a comprehensive Solar PV Technical Project 
-report by executing the calculation scripts and document generation in the correct order.
+report by running the calculations and document generation in-process.
 """
 
-import os
-import subprocess
+import re
 import sys
 import time
+import shutil
+import tempfile
 import yaml
 import logging
 from pathlib import Path
 from typing import Dict, Any, Optional
 
+from scripts.calculate import load_data, run_calculations, save_results as save_calculations
+from scripts.generate_document import DOCUMENT_SECTIONS, build_context, load_constants, render_document
+from scripts.export_document import EXPORT_FORMATS, get_exporter
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -25,6 +30,14 @@ logging.basicConfig(
     ]
 )
 
+# Per-request workspaces for reports written to disk
+WORKSPACES_DIR = Path(__file__).parent / "output" / "workspaces"
+WORKSPACE_PREFIX = "report_"
+# Workspaces older than this are deleted when a new one is created
+WORKSPACE_MAX_AGE = 24 * 3600
+# Workspace names handed to clients as report IDs
+WORKSPACE_ID = re.compile(rf"^{WORKSPACE_PREFIX}[A-Za-z0-9_]+$")
+
 def load_config() -> Optional[Dict[str, Any]]:
     """Load configuration from config.yaml file."""
     script_dir = Path(__file__).parent
@@ -37,21 +50,11 @@ def load_config() -> Optional[Dict[str, Any]]:
         logging.error(f"Error loading configuration: {e}")
         return None
 
-def check_environment():
-    """Verify the required directory structure and files exist."""
+def check_environment(language: str = "fr"):
+    """Verify the required templates and data files exist."""
     script_dir = Path(__file__).parent
-    required_paths = [
-        "data/components.yaml",
-        "data/project_specs.yaml",
-        "data/calculation_results",
-        "scripts/calculate.py",
-        "scripts/generate_document.py",
-        "templates/fr/equipment.md",
-        "templates/fr/cable_sizing.md",
-        "templates/fr/grounding.md",
-        "templates/fr/calculations.md",
-        "templates/fr/protection.md",
-        "output"
+    required_paths = ["data/constants.yaml"] + [
+        f"templates/{language}/{section}.md" for section in DOCUMENT_SECTIONS
     ]
     
     missing_paths = []
@@ -67,147 +70,152 @@ def check_environment():
     
     return True
 
-def run_calculations():
-    """Execute the calculation script to process project data."""
-    print("Step 1/3: Running PV system calculations...")
-    
-    try:
-        script_dir = Path(__file__).parent
-        result = subprocess.run(
-            [sys.executable, str(script_dir / "scripts/calculate.py")],
-            check=True,
-            capture_output=True,
-            text=True,
-            cwd=str(script_dir)  # Set working directory to script directory
-        )
-        logging.info("Calculations completed successfully")
-        logging.info(f"Output: {result.stdout.strip()}")
-        return True
-    except subprocess.CalledProcessError as e:
-        logging.error(f"Error running calculations: {e}")
-        logging.error(f"Error output: {e.stderr}")
-        return False
+def prune_workspaces(root: Path = WORKSPACES_DIR, max_age: float = WORKSPACE_MAX_AGE) -> int:
+    """Delete workspaces not modified for max_age seconds; returns how many were removed."""
+    if not root.exists():
+        return 0
+    cutoff = time.time() - max_age
+    removed = 0
+    for workspace in root.glob(f"{WORKSPACE_PREFIX}*"):
+        try:
+            if workspace.is_dir() and workspace.stat().st_mtime < cutoff:
+                shutil.rmtree(workspace, ignore_errors=True)
+                removed += 1
+        except OSError:
+            continue
+    if removed:
+        logging.info(f"Removed {removed} expired report workspaces")
+    return removed
 
-def validate_calculation_results():
-    """Verify that calculation results exist and are valid."""
-    logging.info("Step 2/3: Validating calculation results...")
-    
-    script_dir = Path(__file__).parent
-    calc_results_dir = script_dir / "data/calculation_results"
-    if not calc_results_dir.exists() or not any(calc_results_dir.iterdir()):
-        logging.error("No calculation results found in data/calculation_results/")
-        return False
-    
-    # Try to load one of the YAML files to validate content
-    try:
-        result_files = list(calc_results_dir.glob("*.yaml"))
-        if result_files:
-            with open(result_files[0], 'r', encoding='utf-8') as f:
-                yaml.safe_load(f)
-        logging.info("Calculation results validated successfully.")
-        return True
-    except Exception as e:
-        logging.error(f"Error validating calculation results: {e}")
-        return False
+def create_workspace(root: Path = WORKSPACES_DIR, max_age: float = WORKSPACE_MAX_AGE) -> Path:
+    """Create an isolated workspace directory so concurrent requests never share files,
+    deleting workspaces older than max_age first."""
+    root.mkdir(parents=True, exist_ok=True)
+    prune_workspaces(root, max_age)
+    return Path(tempfile.mkdtemp(prefix=WORKSPACE_PREFIX, dir=str(root)))
 
-def generate_report(templates: list = None):
-    """Execute the document generation script to create the final report."""
-    logging.info("Step 3/3: Generating final PV technical report...")
-    if templates is None:
-        templates = ["equipment", "cable_sizing", "grounding", "calculations", "protection"]
-    
-    try:
-        script_dir = Path(__file__).parent
-        result = subprocess.run(
-            [sys.executable, str(script_dir / "scripts/generate_document.py")],
-            check=True,
-            capture_output=True,
-            text=True,
-            cwd=str(script_dir)  # Set working directory to script directory
-        )
-        logging.info("Report generation completed successfully")
-        logging.info(f"Output: {result.stdout.strip()}")
-        return True
-    except subprocess.CalledProcessError as e:
-        logging.error(f"Error generating report: {e}")
-        logging.error(f"Error output: {e.stderr}")
-        return False
+def workspace_report(report_id: str, root: Path = WORKSPACES_DIR) -> Optional[Path]:
+    """report.md of the workspace named report_id, or None if the ID is invalid or expired."""
+    if not WORKSPACE_ID.match(report_id):
+        return None
+    report_path = root / report_id / "output" / "report.md"
+    return report_path if report_path.is_file() else None
 
-def verify_output():
-    """Verify that the final document was created successfully."""
-    output_file = Path("output/final_document.md")
-    
-    if not output_file.exists():
-        logging.error("Final document was not generated in output/final_document.md")
-        return False
-    
-    file_size = output_file.stat().st_size
-    if file_size == 0:
-        logging.warning("Final document is empty (0 bytes)")
-        return False
-    
-    logging.info(f"Success! Final document generated: output/final_document.md ({file_size} bytes)")
-    return True
+def save_report_files(output_root: Path, calculations: Dict[str, Any], report_content: str,
+                      project_specs: Dict[str, Any] = None, components: Dict[str, Any] = None,
+                      calculation_results: Dict[str, Any] = None) -> Path:
+    """Write inputs, calculation results and the report under output_root (data/ and output/)."""
+    data_dir = output_root / "data"
+    results_dir = data_dir / "calculation_results"
+    output_dir = output_root / "output"
+    results_dir.mkdir(parents=True, exist_ok=True)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    
+    if project_specs is not None:
+        with open(data_dir / "project_specs.yaml", "w") as f:
+            yaml.dump(project_specs, f)
+    if components is not None:
+        with open(data_dir / "components.yaml", "w") as f:
+            yaml.dump(components, f)
+    if calculation_results:
+        with open(results_dir / "results.yaml", "w") as f:
+            yaml.dump(calculation_results, f)
+    save_calculations(calculations, str(results_dir))
+    
+    report_path = output_dir / "report.md"
+    with open(report_path, "w") as f:
+        f.write(report_content)
+    return report_path
 
-def main(project_name: str, project_specs: Dict[str, Any], components: Dict[str, Any], templates: list = None, calculation_results: Dict[str, Any] = None) -> Dict[str, Any]:
-    """Main execution function for the Solar PV Technical Report Generator."""
+def main(project_name: str, project_specs: Dict[str, Any], components: Dict[str, Any], templates: list = None,
+         calculation_results: Dict[str, Any] = None, write_files: bool = False,
+         language: str = "fr", workspace: Optional[Path] = None,
+         output_format: str = "md") -> Dict[str, Any]:
+    """
+    Main execution function for the Solar PV Technical Report Generator.
+    
+    Calculations and rendering run in-process and the report is returned in
+    the result, so concurrent calls share no state. Inputs, calculations and
+    report.md are only written to disk when write_files is set, into a fresh
+    per-request workspace unless one is given (report_id names a fresh
+    workspace, which is deleted after WORKSPACE_MAX_AGE). An output_format of
+    html or pdf also exports the report, returning the cached document's
+    export_path and export_id.
+    """
     start_time = time.time()
     
     logging.info("=== Solar PV Technical Project Report Generator ===")
     logging.info(f"Starting report generation for project: {project_name}")
     
-    # Save input data to YAML files
-    script_dir = Path(__file__).parent
-    try:
-        with open(script_dir / "data/project_specs.yaml", "w") as f:
-            yaml.dump(project_specs, f)
-        with open(script_dir / "data/components.yaml", "w") as f:
-            yaml.dump(components, f)
-        if calculation_results:
-            with open(script_dir / "data/calculation_results/results.yaml", "w") as f:
-                yaml.dump(calculation_results, f)
-    except Exception as e:
-        logging.error(f"Error saving input data: {e}")
-        return {"success": False, "message": "Failed to save input data", "error": str(e)}
+    if output_format != "md" and output_format not in EXPORT_FORMATS:
+        return {"success": False, "message": f"Unsupported output format: {output_format}"}
     
-    # Change to the project root directory if script is run from elsewhere
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    if os.path.basename(script_dir) == "scripts":
-        os.chdir(os.path.dirname(script_dir))
-    print(script_dir)
-    if not check_environment():
+    if not check_environment(language):
         return {"success": False, "message": "Environment check failed"}
     
-    if not run_calculations():
-        return {"success": False, "message": "Calculations failed"}
-    
-    if not validate_calculation_results():
-        return {"success": False, "message": "Calculation validation failed"}
-    
-    if not generate_report(templates):
-        return {"success": False, "message": "Report generation failed"}
-    
-    if not verify_output():
-        return {"success": False, "message": "Output verification failed"}
+    logging.info("Step 1/2: Running PV system calculations...")
+    try:
+        calculations = run_calculations(project_specs, components)
+    except Exception as e:
+        logging.error(f"Error running calculations: {e}")
+        return {"success": False, "message": "Calculations failed", "error": str(e)}
     
+    logging.info("Step 2/2: Generating final PV technical report...")
     try:
-        with open(script_dir / "output/report.md", "r") as f:
-            report_content = f.read()
-        return {
-            "success": True,
-            "message": "Report generated successfully",
-            "report_content": report_content
-        }
+        context = build_context(project_specs, components, calculations, load_constants())
+        report_content = render_document(context, language=language)
+        # Exports get a copy with request values escaped, since they go through markdown_to_html
+        export_content = render_document(context, language=language, escape=True) if output_format != "md" else None
     except Exception as e:
-        return {
-            "success": False,
-            "message": "Failed to read generated report",
-            "error": str(e)
-        }
+        logging.error(f"Error generating report: {e}")
+        return {"success": False, "message": "Report generation failed", "error": str(e)}
+    render_time = time.time()
+    logging.info(f"Report rendered in {(render_time - start_time) * 1000:.1f} ms")
+    
+    export = None
+    if output_format != "md":
+        logging.info(f"Exporting report to {output_format}...")
+        export = get_exporter().export(export_content, output_format, title=project_name)
+        if not export["success"]:
+            return {"success": False, "message": "Report export failed", "error": export["error"]}
+    
+    report_path = None
+    report_id = None
+    if write_files:
+        try:
+            if workspace:
+                workspace = Path(workspace)
+            else:
+                workspace = create_workspace()
+                report_id = workspace.name
+            report_path = save_report_files(workspace, calculations, report_content,
+                                            project_specs, components, calculation_results)
+            logging.info(f"Report written to {report_path}")
+        except Exception as e:
+            logging.error(f"Error saving report files: {e}")
+            return {"success": False, "message": "Failed to save report files", "error": str(e)}
     
     elapsed_time = time.time() - start_time
     logging.info(f"Report generation completed in {elapsed_time:.2f} seconds.")
-    logging.info("=== Process Completed Successfully ===")
+    
+    return {
+        "success": True,
+        "message": "Report generated successfully",
+        "report_content": report_content,
+        "report_path": str(report_path) if report_path else None,
+        "report_id": report_id,
+        "export_path": export["path"] if export else None,
+        "export_id": export["id"] if export else None,
+        "export_media_type": export["media_type"] if export else None,
+        "calculations": calculations
+    }
 
 if __name__ == "__main__":
-    main()
+    # Render from the YAML inputs in data/ and write calculations and output/report.md
+    script_dir = Path(__file__).parent
+    project_specs, components = load_data(str(script_dir / "data"))
+    result = main(project_specs.get("project", {}).get("name", "project"), project_specs, components)
+    if not result["success"]:
+        sys.exit(1)
+    report_path = save_report_files(script_dir, result["calculations"], result["report_content"])
+    logging.info(f"Report written to {report_path}")
@@ -0,0 +1,208 @@
+import numpy as np
+
+# Standard conductor cross-sections (mm²) considered when sizing cables
+STANDARD_SECTIONS = np.array([1.5, 2.5, 4, 6, 10, 16, 25, 35, 50, 70, 95, 120, 150, 185, 240])
+
+DEFAULT_VOLTAGE_DROP_LIMIT = 2.0  # percentage
+
+
+def _field(items, key, default=0.0):
+    """Get one numeric field from a list of dicts or a DataFrame as a float array"""
+    if hasattr(items, 'columns'):
+        if key not in items.columns:
+            return np.full(len(items), float(default))
+        values = items[key].to_numpy(dtype=float, na_value=np.nan)
+    else:
+        values = np.array([item.get(key) for item in items], dtype=float)
+    return np.where(np.isnan(values), default, values)
+
+
+def _text(items, key):
+    """Get one text field from a list of dicts or a DataFrame"""
+    if hasattr(items, 'columns'):
+        return items[key].to_numpy() if key in items.columns else np.full(len(items), None)
+    return np.array([item.get(key) for item in items], dtype=object)
+
+
+def _ratio(numerator, denominator):
+    """numerator / denominator, or 1 where the denominator is zero (as in calculate.py)"""
+    numerator, denominator = np.broadcast_arrays(numerator, denominator)
+    return np.divide(numerator, denominator, out=np.ones(numerator.shape), where=denominator != 0)
+
+
+def batch_array_configuration(panels, inverters, number_panels=1):
+    """
+    Array configuration for every panel x inverter pair
+
+    Returns a dict of arrays shaped (n_panels, n_inverters); panel-only
+    values are broadcast along the inverter axis.
+    """
+    beta_factor = _field(panels, 'tempCoeffVoc') / 100.0
+    alpha_factor = _field(panels, 'tempCoeffIsc') / 100.0
+
+    # At -10°C (cold condition) and 85°C (hot condition)
+    temp_multiplier_cold = 1 + (-35 * beta_factor)
+    temp_multiplier_hot = 1 + (60 * beta_factor)
+    temp_multiplier_isc = 1 + (60 * alpha_factor)
+
+    Voc_10 = (_field(panels, 'openCircuitVoltage') * temp_multiplier_cold)[:, None]
+    Vmp_10 = (_field(panels, 'voltageAtPmax') * temp_multiplier_cold)[:, None]
+    Vmp_85 = (_field(panels, 'voltageAtPmax') * temp_multiplier_hot)[:, None]
+    Isc_85 = (_field(panels, 'shortCircuitCurrent') * temp_multiplier_isc)[:, None]
+    Imp_85 = (_field(panels, 'currentAtPmax') * temp_multiplier_isc)[:, None]
+
+    total_power = (number_panels * _field(panels, 'maxPower', 1))[:, None]
+
+    Nsmax = np.floor(_ratio(_field(inverters, 'maxDcVoltage', 1)[None, :], Voc_10))
+    Nsoptimal = np.floor(_ratio(_field(inverters, 'mpptVoltageRangeMax', 1)[None, :], Vmp_10))
+    Nsmin = np.ceil(_ratio(_field(inverters, 'mpptVoltageRangeMin', 1)[None, :], Vmp_85))
+    Npmax = np.floor(_ratio(_field(inverters, 'maxShortCircuitCurrent', 1)[None, :], Isc_85))
+    Npoptimal = np.floor(_ratio(_field(inverters, 'maxInputCurrentPerMppt', 1)[None, :], Imp_85))
+    power_ratio = total_power / _field(inverters, 'nominalOutputPower', 1)[None, :]
+
+    shape = Nsmax.shape
+    return {
+        'Voc_10': np.broadcast_to(Voc_10, shape),
+        'Vmp_10': np.broadcast_to(Vmp_10, shape),
+        'Vmp_85': np.broadcast_to(Vmp_85, shape),
+        'Isc_85': np.broadcast_to(Isc_85, shape),
+        'Imp_85': np.broadcast_to(Imp_85, shape),
+        'Nsmax': Nsmax.astype(int),
+        'Nsoptimal': Nsoptimal.astype(int),
+        'Nsmin': Nsmin.astype(int),
+        'Npmax': Npmax.astype(int),
+        'Npoptimal': Npoptimal.astype(int),
+        'power_ratio': power_ratio,
+        'array_power': np.broadcast_to(total_power, shape)
+    }
+
+
+def batch_protection_devices(panels):
+    """Protection device ratings per panel (arrays shaped (n_panels,))"""
+    Irm = _field(panels, 'maxSeriesFuseRating')
+    Isc = _field(panels, 'shortCircuitCurrent')
+    Impp = _field(panels, 'currentAtPmax')
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        Ncmax_lmt = (1 + Irm) / Isc
+        Npmax_lmt = 0.5 * (1 + (Irm / Impp))
+
+    return {
+        'fuse_IscSTC': Isc * 1.1 * 1.25,
+        'switch_IscSTC': Isc * 1.25,
+        'Vocmax': _field(panels, 'openCircuitVoltage') * 1.2,
+        'Iscmax': Isc * 1.25,
+        'Ncmax_lmt': Ncmax_lmt,
+        'Npmax_lmt': Npmax_lmt
+    }
+
+
+def required_section(min_section):
+    """Smallest standard section at least min_section (NaN if none is large enough)"""
+    index = np.searchsorted(STANDARD_SECTIONS, min_section, side='left')
+    sections = np.append(STANDARD_SECTIONS, np.nan)
+    return sections[np.minimum(index, len(STANDARD_SECTIONS))]
+
+
+def batch_cable_sizing(panels, inverters, project_specs=None, components=None,
+                       voltage_drop_limit=DEFAULT_VOLTAGE_DROP_LIMIT):
+    """
+    DC cable sizing per panel and AC cable sizing per inverter
+
+    Voltage drops use the configured cable sections, as in calculate.py;
+    dc_section_required / ac_section_required give the smallest standard
+    section keeping each drop within voltage_drop_limit (%).
+    """
+    project_specs = project_specs or {}
+    components = components or {}
+    constants = project_specs.get('constants', {})
+    project = project_specs.get('project', {})
+    dc_cable = components.get('dc_cable', {})
+    ac_cable = components.get('ac_cable', {})
+
+    rho = constants.get('resistivity_cu', 0.0168)  # Ω·mm²/m (default copper)
+
+    # DC: one string circuit per panel type
+    dc_section = dc_cable.get('section', 4)
+    L = project.get('dcCableLength', 10)
+    ImpSTC = _field(panels, 'currentAtPmax')
+    Ump = _field(panels, 'voltageAtPmax')
+
+    dc_delta_u = 2 * rho * (L / dc_section) * ImpSTC
+    dc_delta_u_perc = 100 * _ratio(dc_delta_u, Ump) * (Ump != 0)
+    dc_min_section = _ratio(2 * rho * L * ImpSTC * 100, voltage_drop_limit * Ump)
+
+    # AC: two runs per inverter
+    ac_section = ac_cable.get('section', 4)
+    L1 = project.get('acCableLength_1', 10)
+    L2 = project.get('acCableLength_2', 10)
+    Imax = _field(inverters, 'maxOutputCurrent')
+    Ve = constants.get('gridVoltage', 230)
+    sin_phi = constants.get('sin_phi', 0.6)
+    cos_phi = constants.get('cos_phi', 0.8)
+    _lambda = constants.get('lambda', 0.00008)  # Ω/m linear reactance (0.08 mΩ/m)
+
+    ac_delta_u_1 = 2 * ((rho * (L1 / ac_section) * cos_phi) + (_lambda * L1 * sin_phi)) * Imax
+    ac_delta_u_2 = 2 * ((rho * (L2 / ac_section) * cos_phi) + (_lambda * L2 * sin_phi)) * Imax
+    ac_delta_u_perc_1 = 100 * ac_delta_u_1 / Ve if Ve != 0 else np.full(Imax.shape, 230.0)
+    ac_delta_u_perc_2 = 100 * ac_delta_u_2 / Ve if Ve != 0 else np.full(Imax.shape, 230.0)
+
+    # Smallest section for which both AC runs together stay within the limit
+    ac_reactive = 2 * _lambda * (L1 + L2) * sin_phi * Imax
+    ac_resistive_budget = voltage_drop_limit * Ve / 100 - ac_reactive
+    ac_min_section = np.where(
+        ac_resistive_budget > 0,
+        _ratio(2 * rho * (L1 + L2) * cos_phi * Imax, ac_resistive_budget),
+        np.inf
+    )
+
+    return {
+        'dc_delta_u': dc_delta_u,
+        'dc_delta_u_perc': dc_delta_u_perc,
+        'dc_section_required': required_section(dc_min_section),
+        'ac_delta_u_perc': ac_delta_u_perc_1 + ac_delta_u_perc_2,
+        'ac_section_required': required_section(ac_min_section)
+    }
+
+
+def feasibility_table(panels, inverters, project_specs=None, components=None,
+                      voltage_drop_limit=DEFAULT_VOLTAGE_DROP_LIMIT):
+    """
+    Screen every panel x inverter combination
+
+    Returns a pandas DataFrame with one row per pair, the array and
+    protection values, required cable sections and an is_compatible flag
+    (a valid series string length and at least one string in parallel).
+    """
+    import pandas as pd
+
+    project_specs = project_specs or {}
+    number_panels = project_specs.get('project', {}).get('numberPanels', 1)
+
+    array = batch_array_configuration(panels, inverters, number_panels)
+    protection = batch_protection_devices(panels)
+    cables = batch_cable_sizing(panels, inverters, project_specs, components, voltage_drop_limit)
+
+    n_panels, n_inverters = array['Nsmax'].shape
+    panel_index = np.repeat(np.arange(n_panels), n_inverters)
+    inverter_index = np.tile(np.arange(n_inverters), n_panels)
+
+    columns = {
+        'panel_index': panel_index,
+        'inverter_index': inverter_index,
+        'panel_model': _text(panels, 'model')[panel_index],
+        'inverter_model': _text(inverters, 'model')[inverter_index],
+    }
+    columns.update({name: values.ravel() for name, values in array.items()})
+    columns.update({name: values[panel_index] for name, values in protection.items()})
+    columns['dc_section_required'] = cables['dc_section_required'][panel_index]
+    columns['ac_section_required'] = cables['ac_section_required'][inverter_index]
+    columns['ac_delta_u_perc'] = cables['ac_delta_u_perc'][inverter_index]
+
+    # Longest usable string respects both the DC voltage and the MPPT window
+    Ns_upper = np.minimum(array['Nsmax'], array['Nsoptimal']).ravel()
+    columns['is_compatible'] = (
+        (array['Nsmin'].ravel() <= Ns_upper) & (Ns_upper >= 1) & (array['Npmax'].ravel() >= 1)
+    )
+
+    return pd.DataFrame(columns)
@@ -0,0 +1,490 @@
+import os
+import re
+import html
+import time
+import base64
+import hashlib
+import logging
+import mimetypes
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path, PurePosixPath
+
+logger = logging.getLogger(__name__)
+
+TECH_STUDY_DIR = Path(__file__).resolve().parent.parent
+STYLESHEET_FILE = TECH_STUDY_DIR / 'templates' / 'report.css'
+EXPORTS_DIR = TECH_STUDY_DIR / 'output' / 'exports'
+
+# Only images under these directories (and the export cache) are inlined into documents
+ASSET_DIRS = (TECH_STUDY_DIR / 'templates', TECH_STUDY_DIR / 'output')
+
+EXPORT_FORMATS = {
+    'html': 'text/html',
+    'pdf': 'application/pdf'
+}
+
+# Conversion pool bounds (PDF rendering is CPU bound, so it runs in worker processes)
+EXPORT_WORKERS_ENV = 'REPORT_EXPORT_WORKERS'
+DEFAULT_MAX_WORKERS = 2
+DEFAULT_MAX_PENDING = 8
+DEFAULT_QUEUE_TIMEOUT = 30
+
+# Export cache bounds: entries unused for longer, then the least recently used
+# beyond the size limit, are deleted after each new export
+EXPORT_CACHE_MAX_AGE = 7 * 24 * 3600
+EXPORT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+HEADING = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+RULE = re.compile(r'^\s*([-*_])(\s*\1){2,}\s*$')
+LIST_ITEM = re.compile(r'^(\s*)([-*+]|\d+\.)\s+(.*)$')
+TABLE_SEPARATOR = re.compile(r'^\s*\|?[\s|:-]*-[\s|:-]*$')
+
+# Spans left untouched by inline formatting: code, display math, inline math
+PROTECTED = re.compile(r'`([^`]+)`|\$\$(.+?)\$\$|\$([^$\n]+)\$')
+INLINE_RULES = [
+    (re.compile(r'<(?!/?[A-Za-z][^<>]*>)'), '&lt;'),
+    (re.compile(r'&(?!#?\w+;)'), '&amp;'),
+    (re.compile(r'!\[([^\]]*)\]\(([^)\s]+)\)'), r'<img src="\2" alt="\1">'),
+    (re.compile(r'\[([^\]]+)\]\(([^)\s]+)\)'), r'<a href="\2">\1</a>'),
+    (re.compile(r'\*\*(.+?)\*\*|__(.+?)__'), lambda m: f'<strong>{m.group(1) or m.group(2)}</strong>'),
+    (re.compile(r'(?<![*\w])\*(?![\s*])(.+?)(?<![\s*])\*(?![*\w])'), r'<em>\1</em>'),
+    (re.compile(r'~([^~\s]+)~'), r'<sub>\1</sub>'),
+    (re.compile(r'\^([^^\s]+)\^'), r'<sup>\1</sup>'),
+]
+IMAGE_SOURCE = re.compile(r'<img src="([^"]+)"')
+
+# Export IDs handed to clients: content key plus format suffix
+EXPORT_ID = re.compile(r'^([0-9a-f]{64})(\.(?:html|pdf))$')
+
+
+def inline_markdown(text):
+    """Convert inline Markdown (emphasis, sub/superscript, links, images) to HTML"""
+    protected = []
+
+    def protect(match):
+        code, display_math, math = match.groups()
+        if code is not None:
+            protected.append(f'<code>{html.escape(code)}</code>')
+        elif display_math is not None:
+            protected.append(f'<div class="math">{html.escape(display_math)}</div>')
+        else:
+            protected.append(f'<span class="math">{html.escape(math)}</span>')
+        return f'\0{len(protected) - 1}\0'
+
+    text = PROTECTED.sub(protect, text)
+    for pattern, replacement in INLINE_RULES:
+        text = pattern.sub(replacement, text)
+    return re.sub(r'\0(\d+)\0', lambda m: protected[int(m.group(1))], text)
+
+
+def _table_cells(line):
+    """Split a Markdown table row into cell texts"""
+    line = line.strip()
+    if line.startswith('|'):
+        line = line[1:]
+    if line.endswith('|'):
+        line = line[:-1]
+    return [cell.strip() for cell in line.split('|')]
+
+
+def markdown_to_html(text):
+    """
+    Convert report Markdown to an HTML fragment
+
+    Covers the syntax the report templates use: front matter, headings,
+    pipe tables, nested lists, rules, paragraphs, inline HTML, math spans
+    and pandoc-style ~sub~ / ^sup^.
+    """
+    lines = text.splitlines()
+    out = []
+    paragraph = []
+    lists = []  # stack of (indent, tag) for open lists
+
+    def close_paragraph():
+        if paragraph:
+            out.append(f'<p>{inline_markdown(" ".join(paragraph))}</p>')
+            paragraph.clear()
+
+    def close_lists(indent=-1):
+        while lists and lists[-1][0] > indent:
+            out.append(f'</li></{lists.pop()[1]}>')
+
+    # Skip YAML front matter
+    i = 0
+    if lines and lines[0].strip() == '---':
+        end = next((j for j in range(1, len(lines)) if lines[j].strip() == '---'), None)
+        if end is not None:
+            i = end + 1
+
+    while i < len(lines):
+        line = lines[i]
+        stripped = line.strip()
+
+        if not stripped:
+            close_paragraph()
+            i += 1
+            continue
+
+        item = LIST_ITEM.match(line)
+        if item and not RULE.match(line):
+            close_paragraph()
+            indent = len(item.group(1).expandtabs(4))
+            tag = 'ol' if item.group(2)[0].isdigit() else 'ul'
+            close_lists(indent)
+            if lists and lists[-1][0] == indent and lists[-1][1] != tag:
+                out.append(f'</li></{lists.pop()[1]}>')
+            if lists and lists[-1][0] == indent:
+                out.append('</li>')
+            else:
+                out.append(f'<{tag}>')
+                lists.append((indent, tag))
+            out.append(f'<li>{inline_markdown(item.group(3))}')
+            i += 1
+            continue
+
+        # Indented continuation of a list item
+        if lists and line[:1].isspace():
+            out.append(' ' + inline_markdown(stripped))
+            i += 1
+            continue
+
+        close_lists()
+
+        heading = HEADING.match(line)
+        if heading:
+            close_paragraph()
+            level = len(heading.group(1))
+            out.append(f'<h{level}>{inline_markdown(heading.group(2))}</h{level}>')
+            i += 1
+            continue
+
+        if RULE.match(line):
+            close_paragraph()
+            out.append('<hr>')
+            i += 1
+            continue
+
+        if stripped.startswith('|') and i + 1 < len(lines) and TABLE_SEPARATOR.match(lines[i + 1]):
+            close_paragraph()
+            header = _table_cells(line)
+            out.append('<table>')
+            out.append('<thead><tr>' + ''.join(f'<th>{inline_markdown(cell)}</th>' for cell in header) + '</tr></thead>')
+            out.append('<tbody>')
+            i += 2
+            while i < len(lines) and lines[i].strip().startswith('|'):
+                cells = _table_cells(lines[i])
+                out.append('<tr>' + ''.join(f'<td>{inline_markdown(cell)}</td>' for cell in cells) + '</tr>')
+                i += 1
+            out.append('</tbody></table>')
+            continue
+
+        paragraph.append(stripped)
+        i += 1
+
+    close_paragraph()
+    close_lists()
+    return '\n'.join(out)
+
+
+class AssetCache:
+    """Content-addressed store for exported documents, charts and static assets"""
+
+    def __init__(self, cache_dir=EXPORTS_DIR):
+        self.cache_dir = Path(cache_dir)
+        self._data_uris = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def digest(data):
+        """SHA-256 hex digest of bytes or text"""
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        return hashlib.sha256(data).hexdigest()
+
+    def path_for(self, key, suffix):
+        """Location of a cached entry"""
+        return self.cache_dir / key[:2] / f'{key}{suffix}'
+
+    def get(self, key, suffix):
+        """Path of a cached entry, or None if it has not been stored (marks it used for pruning)"""
+        path = self.path_for(key, suffix)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def put(self, key, data, suffix):
+        """Store bytes under key (atomically) and return the path"""
+        path = self.path_for(key, suffix)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=str(path.parent), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        return path
+
+    def prune(self, max_bytes=None, max_age=None, keep=None):
+        """
+        Delete entries unused for max_age seconds, then the least recently used
+        ones until the cache holds at most max_bytes
+
+        Args:
+            max_bytes: Size limit of the cache directory, or None
+            max_age: Seconds since an entry was stored or last read, or None
+            keep: Path never deleted (the entry just stored)
+
+        Returns:
+            Number of entries deleted
+        """
+        entries = []
+        for path in self.cache_dir.glob('*/*'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if path.is_file() and path.suffix != '.tmp' and path != keep:
+                entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        if keep is not None and keep.exists():
+            total += keep.stat().st_size
+        cutoff = time.time() - max_age if max_age is not None else None
+
+        removed = 0
+        for mtime, size, path in entries:
+            expired = cutoff is not None and mtime < cutoff
+            if not expired and (max_bytes is None or total <= max_bytes):
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+
+        if removed:
+            logger.info(f"Pruned {removed} entries from the export cache")
+        return removed
+
+    def store(self, data, suffix):
+        """Store content under its own hash, skipping the write if already present"""
+        key = self.digest(data)
+        return self.get(key, suffix) or self.put(key, data, suffix)
+
+    def store_figure(self, figure, fmt='png', dpi=150):
+        """Store a rendered matplotlib figure and return its path"""
+        from io import BytesIO
+
+        buffer = BytesIO()
+        figure.savefig(buffer, format=fmt, dpi=dpi, bbox_inches='tight')
+        return self.store(buffer.getvalue(), f'.{fmt}')
+
+    def data_uri(self, path):
+        """Inline a local file as a data URI, encoding each distinct content once"""
+        data = Path(path).read_bytes()
+        key = self.digest(data)
+        with self._lock:
+            uri = self._data_uris.get(key)
+        if uri is None:
+            mime_type = mimetypes.guess_type(str(path))[0] or 'application/octet-stream'
+            uri = f'data:{mime_type};base64,{base64.b64encode(data).decode("ascii")}'
+            with self._lock:
+                self._data_uris[key] = uri
+        return uri
+
+
+@lru_cache(maxsize=None)
+def load_stylesheet(stylesheet_file=STYLESHEET_FILE):
+    """Load the report stylesheet (cached)"""
+    return Path(stylesheet_file).read_text(encoding='utf-8')
+
+
+def resolve_asset(source, base_dir, asset_dirs):
+    """
+    Local file an image source refers to, if it may be inlined
+
+    Only relative paths without '..' that resolve to an image under one of
+    asset_dirs qualify; URLs, absolute paths and anything else give None.
+    """
+    relative = PurePosixPath(source)
+    if ':' in source or '\\' in source or relative.is_absolute() or '..' in relative.parts:
+        return None
+    path = (Path(base_dir) / relative).resolve()
+    if not any(path.is_relative_to(Path(directory).resolve()) for directory in asset_dirs):
+        return None
+    if not (mimetypes.guess_type(path.name)[0] or '').startswith('image/') or not path.is_file():
+        return None
+    return path
+
+
+def render_html(markdown_text, title='Report', assets=None, base_dir=None, asset_dirs=None):
+    """
+    Render report Markdown to a standalone HTML document
+
+    Local images under the asset directories (ASSET_DIRS and the export
+    cache by default) are inlined as data URIs so the document carries no
+    external references; other image sources are left as they are.
+    """
+    body = markdown_to_html(markdown_text)
+
+    if assets is not None:
+        base_dir = Path(base_dir) if base_dir else TECH_STUDY_DIR
+        if asset_dirs is None:
+            asset_dirs = ASSET_DIRS + (assets.cache_dir,)
+
+        def inline_image(match):
+            path = resolve_asset(html.unescape(match.group(1)), base_dir, asset_dirs)
+            if path is None:
+                return match.group(0)
+            return f'<img src="{assets.data_uri(path)}"'
+
+        body = IMAGE_SOURCE.sub(inline_image, body)
+
+    return (
+        '<!DOCTYPE html>\n'
+        '<html>\n<head>\n<meta charset="utf-8">\n'
+        f'<title>{html.escape(title)}</title>\n'
+        f'<style>\n{load_stylesheet()}</style>\n'
+        '</head>\n<body>\n'
+        f'{body}\n'
+        '</body>\n</html>\n'
+    )
+
+
+def _data_url_fetcher(url, *args, **kwargs):
+    # Documents inline every local asset, so nothing else is fetched while rendering
+    from weasyprint import default_url_fetcher
+
+    if not url.startswith('data:'):
+        raise ValueError(f"External resource not allowed in exported documents: {url}")
+    return default_url_fetcher(url, *args, **kwargs)
+
+
+def html_to_pdf(html_document):
+    """Convert an HTML document to PDF bytes (requires weasyprint)"""
+    try:
+        from weasyprint import HTML
+    except ImportError:
+        raise RuntimeError("PDF export requires weasyprint. Install with: pip install weasyprint")
+    return HTML(string=html_document, base_url=str(TECH_STUDY_DIR),
+                url_fetcher=_data_url_fetcher).write_pdf()
+
+
+class ReportExporter:
+    """Export report Markdown to HTML/PDF with cached output and a bounded worker pool"""
+
+    def __init__(self, cache_dir=EXPORTS_DIR, max_workers=DEFAULT_MAX_WORKERS,
+                 max_pending=DEFAULT_MAX_PENDING, queue_timeout=DEFAULT_QUEUE_TIMEOUT,
+                 max_cache_bytes=EXPORT_CACHE_MAX_BYTES, max_cache_age=EXPORT_CACHE_MAX_AGE):
+        self.assets = AssetCache(cache_dir)
+        self.max_cache_bytes = max_cache_bytes
+        self.max_cache_age = max_cache_age
+        self.max_workers = max_workers
+        self.queue_timeout = queue_timeout
+        self.max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+        # PDF conversions waiting for or holding a slot
+        self.pending = 0
+        self._pending_lock = threading.Lock()
+
+    def _pool(self):
+        """Start the conversion processes on first use"""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._executor
+
+    def export(self, markdown_text, output_format='html', title='Report'):
+        """
+        Export report Markdown
+
+        Args:
+            markdown_text: Rendered report content
+            output_format: 'html' or 'pdf'
+            title: Document title
+
+        Returns:
+            Dictionary with success, id (for export_path), path, format,
+            media_type, cached and elapsed_ms
+        """
+        start_time = time.perf_counter()
+
+        if output_format not in EXPORT_FORMATS:
+            return {'success': False, 'error': f"Unsupported export format: {output_format}"}
+
+        # Key on the rendered document, which carries the title, stylesheet and
+        # inlined images, so a chart regenerated at the same path is a new export
+        document = render_html(markdown_text, title, self.assets)
+        suffix = f'.{output_format}'
+        key = self.assets.digest(f'{output_format}\0{document}')
+
+        path = self.assets.get(key, suffix)
+        cached = path is not None
+
+        if not cached:
+            if output_format == 'html':
+                data = document.encode('utf-8')
+            else:
+                with self._pending_lock:
+                    self.pending += 1
+                try:
+                    if not self._slots.acquire(timeout=self.queue_timeout):
+                        return {'success': False, 'error': "Export queue is full, try again later"}
+                    try:
+                        data = self._pool().submit(html_to_pdf, document).result()
+                    except Exception as e:
+                        logger.error(f"PDF conversion failed: {e}")
+                        return {'success': False, 'error': str(e)}
+                    finally:
+                        self._slots.release()
+                finally:
+                    with self._pending_lock:
+                        self.pending -= 1
+
+            path = self.assets.put(key, data, suffix)
+            self.assets.prune(self.max_cache_bytes, self.max_cache_age, keep=path)
+
+        elapsed_ms = (time.perf_counter() - start_time) * 1000
+        logger.info(f"Exported {output_format} report in {elapsed_ms:.1f} ms"
+                    f"{' (cached)' if cached else ''}: {path}")
+
+        return {
+            'success': True,
+            'id': f'{key}{suffix}',
+            'path': str(path),
+            'format': output_format,
+            'media_type': EXPORT_FORMATS[output_format],
+            'cached': cached,
+            'elapsed_ms': round(elapsed_ms, 2)
+        }
+
+    def find(self, export_id):
+        """Path and media type of a cached export by its ID, or None if invalid or pruned"""
+        match = EXPORT_ID.match(export_id)
+        if not match:
+            return None
+        key, suffix = match.groups()
+        path = self.assets.get(key, suffix)
+        return (path, EXPORT_FORMATS[suffix[1:]]) if path else None
+
+    def shutdown(self):
+        """Stop the conversion processes"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+@lru_cache(maxsize=None)
+def get_exporter():
+    """Get the shared report exporter"""
+    max_workers = int(os.environ.get(EXPORT_WORKERS_ENV, DEFAULT_MAX_WORKERS))
+    return ReportExporter(max_workers=max_workers)
@@ -1,8 +1,13 @@
 import yaml
 import os
-import jinja2
+from functools import lru_cache
 from pathlib import Path
 
+try:
+    from scripts.template_engine import get_engine
+except ImportError:  # run directly as scripts/generate_document.py
+    from template_engine import get_engine
+
 def load_data():
     """Load project specifications, component data, and calculation results"""
     with open('data/project_specs.yaml', 'r') as f:
@@ -18,27 +23,38 @@ def load_data():
         constants = yaml.safe_load(f)
     return project_specs, components, calculations, constants
 
-def render_template(template_path, context):
-    """Render a Jinja2 template with the given context"""
-    template_dir = os.path.dirname(template_path)
-    template_file = os.path.basename(template_path)
-    
-    # Set up Jinja2 environment
-    env = jinja2.Environment(loader=jinja2.FileSystemLoader(template_dir))
-    
-    # Load the template
-    template = env.get_template(template_file)
-    
-    # Render the template with the context
-    return template.render(**context)
+# Document sections in output order
+DOCUMENT_SECTIONS = [
+    'equipment',
+    'array_configuration',
+    'protection',
+    'cable_sizing',
+    'grounding',
+    'calculations'
+]
 
-def main():
-    """Generate the final document by combining templates"""
-    # Load data
-    project_specs, components, calculations, constants = load_data()
-    
-    # Combine all data into a single context dictionary
-    context = {
+TEMPLATES_DIR = Path(__file__).resolve().parent.parent / 'templates'
+CONSTANTS_FILE = Path(__file__).resolve().parent.parent / 'data' / 'constants.yaml'
+
+DOCUMENT_HEADER = """---
+math: true
+mathjax: true
+layout: post
+---
+
+"""
+
+@lru_cache(maxsize=None)
+def load_constants(constants_file=CONSTANTS_FILE):
+    """Load electrical constants (cached)"""
+    with open(constants_file, 'r') as f:
+        return yaml.safe_load(f)
+
+def build_context(project_specs, components, calculations, constants):
+    """Combine all data into a single template context dictionary"""
+    return {
+        # Every component entry (e.g. distributor) is addressable by name
+        **components,
         'project_specs': project_specs,
         'components': components,
         'constants': constants.get('constants', {}),
@@ -57,47 +73,39 @@ def main():
         'dc_cable_sizing': calculations.get('dc_cable_sizing', {} ),
         'ac1_cable_sizing': calculations.get('ac1_cable_sizing', {} ),
         'ac2_cable_sizing': calculations.get('ac2_cable_sizing', {} ),
+        # Flat dc_/ac_ keys used by the cable sizing templates
+        'cable_sizing': calculations.get('cable_sizing') or {
+            **{f'dc_{key}': value for key, value in calculations.get('dc_cable_sizing', {}).items()},
+            **{f'ac_{key}': value for key, value in calculations.get('ac1_cable_sizing', {}).items()},
+        },
     }
+
+def render_document(context, language='fr', sections=None, template_dir=TEMPLATES_DIR, escape=False):
+    """Render the report sections and combine them into the final document
+
+    Set escape when the document will be exported to HTML/PDF, so context values
+    are rendered as literal text rather than Markdown or HTML.
+    """
+    engine = get_engine(Path(template_dir).resolve(), escape)
+    contents = engine.render_sections(sections or DOCUMENT_SECTIONS, context, language)
+    return DOCUMENT_HEADER + ''.join(f'{content}\n\n' for content in contents)
+
+def main():
+    """Generate the final document by combining templates"""
+    # Load data
+    project_specs, components, calculations, constants = load_data()
+    
+    context = build_context(project_specs, components, calculations, constants)
     
     # Ensure output directory exists
     os.makedirs('output', exist_ok=True)
     
-    # Render each template
-    equipment_content = render_template('templates/fr/equipment.md', context)
-    array_config_content = render_template('templates/fr/array_configuration.md', context)
-    protection_content = render_template('templates/fr/protection.md', context)
-    cable_sizing_content = render_template('templates/fr/cable_sizing.md', context)
-    grounding_content = render_template('templates/fr/grounding.md', context)
-    calculations_content = render_template('templates/fr/calculations.md', context)
-    
-    # Combine all content into the final document
-    final_document = f"""---
-math: true
-mathjax: true
-layout: post
----
-
-{equipment_content}
-
-{array_config_content}
-
-{protection_content}
-
-{cable_sizing_content}
-
-{grounding_content}
-
-{calculations_content}
-
-"""
+    final_document = render_document(context, template_dir='templates')
     
     # Write the final document to file
     with open('output/report.md', 'w') as f:
         f.write(final_document)
     
-    print("Context:", context)
-    print("Document generation completed.")
-    print("Components:", components)
     print("Document generation completed.")
 
 if __name__ == "__main__":
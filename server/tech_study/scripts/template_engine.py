@@ -0,0 +1,121 @@
+import os
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+
+import jinja2
+from jinja2 import meta
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES_DIR = Path(__file__).resolve().parent.parent / 'templates'
+
+# Optional on-disk bytecode cache so new processes skip template compilation
+BYTECODE_CACHE_ENV = 'REPORT_BYTECODE_CACHE_DIR'
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_CACHE_SIZE = 256
+
+# Characters with a meaning in Markdown or HTML, written as character references in
+# output rendered for HTML export so request-supplied values (customer, maker,
+# model...) stay plain text; the Markdown report keeps the values as given
+MARKDOWN_ESCAPES = str.maketrans({char: f'&#{ord(char)};' for char in '&<>[]!|*_`$~^\\'})
+
+
+def escape_markdown(value):
+    """Jinja finalize hook: numbers pass through, anything else is rendered as literal text"""
+    if isinstance(value, (int, float)):
+        return value
+    return str(value).translate(MARKDOWN_ESCAPES)
+
+
+class TemplateEngine:
+    """Compile report templates once and render sections with a per-section cache"""
+
+    def __init__(self, template_dir=TEMPLATES_DIR, bytecode_cache_dir=None,
+                 max_workers=DEFAULT_MAX_WORKERS, cache_size=DEFAULT_CACHE_SIZE, escape=False):
+        bytecode_cache = None
+        if bytecode_cache_dir:
+            os.makedirs(bytecode_cache_dir, exist_ok=True)
+            bytecode_cache = jinja2.FileSystemBytecodeCache(str(bytecode_cache_dir))
+
+        self.template_dir = Path(template_dir)
+        self.env = jinja2.Environment(
+            loader=jinja2.FileSystemLoader(str(self.template_dir)),
+            bytecode_cache=bytecode_cache,
+            # Values are only escaped for output headed to markdown_to_html
+            finalize=escape_markdown if escape else None
+        )
+
+        # Compile every template up front and record the context names each one reads
+        self.templates = {}
+        self.variables = {}
+        for name in self.env.list_templates(extensions=['md']):
+            source = self.env.loader.get_source(self.env, name)[0]
+            self.variables[name] = sorted(meta.find_undeclared_variables(self.env.parse(source)))
+            self.templates[name] = self.env.get_template(name)
+
+        self.cache_size = cache_size
+        self._rendered = OrderedDict()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='report-render')
+
+        self.hits = 0
+        self.misses = 0
+
+        logger.info(f"Compiled {len(self.templates)} report templates from {self.template_dir}")
+
+    def context_key(self, name, context):
+        """Hash of the context values a template actually uses"""
+        used = {variable: context.get(variable) for variable in self.variables[name]}
+        payload = json.dumps(used, sort_keys=True, default=str)
+        return hashlib.sha256(f'{name}\0{payload}'.encode('utf-8')).hexdigest()
+
+    def render_template(self, name, context):
+        """Render one template, reusing the cached output when its inputs are unchanged"""
+        key = self.context_key(name, context)
+
+        with self._lock:
+            content = self._rendered.get(key)
+            if content is not None:
+                self._rendered.move_to_end(key)
+                self.hits += 1
+                return content
+
+        content = self.templates[name].render(**context)
+
+        with self._lock:
+            self.misses += 1
+            self._rendered[key] = content
+            while len(self._rendered) > self.cache_size:
+                self._rendered.popitem(last=False)
+
+        return content
+
+    def render_sections(self, sections, context, language='fr'):
+        """Render sections in parallel, returning their content in section order"""
+        names = [f'{language}/{section}.md' for section in sections]
+        missing = [name for name in names if name not in self.templates]
+        if missing:
+            raise jinja2.TemplateNotFound(', '.join(missing))
+
+        if len(names) == 1:
+            return [self.render_template(names[0], context)]
+
+        return list(self._executor.map(lambda name: self.render_template(name, context), names))
+
+    def clear(self):
+        """Drop all cached section output"""
+        with self._lock:
+            self._rendered.clear()
+
+
+@lru_cache(maxsize=None)
+def get_engine(template_dir=TEMPLATES_DIR, escape=False):
+    """Get the shared template engine for a template directory (escaping values for HTML export)"""
+    return TemplateEngine(template_dir, bytecode_cache_dir=os.environ.get(BYTECODE_CACHE_ENV), escape=escape)
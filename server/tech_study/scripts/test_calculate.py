@@ -1,5 +1,15 @@
+import time
 import yaml
-from calculate import calculate_array_configuration, calculate_protection_devices, calculate_cable_sizing
+import numpy as np
+
+try:
+    from scripts.calculate import calculate_array_configuration, calculate_protection_devices, calculate_cable_sizing
+    from scripts.batch_calculate import (batch_array_configuration, batch_protection_devices,
+                                         batch_cable_sizing, feasibility_table)
+except ImportError:
+    from calculate import calculate_array_configuration, calculate_protection_devices, calculate_cable_sizing
+    from batch_calculate import (batch_array_configuration, batch_protection_devices,
+                                 batch_cable_sizing, feasibility_table)
 
 def load_test_data():
     """Load sample project specifications and component data for testing"""
@@ -13,7 +23,9 @@ def load_test_data():
             'openCircuitVoltage': 37.0,
             'voltageAtPmax': 30.0,
             'shortCircuitCurrent': 8.5,
-            'currentAtPmax': 8.0
+            'currentAtPmax': 8.0,
+            'maxSeriesFuseRating': 15,
+            'maxPower': 290
         },
         'inverter': {
             'maxDcVoltage': 1000,
@@ -21,7 +33,8 @@ def load_test_data():
             'mpptVoltageRangeMin': 300,
             'maxShortCircuitCurrent': 100,
             'maxInputCurrentPerMppt': 50,
-            'nominalOutputPower': 3000
+            'nominalOutputPower': 3000,
+            'maxOutputCurrent': 13
         }
     }
     return project_specs, components
@@ -41,9 +54,98 @@ def main():
     print(yaml.dump(protection, default_flow_style=False))
 
     # Test calculate_cable_sizing
-    cable_sizing = calculate_cable_sizing(project_specs, components, array_config)
+    cable_sizing = calculate_cable_sizing(project_specs, components)
     print("Cable Sizing:")
     print(yaml.dump(cable_sizing, default_flow_style=False))
 
+def make_catalog(n_panels, n_inverters, seed=0):
+    """Random panel and inverter catalogs around the sample components"""
+    _, components = load_test_data()
+    rng = np.random.default_rng(seed)
+
+    panels = []
+    for i in range(n_panels):
+        panel = {key: value * rng.uniform(0.8, 1.2) for key, value in components['panel'].items()}
+        panel['model'] = f'panel-{i}'
+        panels.append(panel)
+
+    inverters = []
+    for i in range(n_inverters):
+        inverter = {key: value * rng.uniform(0.5, 1.5) for key, value in components['inverter'].items()}
+        inverter['model'] = f'inverter-{i}'
+        inverters.append(inverter)
+
+    return panels, inverters
+
+
+def test_batch_matches_scalar_calculations():
+    project_specs = {'project': {'numberPanels': 10}}
+    panels, inverters = make_catalog(5, 4)
+
+    array = batch_array_configuration(panels, inverters, number_panels=10)
+    protection = batch_protection_devices(panels)
+    cables = batch_cable_sizing(panels, inverters, project_specs)
+
+    for p, panel in enumerate(panels):
+        for i, inverter in enumerate(inverters):
+            components = {'panel': panel, 'inverter': inverter}
+            expected = calculate_array_configuration(project_specs, components)
+            for key, value in expected.items():
+                assert round(float(array[key][p, i]), 2) == value, key
+
+            expected = calculate_protection_devices(project_specs, components, expected)
+            for key in ('fuse_IscSTC', 'switch_IscSTC', 'Vocmax', 'Iscmax', 'Ncmax_lmt', 'Npmax_lmt'):
+                assert round(float(protection[key][p]), 2) == expected[key], key
+
+            dc, _, ac2 = calculate_cable_sizing(project_specs, components)
+            assert round(float(cables['dc_delta_u_perc'][p]), 2) == dc['delta_u_perc']
+            assert round(float(cables['ac_delta_u_perc'][i]), 2) == ac2['delta_u_perc_total']
+
+
+def test_required_sections_meet_voltage_drop_limit():
+    panels, inverters = make_catalog(20, 10)
+    cables = batch_cable_sizing(panels, inverters, voltage_drop_limit=2.0)
+
+    for p, panel in enumerate(panels):
+        section = cables['dc_section_required'][p]
+        dc, _, _ = calculate_cable_sizing({}, {'panel': panel, 'dc_cable': {'section': section}})
+        assert dc['delta_u_perc'] <= 2.0
+
+    # Every sample inverter can be cabled within the limit with a standard section
+    assert not np.isnan(cables['ac_section_required']).any()
+    for i, inverter in enumerate(inverters):
+        section = cables['ac_section_required'][i]
+        _, _, ac2 = calculate_cable_sizing({}, {'inverter': inverter, 'ac_cable': {'section': section}})
+        assert ac2['delta_u_perc_total'] <= 2.0
+
+
+def test_feasibility_table():
+    project_specs, components = load_test_data()
+    table = feasibility_table([components['panel']], [components['inverter']], project_specs)
+
+    assert len(table) == 1
+    row = table.iloc[0]
+    assert row['Nsmin'] <= row['Nsmax']
+    assert bool(row['is_compatible'])
+
+    # An inverter whose MPPT window starts above its DC voltage limit never fits
+    inverter = dict(components['inverter'], mpptVoltageRangeMin=1200)
+    table = feasibility_table([components['panel']], [inverter], project_specs)
+    assert not table['is_compatible'].any()
+
+
+def test_feasibility_table_large_catalog():
+    panels, inverters = make_catalog(1000, 500)
+
+    start = time.perf_counter()
+    table = feasibility_table(panels, inverters)
+    elapsed = time.perf_counter() - start
+
+    assert len(table) == 500000
+    assert table['panel_model'].iloc[-1] == 'panel-999'
+    assert table['inverter_model'].iloc[-1] == 'inverter-499'
+    assert elapsed < 1.0
+
+
 if __name__ == "__main__":
     main()
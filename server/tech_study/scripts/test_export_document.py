@@ -0,0 +1,172 @@
+import os
+import html
+import re
+import time
+from pathlib import Path
+
+import pytest
+
+try:
+    from scripts import export_document
+    from scripts.export_document import markdown_to_html, render_html, AssetCache, ReportExporter
+    from scripts.template_engine import TemplateEngine
+except ImportError:
+    import export_document
+    from export_document import markdown_to_html, render_html, AssetCache, ReportExporter
+    from template_engine import TemplateEngine
+
+SAMPLE_REPORT = """---
+math: true
+---
+
+# Calculs
+
+| Valeur | Description |
+| -- | -- |
+| T~min~ | Fusible<br>10 A |
+
+- **Nsmax** = 12
+    - Voc = $\\frac{U}{V}$
+- Nsmin = 4
+
+$$Ncmax ≤ (1+\\frac{I_{RM}}{I_{scSTC}})$$
+
+#α not a heading
+"""
+
+
+def test_markdown_to_html():
+    body = markdown_to_html(SAMPLE_REPORT)
+
+    assert 'math: true' not in body
+    assert '<h1>Calculs</h1>' in body
+    assert '<th>Valeur</th>' in body
+    assert '<td>T<sub>min</sub></td><td>Fusible<br>10 A</td>' in body
+    assert body.count('<ul>') == 2
+    assert '<li><strong>Nsmax</strong> = 12' in body
+    assert '<span class="math">\\frac{U}{V}</span>' in body
+    assert '<div class="math">Ncmax ≤ (1+\\frac{I_{RM}}{I_{scSTC}})</div>' in body
+    assert '<p>#α not a heading</p>' in body
+
+
+def test_images_inlined_once(tmp_path):
+    image = tmp_path / 'chart.png'
+    image.write_bytes(b'\x89PNG fake chart')
+    assets = AssetCache(tmp_path / 'cache')
+
+    document = render_html('![chart](chart.png)', assets=assets, base_dir=tmp_path, asset_dirs=[tmp_path])
+
+    assert 'src="data:image/png;base64,' in document
+    assert len(assets._data_uris) == 1
+    assert assets.store(b'same', '.bin') == assets.store(b'same', '.bin')
+
+
+def test_only_asset_images_inlined(tmp_path):
+    assets_dir = tmp_path / 'assets'
+    assets_dir.mkdir()
+    (assets_dir / 'notes.txt').write_text('not an image')
+    (tmp_path / 'secret.png').write_bytes(b'\x89PNG outside the assets')
+    assets = AssetCache(tmp_path / 'cache')
+
+    sources = ['../secret.png', str(tmp_path / 'secret.png'), 'notes.txt', '/etc/hostname',
+               'file:///etc/hostname']
+    document = render_html(''.join(f'![x]({source}) ' for source in sources), assets=assets,
+                           base_dir=assets_dir, asset_dirs=[assets_dir])
+
+    assert 'data:' not in document
+    assert not assets._data_uris
+
+
+def test_request_values_escaped(tmp_path):
+    (tmp_path / 'fr').mkdir()
+    (tmp_path / 'fr' / 'equipment.md').write_text('Client: {{ customer }}, {{ power }} kWc, {{ size }}')
+    context = {'customer': '<b>![x](/etc/hostname)</b>', 'power': 9.5, 'size': '30*35'}
+
+    content = TemplateEngine(tmp_path).render_sections(['equipment'], context)[0]
+    exported = TemplateEngine(tmp_path, escape=True).render_sections(['equipment'], context)[0]
+    body = markdown_to_html(exported)
+
+    # The Markdown report keeps values as given, only the export escapes them
+    assert content == 'Client: <b>![x](/etc/hostname)</b>, 9.5 kWc, 30*35'
+    assert '<img' not in body and '<b>' not in body
+    assert html.unescape(re.sub('<[^>]+>', '', body)) == content
+
+
+def test_export_cached_by_content(tmp_path):
+    exporter = ReportExporter(cache_dir=tmp_path)
+
+    first = exporter.export(SAMPLE_REPORT, 'html', title='Demo')
+    second = exporter.export(SAMPLE_REPORT, 'html', title='Demo')
+    changed = exporter.export(SAMPLE_REPORT + '\nextra', 'html', title='Demo')
+
+    assert first['success'] and not first['cached']
+    assert second['cached'] and second['path'] == first['path']
+    assert changed['path'] != first['path']
+    assert '<title>Demo</title>' in Path(first['path']).read_text(encoding='utf-8')
+    assert not exporter.export(SAMPLE_REPORT, 'docx')['success']
+
+
+def test_export_cache_pruned(tmp_path):
+    exporter = ReportExporter(cache_dir=tmp_path, max_cache_bytes=None, max_cache_age=3600)
+    old = Path(exporter.export('old report', 'html')['path'])
+    os.utime(old, (time.time() - 7200,) * 2)
+    used = Path(exporter.export('used report', 'html')['path'])
+    os.utime(used, (time.time() - 7200,) * 2)
+    assert exporter.export('used report', 'html')['cached']
+
+    new = Path(exporter.export('new report', 'html')['path'])
+    assert not old.exists() and used.exists() and new.exists()
+
+    exporter.max_cache_bytes = new.stat().st_size
+    newest = Path(exporter.export('newest report', 'html')['path'])
+    assert newest.exists() and not used.exists() and not new.exists()
+
+
+def test_export_found_by_id(tmp_path):
+    exporter = ReportExporter(cache_dir=tmp_path)
+    result = exporter.export(SAMPLE_REPORT, 'html', title='Demo')
+
+    assert exporter.find(result['id']) == (Path(result['path']), 'text/html')
+    assert str(tmp_path) not in result['id']
+    assert exporter.find('../' + result['id']) is None
+    assert exporter.find(result['id'].replace('.html', '.pdf')) is None
+
+
+def test_export_cache_follows_images(tmp_path, monkeypatch):
+    chart = tmp_path / 'output' / 'chart.png'
+    chart.parent.mkdir()
+    chart.write_bytes(b'\x89PNG first run')
+    monkeypatch.setattr(export_document, 'TECH_STUDY_DIR', tmp_path)
+    monkeypatch.setattr(export_document, 'ASSET_DIRS', (chart.parent,))
+    exporter = ReportExporter(cache_dir=tmp_path / 'exports')
+
+    first = exporter.export('![chart](output/chart.png)', 'html')
+    chart.write_bytes(b'\x89PNG regenerated with new data')
+    second = exporter.export('![chart](output/chart.png)', 'html')
+
+    assert not second['cached'] and second['path'] != first['path']
+
+
+def test_long_report_export_latency(tmp_path):
+    # Roughly 30 pages of tables, lists and text
+    exporter = ReportExporter(cache_dir=tmp_path)
+    report = '\n'.join(SAMPLE_REPORT.replace('Calculs', f'Section {i}') + 'Lorem ipsum. ' * 200 for i in range(60))
+
+    start = time.perf_counter()
+    result = exporter.export(report, 'html')
+    elapsed = time.perf_counter() - start
+
+    assert result['success']
+    assert elapsed < 0.5
+
+
+def test_pdf_export(tmp_path):
+    pytest.importorskip('weasyprint')
+    exporter = ReportExporter(cache_dir=tmp_path, max_workers=1)
+    try:
+        result = exporter.export(SAMPLE_REPORT, 'pdf')
+    finally:
+        exporter.shutdown()
+
+    assert result['success']
+    assert Path(result['path']).read_bytes().startswith(b'%PDF')